@@ -2,48 +2,96 @@ import os
 import importlib
 from commands.base_command import Command
 
+
+class LazyCommandTable:
+    """Bảng lệnh nạp lười.
+
+    Tên lệnh lấy từ tên file `<tên>_command.py` (không import); module chỉ được import và
+    lệnh được khởi tạo khi lệnh được dùng lần đầu (`name in table` / `table[name]`).
+    """
+
+    def __init__(self, package: str, base_class: type, factory, skip_prefixes=("base_",)):
+        self._package = package
+        self._base_class = base_class
+        self._factory = factory  # factory(command_name, cls) -> instance
+        self._modules = {}
+        self._instances = {}
+        self._aliases = {}
+        command_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), package)
+        for filename in sorted(os.listdir(command_dir)):
+            if filename.endswith("_command.py") and not filename.startswith(tuple(skip_prefixes)):
+                self._modules[filename[:-11]] = f"{package}.{filename[:-3]}"
+
+    def add_alias(self, alias: str, name: str):
+        self._aliases[alias] = name
+
+    def _load(self, name: str):
+        name = self._aliases.get(name, name)
+        if name in self._instances:
+            return self._instances[name]
+        module_name = self._modules.get(name)
+        if module_name is None:
+            return None
+        instance = None
+        try:
+            module = importlib.import_module(module_name)
+            for attr_name in dir(module):
+                attr = getattr(module, attr_name)
+                if isinstance(attr, type) and issubclass(attr, self._base_class) and attr is not self._base_class:
+                    instance = self._factory(name, attr)
+        except Exception as e:
+            print(f"Error loading command from {module_name}: {e}")
+            del self._modules[name]
+            return None
+        if instance is None:
+            del self._modules[name]
+            return None
+        self._instances[name] = instance
+        return instance
+
+    def __contains__(self, name) -> bool:
+        return self._load(name) is not None
+
+    def __getitem__(self, name: str):
+        instance = self._load(name)
+        if instance is None:
+            raise KeyError(name)
+        return instance
+
+    def get(self, name: str, default=None):
+        instance = self._load(name)
+        return default if instance is None else instance
+
+    def keys(self):
+        """Tên các lệnh (kể cả alias) mà không import module."""
+        return list(self._modules) + list(self._aliases)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self._modules) + len(self._aliases)
+
+
 def load_commands(manager, proxy_list, combo_engine):
-    commands = {}
-    command_dir = "commands"
-    for filename in os.listdir(command_dir):
-        if filename.endswith("_command.py") and not filename.startswith("base_") and not filename.startswith("command_loader"):
-            module_name = f"commands.{filename[:-3]}"
-            try:
-                module = importlib.import_module(module_name)
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if isinstance(attr, type) and issubclass(attr, Command) and attr is not Command:
-                        command_name = filename[:-11]  # remove _command.py
-                        
-                        # Instantiate with the correct arguments
-                        if command_name in ["list", "group", "target", "logout", "exit", "plugin"]:
-                            commands[command_name] = attr(manager)
-                        elif command_name in ["login", "proxy"]:
-                            commands[command_name] = attr(manager, proxy_list)
-                        elif command_name == "combo":
-                            commands[command_name] = attr(manager)
-                        elif command_name == "help":
-                            commands[command_name] = attr()
-                        elif command_name == "clear":
-                             commands[command_name] = attr()
-                        elif command_name == "sleep":
-                             commands[command_name] = attr()
-                        elif command_name == "autologin":
-                             commands[command_name] = attr()
-                        elif command_name == "wait":
-                             commands[command_name] = attr()
-                        elif command_name == "config":
-                             commands[command_name] = attr(manager)
-                        elif command_name == "setup_accounts":
-                             commands[command_name] = attr(manager)
-                        else:
-                            commands[command_name] = attr()
-
-            except Exception as e:
-                print(f"Error loading command from {filename}: {e}")
-    
+    def create(command_name, attr):
+        # Instantiate with the correct arguments
+        if command_name in ["list", "group", "target", "logout", "exit", "plugin"]:
+            return attr(manager)
+        elif command_name in ["login", "proxy"]:
+            return attr(manager, proxy_list)
+        elif command_name == "combo":
+            return attr(manager)
+        elif command_name == "config":
+            return attr(manager)
+        elif command_name == "setup_accounts":
+            return attr(manager)
+        else:
+            return attr()
+
+    commands = LazyCommandTable("commands", Command, create, skip_prefixes=("base_", "command_loader"))
+
     # Add aliases
-    if "clear" in commands:
-        commands["cls"] = commands["clear"]
-        
+    commands.add_alias("cls", "clear")
+
     return commands
@@ -0,0 +1,47 @@
+from commands.base_command import Command
+from logs.logger_config import TerminalColors as C
+from logs.metrics import METRICS, start_http_server, stop_http_server, http_server_address
+
+DEFAULT_PORT = 9108
+DEFAULT_DUMP_FILE = "metrics.prom"
+
+
+class MetricsCommand(Command):
+    """metrics serve [port] | stop | dump [file] | show [tiền tố]"""
+
+    async def execute(self, *args, **kwargs) -> bool:
+        parts = kwargs.get('parts', [])
+        sub = parts[1] if len(parts) > 1 else "show"
+
+        if sub == "serve":
+            port = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else DEFAULT_PORT
+            try:
+                await start_http_server(port)
+            except OSError as e:
+                print(f"{C.RED}Không mở được cổng {port}: {e}{C.RESET}")
+                return False
+            host, port = http_server_address()
+            print(f"{C.GREEN}Metrics: http://{host}:{port}/metrics{C.RESET}")
+        elif sub == "stop":
+            await stop_http_server()
+            print("Đã dừng HTTP metrics.")
+        elif sub == "dump":
+            path = parts[2] if len(parts) > 2 else DEFAULT_DUMP_FILE
+            try:
+                METRICS.dump(path)
+                print(f"{C.GREEN}Đã ghi metrics ra {path}{C.RESET}")
+            except OSError as e:
+                print(f"{C.RED}Lỗi ghi file {path}: {e}{C.RESET}")
+        elif sub == "show":
+            prefix = parts[2] if len(parts) > 2 else ""
+            for line in METRICS.expose(prefix).splitlines():
+                if line.startswith("#"):
+                    print(f"{C.DIM}{line}{C.RESET}")
+                else:
+                    print(f"  {line}")
+            address = http_server_address()
+            if address:
+                print(f"{C.GREY}HTTP: http://{address[0]}:{address[1]}/metrics{C.RESET}")
+        else:
+            print(f"{C.YELLOW}Sử dụng: metrics serve [port] | metrics stop | metrics dump [file] | metrics show [tiền tố]{C.RESET}")
+        return False
@@ -0,0 +1,69 @@
+import time
+
+from commands.base_command import Command
+from logs.logger_config import TerminalColors as C
+from logs.loop_monitor import MONITOR
+
+
+class MonitorCommand(Command):
+    """monitor on [interval_ms] [ngưỡng_ms] | off | status | tasks [N] | blocks"""
+
+    async def execute(self, *args, **kwargs) -> bool:
+        parts = kwargs.get('parts', [])
+        sub = parts[1] if len(parts) > 1 else "status"
+
+        if sub == "on":
+            interval = self._ms(parts, 2, 500)
+            threshold = self._ms(parts, 3, 100)
+            MONITOR.start(interval=interval, block_threshold=threshold)
+            print(f"{C.GREEN}Đã BẬT giám sát event loop (đo mỗi {MONITOR.interval * 1000:.0f}ms, "
+                  f"ngưỡng chặn {MONITOR.block_threshold * 1000:.0f}ms).{C.RESET}")
+        elif sub == "off":
+            MONITOR.stop()
+            print("Đã TẮT giám sát event loop.")
+        elif sub == "status":
+            self._print_status()
+        elif sub == "tasks":
+            n = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 15
+            self._print_tasks(n)
+        elif sub == "blocks":
+            self._print_blocks(len(MONITOR.blocks))
+        else:
+            print(f"{C.YELLOW}Sử dụng: monitor on [interval_ms] [ngưỡng_ms] | monitor off | monitor status | "
+                  f"monitor tasks [N] | monitor blocks{C.RESET}")
+        return False
+
+    @staticmethod
+    def _ms(parts, index: int, default: int) -> float:
+        if len(parts) > index and parts[index].isdigit():
+            return int(parts[index]) / 1000
+        return default / 1000
+
+    def _print_status(self):
+        s = MONITOR.status()
+        state = f"{C.GREEN}ĐANG CHẠY{C.RESET}" if MONITOR.running else f"{C.DIM}TẮT{C.RESET}"
+        print(f"\n{C.BOLD}Event loop{C.RESET}: {state}  |  mẫu: {s['samples']}  |  "
+              f"lag tb: {s['avg'] * 1000:.1f}ms  p99: {s['p99'] * 1000:.1f}ms  max: {s['max'] * 1000:.1f}ms  |  "
+              f"bị chặn: {s['blocks']}")
+        self._print_tasks(5)
+        self._print_blocks(5)
+
+    def _print_tasks(self, n: int):
+        by_coro, by_account = MONITOR.census()
+        print(f"\n{C.BOLD}Task đang sống: {sum(by_coro.values())}{C.RESET}")
+        print(f"  {C.CYAN}Theo coroutine:{C.RESET}")
+        for name, count in MONITOR.top(by_coro, n):
+            print(f"    {count:>6}  {name}")
+        print(f"  {C.CYAN}Theo tài khoản:{C.RESET}")
+        for name, count in MONITOR.top(by_account, n):
+            print(f"    {count:>6}  {name}")
+
+    def _print_blocks(self, n: int):
+        blocks = list(MONITOR.blocks)[-n:] if n else []
+        print(f"\n{C.BOLD}Lần chặn loop gần nhất ({len(blocks)}/{len(MONITOR.blocks)}){C.RESET}")
+        if not blocks:
+            print(f"  {C.DIM}(không có){C.RESET}")
+        for b in blocks:
+            at = time.strftime("%H:%M:%S", time.localtime(b.at))
+            print(f"  {C.GREY}{at}{C.RESET} {C.RED}{b.duration * 1000:>7.0f}ms{C.RESET}  "
+                  f"{C.YELLOW}{b.coro}{C.RESET} [{b.account}]  {C.DIM}{b.location}{C.RESET}")
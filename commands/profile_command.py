@@ -0,0 +1,61 @@
+import time
+
+from commands.base_command import Command
+from logs.logger_config import TerminalColors as C
+from logs.profiler import PROFILER
+
+
+class ProfileCommand(Command):
+    """profile start [giây] [hz] | stop | dump [file] | status"""
+
+    async def execute(self, *args, **kwargs) -> bool:
+        parts = kwargs.get('parts', [])
+        sub = parts[1] if len(parts) > 1 else "status"
+
+        if sub == "start":
+            duration = self._number(parts, 2)
+            hz = int(self._number(parts, 3) or 100)
+            PROFILER.start(duration=duration, hz=hz)
+            window = f"trong {duration:g}s" if duration else "đến khi 'profile stop'"
+            print(f"{C.GREEN}Đang lấy mẫu {PROFILER.hz}Hz {window}.{C.RESET}")
+        elif sub == "stop":
+            PROFILER.stop()
+            print(f"Đã dừng profiler ({PROFILER.total} mẫu). Dùng 'profile dump [file]' để ghi kết quả.")
+        elif sub == "dump":
+            if not PROFILER.total:
+                print(f"{C.YELLOW}Chưa có mẫu nào. Chạy 'profile start [giây]' trước.{C.RESET}")
+                return False
+            path = parts[2] if len(parts) > 2 else time.strftime("profile_%Y%m%d_%H%M%S.folded")
+            try:
+                lines = PROFILER.dump(path)
+            except OSError as e:
+                print(f"{C.RED}Lỗi ghi file {path}: {e}{C.RESET}")
+                return False
+            print(f"{C.GREEN}Đã ghi {lines} stack ({PROFILER.total} mẫu) ra {path}{C.RESET}")
+            print(f"{C.GREY}Xem: flamegraph.pl {path} > profile.svg  |  hoặc mở bằng speedscope.app{C.RESET}")
+            self._print_summary()
+        elif sub == "status":
+            state = f"{C.GREEN}ĐANG CHẠY{C.RESET}" if PROFILER.running else f"{C.DIM}TẮT{C.RESET}"
+            print(f"Profiler: {state}  |  {PROFILER.hz}Hz  |  {PROFILER.total} mẫu")
+            if PROFILER.total:
+                self._print_summary()
+        else:
+            print(f"{C.YELLOW}Sử dụng: profile start [giây] [hz] | profile stop | profile dump [file] | "
+                  f"profile status{C.RESET}")
+        return False
+
+    @staticmethod
+    def _number(parts, index: int):
+        try:
+            return float(parts[index]) if len(parts) > index else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _print_summary(n: int = 8):
+        by_account, by_coro = PROFILER.summary()
+        total = PROFILER.total or 1
+        for title, counts in (("Theo coroutine", by_coro), ("Theo tài khoản", by_account)):
+            print(f"  {C.CYAN}{title}:{C.RESET}")
+            for name, count in sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:n]:
+                print(f"    {count * 100 / total:>5.1f}%  {count:>7}  {name}")
@@ -153,3 +153,19 @@ RETRY_CONFIGS = {
     STEP_EQUIP_MASTER:   RetryConfig(2, 0.3, 2.0, 1.0),
     STEP_EQUIP_PET:      RetryConfig(2, 0.3, 2.0, 1.0),
 }
+
+# ── Orchestrator (chạy song song nhiều account) ──
+
+SETUP_WORKERS = 5               # Số account setup đồng thời mặc định, như trước (workers=N để tăng)
+
+# Tài nguyên dùng chung giữa các account: step → tên tài nguyên
+RESOURCE_BA_HAT_MIT = "ba_hat_mit"
+STEP_RESOURCES = {
+    STEP_BUY_BUA: RESOURCE_BA_HAT_MIT,
+    STEP_UPGRADE_16: RESOURCE_BA_HAT_MIT,
+    STEP_UPGRADE_OTHER: RESOURCE_BA_HAT_MIT,
+}
+# Số account tối đa giữ cùng lúc mỗi tài nguyên (ví dụ phiên combine với Bà Hạt Mít)
+RESOURCE_LIMITS = {
+    RESOURCE_BA_HAT_MIT: 5,
+}
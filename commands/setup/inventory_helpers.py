@@ -9,7 +9,7 @@ Code mới nên import trực tiếp từ services.inventory.
 
 from services.inventory import (  # noqa: F401
     count_item, find_item_index, find_item_indices, has_item,
-    count_items_by_ids, refresh_inventory, InventoryService,
+    count_items_by_ids, refresh_inventory, expect_change, InventoryService,
 )
 
 # Legacy constants (giữ nguyên để không break imports)
@@ -23,28 +23,19 @@ GIFTCODE_ITEM_IDS = (457, 381, 382, 383, 384, 385, 386)
 
 def count_beans(acc) -> int:
     """Đếm tổng số đậu thần trong balo."""
-    count = 0
-    for item in acc.char.arr_item_bag or []:
-        if item is not None and item.item_id in BEAN_ITEM_IDS:
-            count += item.quantity
-    return count
+    return sum(acc.char.bag_index.count_many(BEAN_ITEM_IDS).values())
 
 
 def has_giftcode_items(acc) -> bool:
     """Kiểm tra có item giftcode trong balo không."""
-    for item in acc.char.arr_item_bag or []:
-        if item is not None and item.item_id in GIFTCODE_ITEM_IDS:
-            return True
-    return False
+    index = acc.char.bag_index
+    return any(index.has(item_id) for item_id in GIFTCODE_ITEM_IDS)
 
 
 def count_bua_items(acc) -> int:
     """Đếm số loại bùa đã có trong balo."""
-    found = set()
-    for item in acc.char.arr_item_bag or []:
-        if item is not None and item.item_id in BUA_ITEM_IDS:
-            found.add(item.item_id)
-    return len(found)
+    index = acc.char.bag_index
+    return sum(1 for item_id in BUA_ITEM_IDS if index.has(item_id))
 
 
 def count_set_lien_hoan(acc) -> int:
@@ -0,0 +1,170 @@
+"""
+Orchestrator cho setup accounts — chạy nhiều account song song.
+
+- Worker pool giới hạn: tối đa `workers` account được setup cùng lúc; account nào xong
+  thì worker lấy account kế tiếp trong hàng đợi.
+- Giới hạn theo tài nguyên: step dùng tài nguyên chung (STEP_RESOURCES, ví dụ phiên
+  combine với Bà Hạt Mít) phải giữ một slot trong RESOURCE_LIMITS. Account đang chờ
+  tài nguyên không chặn các account đang ở step khác.
+- Thống kê từng step: số lần chạy, thành công/thất bại, thông lượng (step/phút),
+  histogram độ trễ và thời gian chờ tài nguyên.
+
+Resume do SetupStateManager đảm nhận: step đã xong được bỏ qua ở `_setup_one`.
+"""
+
+import asyncio
+import bisect
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from commands.setup.constants import (
+    STEP_LABELS, STEP_RESOURCES, RESOURCE_LIMITS, SETUP_WORKERS,
+)
+
+# Mốc histogram độ trễ (giây); bucket cuối là > mốc lớn nhất
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0, 120.0)
+
+
+class LatencyHistogram:
+    """Histogram độ trễ với các bucket cố định."""
+
+    __slots__ = ('bounds', 'counts', 'total', 'count', 'max')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Ước lượng percentile `q` (0..1) theo cận trên của bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def format_buckets(self) -> str:
+        parts = []
+        for i, n in enumerate(self.counts):
+            if not n:
+                continue
+            label = f"≤{self.bounds[i]:g}s" if i < len(self.bounds) else f">{self.bounds[-1]:g}s"
+            parts.append(f"{label}:{n}")
+        return " ".join(parts)
+
+
+class StepStats:
+    """Thống kê của một step trên mọi account."""
+
+    __slots__ = ('ok', 'fail', 'latency', 'resource_wait')
+
+    def __init__(self):
+        self.ok = 0
+        self.fail = 0
+        self.latency = LatencyHistogram()
+        self.resource_wait = LatencyHistogram()
+
+    @property
+    def runs(self) -> int:
+        return self.ok + self.fail
+
+
+class SetupOrchestrator:
+    """Chạy `setup_one(acc, idx)` cho nhiều account với worker pool và giới hạn tài nguyên."""
+
+    def __init__(self, workers: int = SETUP_WORKERS, resource_limits: Optional[Dict[str, int]] = None):
+        self.workers = max(1, workers)
+        self.resource_limits = dict(RESOURCE_LIMITS if resource_limits is None else resource_limits)
+        self._resources: Dict[str, asyncio.Semaphore] = {}
+        self.stats: Dict[int, StepStats] = {}
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+    async def run(self, jobs: List[tuple], setup_one: Callable[..., Awaitable[bool]]) -> List[bool]:
+        """
+        Chạy các job (acc, idx) qua worker pool. Trả về kết quả theo đúng thứ tự `jobs`.
+        """
+        self._resources = {name: asyncio.Semaphore(max(1, n)) for name, n in self.resource_limits.items()}
+        self.stats = {}
+        self.started_at = time.perf_counter()
+        results: List[bool] = [False] * len(jobs)
+        queue: asyncio.Queue = asyncio.Queue()
+        for pos, job in enumerate(jobs):
+            queue.put_nowait((pos, job))
+
+        async def worker():
+            while True:
+                try:
+                    pos, job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[pos] = bool(await setup_one(*job))
+                except Exception:
+                    results[pos] = False
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(jobs)))))
+        self.finished_at = time.perf_counter()
+        return results
+
+    async def run_step(self, step: int, coro_factory: Callable[[], Awaitable[bool]]) -> bool:
+        """Chạy một step: giữ tài nguyên của step (nếu có), đo thời gian chờ / chạy."""
+        stats = self.stats.get(step)
+        if stats is None:
+            stats = self.stats[step] = StepStats()
+
+        sem = self._resources.get(STEP_RESOURCES.get(step))
+        queued = time.perf_counter()
+        if sem is not None:
+            await sem.acquire()
+        started = time.perf_counter()
+        ok = False
+        try:
+            ok = bool(await coro_factory())
+            return ok
+        finally:
+            if sem is not None:
+                sem.release()
+                stats.resource_wait.observe(started - queued)
+            stats.latency.observe(time.perf_counter() - started)
+            if ok:
+                stats.ok += 1
+            else:
+                stats.fail += 1
+
+    def report(self, print_func: Callable[[str], None] = print, C=None):
+        """In bảng thống kê từng step: thông lượng, p50/p90/max, histogram độ trễ."""
+        if not self.stats:
+            return
+        dim = C.DIM if C else ""
+        bold = C.BOLD if C else ""
+        reset = C.RESET if C else ""
+        elapsed = max((self.finished_at or time.perf_counter()) - self.started_at, 1e-9)
+        print_func(f"  {bold}Thống kê step (tổng {elapsed:.1f}s, {self.workers} workers):{reset}")
+        print_func(f"  {'Step':<30} {'OK':>5} {'Fail':>5} {'/phút':>7} {'p50':>6} {'p90':>6} {'max':>7} {'chờ TN':>7}")
+        for step in sorted(self.stats):
+            s = self.stats[step]
+            label = STEP_LABELS.get(step, f"Step {step}")[:28]
+            throughput = s.ok * 60.0 / elapsed
+            wait = f"{s.resource_wait.mean:.1f}s" if s.resource_wait.count else "-"
+            print_func(f"  {step:>2} {label:<27} {s.ok:>5} {s.fail:>5} {throughput:>7.1f} "
+                       f"{s.latency.percentile(0.5):>5g}s {s.latency.percentile(0.9):>5g}s "
+                       f"{s.latency.max:>6.1f}s {wait:>7}")
+            print_func(f"  {dim}     {s.latency.format_buckets()}{reset}")
@@ -1,15 +1,37 @@
 """
-Quản lý trạng thái setup cho từng account.
-Lưu trạng thái vào file JSON để có thể resume khi bị gián đoạn.
+Quản lý trạng thái setup cho từng account, lưu để có thể resume khi bị gián đoạn.
+
+Lưu trữ gồm hai file:
+  - setup_state.json     : snapshot đầy đủ (cùng định dạng cũ).
+  - setup_state.journal  : nhật ký append-only, mỗi dòng JSON là giá trị MỚI của một step /
+                           attribute / reset (ghi đè, không phải delta) nên phát lại nhiều lần vẫn đúng.
+
+Mỗi thay đổi thêm một bản ghi vào buffer (O(1)). Kết quả step / attribute (mark_step,
+set_attribute) phải bền trước khi sang step kế tiếp (các step như mua đồ không chạy lại an toàn
+được): hai hàm này trả về awaitable, xong khi bản ghi đã write + fsync. Việc ghi được gộp (group
+commit): mọi bản ghi bền trong cùng một vòng event loop (nhiều account setup song song) chung một
+lần flush, lên lịch bằng loop.call_soon. Bản ghi khác (reset) chờ trong buffer tới lần flush kế
+tiếp, khi đủ JOURNAL_BATCH_SIZE, hoặc flush()/save().
+Khi journal đủ lớn (hoặc gọi save()), snapshot mới được ghi ra file tạm rồi os.replace
+(atomic) và journal được làm rỗng. Khi load: đọc snapshot rồi phát lại journal; dòng cuối
+bị cắt dở do crash được bỏ qua.
 """
 
+import asyncio
 import json
 import os
 from dataclasses import dataclass, field, asdict
+from typing import Awaitable, Optional
 
 from commands.setup.constants import ALL_STEPS
+from logs.logger_config import get_logger
+
+logger = get_logger("commands.setup.state_manager")
 
 STATE_FILE = "setup_state.json"
+JOURNAL_FILE = "setup_state.journal"
+JOURNAL_BATCH_SIZE = 64         # Số bản ghi tối đa trong buffer trước khi ghi journal
+JOURNAL_COMPACT_RECORDS = 5000  # Số bản ghi journal trước khi tự compact vào snapshot
 
 
 @dataclass
@@ -35,36 +57,153 @@ class AccountSetupState:
 
 
 class SetupStateManager:
-    """Quản lý trạng thái setup cho từng account, lưu vào file JSON để resume."""
+    """Quản lý trạng thái setup cho từng account: snapshot JSON + journal append-only."""
 
-    def __init__(self):
+    def __init__(self, state_file: str = STATE_FILE, journal_file: str = JOURNAL_FILE):
+        self.state_file = state_file
+        self.journal_file = journal_file
         self._states: dict[str, AccountSetupState] = {}
+        self._pending: list[str] = []       # Bản ghi chưa ghi ra journal
+        self._journal_records = 0           # Số bản ghi đang nằm trong journal
+        self._commit: Optional[asyncio.Future] = None  # Lần flush gộp đã lên lịch (group commit)
+
+    # ── Load / recovery ──
 
     def load(self):
-        """Tải trạng thái từ file JSON."""
-        if not os.path.exists(STATE_FILE):
+        """Tải snapshot rồi phát lại journal (bỏ qua dòng hỏng cuối file do crash)."""
+        self._states.clear()
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                for username, data in raw.items():
+                    self._states[username] = self._normalize(AccountSetupState(**data))
+            except (json.JSONDecodeError, IOError, TypeError) as e:
+                logger.error(f"Không đọc được {self.state_file}: {e}")
+
+        self._journal_records = 0
+        if not os.path.exists(self.journal_file):
             return
         try:
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-            for username, data in raw.items():
-                state = AccountSetupState(**data)
-                # Đảm bảo tất cả step keys đều tồn tại
-                for s in ALL_STEPS:
-                    if str(s) not in state.steps:
-                        state.steps[str(s)] = StepState().__dict__
-                self._states[username] = state
-        except (json.JSONDecodeError, IOError, TypeError):
-            pass
-
-    def save(self):
-        """Lưu trạng thái ra file JSON."""
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.endswith("\n"):
+                        logger.warning(f"{self.journal_file}: bỏ qua dòng {line_no} ghi dở.")
+                        break
+                    try:
+                        self._apply(json.loads(line))
+                    except (json.JSONDecodeError, TypeError, KeyError) as e:
+                        logger.warning(f"{self.journal_file}: bỏ qua dòng {line_no} hỏng ({e}).")
+                        continue
+                    self._journal_records += 1
+        except IOError as e:
+            logger.error(f"Không đọc được {self.journal_file}: {e}")
+            return
+        if self._journal_records:
+            # Gộp journal đã phát lại vào snapshot (cũng loại bỏ phần đuôi hỏng nếu có)
+            self.compact()
+
+    @staticmethod
+    def _normalize(state: AccountSetupState) -> AccountSetupState:
+        """Đảm bảo tất cả step keys đều tồn tại."""
+        for s in ALL_STEPS:
+            if str(s) not in state.steps:
+                state.steps[str(s)] = StepState().__dict__
+        return state
+
+    def _apply(self, record: dict):
+        """Áp dụng một bản ghi journal vào trạng thái trong bộ nhớ."""
+        if record.get("reset_all"):
+            self._states.clear()
+            return
+        username = record["u"]
+        if record.get("reset"):
+            self._states.pop(username, None)
+            return
+        state = self.get(username)
+        if "step" in record:
+            state.steps[record["step"]] = dict(record["s"])
+        for k, v in record.get("attr", {}).items():
+            if hasattr(state, k):
+                setattr(state, k, v)
+
+    # ── Journal ──
+
+    def _append(self, record: dict):
+        """Thêm bản ghi vào buffer; ghi journal khi buffer đầy."""
+        self._pending.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        if len(self._pending) >= JOURNAL_BATCH_SIZE:
+            self.flush()
+
+    def _commit_soon(self) -> Optional[Awaitable[bool]]:
+        """
+        Lên lịch flush gộp cho cuối vòng event loop hiện tại (một fsync cho mọi bản ghi bền trong vòng).
+
+        Returns:
+            Awaitable trả về kết quả flush(); None nếu không có event loop (đã flush đồng bộ).
+        """
+        if self._commit is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+                return None
+            self._commit = loop.create_future()
+            loop.call_soon(self._run_commit)
+        # shield: một caller bị cancel không được hủy future dùng chung của các caller khác
+        return asyncio.shield(self._commit)
+
+    def _run_commit(self):
+        commit, self._commit = self._commit, None
+        ok = self.flush()
+        if not commit.done():
+            commit.set_result(ok)
+
+    def flush(self) -> bool:
+        """Ghi các bản ghi trong buffer ra journal (một lần write + fsync)."""
+        if not self._pending:
+            return True
+        data = "\n".join(self._pending) + "\n"
+        try:
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.error(f"Không ghi được {self.journal_file}: {e}")
+            return False
+        self._journal_records += len(self._pending)
+        self._pending.clear()
+        if self._journal_records >= JOURNAL_COMPACT_RECORDS:
+            self.compact()
+        return True
+
+    def compact(self) -> bool:
+        """Ghi snapshot đầy đủ ra file tạm, os.replace (atomic), rồi làm rỗng journal."""
+        raw = {u: asdict(s) for u, s in self._states.items()}
+        tmp = self.state_file + ".tmp"
         try:
-            raw = {u: asdict(s) for u, s in self._states.items()}
-            with open(STATE_FILE, "w", encoding="utf-8") as f:
+            with open(tmp, "w", encoding="utf-8") as f:
                 json.dump(raw, f, indent=2, ensure_ascii=False)
-        except IOError:
-            pass
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.state_file)
+            # Crash tại đây vẫn an toàn: phát lại journal trên snapshot mới cho cùng kết quả
+            with open(self.journal_file, "w", encoding="utf-8") as f:
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.error(f"Không compact được trạng thái setup: {e}")
+            return False
+        self._pending.clear()
+        self._journal_records = 0
+        return True
+
+    def save(self) -> bool:
+        """Ghi mọi thay đổi (journal + compact snapshot). Trả về False nếu lỗi IO."""
+        return self.compact()
+
+    # ── Truy vấn / cập nhật ──
 
     def get(self, username: str) -> AccountSetupState:
         """Lấy trạng thái của account, tự tạo mới nếu chưa có."""
@@ -75,15 +214,16 @@ class SetupStateManager:
         return self._states[username]
 
     def mark_step(self, username: str, step: int, completed: bool = True,
-                  skipped: bool = False, error: str = ""):
-        """Đánh dấu trạng thái bước setup."""
+                  skipped: bool = False, error: str = "") -> Optional[Awaitable[bool]]:
+        """Đánh dấu trạng thái bước setup. Await kết quả để chờ bản ghi được ghi bền (xem _commit_soon)."""
         state = self.get(username)
         s = state.steps.get(str(step), StepState().__dict__)
         s["completed"] = completed
         s["skipped"] = skipped
         s["error"] = error
         state.steps[str(step)] = s
-        self.save()
+        self._append({"u": username, "step": str(step), "s": s})
+        return self._commit_soon()
 
     def is_step_completed(self, username: str, step: int) -> bool:
         """Kiểm tra bước đã hoàn thành chưa."""
@@ -105,17 +245,22 @@ class SetupStateManager:
         """Reset trạng thái của một account."""
         if username in self._states:
             del self._states[username]
-            self.save()
+            self._append({"u": username, "reset": True})
 
     def reset_all(self):
         """Reset trạng thái của tất cả accounts."""
         self._states.clear()
+        self._append({"reset_all": True})
         self.save()
 
-    def set_attribute(self, username: str, **kwargs):
-        """Thiết lập attribute tùy ý trên trạng thái account."""
+    def set_attribute(self, username: str, **kwargs) -> Optional[Awaitable[bool]]:
+        """Thiết lập attribute tùy ý trên trạng thái account. Await kết quả để chờ ghi bền như mark_step."""
         state = self.get(username)
+        attrs = {}
         for k, v in kwargs.items():
             if hasattr(state, k):
                 setattr(state, k, v)
-        self.save()
+                attrs[k] = v
+        if attrs:
+            self._append({"u": username, "attr": attrs})
+        return self._commit_soon()
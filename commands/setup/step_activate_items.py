@@ -7,6 +7,7 @@ Bước 10: Kích hoạt vật phẩm thưởng.
 import asyncio
 
 from logs.logger_config import TerminalColors
+from controller.event_bus import MenuOpened
 from commands.setup.constants import (
     ITEM_2000, ITEM_2000_USE_TIMES,
     ITEM_UPGRADE_16_CRYSTAL, ITEM_UPGRADE_16, ITEM_12,
@@ -121,18 +122,18 @@ async def _activate_item_2000(acc, ctrl, log_func):
                 break
 
             # Dùng item 2000
-            ctrl.ui_menu_event.clear()
             ctrl.last_npc_template_id = 0
             ctrl.last_ui_options = []
             try:
-                log_func(f"{C.DIM}  Dùng item 2000 tại bag index {found_item}...{C.RESET}")
-                await acc.service.use_item(0, 1, found_item, -1)
-                await asyncio.sleep(0.05)
+                with ctrl.events.expect(MenuOpened) as menu:
+                    log_func(f"{C.DIM}  Dùng item 2000 tại bag index {found_item}...{C.RESET}")
+                    await acc.service.use_item(0, 1, found_item, -1)
+                    await asyncio.sleep(0.05)
 
-                try:
-                    await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
-                except asyncio.TimeoutError:
-                    log_func(f"{C.YELLOW}    Timeout chờ menu item 2000.{C.RESET}")
+                    try:
+                        await menu.result(3.0)
+                    except asyncio.TimeoutError:
+                        log_func(f"{C.YELLOW}    Timeout chờ menu item 2000.{C.RESET}")
 
                 opts = ctrl.last_ui_options or []
                 menu_npc = ctrl.last_npc_template_id
@@ -6,6 +6,7 @@ Mua tất cả các loại bùa 1 tháng chưa có trong balo.
 import asyncio
 
 from logs.logger_config import TerminalColors
+from controller.event_bus import MenuOpened
 from commands.setup.constants import NPC_BA_HAT_MIT, MAP_VACH_NUI, BUA_ITEM_IDS
 from commands.setup.navigation_helpers import (
     teleport_to_npc, move_to_map, find_npc,
@@ -59,10 +60,10 @@ async def buy_bua(acc, log_func) -> bool:
 
     if not opts:
         log_func(f"{C.YELLOW}→ Menu rỗng, thử mở lại...{C.RESET}")
-        ctrl.ui_menu_event.clear()
-        await acc.service.open_menu_npc(NPC_BA_HAT_MIT)
         try:
-            await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
+            with ctrl.events.expect(MenuOpened) as menu:
+                await acc.service.open_menu_npc(NPC_BA_HAT_MIT)
+                await menu.result(3.0)
         except asyncio.TimeoutError:
             pass
         await asyncio.sleep(0.01)
@@ -83,10 +84,10 @@ async def buy_bua(acc, log_func) -> bool:
     log_func(f"{C.DIM}→ Chọn '{opts[shop_idx]}'{C.RESET}")
     opts2 = await open_menu_npc(acc, NPC_BA_HAT_MIT, timeout=3.0)
     # open_menu_npc đã mở menu rồi, cần dùng confirm trực tiếp
-    ctrl.ui_menu_event.clear()
-    await acc.service.confirm_menu_npc(NPC_BA_HAT_MIT, shop_idx)
     try:
-        await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
+        with ctrl.events.expect(MenuOpened) as menu:
+            await acc.service.confirm_menu_npc(NPC_BA_HAT_MIT, shop_idx)
+            await menu.result(3.0)
     except asyncio.TimeoutError:
         pass
     await asyncio.sleep(0.01)
@@ -106,7 +107,6 @@ async def buy_bua(acc, log_func) -> bool:
         return False
 
     log_func(f"{C.DIM}→ Chọn '{opts2[month_idx]}'{C.RESET}")
-    ctrl.ui_menu_event.clear()
     await acc.service.confirm_menu_npc(NPC_BA_HAT_MIT, month_idx)
     await asyncio.sleep(0.01)
 
@@ -8,6 +8,7 @@ Trước khi đưa Item 12 (rada), kiểm tra và ép 441/442 nếu cần.
 import asyncio
 
 from logs.logger_config import TerminalColors
+from controller.event_bus import PetInfoUpdated
 from commands.setup.constants import (
     ITEM_EQUIP, ITEM_12, ITEM_441, ITEM_442,
 )
@@ -111,9 +112,9 @@ async def equip_pet(acc, log_func, C=None) -> bool:
     else:
         for attempt in range(3):
             try:
-                acc.controller.pet_info_event.clear()
-                await acc.service.pet_info()
-                await asyncio.wait_for(acc.controller.pet_info_event.wait(), timeout=3.0)
+                with acc.controller.events.expect(PetInfoUpdated) as pet_info:
+                    await acc.service.pet_info()
+                    await pet_info.result(3.0)
                 if acc.pet and acc.pet.have_pet:
                     have_pet = True
                     break
@@ -197,9 +198,9 @@ async def equip_pet(acc, log_func, C=None) -> bool:
     # Refresh pet info để verify
     await refresh_inventory(acc)
     try:
-        acc.controller.pet_info_event.clear()
-        await acc.service.pet_info()
-        await asyncio.wait_for(acc.controller.pet_info_event.wait(), timeout=3.0)
+        with acc.controller.events.expect(PetInfoUpdated) as pet_info:
+            await acc.service.pet_info()
+            await pet_info.result(3.0)
     except Exception:
         pass
 
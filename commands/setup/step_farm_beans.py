@@ -6,6 +6,7 @@ Mục tiêu: >= 1000 đậu thần.
 import asyncio
 
 from logs.logger_config import TerminalColors
+from controller.event_bus import MagicTreeMenu, MenuOpened
 from commands.setup.constants import NPC_DAU_THAN, TARGET_BEAN_QTY
 from commands.setup.navigation_helpers import go_home, teleport_to_npc
 from commands.setup.inventory_helpers import count_beans
@@ -40,12 +41,11 @@ async def farm_magic_tree(acc, log_func, target_count: int = TARGET_BEAN_QTY) ->
             log_func(f"{C.RED}→ Mất kết nối, dừng farm đậu.{C.RESET}")
             return False
 
-        ctrl.magic_tree_menu.clear()
         ctrl.magic_tree_options = []
-        ctrl.ui_menu_event.clear()
-        await acc.service.open_menu_npc(NPC_DAU_THAN)
         try:
-            await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=0.8)
+            with ctrl.events.expect((MenuOpened, MagicTreeMenu)) as menu:
+                await acc.service.open_menu_npc(NPC_DAU_THAN)
+                await menu.result(0.8)
         except asyncio.TimeoutError:
             pass
         await asyncio.sleep(0.01)
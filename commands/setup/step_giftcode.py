@@ -5,14 +5,7 @@ Tái export từ services.giftcode_service.
 Các module mới nên import trực tiếp từ services.giftcode_service.
 """
 
-from services.giftcode_service import GiftcodeService
-
-# ── Từ khóa nhận diện phản hồi giftcode ──
-GIFTCODE_KEYWORDS = [
-    "thành công", "chúc mừng", "nhận được", "tặng", "giftcode",
-    "đã sử dụng", "da su dung", "hết hạn", "het han",
-    "không tồn tại", "khong ton tai", "sai mã", "mã quà",
-]
+from services.giftcode_service import GiftcodeService, GIFTCODE_KEYWORDS
 
 
 # ── Hàm tương thích ngược ──
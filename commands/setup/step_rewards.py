@@ -9,6 +9,7 @@ Dùng services.giftcode_service cho thao tác giftcode.
 import asyncio
 
 from logs.logger_config import TerminalColors
+from controller.event_bus import MenuOpened
 from commands.setup.constants import HOME_NPC, GIFTCODES
 from commands.setup.navigation_helpers import teleport_to_npc, go_home, open_menu_npc
 from commands.setup.inventory_helpers import has_giftcode_items
@@ -29,10 +30,10 @@ async def open_muri(acc, log_func) -> bool:
             return False
 
     ctrl = acc.controller
-    ctrl.ui_menu_event.clear()
-    await acc.service.open_menu_npc(npc_id)
     try:
-        await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
+        with ctrl.events.expect(MenuOpened) as menu:
+            await acc.service.open_menu_npc(npc_id)
+            await menu.result(3.0)
     except asyncio.TimeoutError:
         pass
     await asyncio.sleep(0.01)
@@ -63,7 +64,7 @@ async def claim_rewards(acc, state_mgr, log_func, force: bool) -> bool:
     if force or not state_mgr.get(acc.username).gold_claimed:
         log_func(f"{C.DIM}→ Nhận vàng miễn phí...{C.RESET}")
         await _claim_gold(acc, log_func)
-        state_mgr.set_attribute(acc.username, gold_claimed=True)
+        await state_mgr.set_attribute(acc.username, gold_claimed=True)
     else:
         log_func(f"{C.GREEN}→ Đã nhận vàng trước đó.{C.RESET}")
 
@@ -74,7 +75,7 @@ async def claim_rewards(acc, state_mgr, log_func, force: bool) -> bool:
     if force or not state_mgr.get(acc.username).gem_claimed:
         log_func(f"{C.DIM}→ Nhận ngọc miễn phí...{C.RESET}")
         await _claim_gem(acc, npc_id, log_func)
-        state_mgr.set_attribute(acc.username, gem_claimed=True)
+        await state_mgr.set_attribute(acc.username, gem_claimed=True)
     else:
         log_func(f"{C.GREEN}→ Đã nhận ngọc trước đó.{C.RESET}")
 
@@ -88,7 +89,7 @@ async def claim_rewards(acc, state_mgr, log_func, force: bool) -> bool:
     
     if state_done or already_has:
         log_func(f"{C.GREEN}→ Đã nhập giftcode trước đó, bỏ qua.{C.RESET}")
-        state_mgr.set_attribute(acc.username, giftcode_done=True)
+        await state_mgr.set_attribute(acc.username, giftcode_done=True)
     else:
         gsvc = GiftcodeService(acc, log_func)
         for code in GIFTCODES:
@@ -108,7 +109,7 @@ async def claim_rewards(acc, state_mgr, log_func, force: bool) -> bool:
                     log_func(f"{C.YELLOW}→ Giftcode '{code}': {status}, tiếp tục.{C.RESET}")
             except asyncio.TimeoutError:
                 log_func(f"{C.YELLOW}→ Giftcode '{code}' timeout, bỏ qua.{C.RESET}")
-        state_mgr.set_attribute(acc.username, giftcode_done=True)
+        await state_mgr.set_attribute(acc.username, giftcode_done=True)
         # ⚠️ Dù giftcode có success hay used/unknown/timeout, step vẫn return True
         # để tránh retry_operation chạy lại step này và timeout lần nữa
 
@@ -119,7 +120,7 @@ async def claim_rewards(acc, state_mgr, log_func, force: bool) -> bool:
     if force or not state_mgr.get(acc.username).disciple_claimed:
         log_func(f"{C.DIM}→ Nhận đệ tử miễn phí...{C.RESET}")
         await _claim_disciple(acc, npc_id, log_func)
-        state_mgr.set_attribute(acc.username, disciple_claimed=True)
+        await state_mgr.set_attribute(acc.username, disciple_claimed=True)
     else:
         log_func(f"{C.GREEN}→ Đã nhận đệ tử trước đó.{C.RESET}")
 
@@ -148,10 +149,10 @@ async def _claim_gold(acc, log_func):
 
         await asyncio.sleep(0.01)
 
-        ctrl.ui_menu_event.clear()
-        await acc.service.open_menu_npc(home_npc)
         try:
-            await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
+            with ctrl.events.expect(MenuOpened) as menu:
+                await acc.service.open_menu_npc(home_npc)
+                await menu.result(3.0)
         except asyncio.TimeoutError:
             pass
         await asyncio.sleep(0.01)
@@ -199,10 +200,10 @@ async def _claim_gem(acc, npc_id, log_func):
         log_func(f"{C.YELLOW}→ Không tìm thấy NPC.{C.RESET}")
         return
 
-    ctrl.ui_menu_event.clear()
-    await acc.service.open_menu_npc(npc_id)
     try:
-        await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
+        with ctrl.events.expect(MenuOpened) as menu:
+            await acc.service.open_menu_npc(npc_id)
+            await menu.result(3.0)
     except asyncio.TimeoutError:
         pass
     await asyncio.sleep(0.01)
@@ -239,10 +240,10 @@ async def _claim_disciple(acc, npc_id, log_func):
         log_func(f"{C.YELLOW}→ Không tìm thấy NPC.{C.RESET}")
         return
 
-    ctrl.ui_menu_event.clear()
-    await acc.service.open_menu_npc(npc_id)
     try:
-        await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
+        with ctrl.events.expect(MenuOpened) as menu:
+            await acc.service.open_menu_npc(npc_id)
+            await menu.result(3.0)
     except asyncio.TimeoutError:
         pass
     await asyncio.sleep(0.01)
@@ -258,10 +259,10 @@ async def _claim_disciple(acc, npc_id, log_func):
         log_func(f"{C.YELLOW}→ Không tìm thấy tùy chọn đệ tử (options: {opts}).{C.RESET}")
         return
 
-    ctrl.ui_menu_event.clear()
-    await acc.service.confirm_menu_npc(npc_id, disciple_opt)
     try:
-        await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
+        with ctrl.events.expect(MenuOpened) as menu:
+            await acc.service.confirm_menu_npc(npc_id, disciple_opt)
+            await menu.result(3.0)
     except asyncio.TimeoutError:
         pass
     await asyncio.sleep(0.01)
@@ -7,6 +7,7 @@ Sau khi mua, dùng item 402 và 403 mỗi loại 6 lần.
 import asyncio
 
 from logs.logger_config import TerminalColors
+from controller.event_bus import MenuOpened, PetInfoUpdated
 from commands.setup.constants import (
     NPC_SANTA, SANTA_MAPS,
     SANTA_ITEM_HO_TRO, SANTA_ITEM_USE, SANTA_NO_BAG_ITEMS,
@@ -45,10 +46,10 @@ async def santa_shop(acc, log_func) -> bool:
             await asyncio.sleep(0.01)
 
             # Mở menu Santa
-            ctrl.ui_menu_event.clear()
-            await acc.service.open_menu_npc(NPC_SANTA)
             try:
-                await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
+                with ctrl.events.expect(MenuOpened) as menu:
+                    await acc.service.open_menu_npc(NPC_SANTA)
+                    await menu.result(3.0)
             except asyncio.TimeoutError:
                 pass
             await asyncio.sleep(0.01)
@@ -64,7 +65,6 @@ async def santa_shop(acc, log_func) -> bool:
                 shop_opt = tab_default
 
             log_func(f"{C.DIM}  → Chọn option {shop_opt} ({opts[shop_opt] if shop_opt < len(opts) else 'default'})...{C.RESET}")
-            ctrl.ui_menu_event.clear()
             await acc.service.confirm_menu_npc(NPC_SANTA, shop_opt)
             await asyncio.sleep(0.01)
 
@@ -123,9 +123,9 @@ async def santa_shop(acc, log_func) -> bool:
         have_pet = True
     else:
         try:
-            acc.controller.pet_info_event.clear()
-            await acc.service.pet_info()
-            await asyncio.wait_for(acc.controller.pet_info_event.wait(), timeout=3.0)
+            with acc.controller.events.expect(PetInfoUpdated) as pet_info:
+                await acc.service.pet_info()
+                await pet_info.result(3.0)
             if acc.pet and acc.pet.have_pet:
                 have_pet = True
         except Exception:
@@ -16,6 +16,8 @@ State Machine Flow:
   STEP 12 → Upgrade Items 1, 22, 28, 12 (Bà Hạt Mít - Ép Sao Trang Bị)
 
 Các bước chi tiết được tách riêng trong package commands/setup/.
+Nhiều account chạy song song qua SetupOrchestrator (worker pool + giới hạn tài nguyên NPC),
+step đã xong (setup_state.json) được bỏ qua nên có thể chạy lại để resume.
 """
 
 import asyncio
@@ -31,8 +33,10 @@ from commands.setup.constants import (
     STEP_USE_SUPPORT, STEP_ACTIVATE_ITEMS, STEP_UPGRADE_16, STEP_UPGRADE_OTHER,
     STEP_EQUIP_MASTER, STEP_EQUIP_PET,
     TARGET_BEAN_QTY, ITEM_441, ITEM_UPGRADE_16, ITEM_12, BUA_ITEM_IDS,
+    SETUP_WORKERS, RESOURCE_LIMITS,
 )
 from commands.setup.state_manager import SetupStateManager
+from commands.setup.orchestrator import SetupOrchestrator
 from services.retry import RetryConfig, retry_operation
 from services.inventory import count_item
 from commands.setup.inventory_helpers import count_beans, count_bua_items
@@ -72,6 +76,7 @@ class SetupAccountsCommand(Command):
         self.manager = manager
         self.state_mgr = SetupStateManager()
         self.state_mgr.load()
+        self.orchestrator: SetupOrchestrator = None
 
     # ── Logging ────────────────────────────────
 
@@ -96,13 +101,15 @@ class SetupAccountsCommand(Command):
             return False
 
         if len(parts) < 2:
-            print(f"{C.YELLOW}Cú pháp: setup_accounts <start> [end] [force|reset|start_step=N]{C.RESET}")
+            print(f"{C.YELLOW}Cú pháp: setup_accounts <start> [end] [force|reset|start_step=N|workers=N|ba_hat_mit=N]{C.RESET}")
             print(f"  Ví dụ: {C.CYAN}setup_accounts 7{C.RESET}           (chạy 1 acc số 7)")
             print(f"        {C.CYAN}setup_accounts 0 9{C.RESET}         (chạy acc 0→9)")
             print(f"        {C.CYAN}setup_accounts 7 force{C.RESET}     (force 1 acc)")
             print(f"        {C.CYAN}setup_accounts 7 9 force{C.RESET}   (force acc 7→9)")
             print(f"        {C.CYAN}setup_accounts 7 reset{C.RESET}     (reset trạng thái)")
             print(f"        {C.CYAN}setup_accounts 7 9 start_step=7{C.RESET}  (chạy từ step 7)")
+            print(f"        {C.CYAN}setup_accounts 0 499 workers=50{C.RESET}  (50 acc đồng thời, mặc định {SETUP_WORKERS})")
+            print(f"        {C.CYAN}setup_accounts 0 499 ba_hat_mit=8{C.RESET}  (tối đa 8 acc ở Bà Hạt Mít cùng lúc)")
             print()
             print(f"  {C.BOLD}Danh sách Steps:{C.RESET}")
             for step in ALL_STEPS:
@@ -132,6 +139,8 @@ class SetupAccountsCommand(Command):
         force = False
         reset_state = False
         start_step = 1
+        workers = SETUP_WORKERS
+        resource_limits = dict(RESOURCE_LIMITS)
         for p in parts[2:]:
             if p.lstrip('-').isdigit():
                 continue  # số, đã xử lý ở trên
@@ -145,16 +154,33 @@ class SetupAccountsCommand(Command):
                     start_step = int(pl.split('=')[1])
                 except ValueError:
                     pass
+            elif pl.startswith('workers='):
+                try:
+                    workers = max(1, int(pl.split('=')[1]))
+                except ValueError:
+                    pass
+            elif '=' in pl and pl.split('=')[0] in resource_limits:
+                name, value = pl.split('=', 1)
+                try:
+                    resource_limits[name] = max(1, int(value))
+                except ValueError:
+                    pass
 
         accounts = self.manager.accounts[start_idx:end_idx + 1]
 
         if reset_state:
             for acc in accounts:
                 self.state_mgr.reset(acc.username)
+            self.state_mgr.save()
             print(f"{C.GREEN}→ Đã reset trạng thái setup cho {len(accounts)} tài khoản.{C.RESET}")
             return False
 
-        print(f"{C.CYAN}=== SETUP {len(accounts)} TÀI KHOẢN ({start_idx}-{end_idx}) ĐỒNG THỜI (TỐI ĐA 5 ACC) ==={C.RESET}")
+        print(f"{C.CYAN}=== SETUP {len(accounts)} TÀI KHOẢN ({start_idx}-{end_idx}) ĐỒNG THỜI (TỐI ĐA {workers} ACC) ==={C.RESET}")
+        if not force:
+            finished = sum(1 for acc in accounts
+                           if all(self.state_mgr.is_step_done(acc.username, s) for s in ALL_STEPS))
+            if finished:
+                print(f"{C.DIM}Resume: {finished}/{len(accounts)} tài khoản đã xong mọi step (sẽ bỏ qua).{C.RESET}")
         if force:
             print(f"{C.RED}!!! CHẾ ĐỘ FORCE (Chạy lại các bước đã hoàn thành) !!!{C.RESET}")
         if start_step > 1:
@@ -162,14 +188,10 @@ class SetupAccountsCommand(Command):
         print(f"{C.DIM}Tạo NV → Chọn NV → Về nhà → NPC → Nhận thưởng → Đậu → Bùa → Santa → Item hỗ trợ → Kích hoạt → Ép 16 → Ép 1/22/28/12 → Mặc đồ → Đệ tử{C.RESET}")
         print()
 
-        sem = asyncio.Semaphore(5)
-
-        async def setup_with_sem(acc, idx):
-            async with sem:
-                return await self._setup_one(acc, idx, end_idx, force=force, start_step=start_step)
-
-        tasks = [setup_with_sem(acc, start_idx + i) for i, acc in enumerate(accounts)]
-        results = await asyncio.gather(*tasks)
+        self.orchestrator = SetupOrchestrator(workers, resource_limits)
+        jobs = [(acc, start_idx + i) for i, acc in enumerate(accounts)]
+        results = await self.orchestrator.run(
+            jobs, lambda acc, idx: self._setup_one(acc, idx, end_idx, force=force, start_step=start_step))
 
         success = sum(1 for r in results if r)
         fail = len(results) - success
@@ -177,6 +199,7 @@ class SetupAccountsCommand(Command):
         print()
         print(f"{C.CYAN}=== HOÀN TẤT ==={C.RESET}")
         print(f"  {C.GREEN}OK: {success}{C.RESET}  |  {C.RED}Fail: {fail}{C.RESET}")
+        self.orchestrator.report(C=C)
         if accounts:
             self.manager.command_target = start_idx
             print(f"  Target: {C.YELLOW}{start_idx} ({accounts[0].username}){C.RESET}")
@@ -193,10 +216,13 @@ class SetupAccountsCommand(Command):
         if force:
             self.state_mgr.reset(username)
 
-        # Đánh dấu các step trước start_step là done (nếu chưa done)
+        # Đánh dấu các step trước start_step là done (nếu chưa done), ghi bền một lần cho cả loạt
+        commit = None
         for step in ALL_STEPS:
             if step < start_step and not self.state_mgr.is_step_done(username, step):
-                self.state_mgr.mark_step(username, step, completed=True)
+                commit = self.state_mgr.mark_step(username, step, completed=True)
+        if commit:
+            await commit
 
         for step in ALL_STEPS:
             if not await self._ensure_logged_in(acc, C):
@@ -211,7 +237,7 @@ class SetupAccountsCommand(Command):
             if step == STEP_CREATE_CHAR and self.state_mgr.get(username).has_character:
                 if not force:
                     self._step_log(acc, step, f"{C.GREEN}→ Đã có nhân vật (state).{C.RESET}")
-                    self.state_mgr.mark_step(username, step, completed=True)
+                    await self.state_mgr.mark_step(username, step, completed=True)
                     continue
 
             label = STEP_LABELS.get(step, f"Step {step}")
@@ -222,21 +248,23 @@ class SetupAccountsCommand(Command):
 
             timeout = STEP_TIMEOUTS.get(step, DEFAULT_STEP_TIMEOUT)
 
-            ok = await retry_operation(
+            ok = await self.orchestrator.run_step(step, lambda s=step: retry_operation(
                 acc, self._log, label,
-                lambda s=step: self._run_step(acc, s, force),
+                lambda: self._run_step(acc, s, force),
                 retry_cfg,
                 timeout=timeout
-            )
+            ))
 
             if ok:
-                self.state_mgr.mark_step(username, step, completed=True)
+                await self.state_mgr.mark_step(username, step, completed=True)
                 self._step_log(acc, step, f"{C.GREEN}✓ Thành công.{C.RESET}")
             else:
-                self.state_mgr.mark_step(username, step, completed=False, error="Failed after retries")
+                await self.state_mgr.mark_step(username, step, completed=False, error="Failed after retries")
                 self._step_log(acc, step, f"{C.YELLOW}✗ Thất bại, chuyển step tiếp.{C.RESET}")
                 # Không return False — tiếp tục step tiếp theo
 
+        self.state_mgr.flush()
+
         # Tóm tắt cuối
         if await self._ensure_logged_in(acc, C):
             bean_final = count_beans(acc)
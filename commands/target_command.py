@@ -1,7 +1,9 @@
 from commands.base_command import Command
-from logs.logger_config import logger, TerminalColors
+from logs.logger_config import get_logger, TerminalColors
 from typing import Any
 
+logger = get_logger("commands.target")
+
 class TargetCommand(Command):
     def __init__(self, manager):
         self.manager = manager
@@ -46,6 +46,21 @@ class Config:
     # False để bỏ qua IP local và gán trực tiếp 5 tài khoản cho 1 proxy.
     USE_LOCAL_IP_FIRST = False     
 
+    # BOSS_HISTORY_SIZE: số boss tối đa giữ trong danh sách boss xuất hiện (bỏ boss cũ nhất khi đầy)
+    BOSS_HISTORY_SIZE = 15
+    # BOSS_TTL_MINUTES: boss xuất hiện quá số phút này thì bị xoá khỏi danh sách (0 = không hết hạn)
+    BOSS_TTL_MINUTES = 60
+    # BOSS_DEDUP_SECONDS: trong khoảng này, các báo cáo trùng (cùng boss, cùng map) từ tài khoản khác bị bỏ qua
+    BOSS_DEDUP_SECONDS = 60
+    # BOSS_ZONE_FIRST_PLAYER_SECONDS: sau khi vào khu, chờ tối đa chừng này cho gói PLAYER_ADD đầu tiên (khu trống)
+    BOSS_ZONE_FIRST_PLAYER_SECONDS = 0.8
+    # BOSS_ZONE_QUIET_SECONDS: không có PLAYER_ADD mới trong chừng này giây thì coi như đã nhận đủ người trong khu
+    BOSS_ZONE_QUIET_SECONDS = 0.3
+    # BOSS_ZONE_SCAN_SECONDS: thời gian tối đa xác nhận một khu (dù PLAYER_ADD vẫn đang tới)
+    BOSS_ZONE_SCAN_SECONDS = 2.0
+    # BOSS_PREPOSITION_SECONDS: boss dự kiến hồi sinh trong chừng này giây thì auto boss đi trước tới map dự đoán
+    BOSS_PREPOSITION_SECONDS = 20
+
     # ACCOUNTS
     ACCOUNTS = []
     try:
@@ -98,6 +113,13 @@ class Config:
                 cls.USE_LOCAL_IP_FIRST = cls._loader.get('proxy.use_local_ip_first', cls.USE_LOCAL_IP_FIRST)
                 cls.DEFAULT_CHAR_GENDER = cls._loader.get('character.default_gender', cls.DEFAULT_CHAR_GENDER)
                 cls.DEFAULT_CHAR_HAIR = cls._loader.get('character.default_hair', cls.DEFAULT_CHAR_HAIR)
+                cls.BOSS_HISTORY_SIZE = cls._loader.get('boss.history_size', cls.BOSS_HISTORY_SIZE)
+                cls.BOSS_TTL_MINUTES = cls._loader.get('boss.ttl_minutes', cls.BOSS_TTL_MINUTES)
+                cls.BOSS_DEDUP_SECONDS = cls._loader.get('boss.dedup_seconds', cls.BOSS_DEDUP_SECONDS)
+                cls.BOSS_ZONE_FIRST_PLAYER_SECONDS = cls._loader.get('boss.zone_first_player_seconds', cls.BOSS_ZONE_FIRST_PLAYER_SECONDS)
+                cls.BOSS_ZONE_QUIET_SECONDS = cls._loader.get('boss.zone_quiet_seconds', cls.BOSS_ZONE_QUIET_SECONDS)
+                cls.BOSS_ZONE_SCAN_SECONDS = cls._loader.get('boss.zone_scan_seconds', cls.BOSS_ZONE_SCAN_SECONDS)
+                cls.BOSS_PREPOSITION_SECONDS = cls._loader.get('boss.preposition_seconds', cls.BOSS_PREPOSITION_SECONDS)
                 
                 print(f"✅ Loaded configuration from {config_path}")
             except Exception as e:
@@ -3,19 +3,20 @@ Controller - Quản lý xử lý tin nhắn và trạng thái game cho một tà
 
 Đã được tái cấu trúc để tách message handlers thành các module riêng biệt.
 """
-from logs.logger_config import logger
+import logging
+import importlib
+import time
+from logs.logger_config import get_logger
+from logs.metrics import METRICS
 from network.message import Message
 from constants.cmd import Cmd
 from model.map_objects import TileMap
+from logic.spatial_index import SpatialIndex
 from services.movement import MovementService
 from logic.auto_play import AutoPlay
-from logic.auto_pet import AutoPet
-from logic.auto_item import AutoItem
-from logic.xmap import XMap
-from logic.auto_NVBoMong import AutoQuest
-from logic.auto_giftcode import AutoGiftcode
-from logic.auto_boss import AutoBoss
-from logic.auto_msm import AutoMsm
+from .event_bus import (
+    EventBus, MagicTreeMenu, InputFormOpened, CombineUpdate,
+)
 
 # Import handlers
 from .handlers import (
@@ -32,7 +33,42 @@ from .handlers import (
 )
 
 
-import asyncio
+logger = get_logger("controller")
+
+MESSAGES = METRICS.counter("nro_messages_total", "Số tin nhắn đã dispatch theo tài khoản/cmd", ("account", "cmd"))
+MESSAGE_SECONDS = METRICS.histogram("nro_message_handle_seconds", "Thời gian xử lý đồng bộ của on_message theo tài khoản/cmd",
+                                    ("account", "cmd"))
+MESSAGE_ERRORS = METRICS.counter("nro_message_errors_total", "Số lỗi khi xử lý tin nhắn theo tài khoản/cmd", ("account", "cmd"))
+
+
+class LazyComponent:
+    """Module automation (`logic.*`) chỉ được import và khởi tạo (`cls(owner)`) ở lần truy cập đầu tiên.
+
+    Sau lần đầu, instance được lưu vào `__dict__` của owner (Controller/Account) nên các lần sau là
+    truy cập thuộc tính thường (descriptor không có __set__).
+    """
+
+    def __init__(self, module: str, class_name: str):
+        self.module = module
+        self.class_name = class_name
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cls = getattr(importlib.import_module(self.module), self.class_name)
+        component = cls(instance)
+        instance.__dict__[self.name] = component
+        return component
+
+    @staticmethod
+    def loaded(instance, name: str):
+        """Component `name` nếu đã được khởi tạo, ngược lại None (không kích hoạt import)."""
+        return instance.__dict__.get(name)
+
 
 class Controller:
     """Quản lý xử lý tin nhắn và trạng thái game cho một tài khoản.
@@ -41,7 +77,17 @@ class Controller:
       - account: đối tượng tài khoản đang điều khiển
       - tile_map, mobs, npcs: trạng thái bản đồ và thực thể
       - movement, auto_play, auto_pet, xmap: các dịch vụ liên quan
+
+    Các module automation (auto_pet, xmap, auto_boss...) được import/khởi tạo lười ở lần dùng đầu tiên.
     """
+    auto_attack = LazyComponent("logic.auto_attack", "AutoAttack")
+    auto_pet = LazyComponent("logic.auto_pet", "AutoPet")
+    auto_item = LazyComponent("logic.auto_item", "AutoItem")
+    xmap = LazyComponent("logic.xmap", "XMap")
+    auto_quest = LazyComponent("logic.auto_NVBoMong", "AutoQuest")
+    auto_giftcode = LazyComponent("logic.auto_giftcode", "AutoGiftcode")
+    auto_boss = LazyComponent("logic.auto_boss", "AutoBoss")
+    auto_msm = LazyComponent("logic.auto_msm", "AutoMsm")
     def __init__(self, account):
         """Khởi tạo Controller cho `account`: thiết lập trạng thái và các dịch vụ liên quan."""
         self.account = account
@@ -50,42 +96,24 @@ class Controller:
         self.mobs = {}
         self.npcs = {}
         self.chars = {}  # Danh sách characters khác trong map (bao gồm bosses)
+        self.mob_index = SpatialIndex()  # Chỉ mục không gian của mob còn sống (tag = template_id)
+        self.char_index = SpatialIndex()  # Chỉ mục không gian của chars (key = char id)
         self.tile_map = TileMap()
         self.zone_list = []  # Lưu danh sách zone cho auto_boss
+        # cmd -> (counter, histogram) của tài khoản này: mỗi tin nhắn chỉ tốn một lần tra dict
+        self._message_series = {}
         self.movement = MovementService(self)
         self.auto_play = AutoPlay(self)
-        self.auto_attack = None  # Will be imported lazily to avoid circular import
-        self.auto_pet = AutoPet(self)
-        self.auto_item = AutoItem(self)
-        self.xmap = XMap(self)
-        self.auto_quest = AutoQuest(self)
-        self.auto_giftcode = AutoGiftcode(self)
-        self.auto_boss = AutoBoss(self)
-        self.auto_msm = AutoMsm(self)
 
-        # UI Events
-        self.ui_menu_event = asyncio.Event()
+        # Bus sự kiện (MenuOpened, ServerMessage, CombineUpdate, MeLoaded...) - xem controller/event_bus.py
+        self.events = EventBus()
+
+        # Trạng thái gần nhất (chỉ để hiển thị/tra cứu; muốn chờ thì dùng self.events)
         self.last_ui_options = []
         self.last_ui_chat = ""
         self.last_npc_template_id = 0
-
-        # Coordinate events
-        self.me_load_all_event = asyncio.Event()
-        self.pet_info_event = asyncio.Event()
-
-        # Magic Tree state
-        self.magic_tree_menu = asyncio.Event()
         self.magic_tree_options = []
-
-        # Input form state
-        self.input_form_received = asyncio.Event()
-
-        # Server message tracking (for giftcode response checking, etc.)
-        self.server_message_event = asyncio.Event()
         self.last_server_message = ""
-
-        # Combine tracking (for ép sao / pha lê hóa trang bị)
-        self.combine_event = asyncio.Event()
         self.combine_result = ""  # 'success' | 'fail' | 'open' | 'reopen' | ''
         
         # Initialize handlers
@@ -99,6 +127,13 @@ class Controller:
         self.npc_handler = NPCHandler(self)
         self.notification_handler = NotificationHandler(self)
         self.misc_handler = MiscHandler(self)
+        # Đo process_* (handlers/instrumentation.py); chỉ có dữ liệu khi đã bật cho account này
+        self.handler_instrumented = False
+        self.handler_stats = {}
+
+    def loaded_component(self, name: str):
+        """Trả về module automation `name` nếu đã được khởi tạo, ngược lại None (không kích hoạt import)."""
+        return LazyComponent.loaded(self, name)
 
     def toggle_auto_quest(self, enabled: bool):
         """Bật hoặc tắt chế độ Auto Quest."""
@@ -127,11 +162,6 @@ class Controller:
     
     def toggle_auto_attack(self, enabled: bool):
         """Bật hoặc tắt Auto Attack (Universal - cho cả mobs và chars)"""
-        # Lazy import to avoid circular dependency
-        if self.auto_attack is None:
-            from logic.auto_attack import AutoAttack
-            self.auto_attack = AutoAttack(self)
-        
         if enabled:
             self.auto_attack.start()
         else:
@@ -161,6 +191,7 @@ class Controller:
     
     def on_message(self, msg: Message):
         """Chuyển tiếp tin nhắn theo `msg.command` đến handler tương ứng."""
+        started = time.perf_counter()
         try:
             cmd = msg.command
             
@@ -180,7 +211,8 @@ class Controller:
             elif cmd == 6: # ITEM_BUY response (updates assets)
                 self.character_handler.process_item_buy(msg)
             elif cmd == Cmd.MAP_CLEAR:
-                logger.info(f"Received MAP_CLEAR (Cmd {cmd}).")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Received MAP_CLEAR (Cmd {cmd}).")
                 
             # Character Info
             elif cmd == Cmd.SUB_COMMAND:
@@ -294,26 +326,44 @@ class Controller:
             elif cmd == Cmd.GET_SESSION_ID:
                 pass
             elif cmd == Cmd.ANDROID_PACK:
-                logger.info(f"Received ANDROID_PACK (Cmd {cmd}).")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Received ANDROID_PACK (Cmd {cmd}).")
             elif cmd == Cmd.ITEM_BACKGROUND:
-                logger.info(f"Received ITEM_BACKGROUND (Cmd {cmd}), len={len(msg.get_data())}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Received ITEM_BACKGROUND (Cmd {cmd}), len={len(msg.get_data())}")
             elif cmd == Cmd.BGITEM_VERSION:
-                logger.info(f"Received BGITEM_VERSION (Cmd {cmd}), len={len(msg.get_data())}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Received BGITEM_VERSION (Cmd {cmd}), len={len(msg.get_data())}")
             elif cmd == Cmd.TILE_SET:
-                logger.info(f"Received TILE_SET (Cmd {cmd}), len={len(msg.get_data())}")
+                self.map_handler.process_tile_set(msg)
             elif cmd == Cmd.MOB_ME_UPDATE:
-                logger.info(f"Received MOB_ME_UPDATE (Cmd {cmd}).")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Received MOB_ME_UPDATE (Cmd {cmd}).")
             elif cmd == Cmd.UPDATE_COOLDOWN:
-                logger.info(f"Received UPDATE_COOLDOWN (Cmd {cmd}).")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Received UPDATE_COOLDOWN (Cmd {cmd}).")
             elif cmd == Cmd.ME_BACK:
-                logger.info(f"Received ME_BACK (Cmd {cmd}).")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Received ME_BACK (Cmd {cmd}).")
             else:
-                logger.info(f"Unhandled command: {cmd}, len={len(msg.get_data())}, hex={msg.get_data().hex()}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Unhandled command: {cmd}, len={len(msg.get_data())}, hex={msg.get_data().hex()}")
                 
         except Exception as e:
+            MESSAGE_ERRORS.labels(self.account.username, msg.command).inc()
             logger.error(f"Error handling message {msg.command}: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            self._observe_message(msg.command, time.perf_counter() - started)
+
+    def _observe_message(self, cmd: int, elapsed: float):
+        series = self._message_series.get(cmd)
+        if series is None:
+            username = self.account.username
+            series = self._message_series[cmd] = (MESSAGES.labels(username, cmd), MESSAGE_SECONDS.labels(username, cmd))
+        series[0].inc()
+        series[1].observe(elapsed)
 
     # Helper methods delegated to handlers
     def _handle_magic_tree(self, msg: Message):
@@ -325,8 +375,9 @@ class Controller:
                 self.magic_tree_options = []
                 while reader.available() > 0:
                     self.magic_tree_options.append(reader.read_utf())
-                logger.info(f"Magic Tree menu: {self.magic_tree_options}")
-                self.magic_tree_menu.set()
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Magic Tree menu: {self.magic_tree_options}")
+                self.events.publish(MagicTreeMenu(list(self.magic_tree_options)))
             elif sub_cmd == 0:  # loadMagicTree
                 logger.info("Magic Tree loaded.")
             elif sub_cmd == 2:  # harvestPea response
@@ -345,8 +396,9 @@ class Controller:
                 field_name = reader.read_utf()
                 field_type = reader.read_byte()
                 fields.append({'name': field_name, 'type': field_type})
-            logger.info(f"Input form received: title='{title}', fields={fields}")
-            self.input_form_received.set()
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Input form received: title='{title}', fields={fields}")
+            self.events.publish(InputFormOpened(title, fields))
         except Exception as e:
             logger.error(f"Error parsing INPUT_FORM: {e}")
 
@@ -363,24 +415,15 @@ class Controller:
         try:
             reader = msg.reader()
             sub_cmd = reader.read_byte() if reader.available() > 0 else 0
-            if sub_cmd == 0:
-                self.combine_result = "open"
-                self.combine_event.set()
-                logger.info("COMBINE: Tab opened.")
-            elif sub_cmd == 1:
-                self.combine_result = "reopen"
-                self.combine_event.set()
-                logger.info("COMBINE: Tab reopened.")
-            elif sub_cmd == 2:
-                self.combine_result = "success"
-                self.combine_event.set()
-                logger.info("COMBINE: Success!")
-            elif sub_cmd == 3:
-                self.combine_result = "fail"
-                self.combine_event.set()
-                logger.info("COMBINE: Failed.")
+            results = {0: ("open", "COMBINE: Tab opened."), 1: ("reopen", "COMBINE: Tab reopened."),
+                       2: ("success", "COMBINE: Success!"), 3: ("fail", "COMBINE: Failed.")}
+            if sub_cmd in results:
+                self.combine_result, text = results[sub_cmd]
+                logger.info(text)
+                self.events.publish(CombineUpdate(self.combine_result))
             else:
-                logger.info(f"COMBINE: unhandled sub_cmd={sub_cmd}, data len={len(msg.get_data())}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"COMBINE: unhandled sub_cmd={sub_cmd}, data len={len(msg.get_data())}")
         except Exception as e:
             logger.error(f"Error parsing COMBINE message: {e}")
 
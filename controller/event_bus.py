@@ -0,0 +1,238 @@
+"""
+Event Bus - Bus sự kiện có kiểu cho từng tài khoản (`controller.events`).
+
+Handler là bên phát (`publish`), còn services / logic / plugins là bên nhận:
+  - `subscribe(EventType, callback)`: callback (sync hoặc async) được gọi cho mọi sự kiện cùng kiểu.
+  - `expect(EventType, predicate)`: đăng ký chờ TRƯỚC khi gửi hành động, rồi `await waiter.wait(timeout)`.
+    Sự kiện tới giữa lúc đăng ký và lúc await không bị mất (khác với Event.clear() rồi wait()).
+    Dùng waiter như context manager để nó luôn được gỡ khỏi bus, kể cả khi gửi hành động bị lỗi / bị cancel.
+  - `await wait_for(EventType, predicate, timeout)`: expect + wait trong một lời gọi.
+
+Ví dụ:
+  with ctrl.events.expect(MenuOpened, lambda e: e.npc_template_id == npc_id) as menu:
+      await service.open_menu_npc(npc_id)
+      event = await menu.wait(timeout=2.0)   # None nếu hết giờ (menu.result(...) thì ném TimeoutError)
+"""
+import asyncio
+import inspect
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Type, Union
+
+from logs.logger_config import get_logger
+
+logger = get_logger("controller.event_bus")
+
+
+# ── Event types ──
+
+@dataclass(slots=True)
+class MapEntered:
+    """MAP_INFO đã xử lý xong: đã vào map/khu, vị trí nhân vật và NPC đã có."""
+    map_id: int
+    zone_id: int
+    x: int
+    y: int
+
+
+@dataclass(slots=True)
+class ZoneListUpdated:
+    """Danh sách khu vực (Cmd 29) của map hiện tại, mỗi khu là dict {'zone_id', 'num_players', 'max_players', ...}."""
+    zones: List[dict] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class PlayerAdded:
+    """PLAYER_ADD: một nhân vật (người chơi hoặc boss) vừa xuất hiện trong khu hiện tại."""
+    char_id: int
+    name: str
+    type_pk: int = 0
+
+
+@dataclass(slots=True)
+class XMapStopped:
+    """XMap kết thúc (tới nơi, thất bại hoặc bị dừng)."""
+    map_id: int
+    target_map_id: int
+
+    @property
+    def arrived(self) -> bool:
+        return self.map_id == self.target_map_id
+
+
+@dataclass(slots=True)
+class Disconnected:
+    """Tài khoản mất kết nối hoặc bị dừng."""
+
+
+@dataclass(slots=True)
+class MenuOpened:
+    """Menu NPC (OPEN_UI_CONFIRM)."""
+    npc_template_id: int
+    chat: str
+    options: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class MagicTreeMenu:
+    """Menu cây đậu thần (MAGIC_TREE sub 1)."""
+    options: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class InputFormOpened:
+    """Form nhập liệu từ server (Cmd -125)."""
+    title: str
+    fields: List[dict] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ServerMessage:
+    """Thông báo server (SERVER_MESSAGE / SERVER_ALERT)."""
+    text: str
+    source: str = "SERVER_MESSAGE"
+
+
+@dataclass(slots=True)
+class CombineUpdate:
+    """Kết quả combine: 'open' | 'reopen' | 'success' | 'fail'."""
+    result: str
+
+
+@dataclass(slots=True)
+class MeLoaded:
+    """ME_LOAD_ALL đã xử lý xong (thông tin nhân vật + hành trang)."""
+
+
+@dataclass(slots=True)
+class PetInfoUpdated:
+    """PET_INFO đã cập nhật account.pet."""
+
+
+EventTypes = Union[Type, Tuple[Type, ...]]
+
+
+class EventWaiter:
+    """Chờ một sự kiện (một lần). Tạo bằng `EventBus.expect`."""
+
+    __slots__ = ('_bus', 'types', 'predicate', 'future')
+
+    def __init__(self, bus: "EventBus", types: Tuple[Type, ...], predicate: Optional[Callable]):
+        self._bus = bus
+        self.types = types
+        self.predicate = predicate
+        self.future = asyncio.get_running_loop().create_future()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def event(self):
+        """Sự kiện đã nhận, hoặc None."""
+        if self.future.done() and not self.future.cancelled():
+            return self.future.result()
+        return None
+
+    async def wait(self, timeout: Optional[float] = None):
+        """Chờ sự kiện khớp; trả về sự kiện hoặc None nếu hết `timeout` giây."""
+        try:
+            if timeout is None:
+                return await self.future
+            return await asyncio.wait_for(self.future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._bus._discard(self)
+
+    async def result(self, timeout: Optional[float] = None):
+        """Như `wait` nhưng ném asyncio.TimeoutError khi hết giờ (giống asyncio.wait_for)."""
+        event = await self.wait(timeout)
+        if event is None:
+            raise asyncio.TimeoutError()
+        return event
+
+    def cancel(self):
+        """Gỡ waiter khỏi bus (sự kiện đã nhận, nếu có, vẫn đọc được qua `event`)."""
+        self.future.cancel()
+        self._bus._discard(self)
+
+    def __enter__(self) -> "EventWaiter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+
+
+class EventBus:
+    """Bus sự kiện của một tài khoản. Phát là đồng bộ: O(số subscriber + số waiter của kiểu đó)."""
+
+    def __init__(self):
+        self._subscribers: Dict[Type, List[Callable]] = {}
+        self._waiters: Dict[Type, List[EventWaiter]] = {}
+        self._last: Dict[Type, object] = {}
+
+    def subscribe(self, event_type: EventTypes, callback: Callable) -> Callable[[], None]:
+        """Đăng ký callback cho một (hoặc nhiều) kiểu sự kiện. Trả về hàm hủy đăng ký."""
+        types = event_type if isinstance(event_type, tuple) else (event_type,)
+        for t in types:
+            self._subscribers.setdefault(t, []).append(callback)
+
+        def unsubscribe():
+            for t in types:
+                callbacks = self._subscribers.get(t)
+                if callbacks and callback in callbacks:
+                    callbacks.remove(callback)
+        return unsubscribe
+
+    def expect(self, event_type: EventTypes, predicate: Optional[Callable] = None) -> EventWaiter:
+        """Đăng ký chờ sự kiện kế tiếp khớp `predicate` (gọi trước khi gửi hành động)."""
+        types = event_type if isinstance(event_type, tuple) else (event_type,)
+        waiter = EventWaiter(self, types, predicate)
+        for t in types:
+            self._waiters.setdefault(t, []).append(waiter)
+        return waiter
+
+    async def wait_for(self, event_type: EventTypes, predicate: Optional[Callable] = None,
+                       timeout: Optional[float] = None):
+        """Chờ sự kiện kế tiếp khớp `predicate`; None nếu hết giờ."""
+        return await self.expect(event_type, predicate).wait(timeout)
+
+    def last(self, event_type: Type):
+        """Sự kiện gần nhất của kiểu `event_type` (hoặc None)."""
+        return self._last.get(event_type)
+
+    def publish(self, event):
+        """Phát sự kiện tới các subscriber và waiter của đúng kiểu đó."""
+        event_type = type(event)
+        self._last[event_type] = event
+
+        for callback in tuple(self._subscribers.get(event_type, ())):
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                logger.error(f"Lỗi trong subscriber {event_type.__name__}: {e}")
+
+        waiters = self._waiters.get(event_type)
+        if not waiters:
+            return
+        pending = []
+        for waiter in waiters:
+            if waiter.future.done():
+                continue
+            try:
+                matched = waiter.predicate is None or waiter.predicate(event)
+            except Exception as e:
+                logger.error(f"Lỗi trong predicate {event_type.__name__}: {e}")
+                matched = False
+            if matched:
+                waiter.future.set_result(event)
+            else:
+                pending.append(waiter)
+        self._waiters[event_type] = pending
+
+    def _discard(self, waiter: EventWaiter):
+        for t in waiter.types:
+            waiters = self._waiters.get(t)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
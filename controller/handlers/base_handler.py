@@ -2,7 +2,9 @@
 Base Handler - Class cơ sở cho tất cả message handlers
 """
 from network.message import Message
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+
+logger = get_logger("controller.base")
 
 
 class BaseHandler:
@@ -1,9 +1,13 @@
 """
 Character Handler - Xử lý các message liên quan đến thông tin nhân vật
 """
+import logging
 from network.message import Message
-from logs.logger_config import TerminalColors as C, logger
+from logs.logger_config import TerminalColors as C, get_logger
 from .base_handler import BaseHandler
+from ..event_bus import MeLoaded
+
+logger = get_logger("controller.character")
 
 
 class CharacterHandler(BaseHandler):
@@ -47,12 +51,14 @@ class CharacterHandler(BaseHandler):
             # Check for remaining data (Potential "Power Info Extra")
             if reader.available() > 0:
                 remaining = reader.read_remaining()
-                logger.info(f"Dữ liệu còn lại trong ME_LOAD_POINT (Power Info Extra?): {remaining.hex()}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Dữ liệu còn lại trong ME_LOAD_POINT (Power Info Extra?): {remaining.hex()}")
 
             if char.c_hp == 0:
                 self.controller.xmap.handle_death()
 
-            logger.info(f"Chỉ số nhân vật (Cmd {msg.command}): HP={char.c_hp}/{char.c_hp_full}, MP={char.c_mp}/{char.c_mp_full}, Tiềm năng={char.c_tiem_nang}, Sát thương={char.c_dam_full}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Chỉ số nhân vật (Cmd {msg.command}): HP={char.c_hp}/{char.c_hp_full}, MP={char.c_mp}/{char.c_mp_full}, Tiềm năng={char.c_tiem_nang}, Sát thương={char.c_dam_full}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích ME_LOAD_POINT: {e}")
 
@@ -129,7 +135,7 @@ class CharacterHandler(BaseHandler):
                     from model.game_objects import Item, ItemOption
                     if reader.available() < 1: return
                     num_bag_items = reader.read_byte()
-                    char.arr_item_bag = [None] * num_bag_items
+                    items = [None] * num_bag_items
                     for i in range(num_bag_items):
                         if reader.available() < 2: break
                         template_id = reader.read_short()
@@ -158,7 +164,8 @@ class CharacterHandler(BaseHandler):
                                     item.item_option.append(ItemOption(opt_id, opt_param))
                         
                         item.index_ui = i
-                        char.arr_item_bag[i] = item
+                        items[i] = item
+                    self.controller.inventory_handler.apply_items("bag", items)
                 except Exception as e:
                     logger.error(f"Lỗi khi phân tích Bag Items: {e}")
                 
@@ -167,7 +174,7 @@ class CharacterHandler(BaseHandler):
                     from model.game_objects import Item, ItemOption
                     if reader.available() < 1: return
                     num_box_items = reader.read_byte()
-                    char.arr_item_box = [None] * num_box_items
+                    items = [None] * num_box_items
                     for i in range(num_box_items):
                         if reader.available() < 2: break
                         template_id = reader.read_short()
@@ -196,23 +203,25 @@ class CharacterHandler(BaseHandler):
                                     item.item_option.append(ItemOption(opt_id, opt_param))
                         
                         item.index_ui = i
-                        char.arr_item_box[i] = item
+                        items[i] = item
+                    self.controller.inventory_handler.apply_items("box", items)
                 except Exception as e:
                     logger.error(f"Lỗi khi phân tích Box Items: {e}")
 
                 # Check for remaining data
                 if reader.available() > 0:
                     remaining_data = reader.read_remaining()
-                    logger.info(f"Dữ liệu còn lại trong ME_LOAD_ALL (Info khác?): {remaining_data.hex()}")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Dữ liệu còn lại trong ME_LOAD_ALL (Info khác?): {remaining_data.hex()}")
 
-                logger.info(f"Đã xử lý đầy đủ ME_LOAD_ALL: Tên={char.name}, SM={char.c_power}, Vàng={char.xu}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Đã xử lý đầy đủ ME_LOAD_ALL: Tên={char.name}, SM={char.c_power}, Vàng={char.xu}")
                 
                 # Signal that login is fully complete
                 if not self.account.login_event.is_set():
                     self.account.login_event.set()
                 
-                # Signal me_load_all event
-                self.controller.me_load_all_event.set()
+                self.controller.events.publish(MeLoaded())
 
             elif sub_cmd == 4:
                 char.xu = self._read_gold(reader, char)
@@ -225,34 +234,42 @@ class CharacterHandler(BaseHandler):
             elif sub_cmd == 5:
                 old_hp = char.c_hp
                 char.c_hp = reader.read_int()
-                logger.info(f"Cập nhật HP: {old_hp} -> {char.c_hp}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Cập nhật HP: {old_hp} -> {char.c_hp}")
 
             elif sub_cmd == 6:
                 old_mp = char.c_mp
                 char.c_mp = reader.read_int()
-                logger.info(f"Cập nhật MP: {old_mp} -> {char.c_mp}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Cập nhật MP: {old_mp} -> {char.c_mp}")
 
             elif sub_cmd == 61:
                 if reader.available() > 0:
                     remaining = reader.read_remaining()
-                    logger.info(f"SUB_COMMAND (Lệnh {msg.command}) sub_cmd 61: Payload Hex: {remaining.hex()}")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"SUB_COMMAND (Lệnh {msg.command}) sub_cmd 61: Payload Hex: {remaining.hex()}")
                 else:
-                    logger.info(f"SUB_COMMAND (Lệnh {msg.command}) sub_cmd 61 (empty)")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"SUB_COMMAND (Lệnh {msg.command}) sub_cmd 61 (empty)")
 
             elif sub_cmd == 14:
                 if reader.available() > 0:
                     remaining = reader.read_remaining()
-                    logger.info(f"SUB_COMMAND (Lệnh {msg.command}) sub_cmd 14: Payload Hex: {remaining.hex()}")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"SUB_COMMAND (Lệnh {msg.command}) sub_cmd 14: Payload Hex: {remaining.hex()}")
                 else:
-                    logger.info(f"SUB_COMMAND (Lệnh {msg.command}) sub_cmd 14 (empty)")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"SUB_COMMAND (Lệnh {msg.command}) sub_cmd 14 (empty)")
 
             elif sub_cmd == 21: # BOX_COIN_OUT
                 coin_change = reader.read_int()
                 char.xu += coin_change
-                logger.info(f"Cập nhật xu từ rương (sub_cmd 21): thay đổi={coin_change}, Vàng={char.xu}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Cập nhật xu từ rương (sub_cmd 21): thay đổi={coin_change}, Vàng={char.xu}")
 
             else:
-                logger.info(f"SUB_COMMAND (Lệnh {msg.command}) lệnh phụ chưa xử lý: {sub_cmd}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"SUB_COMMAND (Lệnh {msg.command}) lệnh phụ chưa xử lý: {sub_cmd}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích SUB_COMMAND: {e}")
             import traceback
@@ -264,7 +281,8 @@ class CharacterHandler(BaseHandler):
             reader = msg.reader()
             power = reader.read_long()
             self.account.char.c_power = power
-            logger.info(f"Cập nhật Sức Mạnh (Cmd {msg.command}): {power}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Cập nhật Sức Mạnh (Cmd {msg.command}): {power}")
             
             if reader.available() > 0:
                 pass
@@ -287,7 +305,8 @@ class CharacterHandler(BaseHandler):
                 char.c_power += amount
                 char.c_tiem_nang += amount
             
-            logger.info(f"Người chơi tăng EXP (Cmd {msg.command}): Loại={exp_type}, Số lượng={amount}. SM Hiện tại: {char.c_power}, TN: {char.c_tiem_nang}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Người chơi tăng EXP (Cmd {msg.command}): Loại={exp_type}, Số lượng={amount}. SM Hiện tại: {char.c_power}, TN: {char.c_tiem_nang}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích PLAYER_UP_EXP: {e}")
 
@@ -301,7 +320,8 @@ class CharacterHandler(BaseHandler):
             
             char.luong = reader.read_int()
             char.luong_khoa = reader.read_int()
-            logger.info(f"Cập nhật tài sản sau khi mua/bán (Cmd 6): Vàng={char.xu}, Ngọc={char.luong}, Ngọc khóa={char.luong_khoa}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Cập nhật tài sản sau khi mua/bán (Cmd 6): Vàng={char.xu}, Ngọc={char.luong}, Ngọc khóa={char.luong_khoa}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích ITEM_BUY: {e}")
 
@@ -311,7 +331,8 @@ class CharacterHandler(BaseHandler):
             reader = msg.reader()
             coin_change = reader.read_int()
             self.account.char.xu += coin_change
-            logger.info(f"Cập nhật xu (Cmd -1): thay đổi={coin_change}, Vàng={self.account.char.xu}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Cập nhật xu (Cmd -1): thay đổi={coin_change}, Vàng={self.account.char.xu}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích ME_CHANGE_COIN: {e}")
 
@@ -321,6 +342,7 @@ class CharacterHandler(BaseHandler):
             reader = msg.reader()
             coin_change = reader.read_int()
             self.account.char.xu += coin_change
-            logger.info(f"Cập nhật xu trong hành trang (Cmd 95): thay đổi={coin_change}, Vàng={self.account.char.xu}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Cập nhật xu trong hành trang (Cmd 95): thay đổi={coin_change}, Vàng={self.account.char.xu}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích ME_UP_COIN_BAG: {e}")
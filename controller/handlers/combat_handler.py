@@ -1,13 +1,102 @@
 """
 Combat Handler - Xử lý các message liên quan đến chiến đấu
 """
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from network.message import Message
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+from logs.metrics import METRICS
+from logic.spatial_index import index_mob, is_mob_attackable
 from .base_handler import BaseHandler
 
+logger = get_logger("controller.combat")
+
+MOBS_KILLED = METRICS.counter("nro_mobs_killed_total", "Số quái đang focus đã chết (tính là hạ được)", ("account",))
+
 
 class CombatHandler(BaseHandler):
-    """Handler xử lý mob HP, death, respawn, attacks."""
+    """Handler xử lý mob HP, death, respawn, attacks.
+
+    Đồng thời giữ tập mob còn sống theo template (`alive_by_template`) và đồng bộ
+    `controller.mob_index`, cập nhật tăng dần theo MAP_INFO / MOB_HP / NPC_DIE / NPC_LIVE.
+    """
+
+    def __init__(self, controller):
+        super().__init__(controller)
+        self.alive_by_template: Dict[int, Set[int]] = {}  # template_id -> {mob_id còn sống}
+        self._alive_template: Dict[int, int] = {}  # mob_id còn sống -> template_id
+
+    # ── Alive-mob sets ──
+
+    def reset_mobs(self):
+        """Dựng lại tập mob sống và mob_index từ `controller.mobs` (khi vào map mới)."""
+        self.alive_by_template.clear()
+        self._alive_template.clear()
+        self.controller.mob_index.clear()
+        for mob in self.controller.mobs.values():
+            self.sync_mob(mob)
+
+    def sync_mob(self, mob):
+        """Cập nhật trạng thái sống/chết của một mob vào tập theo template và mob_index."""
+        index_mob(self.controller.mob_index, mob)
+        old_template = self._alive_template.pop(mob.mob_id, None)
+        if old_template is not None:
+            ids = self.alive_by_template.get(old_template)
+            if ids is not None:
+                ids.discard(mob.mob_id)
+                if not ids:
+                    del self.alive_by_template[old_template]
+        alive = is_mob_attackable(mob)
+        if alive:
+            self._alive_template[mob.mob_id] = mob.template_id
+            self.alive_by_template.setdefault(mob.template_id, set()).add(mob.mob_id)
+        if alive != (old_template is not None):
+            # Quái đang focus chết / hồi sinh, hoặc AutoPlay đang chờ mục tiêu: đánh thức thay vì để nó tự poll.
+            # Quái khác chết không được đánh thức (AutoPlay đang chờ hồi chiêu, không đổi nhịp đánh)
+            auto_play = self.controller.auto_play
+            focus = self.controller.account.char.mob_focus
+            if auto_play.idle or (focus is not None and focus.mob_id == mob.mob_id):
+                auto_play.wake()
+
+    def is_alive(self, mob_id: int) -> bool:
+        """Mob còn sống và đánh được."""
+        return mob_id in self._alive_template
+
+    @property
+    def alive_count(self) -> int:
+        return len(self._alive_template)
+
+    def alive_mob_ids(self, templates: Optional[Iterable[int]] = None) -> List[int]:
+        """ID các mob còn sống, lọc theo template nếu có."""
+        if not templates:
+            return list(self._alive_template)
+        ids = []
+        for t in templates:
+            ids.extend(self.alive_by_template.get(t, ()))
+        return ids
+
+    def nearest_alive(self, x: int, y: int, templates: Optional[Set[int]] = None,
+                      max_dist: float = None) -> Tuple[Optional[int], object]:
+        """Mob sống gần (x, y) nhất: (khoảng cách bình phương, mob) hoặc (None, None).
+
+        Có lọc template thì chỉ duyệt các ứng viên của template đó; không lọc thì hỏi mob_index.
+        """
+        if not templates:
+            return self.controller.mob_index.nearest_one(x, y, max_dist)
+        mobs = self.controller.mobs
+        max_d2 = None if max_dist is None else max_dist * max_dist
+        best_d2, best = None, None
+        for t in templates:
+            for mob_id in self.alive_by_template.get(t, ()):
+                mob = mobs.get(mob_id)
+                if mob is None:
+                    continue
+                d2 = (mob.x - x) ** 2 + (mob.y - y) ** 2
+                if (max_d2 is None or d2 <= max_d2) and (best_d2 is None or d2 < best_d2):
+                    best_d2, best = d2, mob
+        return best_d2, best
+
+    # ── Packets ──
     
     def process_mob_hp(self, msg: Message):
         """Cập nhật HP của mob (MOB_HP), xử lý các dữ liệu bổ sung nếu có."""
@@ -25,7 +114,9 @@ class CombatHandler(BaseHandler):
             if mob:
                 old_hp = mob.hp
                 mob.hp = current_hp
-                logger.info(f"Cập nhật quái vật: ID={mob_id} | HP: {old_hp} -> {current_hp}/{mob.max_hp} (ST: {damage})")
+                self.sync_mob(mob)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Cập nhật quái vật: ID={mob_id} | HP: {old_hp} -> {current_hp}/{mob.max_hp} (ST: {damage})")
             else:
                 logger.warning(f"Đã nhận MOB_HP cho MobID không xác định={mob_id}. HP={current_hp}")
                 
@@ -45,12 +136,17 @@ class CombatHandler(BaseHandler):
             if mob:
                 mob.hp = 0
                 mob.status = 0
-                logger.info(f"Quái vật đã CHẾT: ID={mob_id} (ST: {damage})")
+                self.sync_mob(mob)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Quái vật đã CHẾT: ID={mob_id} (ST: {damage})")
                 
-                # Báo cho auto quest biết có quái chết
-                self.controller.auto_quest.increment_kill_count(mob.template_id)
+                # Báo cho auto quest biết có quái chết (chỉ khi đã được khởi tạo)
+                auto_quest = self.controller.loaded_component('auto_quest')
+                if auto_quest:
+                    auto_quest.increment_kill_count(mob.template_id)
 
                 if self.account.char.mob_focus == mob:
+                    MOBS_KILLED.labels(self.account.username).inc()
                     self.account.char.mob_focus = None
             else:
                 logger.warning(f"Đã nhận NPC_DIE cho MobID không xác định={mob_id}")
@@ -75,8 +171,10 @@ class CombatHandler(BaseHandler):
             mob.max_hp = mob.hp
             mob.x = mob.x_first
             mob.y = mob.y_first
+            self.sync_mob(mob)
             
-            logger.info(f"Quái vật HỒI SINH: ID={mob_id} | HP={mob.hp} | Vị trí=({mob.x},{mob.y})")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Quái vật HỒI SINH: ID={mob_id} | HP={mob.hp} | Vị trí=({mob.x},{mob.y})")
             
         except Exception as e:
             logger.error(f"Lỗi khi phân tích NPC_LIVE: {e}")
@@ -89,6 +187,7 @@ class CombatHandler(BaseHandler):
             reader = msg.reader()
             player_id = reader.read_int()
             npc_id = reader.read_byte()
-            logger.info(f"Người chơi tấn công NPC (Cmd {msg.command}): PlayerID={player_id}, NPC_ID={npc_id}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Người chơi tấn công NPC (Cmd {msg.command}): PlayerID={player_id}, NPC_ID={npc_id}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích PLAYER_ATTACK_NPC: {e}")
@@ -0,0 +1,169 @@
+"""
+Handler Instrumentation - Đo thời gian giải mã / kích thước payload / số lỗi của từng `process_*`.
+
+Bật theo từng tài khoản: `enable(controller)` thay mọi `process_*` của các handler bằng bản bọc
+(gán lên instance, class không đổi); `disable(controller)` gỡ bản bọc. Khi tắt, dispatch gọi thẳng
+method gốc nên không tốn thêm gì.
+
+Lỗi được đếm gồm cả exception thoát ra khỏi handler lẫn exception bị `try/except` nuốt mất trong
+lúc `process_*` chạy (đa số handler chỉ log rồi bỏ qua) — phần sau dùng sự kiện EXCEPTION_HANDLED
+của `sys.monitoring` (Python 3.12+), chỉ đăng ký khi có ít nhất một tài khoản đang bật.
+
+    enable(acc.controller)
+    for stats in top(acc.controller, 10): print(stats.cmd, stats.handler, stats.avg)
+"""
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from logs.metrics import METRICS
+from .base_handler import BaseHandler
+
+HANDLER_SECONDS = METRICS.histogram("nro_handler_decode_seconds", "Thời gian chạy process_* theo cmd (khi bật đo)",
+                                    ("cmd", "handler"))
+HANDLER_ERRORS = METRICS.counter("nro_handler_exceptions_total", "Exception trong process_* theo cmd (khi bật đo)",
+                                 ("cmd", "handler"))
+
+SORT_KEYS = ("total", "avg", "max", "count", "bytes", "errors")
+
+
+@dataclass(slots=True)
+class HandlerStats:
+    """Thống kê của một cặp (cmd, handler.process_*) trên một tài khoản."""
+    cmd: int
+    handler: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    bytes: int = 0
+    errors: int = 0
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+# Lời gọi process_* đang chạy (để gán exception bị nuốt cho đúng cmd); loop chạy một thread
+_current: Optional[HandlerStats] = None
+_enabled_count = 0  # số controller đang bật đo
+
+_MONITORING = getattr(sys, "monitoring", None)
+_TOOL_ID = 4  # một trong các id tự do của sys.monitoring (0-5)
+_tool_registered = False
+
+
+def _on_exception_handled(code, offset, exception):
+    stats = _current
+    # `except`/`finally` của chính bản bọc: exception thoát ra đã được đếm một lần trong _wrap
+    if stats is not None and code is not _WRAPPER_CODE:
+        stats.errors += 1
+        HANDLER_ERRORS.labels(stats.cmd, stats.handler).inc()
+
+
+def _set_exception_events(active: bool):
+    global _tool_registered
+    if _MONITORING is None:
+        return
+    if not _tool_registered:
+        if not active:
+            return
+        try:
+            _MONITORING.use_tool_id(_TOOL_ID, "nro_handler_instrumentation")
+        except ValueError:  # id đã bị tool khác (debugger/coverage) chiếm: chỉ đếm exception thoát ra
+            return
+        _MONITORING.register_callback(_TOOL_ID, _MONITORING.events.EXCEPTION_HANDLED, _on_exception_handled)
+        _tool_registered = True
+    _MONITORING.set_events(_TOOL_ID, _MONITORING.events.EXCEPTION_HANDLED if active else 0)
+
+
+def _wrap(method, table: Dict[Tuple[int, str], HandlerStats], label: str):
+    perf_counter = time.perf_counter
+
+    def instrumented(msg, *args, **kwargs):
+        global _current
+        key = (msg.command, label)
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = HandlerStats(msg.command, label)
+        previous, _current = _current, stats
+        start = perf_counter()
+        try:
+            return method(msg, *args, **kwargs)
+        except Exception:
+            stats.errors += 1
+            HANDLER_ERRORS.labels(stats.cmd, label).inc()
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            _current = previous
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+            stats.bytes += msg.payload_size()
+            HANDLER_SECONDS.labels(stats.cmd, label).observe(elapsed)
+
+    instrumented.__wrapped__ = method
+    return instrumented
+
+
+_WRAPPER_CODE = _wrap(None, {}, "").__code__  # mọi bản bọc dùng chung code object này
+
+
+def _handlers(controller) -> List[BaseHandler]:
+    return [h for h in vars(controller).values() if isinstance(h, BaseHandler)]
+
+
+def _process_methods(handler: BaseHandler) -> List[str]:
+    return [name for name in dir(type(handler))
+            if name.startswith("process_") and callable(getattr(type(handler), name))]
+
+
+def is_enabled(controller) -> bool:
+    return getattr(controller, "handler_instrumented", False)
+
+
+def enable(controller):
+    """Bọc mọi `process_*` của các handler thuộc `controller` (giữ thống kê cũ nếu đã có)."""
+    if is_enabled(controller):
+        return
+    controller.handler_instrumented = True
+    table = controller.handler_stats
+    for handler in _handlers(controller):
+        prefix = type(handler).__name__.replace("Handler", "").lower()
+        for name in _process_methods(handler):
+            method = getattr(handler, name)
+            setattr(handler, name, _wrap(method, table, f"{prefix}.{name}"))
+    _set_enabled_count(+1)
+
+
+def disable(controller):
+    """Gỡ bản bọc; thống kê vẫn giữ trong `controller.handler_stats`."""
+    if not is_enabled(controller):
+        return
+    controller.handler_instrumented = False
+    for handler in _handlers(controller):
+        for name in _process_methods(handler):
+            if name in vars(handler):
+                delattr(handler, name)
+    _set_enabled_count(-1)
+
+
+def _set_enabled_count(delta: int):
+    global _enabled_count
+    _enabled_count += delta
+    if _enabled_count == (1 if delta > 0 else 0):
+        _set_exception_events(_enabled_count > 0)
+
+
+def reset(controller):
+    controller.handler_stats.clear()
+
+
+def top(controller, n: int = 10, sort: str = "total") -> List[HandlerStats]:
+    """N cặp (cmd, handler) tốn nhất theo `sort` (total | avg | max | count | bytes | errors)."""
+    if sort not in SORT_KEYS:
+        sort = "total"
+    stats = controller.handler_stats.values()
+    return sorted(stats, key=lambda s: getattr(s, sort), reverse=True)[:n]
@@ -1,81 +1,137 @@
 """
 Inventory Handler - Xử lý các message liên quan đến túi đồ và pet
 """
+import logging
 import asyncio
+from typing import Callable, List, Optional
 from network.message import Message
-from logs.logger_config import logger
+from model.inventory_index import InventoryChange, QUANTITY, REMOVED
+from logs.logger_config import get_logger
 from .base_handler import BaseHandler
+from ..event_bus import EventWaiter, PetInfoUpdated
+
+logger = get_logger("controller.inventory")
 
 
 class InventoryHandler(BaseHandler):
-    """Handler xử lý bag, pet info, item usage."""
-    
+    """Handler xử lý bag, pet info, item usage.
+    Bag/box mới nhận được được merge vào danh sách hiện có (giữ lại Item không đổi) và mỗi
+    InventoryChange (added / removed / quantity / options) được phát lên `controller.events`.
+    """
+
+    # ── Change events ──
+
+    def expect_change(self, predicate: Optional[Callable[[InventoryChange], bool]] = None) -> EventWaiter:
+        """Đăng ký chờ thay đổi hành trang TRƯỚC khi gửi hành động."""
+        return self.controller.events.expect(InventoryChange, predicate)
+
+    async def wait_for_change(self, predicate: Optional[Callable[[InventoryChange], bool]] = None,
+                              timeout: float = 2.0, waiter: Optional[EventWaiter] = None) -> Optional[InventoryChange]:
+        """Chờ thay đổi hành trang khớp `predicate` (hoặc `waiter` từ expect_change). Hết giờ trả về None."""
+        return await (waiter or self.expect_change(predicate)).wait(timeout)
+
+    def _emit_changes(self, changes: List[InventoryChange]):
+        publish = self.controller.events.publish
+        for change in changes:
+            publish(change)
+
+    # ── Bag / Box ──
+
+    def apply_items(self, container: str, new_items: list) -> List[InventoryChange]:
+        """Merge danh sách item mới của `container` ("bag"/"box") vào char, phát và trả về các thay đổi."""
+        char = self.account.char
+        if container == "bag":
+            changes = char.bag_index.merge(char.arr_item_bag, new_items, container)
+        else:
+            changes = char.box_index.merge(char.arr_item_box, new_items, container)
+        self._emit_changes(changes)
+        return changes
+
+    def _read_items(self, reader, size: int) -> list:
+        """Đọc `size` ô item (định dạng BAG_INFO/BOX_INFO action 0)."""
+        from model.game_objects import Item, ItemOption
+        items = [None] * size
+        for i in range(size):
+            if reader.available() < 2: break 
+            template_id = reader.read_short()
+            if template_id == -1:
+                continue
+
+            item = Item()
+            item.item_id = template_id
+            
+            if reader.available() < 4: break
+            item.quantity = reader.read_int()
+
+            if reader.available() < 2: break
+            item.info = reader.read_utf()
+            
+            if reader.available() < len(item.info.encode('utf-8')) + 1: break
+
+            if reader.available() < 2: break
+            item.content = reader.read_utf()
+            
+            if reader.available() < len(item.content.encode('utf-8')) + 1: break
+            
+            item.index_ui = i
+            
+            if reader.available() < 1: break
+            num_options = reader.read_ubyte()
+            if num_options > 0:
+                item.item_option = []
+                for _ in range(num_options):
+                    if reader.available() < 3: break
+                    option_id = reader.read_ubyte()
+                    param = reader.read_ushort()
+                    if option_id != 255:
+                        item.item_option.append(ItemOption(option_id, param))
+            
+            items[i] = item
+        return items
+
+    def _update_quantity(self, container: str, index: int, quantity: int) -> bool:
+        """Action 2: cập nhật số lượng một ô (0 = hết). Trả về False nếu ô không hợp lệ."""
+        char = self.account.char
+        if container == "bag":
+            items, inventory_index = char.arr_item_bag, char.bag_index
+        else:
+            items, inventory_index = char.arr_item_box, char.box_index
+        if not (0 <= index < len(items)) or items[index] is None:
+            return False
+        item = items[index]
+        inventory_index.set_quantity(index, quantity)
+        kind = REMOVED if quantity == 0 else QUANTITY
+        change = InventoryChange(container, kind, index, item.item_id, item.quantity, quantity)
+        item.quantity = quantity
+        if quantity == 0:
+            items[index] = None
+        self._emit_changes([change])
+        return True
+
     def process_bag_info(self, msg: Message):
         """Cập nhật dữ liệu túi đồ (BAG): xử lý danh sách ô, cập nhật số lượng hoặc thay đổi ô trong túi."""
         try:
             reader = msg.reader()
             action = reader.read_byte()
-            logger.info(f"Thông tin túi đồ (Cmd {msg.command}): Hành động={action}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thông tin túi đồ (Cmd {msg.command}): Hành động={action}")
 
             if action == 0:
-                from model.game_objects import Item, ItemOption
-                my_char = self.account.char
-
                 if reader.available() < 1: return
                 bag_size = reader.read_ubyte()
-                my_char.arr_item_bag = [None] * bag_size
-                logger.info(f"Đang xử lý {bag_size} ô trong túi đồ.")
-
-                for i in range(bag_size):
-                    if reader.available() < 2: break 
-                    template_id = reader.read_short()
-                    if template_id == -1:
-                        continue
-
-                    item = Item()
-                    item.item_id = template_id
-                    
-                    if reader.available() < 4: break
-                    item.quantity = reader.read_int()
-
-                    if reader.available() < 2: break
-                    item.info = reader.read_utf()
-                    
-                    if reader.available() < len(item.info.encode('utf-8')) + 1: break
-
-                    if reader.available() < 2: break
-                    item.content = reader.read_utf()
-                    
-                    if reader.available() < len(item.content.encode('utf-8')) + 1: break
-                    
-                    item.index_ui = i
-                    
-                    if reader.available() < 1: break
-                    num_options = reader.read_ubyte()
-                    if num_options > 0:
-                        item.item_option = []
-                        for _ in range(num_options):
-                            if reader.available() < 3: break
-                            option_id = reader.read_ubyte()
-                            param = reader.read_ushort()
-                            if option_id != 255:
-                                item.item_option.append(ItemOption(option_id, param))
-                    
-                    my_char.arr_item_bag[i] = item
-                
-                logger.info(f"Đã cập nhật thành công túi đồ với {sum(1 for i in my_char.arr_item_bag if i is not None)} vật phẩm.")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Đang xử lý {bag_size} ô trong túi đồ.")
+                changes = self.apply_items("bag", self._read_items(reader, bag_size))
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Đã cập nhật thành công túi đồ với {len(self.account.char.bag_index)} vật phẩm ({len(changes)} thay đổi).")
 
             elif action == 2:
                 if reader.available() < 5: return
                 index = reader.read_byte()
                 quantity = reader.read_int()
-                logger.info(f"Cập nhật số lượng vật phẩm tại vị trí {index} thành {quantity}.")
-                my_char = self.account.char
-                if index < len(my_char.arr_item_bag) and my_char.arr_item_bag[index] is not None:
-                    my_char.arr_item_bag[index].quantity = quantity
-                    if quantity == 0:
-                        my_char.arr_item_bag[index] = None
-                else:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Cập nhật số lượng vật phẩm tại vị trí {index} thành {quantity}.")
+                if not self._update_quantity("bag", index, quantity):
                     logger.warning(f"Nhận được cập nhật số lượng cho vật phẩm không hợp lệ tại vị trí {index}.")
 
         except Exception as e:
@@ -88,67 +144,25 @@ class InventoryHandler(BaseHandler):
         try:
             reader = msg.reader()
             action = reader.read_byte()
-            logger.info(f"Thông tin rương đồ (Cmd {msg.command}): Hành động={action}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thông tin rương đồ (Cmd {msg.command}): Hành động={action}")
 
             if action == 0:
-                from model.game_objects import Item, ItemOption
-                my_char = self.account.char
-
                 if reader.available() < 1: return
                 box_size = reader.read_ubyte()
-                my_char.arr_item_box = [None] * box_size
-                logger.info(f"Đang xử lý {box_size} ô trong rương đồ.")
-
-                for i in range(box_size):
-                    if reader.available() < 2: break 
-                    template_id = reader.read_short()
-                    if template_id == -1:
-                        continue
-
-                    item = Item()
-                    item.item_id = template_id
-                    
-                    if reader.available() < 4: break
-                    item.quantity = reader.read_int()
-
-                    if reader.available() < 2: break
-                    item.info = reader.read_utf()
-                    
-                    if reader.available() < len(item.info.encode('utf-8')) + 1: break
-
-                    if reader.available() < 2: break
-                    item.content = reader.read_utf()
-                    
-                    if reader.available() < len(item.content.encode('utf-8')) + 1: break
-                    
-                    item.index_ui = i
-                    
-                    if reader.available() < 1: break
-                    num_options = reader.read_ubyte()
-                    if num_options > 0:
-                        item.item_option = []
-                        for _ in range(num_options):
-                            if reader.available() < 3: break
-                            option_id = reader.read_ubyte()
-                            param = reader.read_ushort()
-                            if option_id != 255:
-                                item.item_option.append(ItemOption(option_id, param))
-                    
-                    my_char.arr_item_box[i] = item
-                
-                logger.info(f"Đã cập nhật thành công rương đồ với {sum(1 for i in my_char.arr_item_box if i is not None)} vật phẩm.")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Đang xử lý {box_size} ô trong rương đồ.")
+                changes = self.apply_items("box", self._read_items(reader, box_size))
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Đã cập nhật thành công rương đồ với {len(self.account.char.box_index)} vật phẩm ({len(changes)} thay đổi).")
 
             elif action == 2:
                 if reader.available() < 5: return
                 index = reader.read_byte()
                 quantity = reader.read_int()
-                logger.info(f"Cập nhật số lượng vật phẩm tại vị trí {index} trong rương thành {quantity}.")
-                my_char = self.account.char
-                if index < len(my_char.arr_item_box) and my_char.arr_item_box[index] is not None:
-                    my_char.arr_item_box[index].quantity = quantity
-                    if quantity == 0:
-                        my_char.arr_item_box[index] = None
-                else:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Cập nhật số lượng vật phẩm tại vị trí {index} trong rương thành {quantity}.")
+                if not self._update_quantity("box", index, quantity):
                     logger.warning(f"Nhận được cập nhật số lượng cho vật phẩm không hợp lệ tại vị trí {index} trong rương.")
 
         except Exception as e:
@@ -232,10 +246,10 @@ class InventoryHandler(BaseHandler):
                     s.more_info = reader.read_utf()
                     pet.arr_pet_skill[i] = s
             
-            logger.info(f"Đã cập nhật thông tin Đệ tử: {pet.name} | HP: {pet.c_hp}/{pet.c_hp_full} | Sức mạnh: {pet.c_power}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Đã cập nhật thông tin Đệ tử: {pet.name} | HP: {pet.c_hp}/{pet.c_hp_full} | Sức mạnh: {pet.c_power}")
             
-            # Signal pet_info event
-            self.controller.pet_info_event.set()
+            self.controller.events.publish(PetInfoUpdated())
 
         except Exception as e:
             logger.error(f"Lỗi khi phân tích PET_INFO: {e}")
@@ -258,36 +272,26 @@ class InventoryHandler(BaseHandler):
             reasons.append(f"MP thấp ({int(char.c_mp/char.c_mp_full*100)}%)")
         
         if not needs_eat:
-            logger.info(f"[{self.account.username}] Không cần ăn đậu (HP/MP > 80%, Thể lực > 20%).")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"[{self.account.username}] Không cần ăn đậu (HP/MP > 80%, Thể lực > 20%).")
             return
 
-        logger.info(f"[{self.account.username}] Quyết định ăn đậu. Lý do: {', '.join(reasons)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"[{self.account.username}] Quyết định ăn đậu. Lý do: {', '.join(reasons)}")
 
-        found_index = -1
-        
-        if char.arr_item_bag:
-            for i, item in enumerate(char.arr_item_bag):
-                if item and item.item_id in PEAN_IDS:
-                    found_index = i
-                    break
+        found_index = char.bag_index.first_slot_of(PEAN_IDS)
         
         if found_index != -1:
-            logger.info(f"[{self.account.username}] Sử dụng đậu thần tại vị trí {found_index}...")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"[{self.account.username}] Sử dụng đậu thần tại vị trí {found_index}...")
             await self.account.service.use_item(0, 1, found_index, -1)
         else:
             logger.warning(f"[{self.account.username}] Cần ăn đậu nhưng không tìm thấy trong hành trang.")
 
     def find_item_in_bag(self, item_id: int):
         """Tìm item trong hành trang và trả về danh sách kết quả."""
-        results = []
         char = self.account.char
-        if not char.arr_item_bag:
-            return results
-            
-        for i, item in enumerate(char.arr_item_bag):
-            if item and item.item_id == item_id:
-                results.append(item)
-        return results
+        return [char.arr_item_bag[i] for i in char.bag_index.slots(item_id)]
 
     async def use_item_by_id(self, item_id: int, action_type: int):
         """
@@ -300,25 +304,25 @@ class InventoryHandler(BaseHandler):
             logger.warning(f"[{self.account.username}] Hành trang chưa tải hoặc rỗng.")
             return
 
-        found = False
+        slots = char.bag_index.slots(item_id)
+        found = bool(slots)
         count_action = 0
-        for i, item in enumerate(char.arr_item_bag):
-            if item and item.item_id == item_id:
-                found = True
-                try:
-                    if action_type == 0:
-                        await self.account.service.use_item(0, 1, i, -1)
-                        count_action += 1
-                        await asyncio.sleep(0.1)
-                    elif action_type == 1:
-                        await self.account.service.sale_item(1, 1, i)
-                        count_action += 1
-                        await asyncio.sleep(0.1)
-                except Exception as e:
-                    logger.error(f"[{self.account.username}] Lỗi khi xử lý item {item_id} tại index {i}: {e}")
+        for i in slots:
+            try:
+                if action_type == 0:
+                    await self.account.service.use_item(0, 1, i, -1)
+                    count_action += 1
+                    await asyncio.sleep(0.1)
+                elif action_type == 1:
+                    await self.account.service.sale_item(1, 1, i)
+                    count_action += 1
+                    await asyncio.sleep(0.1)
+            except Exception as e:
+                logger.error(f"[{self.account.username}] Lỗi khi xử lý item {item_id} tại index {i}: {e}")
         
         if not found:
             logger.warning(f"[{self.account.username}] Không tìm thấy item ID {item_id} trong hành trang.")
         else:
             action_str = "Sử dụng" if action_type == 0 else "Bán"
-            logger.info(f"[{self.account.username}] Đã gửi yêu cầu {action_str} {count_action} item ID {item_id}.")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"[{self.account.username}] Đã gửi yêu cầu {action_str} {count_action} item ID {item_id}.")
@@ -1,13 +1,17 @@
 """
 Map Handler - Xử lý các message liên quan đến bản đồ
 """
+import logging
 import asyncio
 from network.message import Message
-from logs.logger_config import logger
-from model.map_objects import Waypoint
+from logs.logger_config import get_logger
+from model.map_objects import Waypoint, CollisionGrid, TILE_SETS, MAP_TEMPLATES
 from .base_handler import BaseHandler
+from ..event_bus import MapEntered, ZoneListUpdated
 import ui
 
+logger = get_logger("controller.map")
+
 
 class MapHandler(BaseHandler):
     """Handler xử lý map info, zones, updates."""
@@ -26,13 +30,15 @@ class MapHandler(BaseHandler):
             map_name = reader.read_utf()
             zone_id = reader.read_byte()
 
-            logger.info(f"Enter map: {map_name} (id={map_id}, zone={zone_id})")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Enter map: {map_name} (id={map_id}, zone={zone_id})")
 
             self.controller.map_info = {'id': map_id, 'name': map_name, 'planet': planet_id, 'zone': zone_id}
             self.controller.tile_map.set_map_info(map_id, planet_id, tile_id, bg_id, type_map, map_name, zone_id)
             
             # Clear chars list when entering new map/zone
             self.controller.chars.clear()
+            self.controller.char_index.clear()
 
             self.account.char.cx = reader.read_short()
             self.account.char.cy = reader.read_short()
@@ -70,6 +76,7 @@ class MapHandler(BaseHandler):
                 mob.x_first, mob.y_first = mx, my
                 mob.status = status
                 self.controller.mobs[i] = mob
+            self.controller.combat_handler.reset_mobs()
 
             num_extra = reader.read_byte()
             for _ in range(num_extra):
@@ -86,7 +93,17 @@ class MapHandler(BaseHandler):
                     t_id = reader.read_byte()
                     avatar = reader.read_short()
                     self.controller.npcs[i] = {'id': i, 'status': status, 'x': nx, 'y': ny, 'template_id': t_id, 'avatar': avatar}
-                    logger.info(f"Loaded NPC: id={i}, template={t_id} at ({nx},{ny})")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Loaded NPC: id={i}, template={t_id} at ({nx},{ny})")
+
+            # Dữ liệu va chạm (tile) của map: dùng cache nếu đã có, nếu không thì xin server
+            self.account.service.expire_map_templates()
+            cached = MAP_TEMPLATES.get(map_id)
+            if cached:
+                self.controller.tile_map.load_map_template(*cached)
+            else:
+                self.controller.tile_map.load_map_template(0, 0, [])
+                asyncio.create_task(self.account.service.request_map_template(map_id))
 
             # Signal that the login is complete as we are now in a map
             if not self.account.login_event.is_set():
@@ -95,11 +112,77 @@ class MapHandler(BaseHandler):
             asyncio.create_task(self.account.service.pet_info())
             asyncio.create_task(self.account.service.finish_load_map())
 
+            char = self.account.char
+            self.controller.events.publish(MapEntered(map_id, zone_id, char.cx, char.cy))
+
         except Exception as e:
             logger.error(f"Error parsing MAP_INFO: {e}")
             import traceback
             traceback.print_exc()
 
+    def process_map_template(self, msg: Message):
+        """Xử lý map template (NOT_MAP sub 10): kích thước lưới tile và tile IDs của map hiện tại."""
+        try:
+            reader = msg.reader()
+            reader.read_byte()  # sub_cmd
+            tmw = reader.read_ubyte()
+            tmh = reader.read_ubyte()
+            maps = reader.read_bytes(tmw * tmh)
+            if len(maps) != tmw * tmh:
+                logger.warning(f"MAP_TEMPLATE thiếu dữ liệu: {len(maps)}/{tmw * tmh} tiles")
+                return
+
+            # Gói trả lời không có map_id: ghép với yêu cầu cũ nhất còn chờ. Chỉ tin (và cache) khi
+            # yêu cầu đó là của map đang đứng; nếu đã rời map (XMap) thì không kiểm chứng được gói
+            # thuộc map nào (server có thể đã bỏ một yêu cầu) nên bỏ, tránh ghi sai cache dùng chung
+            service = self.account.service
+            service.expire_map_templates()
+            pending = service.pending_map_templates
+            if not pending:
+                logger.warning(f"Bỏ qua MAP_TEMPLATE không được yêu cầu ({tmw}x{tmh} tiles)")
+                return
+            map_id, _ = pending.popleft()
+            tile_map = self.controller.tile_map
+            if tile_map.map_id != map_id:
+                logger.info(f"Bỏ qua MAP_TEMPLATE của map {map_id} (đang ở map {tile_map.map_id})")
+                return
+
+            MAP_TEMPLATES[map_id] = (tmw, tmh, maps)
+            tile_map.load_map_template(tmw, tmh, maps)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Đã tải map template: map={map_id}, {tmw}x{tmh} tiles")
+        except Exception as e:
+            logger.error(f"Lỗi khi phân tích MAP_TEMPLATE: {e}")
+
+    def process_tile_set(self, msg: Message):
+        """Xử lý TILE_SET (-82): bảng loại tile (va chạm) cho từng tile set, dùng chung mọi tài khoản."""
+        try:
+            reader = msg.reader()
+            tile_sets = []
+            num_sets = reader.read_byte()
+            for _ in range(num_sets):
+                entries = []
+                num_types = reader.read_byte()
+                for _ in range(num_types):
+                    tile_type = reader.read_int()
+                    num_index = reader.read_byte()
+                    indexes = frozenset(reader.read_byte() for _ in range(num_index))
+                    entries.append((tile_type, indexes))
+                tile_sets.append(entries)
+
+            # Mọi tài khoản đều nhận cùng TILE_SET khi đăng nhập: chỉ dựng lại lưới khi nội dung đổi
+            if tile_sets == TILE_SETS:
+                return
+            TILE_SETS[:] = tile_sets
+            CollisionGrid.clear_shared()
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Đã tải {len(tile_sets)} tile set (TILE_SET)")
+
+            # Map hiện tại có thể đã nhận template trước tile set
+            self.controller.tile_map.load_types()
+        except Exception as e:
+            logger.error(f"Lỗi khi phân tích TILE_SET: {e}")
+
     def process_zone_list(self, msg: Message):
         """Xử lý gói tin danh sách khu vực (Cmd 29)."""
         try:
@@ -132,7 +215,8 @@ class MapHandler(BaseHandler):
             
             # Lưu zone_list cho auto_boss sử dụng
             self.controller.zone_list = zones_data
-                
+            self.controller.events.publish(ZoneListUpdated(zones_data))
+
             current_zone = self.controller.map_info.get('zone', -1)
             map_id = self.controller.map_info.get('id', -1)
             ui.display_zone_list(zones_data, self.controller.map_info.get('name', 'Unknown'), self.account.username, current_zone, map_id)
@@ -148,7 +232,8 @@ class MapHandler(BaseHandler):
             time_offline = 0
             if reader.available() > 0:
                 time_offline = reader.read_int()
-            logger.info(f"Bản đồ ngoại tuyến (Cmd {msg.command}): MapID={map_id}, Thời gian ngoại tuyến={time_offline}s")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Bản đồ ngoại tuyến (Cmd {msg.command}): MapID={map_id}, Thời gian ngoại tuyến={time_offline}s")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích MAP_OFFLINE: {e}")
 
@@ -157,7 +242,8 @@ class MapHandler(BaseHandler):
         try:
             reader = msg.reader()
             vc_data = reader.read_byte()
-            logger.info(f"UPDATE_DATA: vcData={vc_data}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"UPDATE_DATA: vcData={vc_data}")
             
             def read_byte_array(r):
                 length = r.read_int()
@@ -182,7 +268,8 @@ class MapHandler(BaseHandler):
             if msg.command == -28: # Cmd.NOT_MAP
                 reader.read_byte() # skip sub_cmd
             vc_map = reader.read_byte()
-            logger.info(f"UPDATE_MAP: vcMap={vc_map}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"UPDATE_MAP: vcMap={vc_map}")
             
             # Map Names
             num_maps = reader.read_ubyte()
@@ -214,7 +301,8 @@ class MapHandler(BaseHandler):
                 logger.warning(f"UPDATE_MAP: Dữ liệu Npc không đầy đủ. Bỏ qua.")
             
             # Mob Templates
-            from model.game_objects import MOB_TEMPLATES, MobTemplate
+            from model.game_objects import MobTemplate
+            from logic.game_data import GAME_DATA
             count = 0
             try:
                 num_mobs = reader.read_ubyte()
@@ -228,9 +316,10 @@ class MapHandler(BaseHandler):
                     t.speed = reader.read_byte()
                     t.dart_type = reader.read_byte()
                     
-                    MOB_TEMPLATES[i] = t
+                    GAME_DATA.update_mob_template(t)
                     count += 1
-                logger.info(f"Đã cập nhật {count} Mob Templates từ gói UPDATE_MAP.")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Đã cập nhật {count} Mob Templates từ gói UPDATE_MAP.")
             except struct.error:
                  logger.warning(f"UPDATE_MAP: Dữ liệu Mob không đầy đủ (có thể do bản đồ cache hoặc gói tin ngắn). Đã đọc {count} mobs. Size={len(msg.get_data())}")
             
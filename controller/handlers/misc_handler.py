@@ -1,12 +1,15 @@
 """
 Misc Handler - Xử lý các message còn lại
 """
+import logging
 import re
 import asyncio
 from network.message import Message
-from logs.logger_config import logger
+from logs.logger_config import get_logger
 from .base_handler import BaseHandler
 
+logger = get_logger("controller.misc")
+
 
 class MiscHandler(BaseHandler):
     """Handler xử lý các messages còn lại."""
@@ -16,7 +19,8 @@ class MiscHandler(BaseHandler):
         try:
             reader = msg.reader()
             info_text = reader.read_utf()
-            logger.info(f"Thông tin trò chơi (Lệnh {msg.command}): '{info_text}'")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thông tin trò chơi (Lệnh {msg.command}): '{info_text}'")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích cú pháp GAME_INFO: {e}")
 
@@ -28,11 +32,14 @@ class MiscHandler(BaseHandler):
             if special_type == 0:
                 img_id = reader.read_short()
                 info = reader.read_utf()
-                logger.info(f"Kỹ năng đặc biệt (Cmd {msg.command}): Loại={special_type}, ImgID={img_id}, Thông tin='{info}'")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Kỹ năng đặc biệt (Cmd {msg.command}): Loại={special_type}, ImgID={img_id}, Thông tin='{info}'")
             elif special_type == 1:
-                logger.info(f"Kỹ năng đặc biệt (Cmd {msg.command}): Loại={special_type} (danh sách), Payload Hex: {msg.get_data().hex()}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Kỹ năng đặc biệt (Cmd {msg.command}): Loại={special_type} (danh sách), Payload Hex: {msg.get_data().hex()}")
             else:
-                logger.info(f"Kỹ năng đặc biệt (Cmd {msg.command}): Loại không xác định={special_type}, Payload Hex: {msg.get_data().hex()}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Kỹ năng đặc biệt (Cmd {msg.command}): Loại không xác định={special_type}, Payload Hex: {msg.get_data().hex()}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích SPEACIAL_SKILL: {e}")
 
@@ -43,7 +50,8 @@ class MiscHandler(BaseHandler):
             time_id = reader.read_byte()
             message = reader.read_utf()
             duration = reader.read_short()
-            logger.info(f"Thông báo thời gian (Cmd {msg.command}): ID={time_id}, Thông báo='{message}', Thời hạn={duration}s")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thông báo thời gian (Cmd {msg.command}): ID={time_id}, Thông báo='{message}', Thời hạn={duration}s")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích MESSAGE_TIME: {e}")
 
@@ -55,7 +63,8 @@ class MiscHandler(BaseHandler):
             flag_id = 0
             if reader.available() > 0:
                 flag_id = reader.read_byte()
-            logger.info(f"Thay đổi cờ (Lệnh {msg.command}): CharID={char_id}, FlagID={flag_id}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thay đổi cờ (Lệnh {msg.command}): CharID={char_id}, FlagID={flag_id}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích CHANGE_FLAG: {e}")
 
@@ -64,7 +73,8 @@ class MiscHandler(BaseHandler):
         try:
             reader = msg.reader()
             max_stamina = reader.read_short()
-            logger.info(f"Thể lực tối đa (Cmd {msg.command}): {max_stamina}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thể lực tối đa (Cmd {msg.command}): {max_stamina}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích MAXSTAMINA: {e}")
 
@@ -73,7 +83,8 @@ class MiscHandler(BaseHandler):
         try:
             reader = msg.reader()
             stamina = reader.read_short()
-            logger.info(f"Thể lực hiện tại (Cmd {msg.command}): {stamina}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thể lực hiện tại (Cmd {msg.command}): {stamina}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích STAMINA: {e}")
 
@@ -82,7 +93,8 @@ class MiscHandler(BaseHandler):
         try:
             reader = msg.reader()
             active_point = reader.read_int()
-            logger.info(f"Cập nhật điểm năng động (Cmd {msg.command}): {active_point}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Cập nhật điểm năng động (Cmd {msg.command}): {active_point}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích UPDATE_ACTIVEPOINT: {e}")
 
@@ -91,7 +103,8 @@ class MiscHandler(BaseHandler):
         try:
             reader = msg.reader()
             challenge_id = reader.read_int()
-            logger.info(f"Thách đấu (Cmd {msg.command}): ChallengeID={challenge_id}, Payload Hex: {msg.get_data().hex()}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thách đấu (Cmd {msg.command}): ChallengeID={challenge_id}, Payload Hex: {msg.get_data().hex()}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích THACHDAU: {e}")
 
@@ -100,7 +113,8 @@ class MiscHandler(BaseHandler):
         try:
             reader = msg.reader()
             auto_mode = reader.read_byte()
-            logger.info(f"Tự động chơi (Cmd {msg.command}): Chế độ={auto_mode}, Payload Hex: {msg.get_data().hex()}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Tự động chơi (Cmd {msg.command}): Chế độ={auto_mode}, Payload Hex: {msg.get_data().hex()}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích AUTOPLAY: {e}")
 
@@ -109,7 +123,8 @@ class MiscHandler(BaseHandler):
         try:
             reader = msg.reader()
             mabu_state = reader.read_byte()
-            logger.info(f"Mabu (Cmd {msg.command}): Trạng thái={mabu_state}, Payload Hex: {msg.get_data().hex()}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Mabu (Cmd {msg.command}): Trạng thái={mabu_state}, Payload Hex: {msg.get_data().hex()}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích MABU: {e}")
 
@@ -118,7 +133,8 @@ class MiscHandler(BaseHandler):
         try:
             reader = msg.reader()
             the_luc_value = reader.read_short()
-            logger.info(f"Thể lực (Cmd {msg.command}): Giá trị={the_luc_value}, Payload Hex: {msg.get_data().hex()}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Thể lực (Cmd {msg.command}): Giá trị={the_luc_value}, Payload Hex: {msg.get_data().hex()}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích THELUC: {e}")
 
@@ -148,7 +164,8 @@ class MiscHandler(BaseHandler):
             HAIR_BY_GENDER = {0: 64, 1: 9, 2: 6}
             hair = HAIR_BY_GENDER.get(gender, Config.DEFAULT_CHAR_HAIR)
             
-            logger.info(f"Tự động tạo nhân vật: Name={clean_name}, Gender={gender}, Hair={hair}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Tự động tạo nhân vật: Name={clean_name}, Gender={gender}, Hair={hair}")
             asyncio.create_task(self.account.service.create_character(clean_name, gender, hair))
             
         except Exception as e:
@@ -164,20 +181,11 @@ class MiscHandler(BaseHandler):
             logger.warning(f"[{self.account.username}] Không có quái vật nào trong khu vực.")
             return
 
-        closest_mob = None
-        min_dist = float('inf')
-
-        for mob in mobs.values():
-            if mob.status == 0 or mob.hp <= 0:
-                continue
-            
-            dist = (char.cx - mob.x)**2 + (char.cy - mob.y)**2
-            if dist < min_dist:
-                min_dist = dist
-                closest_mob = mob
+        min_dist, closest_mob = self.controller.combat_handler.nearest_alive(char.cx, char.cy)
 
         if closest_mob:
-            logger.info(f"[{self.account.username}] Tấn công quái ID {closest_mob.mob_id} (Khoảng cách: {int(min_dist**0.5)})")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"[{self.account.username}] Tấn công quái ID {closest_mob.mob_id} (Khoảng cách: {int(min_dist**0.5)})")
             cdir = 1 if closest_mob.x > char.cx else -1
             await self.account.service.send_player_attack([closest_mob.mob_id], cdir)
         else:
@@ -186,7 +194,8 @@ class MiscHandler(BaseHandler):
     async def auto_upgrade_stats(self, target_hp: int, target_mp: int, target_sd: int):
         """Tự động cộng chỉ số tiềm năng cho đến khi đạt mục tiêu."""
         char = self.account.char
-        logger.info(f"[{self.account.username}] Bắt đầu cộng chỉ số. Mục tiêu -> HP: {target_hp}, MP: {target_mp}, SD: {target_sd}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"[{self.account.username}] Bắt đầu cộng chỉ số. Mục tiêu -> HP: {target_hp}, MP: {target_mp}, SD: {target_sd}")
         
         while True:
             acted = False
@@ -222,7 +231,8 @@ class MiscHandler(BaseHandler):
                 acted = True
             
             if not acted:
-                logger.info(f"[{self.account.username}] Hoàn tất cộng chỉ số hoặc đã hết tiềm năng.")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"[{self.account.username}] Hoàn tất cộng chỉ số hoặc đã hết tiềm năng.")
                 break
             
             await asyncio.sleep(0.05)
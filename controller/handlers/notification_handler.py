@@ -1,9 +1,15 @@
 """
 Notification Handler - Xử lý các message thông báo và boss notifications
 """
+import logging
 from network.message import Message
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+from logic.boss_manager import BossManager
+from logic.text_classifier import TEXT_CLASSIFIER
 from .base_handler import BaseHandler
+from ..event_bus import ServerMessage
+
+logger = get_logger("controller.notification")
 
 
 class NotificationHandler(BaseHandler):
@@ -14,16 +20,18 @@ class NotificationHandler(BaseHandler):
         try:
             reader = msg.reader()
             text = reader.read_utf()
-            logger.info(f"SERVER MESSAGE: {text}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"SERVER MESSAGE: {text}")
             self.check_boss_notification(text, source="SERVER_MESSAGE")
             
             # Track server response (for giftcode checking, etc.)
             self.controller.last_server_message = text
-            self.controller.server_message_event.set()
+            self.controller.events.publish(ServerMessage(text, "SERVER_MESSAGE"))
             
             # Hook cho AutoMsm
-            if hasattr(self.controller, 'auto_msm') and self.controller.auto_msm:
-                self.controller.auto_msm.on_server_message(text)
+            auto_msm = self.controller.loaded_component('auto_msm')
+            if auto_msm:
+                auto_msm.on_server_message(text)
                 
         except Exception as e:
             logger.error(f"Error parsing SERVER_MESSAGE: {e}")
@@ -52,16 +60,18 @@ class NotificationHandler(BaseHandler):
         try:
             reader = msg.reader()
             text = reader.read_utf()
-            logger.info(f"SERVER ALERT: {text}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"SERVER ALERT: {text}")
             self.check_boss_notification(text, source="SERVER_ALERT")
             
             # Track server response (for giftcode checking, etc.)
             self.controller.last_server_message = text
-            self.controller.server_message_event.set()
+            self.controller.events.publish(ServerMessage(text, "SERVER_ALERT"))
             
             # Hook cho AutoMsm
-            if hasattr(self.controller, 'auto_msm') and self.controller.auto_msm:
-                self.controller.auto_msm.on_server_message(text)
+            auto_msm = self.controller.loaded_component('auto_msm')
+            if auto_msm:
+                auto_msm.on_server_message(text)
         except Exception as e:
             logger.error(f"Error parsing SERVER_ALERT: {e}")
 
@@ -82,71 +92,38 @@ class NotificationHandler(BaseHandler):
             self.check_boss_notification(text, source="BIG_MESSAGE")
             
             # Hook cho AutoMsm
-            if hasattr(self.controller, 'auto_msm') and self.controller.auto_msm:
-                self.controller.auto_msm.on_server_message(text)
+            auto_msm = self.controller.loaded_component('auto_msm')
+            if auto_msm:
+                auto_msm.on_server_message(text)
         except Exception as e:
             logger.error(f"Error parsing BIG_MESSAGE: {e}")
 
     def process_big_boss(self, msg: Message, type: int):
         """Xử lý thông tin Big Boss (Cmd 101, 102)."""
         try:
-            logger.info(f"BIG_BOSS type {type} received. Len: {len(msg.get_data())}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"BIG_BOSS type {type} received. Len: {len(msg.get_data())}")
         except Exception as e:
             logger.error(f"Error parsing BIG_BOSS: {e}")
 
     def check_boss_notification(self, text: str, source: str = "UNKNOWN"):
         """
-        Kiểm tra nội dung chat xem có phải thông báo boss xuất hiện không.
+        Kiểm tra nội dung chat xem có phải thông báo boss xuất hiện / bị tiêu diệt không.
         """
-        if "xuất hiện tại" in text:
+        # Một lượt quét cho mọi bộ từ khóa; cùng chuỗi ở các tài khoản khác lấy lại từ cache
+        match = TEXT_CLASSIFIER.classify(text)
+        if match.boss_appear:
             try:
-                from logic.boss_manager import BossManager
-                
-                # Normalize text
-                clean_text = text.replace("Boss ", "").replace("boss ", "").replace("BOSS ", "") 
-                
-                # Handle different phrases
-                if " vừa xuất hiện tại " in clean_text:
-                    splitter = " vừa xuất hiện tại "
-                elif " đã xuất hiện tại " in clean_text:
-                    splitter = " đã xuất hiện tại "
-                else:
-                    splitter = " xuất hiện tại "
-                
-                parts = clean_text.split(splitter)
-                if len(parts) >= 2:
-                    boss_name = parts[0].strip()
-                    location_part = parts[1]
-                    
-                    # Tách khu vực nếu có
-                    map_name = location_part.strip()
-                    zone_id = -1
-                    
-                    if "khu vực" in location_part:
-                        loc_parts = location_part.split(" khu vực ")
-                        map_name = loc_parts[0].strip()
-                        if len(loc_parts) > 1:
-                            try:
-                                zone_id = int(loc_parts[1].strip())
-                            except:
-                                pass
-
-                    BossManager().add_boss(boss_name, map_name, zone_id)
+                boss_name, map_name, zone_id = match.boss_appear
+                # Chỉ báo cáo đầu tiên (trong mọi tài khoản) được ghi và log
+                if BossManager().add_boss(boss_name, map_name, zone_id) and logger.isEnabledFor(logging.INFO):
                     logger.info(f"PHÁT HIỆN BOSS: {boss_name} tại {map_name} (Khu {zone_id})")
-            
             except Exception as e:
                 logger.error(f"Lỗi khi phân tích thông báo Boss: {e}")
 
-        # Check death message
-        if "vừa tiêu diệt được" in text:
+        if match.boss_death:
             try:
-                from logic.boss_manager import BossManager
-                parts = text.split(" vừa tiêu diệt được ")
-                if len(parts) >= 2:
-                    remainder = parts[1]
-                    boss_name = remainder.split(" mọi người")[0].strip()
-                    
-                    if BossManager().mark_boss_dead(boss_name):
-                         logger.info(f"BOSS DIED: {boss_name}")
+                if BossManager().mark_boss_dead(match.boss_death) and logger.isEnabledFor(logging.INFO):
+                    logger.info(f"BOSS DIED: {match.boss_death}")
             except Exception as e:
                 logger.error(f"Lỗi khi xử lý boss chết: {e}")
@@ -1,11 +1,15 @@
 """
 NPC Handler - Xử lý các message liên quan đến NPC
 """
+import logging
 import re
 from network.message import Message
-from logs.logger_config import logger, TerminalColors as C
+from logs.logger_config import get_logger, TerminalColors as C
 from logic.auto_NVBoMong import BO_MONG_NPC_TEMPLATE_ID
 from .base_handler import BaseHandler
+from ..event_bus import MenuOpened
+
+logger = get_logger("controller.npc")
 
 
 class NPCHandler(BaseHandler):
@@ -46,13 +50,14 @@ class NPCHandler(BaseHandler):
             for _ in range(num_options):
                 options.append(reader.read_utf())
 
-            # Store in controller and trigger event for XMap/AutoQuest
+            # Store in controller and publish for XMap/AutoQuest/services
             self.controller.last_ui_options = options
             self.controller.last_ui_chat = menu_chat
             self.controller.last_npc_template_id = npc_template_id
-            self.controller.ui_menu_event.set()
+            self.controller.events.publish(MenuOpened(npc_template_id, menu_chat, options))
 
-            logger.info(f"NPC Menu (template={npc_template_id}): Chat='{menu_chat.replace(chr(10), ' ')}' Options={options}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"NPC Menu (template={npc_template_id}): Chat='{menu_chat.replace(chr(10), ' ')}' Options={options}")
 
             # Common formatting for the chat content
             formatted_chat = re.sub(r'\|\d+\|', '\n- ', menu_chat)
@@ -1,11 +1,16 @@
 """
 Player Handler - Xử lý các message liên quan đến người chơi khác
 """
+import logging
 import asyncio
 from network.message import Message
 from network.reader import Reader
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+from model.game_objects import CharEffect, CharInfo
 from .base_handler import BaseHandler
+from ..event_bus import PlayerAdded
+
+logger = get_logger("controller.player")
 
 
 class PlayerHandler(BaseHandler):
@@ -19,46 +24,50 @@ class PlayerHandler(BaseHandler):
             clan_id = reader.read_int()
             
             char_data = self.read_char_info(reader)
-            char_data['id'] = player_id
-            char_data['clan_id'] = clan_id
+            char_data.id = player_id
+            char_data.clan_id = clan_id
             
             # Lưu vào chars dict (cho boss detection)
             self.controller.chars[player_id] = char_data
-            
-            logger.info(f"Đã thêm người chơi (Cmd {msg.command}): ID={player_id}, Tên='{char_data.get('name')}', Vị trí=({char_data.get('x')},{char_data.get('y')})")
+            self.controller.char_index.insert(player_id, char_data.x, char_data.y, char_data)
+            self.controller.events.publish(PlayerAdded(player_id, char_data.name, char_data.type_pk))
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Đã thêm người chơi (Cmd {msg.command}): ID={player_id}, Tên='{char_data.name}', Vị trí=({char_data.x},{char_data.y})")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích PLAYER_ADD: {e}")
 
-    def read_char_info(self, reader: Reader) -> dict:
-        """Đọc thông tin cơ bản của một nhân vật từ `reader` và trả về dict chứa giá trị như level, tên, vị trí, hiệu ứng."""
-        c = {}
-        c['level'] = reader.read_byte()
-        c['is_invisible'] = reader.read_bool()
-        c['type_pk'] = reader.read_byte()
-        c['class'] = reader.read_byte()
-        c['gender'] = reader.read_byte()
-        c['head'] = reader.read_short()
-        c['name'] = reader.read_utf()
-        c['hp'] = reader.read_int3() 
-        c['max_hp'] = reader.read_int3() 
-        c['body'] = reader.read_short()
-        c['leg'] = reader.read_short()
-        c['bag'] = reader.read_ubyte()
+    def read_char_info(self, reader: Reader) -> CharInfo:
+        """Đọc thông tin cơ bản của một nhân vật từ `reader` và trả về CharInfo (level, tên, vị trí, hiệu ứng).
+
+        CharInfo vẫn hỗ trợ truy cập kiểu dict (`c['x']`, `c.get('name')`) cho code cũ.
+        """
+        c = CharInfo()
+        c.level = reader.read_byte()
+        c.is_invisible = reader.read_bool()
+        c.type_pk = reader.read_byte()
+        c.char_class = reader.read_byte()
+        c.gender = reader.read_byte()
+        c.head = reader.read_short()
+        c.name = reader.read_utf()
+        c.hp = reader.read_int3() 
+        c.max_hp = reader.read_int3() 
+        c.body = reader.read_short()
+        c.leg = reader.read_short()
+        c.bag = reader.read_ubyte()
         reader.read_byte()
-        c['x'] = reader.read_short()
-        c['y'] = reader.read_short()
-        c['eff_buff_hp'] = reader.read_short()
-        c['eff_buff_mp'] = reader.read_short()
+        c.x = reader.read_short()
+        c.y = reader.read_short()
+        c.eff_buff_hp = reader.read_short()
+        c.eff_buff_mp = reader.read_short()
         
         num_eff = reader.read_byte()
-        effects = []
         for _ in range(num_eff):
             eff_id = reader.read_byte()
             p1 = reader.read_int()
             p2 = reader.read_int()
             p3 = reader.read_short()
-            effects.append({'id': eff_id, 'p1': p1, 'p2': p2, 'p3': p3})
-        c['effects'] = effects
+            c.effects.append(CharEffect(eff_id, p1, p2, p3))
         
         return c
 
@@ -69,7 +78,14 @@ class PlayerHandler(BaseHandler):
             player_id = reader.read_int()
             x = reader.read_short()
             y = reader.read_short()
-            logger.info(f"Người chơi di chuyển (Cmd {msg.command}): ID={player_id}, X={x}, Y={y}")
+
+            char_data = self.controller.chars.get(player_id)
+            if char_data is not None:
+                char_data.x = x
+                char_data.y = y
+                self.controller.char_index.move(player_id, x, y)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Người chơi di chuyển (Cmd {msg.command}): ID={player_id}, X={x}, Y={y}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích PLAYER_MOVE: {e}")
 
@@ -78,6 +94,7 @@ class PlayerHandler(BaseHandler):
         try:
             reader = msg.reader()
             player_id = reader.read_int()
+            self.controller.auto_play.wake()  # focus char hoặc chính mình có thể vừa chết
             
             if player_id == self.account.char.char_id:
                 logger.warning("Nhân vật của bạn đã chết (PLAYER_DIE).")
@@ -93,13 +110,15 @@ class PlayerHandler(BaseHandler):
                 else:
                     asyncio.create_task(self.account.service.return_town_from_dead())
 
-            logger.info(f"Người chơi đã chết (Cmd {msg.command}): PlayerID={player_id}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Người chơi đã chết (Cmd {msg.command}): PlayerID={player_id}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích PLAYER_DIE: {e}")
 
     async def _handle_revive_and_return(self, target_map_id: int, resume_auto_play: bool, resume_auto_pet: bool):
         """Xử lý hồi sinh, đợi về nhà, quay lại map cũ (khu ngẫu nhiên) và tiếp tục auto."""
-        logger.info(f"Đang thực hiện quy trình Hồi sinh -> Quay lại Map {target_map_id}...")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Đang thực hiện quy trình Hồi sinh -> Quay lại Map {target_map_id}...")
         
         await asyncio.sleep(0.2)
         await self.account.service.return_town_from_dead()
@@ -135,7 +154,8 @@ class PlayerHandler(BaseHandler):
         try:
             reader = msg.reader()
             num_players = reader.read_byte()
-            logger.info(f"Processing player list update (Cmd 18): {num_players} players")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Processing player list update (Cmd 18): {num_players} players")
             
             for i in range(num_players):
                 char_id = reader.read_int()
@@ -144,11 +164,14 @@ class PlayerHandler(BaseHandler):
                 hp_show = reader.read_long()
                 
                 # Cập nhật người chơi hiện có
-                if char_id in self.controller.chars:
-                    self.controller.chars[char_id]['x'] = cx
-                    self.controller.chars[char_id]['y'] = cy
-                    self.controller.chars[char_id]['hp'] = hp_show
-                    logger.debug(f"Updated player {char_id} ({self.controller.chars[char_id].get('name')}): pos=({cx},{cy}), HP={hp_show}")
+                char_data = self.controller.chars.get(char_id)
+                if char_data is not None:
+                    char_data.x = cx
+                    char_data.y = cy
+                    char_data.hp = hp_show
+                    self.controller.char_index.move(char_id, cx, cy)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Updated player {char_id} ({char_data.name}): pos=({cx},{cy}), HP={hp_show}")
                 else:
                     logger.warning(f"Player {char_id} in list but not in chars dict (pos={cx},{cy}, HP={hp_show})")
                     
@@ -1,10 +1,13 @@
 """
 Task Handler - Xử lý các message liên quan đến nhiệm vụ
 """
+import logging
 from network.message import Message
-from logs.logger_config import logger
+from logs.logger_config import get_logger
 from .base_handler import BaseHandler
 
+logger = get_logger("controller.task")
+
 
 class TaskHandler(BaseHandler):
     """Handler xử lý task get, update, next."""
@@ -46,7 +49,8 @@ class TaskHandler(BaseHandler):
             char.task.counts = counts
             char.task.count = current_count
             
-            logger.info(f"Nhiệm vụ (Cmd {msg.command}): [{task_id}] {task_name} - Bước {index} - Progress: {current_count}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Nhiệm vụ (Cmd {msg.command}): [{task_id}] {task_name} - Bước {index} - Progress: {current_count}")
         except Exception as e:
             logger.error(f"Lỗi khi phân tích TASK_GET: {e}")
 
@@ -63,7 +67,8 @@ class TaskHandler(BaseHandler):
                 new_count = val
                 if char.task.count != new_count:
                     char.task.count = new_count
-                    logger.info(f"Cập nhật nhiệm vụ chính (Ngắn): Tiến độ -> {new_count}")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Cập nhật nhiệm vụ chính (Ngắn): Tiến độ -> {new_count}")
                 return
 
             # Gói tin đầy đủ
@@ -75,9 +80,11 @@ class TaskHandler(BaseHandler):
                 if char.task.index != index or char.task.count != count:
                     char.task.index = index
                     char.task.count = count
-                    logger.info(f"Cập nhật NV chính: [{task_id}] Bước {index} -> {count}")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Cập nhật NV chính: [{task_id}] Bước {index} -> {count}")
             else:
-                logger.info(f"Nhận được cập nhật cho task ID {task_id} (không phải NV chính), tiến độ -> {count}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Nhận được cập nhật cho task ID {task_id} (không phải NV chính), tiến độ -> {count}")
 
         except Exception as e:
             logger.error(f"Lỗi khi phân tích TASK_UPDATE: {e}")
@@ -93,13 +100,16 @@ class TaskHandler(BaseHandler):
                 if reader.available() > 0:
                     next_index = reader.read_byte()
                     char.task.index = next_index
-                    logger.info(f"Chuyển bước nhiệm vụ (Cmd 41): Index -> {next_index}")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Chuyển bước nhiệm vụ (Cmd 41): Index -> {next_index}")
                 else:
                     char.task.index += 1
-                    logger.info(f"Chuyển bước nhiệm vụ (Cmd 41): Index +1 -> {char.task.index} (Empty Reader)")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Chuyển bước nhiệm vụ (Cmd 41): Index +1 -> {char.task.index} (Empty Reader)")
             else:
                 char.task.index += 1
-                logger.info(f"Chuyển bước nhiệm vụ (Cmd 41): Index +1 -> {char.task.index} (No Data)")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"Chuyển bước nhiệm vụ (Cmd 41): Index +1 -> {char.task.index} (No Data)")
             
             char.task.count = 0
         except Exception as e:
@@ -1,20 +1,32 @@
 import asyncio
 import sys
+import time
 from network.session import Session
 from network.service import Service
 from controller import Controller
+from controller.controller import LazyComponent
+from controller.event_bus import Disconnected
 from model.game_objects import Char, Pet
 from config import Config
-from logs.logger_config import logger, TerminalColors
+from logs.logger_config import get_logger, TerminalColors
 from constants.cmd import Cmd
 from network.message import Message
-from logic.auto_main_quest import AutoMainQuest
-from logic.auto_scanmap import AutoScanMap
+from logs.metrics import METRICS
+
+logger = get_logger("core.account")
+
+LOGINS = METRICS.counter("nro_logins_total", "Số lần đăng nhập theo kết quả", ("account", "result"))
+LOGIN_SECONDS = METRICS.histogram("nro_login_seconds", "Thời gian một lần đăng nhập (kết nối -> xác nhận)", ("account",))
+RECONNECTS = METRICS.counter("nro_reconnects_total", "Số lần thử kết nối lại", ("account",))
 
 class Account:
     """
     Encapsulates all objects and data for a single game account session.
     """
+    # Modules (imported and created on first use)
+    auto_main_quest = LazyComponent("logic.auto_main_quest", "AutoMainQuest")
+    auto_scanmap = LazyComponent("logic.auto_scanmap", "AutoScanMap")
+
     def __init__(self, username, password, version, host, port, proxy=None):
         self.username = username
         self.password = password
@@ -39,16 +51,12 @@ class Account:
         self.session = Session(self.controller, proxy=self.proxy)
         # The service is now a regular object, instantiated per account
         self.service = Service(self.session, self.char)
-        
-        # Modules
-        self.auto_main_quest = AutoMainQuest(self)
-        self.auto_scanmap = AutoScanMap(self)
-
 
     async def login(self):
         """
         Connects and performs the login sequence for this account.
         """
+        started = time.perf_counter()
         listen_task = await self.session.connect(self.host, self.port)
         if listen_task:
             self.tasks.append(listen_task)
@@ -57,6 +65,7 @@ class Account:
 
         if not self.session.connected:
             logger.error(f"[{self.username}] Connection failed. Cannot proceed with login.")
+            self._record_login("connect_failed", started)
             return False
 
         logger.info(f"[{self.username}] Sending login information to the server...")
@@ -106,6 +115,7 @@ class Account:
             if self.session:
                 self.session.disconnect()
             self.stop_tasks()
+            self._record_login("timeout", started)
             return False
 
         # If event was set, login is successful
@@ -113,6 +123,7 @@ class Account:
         self.status = "Logged In"
         self._should_auto_reconnect = True
         logger.info(f"[{self.username}] Login successful! Account is running.")
+        self._record_login("ok", started)
         
         # Trigger plugin hook
         if self.manager and self.manager.plugin_hooks:
@@ -127,17 +138,23 @@ class Account:
 
         return True
 
+    def _record_login(self, result: str, started: float):
+        LOGINS.labels(self.username, result).inc()
+        LOGIN_SECONDS.labels(self.username).observe(time.perf_counter() - started)
+
     async def handle_disconnect(self):
         """Handles the disconnection event, triggering auto-reconnect if configured."""
         if not Config.AUTO_LOGIN or not self._should_auto_reconnect:
             # If auto-login is off, or this was a manual logout, just set status and exit
             self.status = "Offline"
             self.is_logged_in = False
+            self.controller.events.publish(Disconnected())
             return
 
         logger.warning(f"[{self.username}] Connection lost! Starting auto-reconnect process...")
         self.status = "Reconnecting"
         self.is_logged_in = False
+        self.controller.events.publish(Disconnected())
 
         while Config.AUTO_LOGIN and self._should_auto_reconnect:
             logger.info(f"[{self.username}] Attempting to reconnect in 0.5 seconds...")
@@ -149,6 +166,7 @@ class Account:
             self.service = Service(self.session, self.char)
 
             # Try to login again
+            RECONNECTS.labels(self.username).inc()
             try:
                 login_success = await self.login()
                 if login_success:
@@ -181,10 +199,12 @@ class Account:
             self.session.disconnect()
             
         # Dừng các module tự động
-        if hasattr(self, 'auto_main_quest'):
-            asyncio.create_task(self.auto_main_quest.stop())
-        if hasattr(self, 'auto_scanmap'):
-            asyncio.create_task(self.auto_scanmap.stop())
+        auto_main_quest = LazyComponent.loaded(self, 'auto_main_quest')
+        if auto_main_quest:
+            asyncio.create_task(auto_main_quest.stop())
+        auto_scanmap = LazyComponent.loaded(self, 'auto_scanmap')
+        if auto_scanmap:
+            asyncio.create_task(auto_scanmap.stop())
         
         # Trigger plugin hook before marking as offline
         if self.is_logged_in and self.manager and self.manager.plugin_hooks:
@@ -195,3 +215,4 @@ class Account:
         
         self.is_logged_in = False
         self.status = "Offline"
+        self.controller.events.publish(Disconnected())
@@ -1,7 +1,9 @@
 import asyncio
 from config import Config
 from core.account import Account
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+
+logger = get_logger("core.account_manager")
 
 class AccountManager:
     def __init__(self):
@@ -1,34 +1,13 @@
-from logs.logger_config import logger
+from logs.logger_config import get_logger
 import re
 import asyncio
 from enum import Enum
 import time
 import math
+from logic.game_data import GAME_DATA, MOB_LOCATION_DATA
+
+logger = get_logger("logic.auto_nvbomong")
 
-MOB_LOCATION_DATA = {
-    "mộc nhân": (14, 0), "khủng long": (1, 1), "lợn lòi": (8, 2), "quỷ đất": (15, 3),
-    "khủng long mẹ": (2, 4), "lợn lòi mẹ": (9, 5), "quỷ đất mẹ": (16, 6),
-    "thằn lằn bay": (3, 7), "phi long": (11, 8), "quỷ bay": (17, 9), "thằn lằn mẹ": (4, 10),
-    "phi long mẹ": (12, 11), "quỷ bay mẹ": (18, 12), "ốc mượn hồn": (29, 13),
-    "ốc sên": (33, 14), "heo xayda mẹ": (37, 15), "heo rừng": (28, 16),
-    "heo da xanh": (32, 17), "heo xayda": (36, 18), "heo rừng mẹ": (6, 19),
-    "heo xanh mẹ": (10, 20), "alien": (19, 21), "bulon": (30, 22), "ukulele": (34, 23),
-    "quỷ mập": (38, 24), "tambourine": (6, 25), "drum": (10, 26), "akkuman": (19, 27),
-    "không tặc": (29, 31), "quỷ đầu to": (33, 32), "quỷ địa ngục": (37, 33),
-    "không tặc": (29, 31), "quỷ đầu to": (33, 32), "quỷ địa ngục": (37, 33),
-    "nappa": (68, 39), "soldier": (70, 40), "appule": (71, 41), "raspberry": (71, 42),
-    "thằn lằn xanh": (72, 43), "quỷ đầu nhọn": (64, 44), "quỷ đầu vàng": (63, 45),
-    "quỷ da tím": (66, 46), "quỷ già": (67, 47), "cá sấu": (73, 48),
-    "dơi da xanh": (67, 49), "quỷ chim": (81, 50), "lính đầu trọc": (74, 51),
-    "lính tai dài": (76, 52), "lính vũ trụ": (77, 53), "khỉ lông đen": (82, 54),
-    "khỉ giáp sắt": (83, 55), "khỉ lông đỏ": (79, 56), "khỉ lông vàng": (80, 57),
-    "xên con cấp 1": (92, 58), "xên con cấp 2": (93, 59), "xên con cấp 3": (94, 60),
-    "xên con cấp 4": (96, 61), "xên con cấp 5": (97, 62), "xên con cấp 6": (98, 63),
-    "xên con cấp 7": (99, 64), "xên con cấp 8": (100, 65), "tai tím": (106, 66),
-    "abo": (107, 67), "kado": (109, 68), "da xanh": (110, 69),
-    "ếch mặt đỏ": (166, 86), "jinai": (166, 87),
-    "khỉ lông xanh": (155, 78), "taburine đỏ": (155, 79),
-}
 BO_MONG_MAP_ID = 47
 BO_MONG_NPC_TEMPLATE_ID = 17
 
@@ -495,9 +474,9 @@ class AutoQuest:
         
         target_name_lower = self.quest_info.mob_name.lower().strip()
         
-        for name, ids in MOB_LOCATION_DATA.items():
-            if name.lower() == target_name_lower:
-                return ids
+        ids = GAME_DATA.mob_location(target_name_lower)
+        if ids:
+            return ids
         
         # Fallback for partial match
         for name, ids in MOB_LOCATION_DATA.items():
@@ -1,7 +1,7 @@
 import asyncio
 import time
-import math
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+from logs.metrics import METRICS
 from logic.target_utils import (
     focus_nearest_mob,
     focus_nearest_char,
@@ -12,6 +12,10 @@ from logic.target_utils import (
     get_focused_target
 )
 
+logger = get_logger("logic.auto_attack")
+
+ATTACKS_SENT = METRICS.counter("nro_attacks_sent_total", "Số gói tấn công đã gửi theo module", ("account", "source"))
+
 
 class AutoAttack:
     """
@@ -32,6 +36,7 @@ class AutoAttack:
         self.priority_mode = "nearest"  # nearest, boss_first, name_match
         self.priority_names = []  # Danh sách tên ưu tiên (VD: ["Fide", "Android"])
         self.prefer_boss = False  # Ưu tiên boss hơn mob khi khoảng cách tương đương
+        self._m_attacks = ATTACKS_SENT.labels(getattr(controller.account, 'username', 'unknown'), "auto_attack")
     
     def start(self):
         """Bật Auto Attack"""
@@ -113,16 +118,15 @@ class AutoAttack:
                 mob_data = self.controller.mobs.get(mob.mob_id)
                 if mob_data:
                     # Check khoảng cách - nếu quá xa (teleport), clear focus để tìm target mới
-                    dist = math.sqrt((mob_data.x - my_char.cx)**2 + (mob_data.y - my_char.cy)**2)
-                    if dist > self.max_target_distance:
+                    dist2 = (mob_data.x - my_char.cx)**2 + (mob_data.y - my_char.cy)**2
+                    if dist2 > self.max_target_distance ** 2:
                         # Target quá xa (đã teleport), clear focus
                         my_char.mob_focus = None
-                        logger.info(f"AutoAttack: Mob {mob_data.mob_id} quá xa ({dist:.1f}px), clear focus")
+                        logger.info(f"AutoAttack: Mob {mob_data.mob_id} quá xa ({dist2 ** 0.5:.1f}px), clear focus")
                         continue
                     
-                    # Check theo auto_play.py: hp > -1 (không phải hp > 0)
-                    # Mob chết có thể có HP = -1, không phải 0
-                    if mob_data.hp > -1:
+                    # Tập mob sống do CombatHandler cập nhật theo MOB_HP / NPC_DIE / NPC_LIVE
+                    if self.controller.combat_handler.is_alive(mob.mob_id):
                         mob_ids.append(mob.mob_id)
                     else:
                         # Mob chết, clear focus
@@ -136,11 +140,11 @@ class AutoAttack:
                     # Check khoảng cách cho char
                     char_x = current_char.get('x', 0)
                     char_y = current_char.get('y', 0)
-                    dist = math.sqrt((char_x - my_char.cx)**2 + (char_y - my_char.cy)**2)
-                    if dist > self.max_target_distance:
+                    dist2 = (char_x - my_char.cx)**2 + (char_y - my_char.cy)**2
+                    if dist2 > self.max_target_distance ** 2:
                         # Char quá xa, clear focus
                         my_char.char_focus = None
-                        logger.info(f"AutoAttack: Char {char_id} quá xa ({dist:.1f}px), clear focus")
+                        logger.info(f"AutoAttack: Char {char_id} quá xa ({dist2 ** 0.5:.1f}px), clear focus")
                         continue
                     
                     # Check HP > -1 tương tự
@@ -153,9 +157,11 @@ class AutoAttack:
             # Send attack nếu có target hợp lệ
             if mob_ids:
                 await service.send_player_attack(mob_ids=mob_ids)
+                self._m_attacks.inc()
                 
             for char_id in char_ids:
                 await service.attack_player(char_id)
+                self._m_attacks.inc()
                 
                 # Update lastTimeUseThisSkill
                 if my_skill:
@@ -1,11 +1,16 @@
 import asyncio
 import time
 import math
-from typing import Dict, List, Optional, Tuple, Callable
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Callable, Union
 from enum import Enum
-from logs.logger_config import logger
+from config import Config
+from controller.event_bus import MapEntered, PlayerAdded, ZoneListUpdated
+from logs.logger_config import get_logger
 from logic.quest_mapper import QuestMapper
 
+logger = get_logger("logic.auto_boss")
+
 
 class BossRole(Enum):
     HUNTER = "HUNTER"      # Người làm nhiệm vụ / chủ party
@@ -46,12 +51,17 @@ class BossHuntCoordinator:
         # Map boss_name -> (map_id, zone_id) when found
         self.boss_found_events: Dict[str, Tuple[int, int]] = {}
         
-        # Map boss_name -> {group_id -> {username -> [zone_ids]}}
+        # Map boss_name -> {group_id -> {username -> [zone_ids]}} (kế hoạch chia ban đầu)
         self.zone_assignments: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
         
+        # Hàng zone còn lại của từng hunter: (boss_name, group_id) -> {username -> deque(zone_ids)}
+        # Hunter quét xong sớm lấy zone từ cuối hàng của người còn nhiều nhất (rebalance)
+        self.zone_queues: Dict[Tuple[str, str], Dict[str, deque]] = {}
+        
         # SYNC BARRIER: Track hunters ready for zone assignment
         # Map boss_name -> {group_id -> set(usernames)}
         self.ready_hunters: Dict[str, Dict[str, set]] = {}
+        self._ready_events: Dict[Tuple[str, str], asyncio.Event] = {}
         
         self._initialized = True
     
@@ -77,6 +87,14 @@ class BossHuntCoordinator:
                     del self.boss_found_events[boss_name]
                 if boss_name in self.zone_assignments:
                     del self.zone_assignments[boss_name]
+                self.ready_hunters.pop(boss_name, None)
+                for key in [k for k in self.zone_queues if k[0] == boss_name]:
+                    del self.zone_queues[key]
+                for key in [k for k in self._ready_events if k[0] == boss_name]:
+                    del self._ready_events[key]
+            else:
+                # Ít hunter hơn: những người đang đợi barrier có thể đã đủ
+                self._check_ready(boss_name, hunter.group_id)
     
     def get_hunters_in_group(self, boss_name: str, group_id: str) -> List['AutoBoss']:
         """Lấy danh sách hunters trong cùng group"""
@@ -85,11 +103,47 @@ class BossHuntCoordinator:
         
         return [h for h in self.active_hunts[boss_name] if h.group_id == group_id]
     
-    def assign_zones(self, boss_name: str, group_id: str, total_zones: int) -> Dict[str, List[int]]:
+    @staticmethod
+    def _order_zones(zones: Union[int, List[dict]]) -> List[int]:
         """
-        Chia zone cho các hunter - ROUND-ROBIN để spread out
+        Thứ tự quét zone theo số người chơi hiện tại (zone_list): zone đông trước vì người chơi
+        kéo tới zone có boss; zone đầy xuống cuối vì thường không vào được.
+        """
+        if isinstance(zones, int):
+            return list(range(zones))
+        
+        def rank(zone: dict):
+            num_players = zone.get('num_players', 0)
+            max_players = zone.get('max_players', 0)
+            full = max_players > 0 and num_players >= max_players
+            return (full, -num_players, zone.get('zone_id', 0))
+        
+        return [zone['zone_id'] for zone in sorted(zones, key=rank)]
+    
+    def has_zone_plan(self, boss_name: str, group_id: str) -> bool:
+        """Nhóm đang có kế hoạch quét dở (còn zone chưa quét)"""
+        queues = self.zone_queues.get((boss_name, group_id))
+        return bool(queues) and any(queues.values())
+    
+    def remaining_zones(self, boss_name: str, group_id: str) -> int:
+        """Số zone cả nhóm chưa quét"""
+        return sum(len(q) for q in self.zone_queues.get((boss_name, group_id), {}).values())
+    
+    def assign_zones(self, boss_name: str, group_id: str, zones: Union[int, List[dict]],
+                     username: str = "") -> Dict[str, List[int]]:
+        """
+        Chia zone cho các hunter - ROUND-ROBIN theo thứ tự đông người trước (`zones` là
+        controller.zone_list, hoặc số zone nếu không có số người).
+        Kế hoạch đang quét dở được giữ nguyên: hunter vào sau (`username`) nhận hàng rỗng và
+        lấy zone từ người khác qua `next_zone`.
         Returns: Dict mapping username -> list of zone IDs
         """
+        key = (boss_name, group_id)
+        if self.has_zone_plan(boss_name, group_id):
+            if username:
+                self.zone_queues[key].setdefault(username, deque())
+            return self.zone_assignments.get(boss_name, {}).get(group_id, {})
+        
         hunters = self.get_hunters_in_group(boss_name, group_id)
         if not hunters:
             return {}
@@ -97,36 +151,67 @@ class BossHuntCoordinator:
         # Initialize assignment structure
         if boss_name not in self.zone_assignments:
             self.zone_assignments[boss_name] = {}
-        if group_id not in self.zone_assignments[boss_name]:
-            self.zone_assignments[boss_name][group_id] = {}
-        
-        assignments = {}
-        num_hunters = len(hunters)
         
         # Sort hunters by username for consistency
         sorted_hunters = sorted(hunters, key=lambda h: h.username)
+        num_hunters = len(sorted_hunters)
+        order = self._order_zones(zones)
         
-        # ROUND-ROBIN: Spread accounts across zones
-        # Example: 12 zones, 3 accounts
-        # Account 0: [0, 3, 6, 9]
-        # Account 1: [1, 4, 7, 10]
-        # Account 2: [2, 5, 8, 11]
-        for i in range(total_zones):
-            hunter_idx = i % num_hunters
-            hunter = sorted_hunters[hunter_idx]
-            username = hunter.username
-            
-            if username not in assignments:
-                assignments[username] = []
-            assignments[username].append(i)
+        # ROUND-ROBIN: mỗi hunter nhận 1 zone đông người trước rồi mới tới zone vắng
+        # Example: thứ tự [5, 0, 3, 1, 2, 4], 2 accounts
+        # Account 0: [5, 3, 2]
+        # Account 1: [0, 1, 4]
+        assignments: Dict[str, List[int]] = {h.username: [] for h in sorted_hunters}
+        for i, zone_id in enumerate(order):
+            assignments[sorted_hunters[i % num_hunters].username].append(zone_id)
         
         self.zone_assignments[boss_name][group_id] = assignments
-        logger.info(f"[Coordinator] Chia {total_zones} zones cho {num_hunters} hunters (round-robin spread)")
-        for username, zones in assignments.items():
-            logger.info(f"[Coordinator]   {username}: zones {zones} ({len(zones)} zones)")
+        self.zone_queues[key] = {name: deque(zone_ids) for name, zone_ids in assignments.items()}
+        
+        # Vòng quét mới: barrier cho lần sau bắt đầu lại từ đầu
+        self.ready_hunters.setdefault(boss_name, {})[group_id] = set()
+        self._ready_events.pop(key, None)
+        
+        logger.info(f"[Coordinator] Chia {len(order)} zones cho {num_hunters} hunters (đông người trước, round-robin)")
+        for name, zone_ids in assignments.items():
+            logger.info(f"[Coordinator]   {name}: zones {zone_ids} ({len(zone_ids)} zones)")
         
         return assignments
     
+    def next_zone(self, boss_name: str, group_id: str, username: str) -> Optional[int]:
+        """
+        Zone kế tiếp cho `username`. Hết hàng của mình thì lấy zone cuối hàng (vắng nhất) của
+        hunter còn nhiều zone nhất. None khi cả nhóm đã quét hết.
+        """
+        queues = self.zone_queues.get((boss_name, group_id))
+        if not queues:
+            return None
+        
+        own = queues.get(username)
+        if own:
+            return own.popleft()
+        
+        donor = max(queues, key=lambda name: len(queues[name]))
+        if not queues[donor]:
+            return None
+        zone_id = queues[donor].pop()
+        logger.info(f"[Coordinator] {username} quét xong sớm, nhận zone {zone_id} từ {donor} ({len(queues[donor])} zone còn lại)")
+        return zone_id
+    
+    def _ready_event(self, boss_name: str, group_id: str) -> asyncio.Event:
+        key = (boss_name, group_id)
+        event = self._ready_events.get(key)
+        if event is None:
+            event = self._ready_events[key] = asyncio.Event()
+        return event
+    
+    def _check_ready(self, boss_name: str, group_id: str):
+        """Mở barrier khi mọi hunter đang đăng ký trong group đã ready"""
+        expected = {h.username for h in self.get_hunters_in_group(boss_name, group_id)}
+        ready = self.ready_hunters.get(boss_name, {}).get(group_id, set())
+        if expected and expected <= ready:
+            self._ready_event(boss_name, group_id).set()
+    
     def mark_ready(self, boss_name: str, group_id: str, username: str):
         """Mark hunter as ready for zone assignment"""
         if boss_name not in self.ready_hunters:
@@ -136,35 +221,33 @@ class BossHuntCoordinator:
         
         self.ready_hunters[boss_name][group_id].add(username)
         logger.info(f"[Coordinator] {username} marked ready ({len(self.ready_hunters[boss_name][group_id])} ready)")
+        self._check_ready(boss_name, group_id)
     
     async def wait_for_all_ready(self, boss_name: str, group_id: str, timeout: float = 5.0) -> bool:
         """
-        Wait for all registered hunters to mark ready
+        Wait for all registered hunters to mark ready (hunter cuối cùng mark_ready sẽ đánh thức cả nhóm)
         Returns True if all ready, False if timeout
         """
-        hunters = self.get_hunters_in_group(boss_name, group_id)
-        expected_count = len(hunters)
+        # Nhóm đang quét dở: vào hàng luôn, không đợi
+        if self.has_zone_plan(boss_name, group_id):
+            return True
         
+        expected_count = len(self.get_hunters_in_group(boss_name, group_id))
         if expected_count == 0:
             return True
         
         logger.info(f"[Coordinator] Waiting for {expected_count} hunters to be ready...")
         
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            ready_set = self.ready_hunters.get(boss_name, {}).get(group_id, set())
-            ready_count = len(ready_set)
-            
-            if ready_count >= expected_count:
-                logger.info(f"[Coordinator] All {expected_count} hunters ready!")
-                return True
-            
-            await asyncio.sleep(0.1)
-        
-        # Timeout - proceed with whoever is ready
-        ready_count = len(self.ready_hunters.get(boss_name, {}).get(group_id, set()))
-        logger.info(f"[Coordinator] Timeout - proceeding with {ready_count}/{expected_count} hunters")
-        return False
+        self._check_ready(boss_name, group_id)
+        try:
+            await asyncio.wait_for(self._ready_event(boss_name, group_id).wait(), timeout)
+            logger.info(f"[Coordinator] All {expected_count} hunters ready!")
+            return True
+        except asyncio.TimeoutError:
+            # Timeout - proceed with whoever is ready
+            ready_count = len(self.ready_hunters.get(boss_name, {}).get(group_id, set()))
+            logger.info(f"[Coordinator] Timeout - proceeding with {ready_count}/{expected_count} hunters")
+            return False
     
     def broadcast_boss_found(self, boss_name: str, group_id: str, map_id: int, zone_id: int):
         """Thông báo tìm thấy boss tới tất cả hunters trong group"""
@@ -220,11 +303,13 @@ class AutoBoss:
         self.group_id = ""
         self.coordinator = BossHuntCoordinator()
         
-        # Zone scanning
+        # Zone scanning (zone lấy dần từ hàng của coordinator)
         self.assigned_zones: List[int] = []
-        self.current_zone_index = 0
+        self.zone_scan_started = False
+        self.zones_scanned = 0
         self.zone_change_retry_count = 0
         self.max_zone_retry = 3
+        self.zone_change_timeout = 2.0  # chờ MAP_INFO của zone mới
         
         # Death recovery
         self.last_scanned_map_id = -1
@@ -397,6 +482,9 @@ class AutoBoss:
         if self.target_boss_name:
             self.coordinator.unregister_hunter(self.target_boss_name, self)
         
+        # Lần start sau lấy lại danh sách zone
+        self.zone_scan_started = False
+        
         # Reset roles
         self.role = BossRole.HUNTER
         self.supported_owner = ""
@@ -502,6 +590,7 @@ class AutoBoss:
                 # Log periodically (mỗi 10s) để không spam
                 if int(time.time()) % 10 == 0:
                     logger.info(f"[{self.username}] ⏳ Đang đợi boss '{self.target_boss_name}' xuất hiện...")
+                await self._preposition_for_spawn()
                 return
             
             # Normal mode -> Stop tìm thấy
@@ -517,6 +606,24 @@ class AutoBoss:
         # Chuyển sang state NAVIGATING
         self.state = BossState.NAVIGATING
     
+    async def _preposition_for_spawn(self):
+        """Boss sắp hồi sinh (dự đoán từ lịch sử): đi trước tới map dự đoán trong lúc chờ thông báo"""
+        from logic.boss_manager import BossManager
+        prediction = BossManager().predict_next(self.target_boss_name)
+        if prediction is None or prediction.map_id == -1:
+            return
+        
+        lead = Config.BOSS_PREPOSITION_SECONDS
+        if not -lead <= prediction.seconds_left() <= lead + prediction.spread:
+            return
+        if self.controller.tile_map.map_id == prediction.map_id or self.controller.xmap.is_xmapping:
+            return
+        
+        logger.info(f"[{self.username}] ⏱️ Boss '{prediction.name}' dự kiến xuất hiện sau "
+                    f"{prediction.seconds_left():.0f}s tại {prediction.map_name} [{prediction.map_id}] "
+                    f"(chu kỳ {prediction.interval:.0f}s ±{prediction.spread:.0f}s, {prediction.samples} mẫu) -> đi trước")
+        await self.controller.xmap.start(prediction.map_id)
+    
     def _find_boss_in_manager(self) -> Optional[dict]:
         """Tìm boss 'Sống' trong BossManager (case-insensitive)"""
         from logic.boss_manager import BossManager
@@ -560,9 +667,9 @@ class AutoBoss:
         await asyncio.sleep(0.2)
     
     async def _state_zone_scanning(self):
-        """State: Quét các zone được assign (với Hive coordination)"""
+        """State: Quét zone lấy từ hàng của coordinator (với Hive coordination)"""
         # Lần đầu vào state này, cần lấy danh sách zone và assign
-        if not self.assigned_zones:
+        if not self.zone_scan_started:
             await self._initialize_zone_scanning()
             return
         
@@ -576,39 +683,36 @@ class AutoBoss:
                 self.state = BossState.GATHERING
                 return
         
-        # Scan zone tiếp theo
-        if self.current_zone_index >= len(self.assigned_zones):
-            logger.info(f"[{self.username}] Đã quét hết {len(self.assigned_zones)} zone, không tìm thấy boss")
+        # Scan zone tiếp theo (hết zone của mình thì coordinator chia lại từ hunter khác)
+        target_zone = self.coordinator.next_zone(self.target_boss_name, self.group_id, self.username)
+        if target_zone is None:
+            logger.info(f"[{self.username}] Nhóm đã quét hết zone ({self.zones_scanned} zone bởi {self.username}), không tìm thấy boss")
             
             # Nếu là Quest Mode -> Quay lại SEARCHING để check lại status Boss hoặc scan lại
             if self.role in [BossRole.HUNTER, BossRole.SUPPORTER]:
                 logger.info(f"[{self.username}] 🔄 Quest Mode: Quay lại trạng thái tìm kiếm...")
                 self.state = BossState.SEARCHING
-                self.assigned_zones = [] # Reset zones để scan lại nếu cần
+                self.zone_scan_started = False  # Reset để scan lại nếu cần
                 return
 
             self.stop()
             return
         
-        target_zone = self.assigned_zones[self.current_zone_index]
-        
-        logger.info(f"[{self.username}] 🔍 Quét zone {target_zone} ({self.current_zone_index + 1}/{len(self.assigned_zones)})...")
+        self.zones_scanned += 1
+        remaining = self.coordinator.remaining_zones(self.target_boss_name, self.group_id)
+        logger.info(f"[{self.username}] 🔍 Quét zone {target_zone} (zone thứ {self.zones_scanned}, nhóm còn {remaining})...")
         
-        # Request đổi zone với verification
-        success = await self._request_zone_change_with_verify(target_zone)
+        found = await self._scan_zone(target_zone)
         
-        if not success:
+        if found is None:
             logger.info(f"[{self.username}] Không thể vào zone {target_zone}, skip")
-            self.current_zone_index += 1
             return
         
         # Lưu vị trí để recovery nếu chết
         self.last_scanned_map_id = self.controller.tile_map.map_id
         self.last_scanned_zone_id = target_zone
         
-        # Check xem zone này có boss không
-        logger.info(f"[{self.username}] 🔎 Kiểm tra boss trong zone {target_zone}...")
-        if await self._check_zone_for_boss():
+        if found:
             # Tìm thấy boss!
             logger.info(f"[{self.username}] 🎯 PHÁT HIỆN BOSS tại Zone {target_zone}!")
             self.target_zone_id = target_zone
@@ -627,19 +731,18 @@ class AutoBoss:
         else:
             # Không có boss, chuyển zone tiếp theo
             logger.info(f"[{self.username}] ❌ Không có boss trong zone {target_zone}")
-            self.current_zone_index += 1
-            await asyncio.sleep(1.0)  # Đợi 1 giây trước khi scan zone tiếp
     
     async def _initialize_zone_scanning(self):
-        """Khởi tạo zone scanning: lấy danh sách zone và assign"""
+        """Khởi tạo zone scanning: lấy danh sách zone (kèm số người) và assign"""
         logger.info(f"[{self.username}] Lấy danh sách zone...")
         
-        # Request zone list
-        await self.controller.account.service.open_zone_ui()
-        await asyncio.sleep(1.5)  # Đợi server response
+        # Request zone list, chờ đúng gói trả lời thay vì sleep cố định
+        with self.controller.events.expect(ZoneListUpdated) as zone_list_event:
+            await self.controller.account.service.open_zone_ui()
+            event = await zone_list_event.wait(timeout=2.0)
         
         # Get zone list from controller (set by process_zone_list)
-        zone_list = getattr(self.controller, 'zone_list', None)
+        zone_list = event.zones if event else getattr(self.controller, 'zone_list', None)
         
         if not zone_list:
             logger.info(f"[{self.username}] Không lấy được danh sách zone")
@@ -656,59 +759,107 @@ class AutoBoss:
         # Wait for all hunters to be ready (with timeout)
         await self.coordinator.wait_for_all_ready(self.target_boss_name, self.group_id, timeout=2.0)
         
-        # Assign zones - CHỈ 1 lần cho tất cả hunters
+        # Assign zones - CHỈ 1 lần cho cả nhóm (hunter sau dùng lại kế hoạch đang chạy)
         assignments = self.coordinator.assign_zones(
             self.target_boss_name, 
             self.group_id, 
-            total_zones
+            zone_list,
+            self.username
         )
         
-        self.assigned_zones = assignments.get(self.username, list(range(total_zones)))
-        self.current_zone_index = 0
+        self.assigned_zones = assignments.get(self.username, [])
+        self.zone_scan_started = True
+        self.zones_scanned = 0
         
         logger.info(f"[{self.username}] Được assign scan zones: {self.assigned_zones} (Tổng: {len(self.assigned_zones)}/{total_zones})")
     
     async def _request_zone_change_with_verify(self, zone_id: int) -> bool:
-        """Request đổi zone và verify thành công. Returns True nếu thành công."""
+        """Request đổi zone và chờ MAP_INFO của zone đó. Returns True nếu thành công."""
+        if self.controller.map_info.get('zone', -1) == zone_id:
+            return True
+        
         logger.info(f"[{self.username}] 🔄 Request đổi sang zone {zone_id}...")
         
         for attempt in range(self.max_zone_retry):
-            # Send request
-            await self.controller.account.service.request_change_zone(zone_id)
+            # Đăng ký chờ TRƯỚC khi gửi để không lỡ MAP_INFO
+            with self.controller.events.expect(MapEntered, lambda e: e.zone_id == zone_id) as entered:
+                await self.controller.account.service.request_change_zone(zone_id)
+                arrived = await entered.wait(self.zone_change_timeout)
             
-            # Wait longer for zone change AND char spawn (bosses need time!)
-            await asyncio.sleep(1.0)  # Tăng lên 4s để chars (bosses) spawn đầy đủ
-            
-            current_zone = self.controller.map_info.get('zone', -1)
-            
-            if current_zone == zone_id:
+            if arrived:
                 logger.info(f"[{self.username}] ✅ Xác nhận zone hiện tại: {zone_id}")
                 return True
-            else:
-                logger.info(f"[{self.username}] Zone chưa đổi (hiện tại: {current_zone}), retry {attempt + 1}/{self.max_zone_retry}...")
+            
+            current_zone = self.controller.map_info.get('zone', -1)
+            logger.info(f"[{self.username}] Zone chưa đổi (hiện tại: {current_zone}), retry {attempt + 1}/{self.max_zone_retry}...")
         
         # Failed after max retries
         logger.info(f"[{self.username}] ❌ Không thể vào zone {zone_id} sau {self.max_zone_retry} lần thử")
         return False
     
-    async def _check_zone_for_boss(self) -> bool:
-        """Kiểm tra chars (characters/bosses) trong zone có boss target không"""
-        # Get boss template from manager
+    @staticmethod
+    def _is_boss_name(char_name: str, boss_name_lower: str) -> bool:
+        """Tên char khớp tên boss (partial match, không phân biệt hoa thường)"""
+        char_name = char_name.lower()
+        return bool(char_name) and (boss_name_lower in char_name or char_name in boss_name_lower)
+    
+    async def _scan_zone(self, zone_id: int) -> Optional[bool]:
+        """
+        Đổi sang `zone_id` và xác nhận có boss hay không ngay khi PLAYER_ADD tới:
+        thấy boss thì trả về True liền; hết gói PLAYER_ADD (im lặng `Config.BOSS_ZONE_QUIET_SECONDS`)
+        thì kết luận không có. Trả về None nếu không vào được zone.
+        """
         boss_info = self._find_boss_in_manager()
-        if not boss_info:
-            return False
+        boss_name_lower = (boss_info['name'] if boss_info else self.target_boss_name).lower()
+        already_here = self.controller.map_info.get('zone', -1) == zone_id
         
-        boss_name = boss_info['name']
-        boss_name_lower = boss_name.lower()
+        found = asyncio.Event()
+        activity = asyncio.Event()
         
-        # DIAGNOSTIC: Log số lượng chars hiện tại
-        chars_count = len(self.controller.chars)
-        logger.info(f"[{self.username}] Đang kiểm tra boss '{boss_name}' - Có {chars_count} chars trong map")
+        def on_player_added(event: PlayerAdded):
+            # Bỏ qua PLAYER_ADD của zone cũ còn tới trước MAP_INFO
+            if self.controller.map_info.get('zone', -1) != zone_id:
+                return
+            activity.set()
+            if self._is_boss_name(event.name, boss_name_lower):
+                found.set()
         
-        # Đợi thêm 1s nữa để đảm bảo chars đã load đầy đủ
-        await asyncio.sleep(1.0)
+        # Đăng ký TRƯỚC khi đổi zone: PLAYER_ADD tới ngay sau MAP_INFO
+        unsubscribe = self.controller.events.subscribe(PlayerAdded, on_player_added)
+        try:
+            if not await self._request_zone_change_with_verify(zone_id):
+                return None
+            if not boss_info:
+                return False
+            if not already_here and not self._check_zone_for_boss(boss_info['name']):
+                await self._await_zone_players(found, activity)
+        finally:
+            unsubscribe()
+        
+        return self._check_zone_for_boss(boss_info['name'])
+    
+    async def _await_zone_players(self, found: asyncio.Event, activity: asyncio.Event):
+        """Chờ tới khi thấy boss, hoặc server ngừng gửi PLAYER_ADD, hoặc hết thời gian quét zone"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + Config.BOSS_ZONE_SCAN_SECONDS
+        window = Config.BOSS_ZONE_QUIET_SECONDS if activity.is_set() else Config.BOSS_ZONE_FIRST_PLAYER_SECONDS
+        
+        while not found.is_set():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            activity.clear()
+            try:
+                await asyncio.wait_for(activity.wait(), min(window, remaining))
+            except asyncio.TimeoutError:
+                return  # Không còn PLAYER_ADD: đã nhận đủ người trong zone
+            window = Config.BOSS_ZONE_QUIET_SECONDS
+    
+    def _check_zone_for_boss(self, boss_name: str) -> bool:
+        """Kiểm tra chars (characters/bosses) hiện có trong zone có boss target không"""
+        boss_name_lower = boss_name.lower()
         
-        # METHOD 1: Sử dụng target_utils để tìm target theo tên (case-insensitive)
+        # METHOD 1: Sử dụng target_utils để tìm target theo tên (case-insensitive), đồng thời focus boss
         from logic.target_utils import focus_by_name
         found = focus_by_name(self.controller, boss_name, target_type="char", max_distance=1000)
         
@@ -721,18 +872,12 @@ class AutoBoss:
                 return True
         
         # METHOD 2: Fallback - Kiểm tra trực tiếp trong controller.chars
-        logger.info(f"[{self.username}] focus_by_name không tìm thấy, kiểm tra trực tiếp trong chars...")
         for char_id, char_data in self.controller.chars.items():
-            char_name = char_data.get('name', '').lower()
-            # DIAGNOSTIC: Log từng char để debug
-            logger.info(f"[{self.username}]   - Char ID {char_id}: '{char_data.get('name', 'N/A')}'")
-            
             # Kiểm tra tên boss có khớp không (partial match)
-            if boss_name_lower in char_name or char_name in boss_name_lower:
+            if self._is_boss_name(char_data.get('name', ''), boss_name_lower):
                 logger.info(f"[{self.username}] ✅ Tìm thấy boss '{char_data.get('name')}' trong chars (direct check)")
                 return True
         
-        logger.info(f"[{self.username}] ❌ Không tìm thấy boss '{boss_name}' sau khi kiểm tra {chars_count} chars")
         return False
     
     async def _state_gathering(self):
@@ -841,10 +986,6 @@ class AutoBoss:
                 return
 
         # Bật AutoAttack bằng hàm set_priority để an toàn hơn
-        if self.controller.auto_attack is None:
-             from logic.auto_attack import AutoAttack
-             self.controller.auto_attack = AutoAttack(self.controller)
-
         if not self.controller.auto_attack.is_running:
             logger.info(f"[{self.username}] Bật Auto Attack để tấn công boss...")
             # Set priority mode focus vào tên boss
@@ -963,7 +1104,8 @@ class AutoBoss:
         self.target_map_id = -1
         self.target_zone_id = -1
         self.assigned_zones = []
-        self.current_zone_index = 0
+        self.zone_scan_started = False
+        self.zones_scanned = 0
         self.state = BossState.SEARCHING
         
         # Register boss mới
@@ -1,9 +1,11 @@
 import asyncio
 import re
-from logs.logger_config import logger
+from logs.logger_config import get_logger
 from constants.cmd import Cmd
 from model.map_objects import Waypoint
 
+logger = get_logger("logic.auto_giftcode")
+
 class AutoGiftcode:
     def __init__(self, controller):
         self.controller = controller
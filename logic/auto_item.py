@@ -1,6 +1,8 @@
 import asyncio
 import time
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+
+logger = get_logger("logic.auto_item")
 
 USE_INTERVAL = 1800  # 30 minutes in seconds (30 * 60)
 
@@ -89,17 +91,10 @@ class AutoItem:
             logger.warning(f"[{self.controller.account.username}] Auto-Item: Túi đồ trống hoặc chưa được tải.")
             return
         
-        found_item = False
-        item_index = -1
-        
-        for index, item in enumerate(inventory):
-            if item and item.item_id == self.item_id:
-                found_item = True
-                item_index = index
-                logger.info(f"[{self.controller.account.username}] Auto-Item: Tìm thấy item ID {self.item_id} tại vị trí {index}")
-                break
+        item_index = char.bag_index.first_slot(self.item_id)
         
-        if found_item:
+        if item_index != -1:
+            logger.info(f"[{self.controller.account.username}] Auto-Item: Tìm thấy item ID {self.item_id} tại vị trí {item_index}")
             # Use the item (action type 0 = use, type 1 = use on master/self)
             # Using type 1 (use on self) as it's more common for consumables
             logger.info(f"[{self.controller.account.username}] Auto-Item: Đang sử dụng item tại vị trí {item_index}...")
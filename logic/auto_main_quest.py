@@ -12,13 +12,15 @@ Chiến lược:
 """
 
 import asyncio
-import json
 import math
 import time
 import re
-import unicodedata
 from enum import Enum
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+from controller.event_bus import MenuOpened
+from logic.game_data import GAME_DATA, MOB_LOCATION_DATA, normalize_name
+
+logger = get_logger("logic.auto_main_quest")
 
 # =============================================================================
 # CONSTANTS from server code analysis
@@ -238,62 +240,6 @@ BOSS_CONFIG = {
              "required_task": "TASK_28_6", "boss_id": "MABU_12H", "min_hp": 20000000, "min_dam": 1500000},
 }
 
-# =============================================================================
-# MOB TEMPLATE ID -> NAME mapping (từ ConstMob.java)
-# =============================================================================
-MOB_TEMPLATE_NAMES = {
-    0: "mộc nhân", 1: "khủng long", 2: "lợn lòi", 3: "quỷ đất",
-    4: "khủng long mẹ", 5: "lợn lòi mẹ", 6: "quỷ đất mẹ",
-    7: "thằn lằn bay", 8: "phi long", 9: "quỷ bay",
-    10: "thằn lằn mẹ", 11: "phi long mẹ", 12: "quỷ bay mẹ",
-    13: "ốc mượn hồn", 14: "ốc sên", 15: "heo xayda mẹ",
-    16: "heo rừng", 17: "heo da xanh", 18: "heo xayda",
-    19: "heo rừng mẹ", 20: "heo xanh mẹ", 21: "alien",
-    22: "bulon", 23: "ukulele", 24: "quỷ mập",
-    25: "tambourine", 26: "drum", 27: "akkuman",
-    31: "không tặc", 32: "quỷ đầu to", 33: "quỷ địa ngục",
-    34: "lính độc nhãn", 35: "lính độc nhãn",
-    39: "nappa", 40: "soldier", 41: "appule", 42: "raspberry", 43: "thằn lằn xanh",
-    44: "quỷ đầu nhọn", 45: "quỷ đầu vàng", 46: "quỷ da tím", 47: "quỷ già",
-    48: "cá sấu", 49: "dơi da xanh", 50: "quỷ chim",
-    51: "lính đầu trọc", 52: "lính tai dài", 53: "lính vũ trụ",
-    54: "khỉ lông đen", 55: "khỉ giáp sắt", 56: "khỉ lông đỏ", 57: "khỉ lông vàng",
-    58: "xên con cấp 1", 59: "xên con cấp 2", 60: "xên con cấp 3",
-    61: "xên con cấp 4", 62: "xên con cấp 5", 63: "xên con cấp 6",
-    64: "xên con cấp 7", 65: "xên con cấp 8",
-    66: "tai tím", 67: "abo", 68: "kado", 69: "da xanh",
-}
-
-# Mob template ID -> Map ID mapping (kết hợp từ auto_NVBoMong.MOB_LOCATION_DATA + maps_config.json + phân tích)
-MOB_LOCATION_DATA = {
-    "mộc nhân": (14, 0), "khủng long": (1, 1), "lợn lòi": (8, 2), "quỷ đất": (15, 3),
-    "khủng long mẹ": (2, 4), "lợn lòi mẹ": (9, 5), "quỷ đất mẹ": (16, 6),
-    "thằn lằn bay": (3, 7), "phi long": (11, 8), "quỷ bay": (17, 9), "thằn lằn mẹ": (4, 10),
-    "phi long mẹ": (12, 11), "quỷ bay mẹ": (18, 12),
-    "ốc mượn hồn": (29, 13), "ốc sên": (33, 14), "heo xayda mẹ": (37, 15),
-    "heo rừng": (28, 16), "heo da xanh": (32, 17), "heo xayda": (36, 18),
-    "heo rừng mẹ": (6, 19), "heo xanh mẹ": (10, 20), "alien": (19, 21),
-    "bulon": (30, 22), "ukulele": (34, 23), "quỷ mập": (38, 24),
-    "tambourine": (6, 25), "drum": (10, 26), "akkuman": (19, 27),
-    "không tặc": (29, 31), "quỷ đầu to": (33, 32), "quỷ địa ngục": (37, 33),
-    "nappa": (68, 39), "soldier": (70, 40), "appule": (71, 41), "raspberry": (71, 42),
-    "thằn lằn xanh": (72, 43), "quỷ đầu nhọn": (64, 44), "quỷ đầu vàng": (63, 45),
-    "quỷ da tím": (66, 46), "quỷ già": (67, 47), "cá sấu": (73, 48),
-    "dơi da xanh": (67, 49), "quỷ chim": (81, 50), "lính đầu trọc": (74, 51),
-    "lính tai dài": (76, 52), "lính vũ trụ": (77, 53), "khỉ lông đen": (82, 54),
-    "khỉ giáp sắt": (83, 55), "khỉ lông đỏ": (79, 56), "khỉ lông vàng": (80, 57),
-    "xên con cấp 1": (92, 58), "xên con cấp 2": (93, 59), "xên con cấp 3": (94, 60),
-    "xên con cấp 4": (96, 61), "xên con cấp 5": (97, 62), "xên con cấp 6": (98, 63),
-    "xên con cấp 7": (99, 64), "xên con cấp 8": (100, 65), "tai tím": (106, 66),
-    "abo": (107, 67), "kado": (109, 68), "da xanh": (110, 69),
-    "khỉ lông xanh": (155, 78), "taburine đỏ": (155, 79),
-    "ếch mặt đỏ": (166, 86), "jinai": (166, 87),
-}
-
-# Map ID -> name lookup (từ map_data.py)
-# Imported at runtime to avoid circular import
-MAP_ID_TO_NAME = {}
-
 # NPC Template ID -> Map ID (nơi NPC đó đứng)
 NPC_LOCATION_MAP = {
     NPC["CUI"]: 19,           # Thành phố Vegeta
@@ -347,7 +293,7 @@ class AutoMainQuest:
         
         # Config data
         self.config_data = self._load_config()
-        self._load_map_names()
+        GAME_DATA.load()
         
         # Boss tracking
         self._boss_map_id = None
@@ -368,21 +314,9 @@ class AutoMainQuest:
         self._auto_msm = None
 
     def _load_config(self):
-        """Load maps_config.json để biết map nào có quái gì"""
-        try:
-            with open('maps_config.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {"maps": []}
-
-    def _load_map_names(self):
-        """Load map name data"""
-        global MAP_ID_TO_NAME
-        try:
-            from logic.map_data import MAP_ID_TO_NAME as _map_names
-            MAP_ID_TO_NAME.update(_map_names)
-        except Exception:
-            pass
+        """maps_config.json (từ data bundle, dùng chung) để biết map nào có quái gì"""
+        from logic.data_bundle import get_bundle
+        return get_bundle()["maps_config"]
 
     # ── Gender Helpers ──────────────────────────────────────────
 
@@ -523,8 +457,7 @@ class AutoMainQuest:
         step_lower = step_name.lower()
         
         # Đã ở bước enter map, kiểm tra xem có map keyword không
-        from logic.map_data import MAP_NAME_TO_ID as name_to_id
-        for map_name, map_id in name_to_id.items():
+        for map_name, map_id in GAME_DATA.maps.name_to_id().items():
             if map_name.lower() in step_lower:
                 return map_id
         
@@ -550,11 +483,9 @@ class AutoMainQuest:
             if boss_name.lower() in mob.name.lower():
                 return ("mob", mid, mob)
         # 3. Fallback: check mob name không dấu
-        boss_ascii = ''.join(c for c in unicodedata.normalize('NFD', boss_name.lower())
-                            if unicodedata.category(c) != 'Mn')
+        boss_ascii = normalize_name(boss_name)
         for mid, mob in self.account.controller.mobs.items():
-            mob_ascii = ''.join(c for c in unicodedata.normalize('NFD', mob.name.lower())
-                               if unicodedata.category(c) != 'Mn')
+            mob_ascii = normalize_name(mob.name)
             if boss_ascii in mob_ascii:
                 return ("mob", mid, mob)
         return None
@@ -708,17 +639,16 @@ class AutoMainQuest:
         
         # Mở menu NPC và thử các option để báo cáo
         cur_idx = self.account.char.task.index
-        self.account.controller.ui_menu_event.clear()
-        await self.account.service.open_menu_npc(npc_tid)
         try:
-            await asyncio.wait_for(self.account.controller.ui_menu_event.wait(), timeout=5.0)
+            with self.account.controller.events.expect(MenuOpened) as menu:
+                await self.account.service.open_menu_npc(npc_tid)
+                await menu.result(5.0)
             opts = self.account.controller.last_ui_options
             if opts:
                 # Thử option 0, nếu task chưa chuyển thì thử option 1
                 for try_idx in [0, 1]:
                     if try_idx >= len(opts):
                         break
-                    self.account.controller.ui_menu_event.clear()
                     await self.account.service.confirm_menu_npc(npc_tid, try_idx)
                     await asyncio.sleep(1.5)
                     if self.account.char.task.index > cur_idx:
@@ -861,10 +791,10 @@ class AutoMainQuest:
         await asyncio.sleep(0.2)
         
         logger.info(f"[{username}] [AutoQuest] Mở menu Cui để tele tới {boss_name}...")
-        self.account.controller.ui_menu_event.clear()
-        await self.account.service.open_menu_npc(cui_tid)
         try:
-            await asyncio.wait_for(self.account.controller.ui_menu_event.wait(), timeout=5.0)
+            with self.account.controller.events.expect(MenuOpened) as menu:
+                await self.account.service.open_menu_npc(cui_tid)
+                await menu.result(5.0)
             opts = self.account.controller.last_ui_options
             
             # Tìm đúng menu chứa tên boss
@@ -897,9 +827,6 @@ class AutoMainQuest:
         
         # Thiết lập auto_attack trước khi vào loop
         controller_local = self.account.controller
-        if controller_local.auto_attack is None:
-            from logic.auto_attack import AutoAttack
-            controller_local.auto_attack = AutoAttack(controller_local)
         controller_local.auto_attack.set_priority_mode("name_match", names=[boss_name])
         if not controller_local.auto_attack.is_running:
             controller_local.toggle_auto_attack(True)
@@ -1135,7 +1062,7 @@ class AutoMainQuest:
         if self.is_running:
             return
         self.config_data = self._load_config()
-        self._load_map_names()
+        GAME_DATA.load()
         self.is_running = True
         self.state = AutoQuestState.ANALYZE_TASK
         self._boss_map_id = None
@@ -1,6 +1,13 @@
 import asyncio
 import time
-from logs.logger_config import TerminalColors as C, logger
+from logs.logger_config import TerminalColors as C, get_logger
+from controller.event_bus import MenuOpened
+from logic.text_classifier import TEXT_CLASSIFIER
+
+logger = get_logger("logic.auto_msm")
+
+MSM_KEYWORDS = ("không đủ", "vàng", "chúc mừng", "giới hạn")
+TEXT_CLASSIFIER.register("msm", MSM_KEYWORDS)
 
 class AutoMsm:
     def __init__(self, controller):
@@ -41,12 +48,15 @@ class AutoMsm:
 
     def on_server_message(self, text: str):
         if not self.is_running: return
+        match = TEXT_CLASSIFIER.classify(text)
+        if not match.has("msm"):
+            return
         # Nếu đang ở State chờ nâng cấp và bị báo thiếu vàng
-        if "không đủ" in text.lower() and "vàng" in text.lower():
+        if match.has("msm", "không đủ") and match.has("msm", "vàng"):
             logger.warning(f"[{self.controller.account.username}] Hết vàng! Chuyển sang trạng thái về làng nhận vàng.")
             self.state = "GO_HOME"
         # Báo nâng thành công
-        elif "chúc mừng" in text.lower() or "giới hạn" in text.lower():
+        elif match.has("msm", "chúc mừng") or match.has("msm", "giới hạn"):
             logger.info(f"[{self.controller.account.username}] {text}")
             
     async def _run_loop(self):
@@ -102,11 +112,10 @@ class AutoMsm:
             await asyncio.sleep(0.1)
 
             logger.info(f"[{self.controller.account.username}] Đang mở menu NPC {limit_npc} để nâng sức mạnh...")
-            self.controller.ui_menu_event.clear()
-            await self.controller.account.service.open_menu_npc(limit_npc)
-            
             try:
-                await asyncio.wait_for(self.controller.ui_menu_event.wait(), timeout=2.0)
+                with self.controller.events.expect(MenuOpened) as menu:
+                    await self.controller.account.service.open_menu_npc(limit_npc)
+                    await menu.result(2.0)
                 options = self.controller.last_ui_options
                 
                 target_str = "bản thân" if self.target == "banthan" else "đệ tử"
@@ -117,9 +126,9 @@ class AutoMsm:
                         break
                         
                 if idx1 != -1:
-                    self.controller.ui_menu_event.clear()
-                    await self.controller.account.service.confirm_menu_npc(limit_npc, idx1)
-                    await asyncio.wait_for(self.controller.ui_menu_event.wait(), timeout=2.0)
+                    with self.controller.events.expect(MenuOpened) as menu:
+                        await self.controller.account.service.confirm_menu_npc(limit_npc, idx1)
+                        await menu.result(2.0)
                     options = self.controller.last_ui_options
                     chat = getattr(self.controller, 'last_ui_chat', '')
                     
@@ -137,14 +146,13 @@ class AutoMsm:
                             break
                             
                     if idx2 != -1:
-                        self.controller.ui_menu_event.clear()
-                        await self.controller.account.service.confirm_menu_npc(limit_npc, idx2)
                         msg = "Đã bấm Nâng ngay. Chờ kết quả..."
-                        logger.info(f"[{self.controller.account.username}] {msg}")
-                        print(f"[{C.YELLOW}{self.controller.account.username}{C.RESET}] {msg}")
-                        
                         try:
-                            await asyncio.wait_for(self.controller.ui_menu_event.wait(), timeout=2.0)
+                            with self.controller.events.expect(MenuOpened) as menu:
+                                await self.controller.account.service.confirm_menu_npc(limit_npc, idx2)
+                                logger.info(f"[{self.controller.account.username}] {msg}")
+                                print(f"[{C.YELLOW}{self.controller.account.username}{C.RESET}] {msg}")
+                                await menu.result(2.0)
                             chat_after = getattr(self.controller, 'last_ui_chat', '')
                             if "đạt đến giới hạn" in chat_after.lower():
                                 msg = f"Đã đạt đến giới hạn sức mạnh, tự động TẮT AutoMsm."
@@ -195,11 +203,10 @@ class AutoMsm:
             await asyncio.sleep(0.2)
 
             logger.info(f"[{self.controller.account.username}] Đang xin vàng NPC {home_npc}...")
-            self.controller.ui_menu_event.clear()
-            await self.controller.account.service.open_menu_npc(home_npc)
-            
             try:
-                await asyncio.wait_for(self.controller.ui_menu_event.wait(), timeout=2.0)
+                with self.controller.events.expect(MenuOpened) as menu:
+                    await self.controller.account.service.open_menu_npc(home_npc)
+                    await menu.result(2.0)
                 options = self.controller.last_ui_options
                 
                 idx = -1
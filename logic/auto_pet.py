@@ -1,8 +1,10 @@
 import asyncio
-from logs.logger_config import logger 
+from logs.logger_config import get_logger
 from model.game_objects import Char
 from network.service import Service
 
+logger = get_logger("logic.auto_pet")
+
 BEAN_ITEM_IDS = [13, 60, 61, 62, 63, 64, 65, 352, 523, 595]  # Template IDs for "đậu thần" (magic bean)
 STAMINA_THRESHOLD = 50  # Use bean when stamina is below this value
 CHECK_INTERVAL = 2  # Seconds to wait between checks
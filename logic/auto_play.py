@@ -1,17 +1,34 @@
 import asyncio
-import math
-from logs.logger_config import logger 
+import time
+from typing import Optional
+from logs.logger_config import get_logger
 from model.game_objects import Char, Mob, Skill
 from network.service import Service
+from logs.metrics import METRICS
+
+logger = get_logger("logic.auto_play")
+
+ATTACKS_SENT = METRICS.counter("nro_attacks_sent_total", "Số gói tấn công đã gửi theo module", ("account", "source"))
 
 # logger = logging.getLogger(__name__)
 
 class AutoPlay:
+    MIN_WAIT = 0.01  # Nhịp tối thiểu giữa hai lượt (giữ nhịp đánh như vòng lặp cũ)
+    IDLE_WAIT = 0.5  # Trần thời gian ngủ khi không có mục tiêu (focus đặt bằng lệnh, hồi sinh...)
+
     def __init__(self, controller):
         self.controller = controller
         self.interval = False # Trạng thái hoạt động
         self.task: asyncio.Task = None
         self.target_mobs = set() # Set chứa các template_id của quái cần đánh
+        # Đánh thức vòng lặp sớm: quái hồi sinh/chết (CombatHandler), vào map mới, người chơi chết
+        self._wake = asyncio.Event()
+        self.idle = True  # Lượt gần nhất không có mục tiêu (tansat trả về None)
+        self._m_attacks = ATTACKS_SENT.labels(getattr(controller.account, 'username', 'unknown'), "auto_play")
+
+    def wake(self):
+        """Báo vòng lặp có sự kiện đáng xử lý, không cần chờ hết thời gian ngủ."""
+        self._wake.set()
 
     def start(self):
         if not self.interval:
@@ -33,15 +50,45 @@ class AutoPlay:
 
         while self.interval:
             try:
-                await self.tansat()
-                await asyncio.sleep(0.01) # Vòng lặp nhanh để tăng độ phản hồi
+                self._wake.clear()
+                delay = await self.tansat()
+                self.idle = delay is None
+                await self._sleep(delay)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Lỗi trong vòng lặp Tự động chơi: {e}")
                 await asyncio.sleep(0.05)
 
-    async def tansat(self):
+    async def _sleep(self, delay: Optional[float]):
+        """Ngủ tới thời điểm có ý nghĩa tiếp theo hoặc tới khi bị `wake()`.
+
+        Args:
+            delay: Số giây chờ (vd. thời gian hồi chiêu còn lại); None = không có mục tiêu, chờ sự kiện
+        """
+        if self._wake.is_set():
+            await asyncio.sleep(self.MIN_WAIT)
+            return
+        delay = self.IDLE_WAIT if delay is None else max(delay, self.MIN_WAIT)
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    def _cooldown_left(skill: Skill) -> float:
+        """Số giây còn lại trước khi `skill` hồi chiêu (cool_down tính bằng ms)."""
+        if skill is None:
+            return 0
+        elapsed = int(time.time() * 1000) - skill.last_time_use_this_skill
+        return max(skill.cool_down - elapsed, 0) / 1000
+
+    async def tansat(self) -> Optional[float]:
+        """Một lượt tàn sát.
+
+        Returns:
+            Số giây nên chờ trước lượt tiếp theo, hoặc None nếu không có mục tiêu (chờ sự kiện).
+        """
         my_char = self.controller.account.char
         service = self.controller.account.service
         
@@ -73,23 +120,21 @@ class AutoPlay:
                         await asyncio.sleep(0.2)
                     
                     logger.info(f"Auto: Đã quay về map {current_map_id}.")
-            return  # Kết thúc lượt này, vòng lặp tiếp theo sẽ tiếp tục tấn công
+            return 0  # Kết thúc lượt này, vòng lặp tiếp theo sẽ tiếp tục tấn công
         
         # 1. Ưu tiên attack Char (Boss/Player) nếu có char_focus
         char_focus = my_char.char_focus
         if char_focus:
-            await self._attack_char_focus(char_focus, service, my_char)
-            return
+            return await self._attack_char_focus(char_focus, service, my_char)
         
         # 2. Xác thực Mục tiêu Mob Hiện tại (Focus)
         mob_focus = my_char.mob_focus
         target_valid = False
         
+        combat = self.controller.combat_handler
         if mob_focus:
             current_mob_data = self.controller.mobs.get(mob_focus.mob_id)
-            if (current_mob_data and 
-                current_mob_data.status > 1 and 
-                current_mob_data.hp > 0):
+            if current_mob_data and combat.is_alive(mob_focus.mob_id):
                 
                 # Kiểm tra lại xem mục tiêu hiện tại có còn nằm trong danh sách target (nếu có lọc)
                 if not self.target_mobs or current_mob_data.template_id in self.target_mobs:
@@ -106,21 +151,8 @@ class AutoPlay:
         # 2. Tìm mục tiêu mới nếu mục tiêu cũ không hợp lệ
         force_move = False  # Cờ buộc di chuyển khi chọn mục tiêu mới
         if not target_valid:
-            best_mob = None
-            min_dist = 999999
-            
-            for mob_id, mob in self.controller.mobs.items():
-                if mob.status <= 1 or mob.hp <= 0 or mob.is_mob_me:
-                    continue
-                
-                # Lọc theo danh sách ID nếu có
-                if self.target_mobs and mob.template_id not in self.target_mobs:
-                    continue
-
-                dist = math.sqrt((mob.x - my_char.cx)**2 + (mob.y - my_char.cy)**2)
-                if dist < min_dist:
-                    min_dist = dist
-                    best_mob = mob
+            # Chỉ duyệt các quái còn sống (theo template nếu có lọc)
+            _, best_mob = combat.nearest_alive(my_char.cx, my_char.cy, self.target_mobs or None)
             
             if best_mob:
                 my_char.mob_focus = best_mob
@@ -128,14 +160,12 @@ class AutoPlay:
                 force_move = True  # Buộc di chuyển đến mục tiêu mới
                 # logger.info(f"Auto: Tìm thấy mục tiêu {best_mob.mob_id}")
             else:
-                return
+                return None  # Không còn quái sống, chờ NPC_LIVE / đổi map
 
         # 3. Dịch chuyển và Tấn công (Teleport & Attack)
         if mob_focus:
-            # Tính khoảng cách hiện tại
-            dist = math.sqrt((mob_focus.x - my_char.cx)**2 + (mob_focus.y - my_char.cy)**2)
             if mob_focus.status <= 1 or mob_focus.hp <= 0:
-                return
+                return None
             # Nếu ở quá xa (ví dụ > 60px), thực hiện dịch chuyển tức thời
             # Kiểm tra khoảng cách X và Y riêng biệt
             dist_x = abs(mob_focus.x - my_char.cx)
@@ -162,24 +192,32 @@ class AutoPlay:
                 # Nghỉ một chút siêu ngắn để server cập nhật vị trí trước khi tấn công
                 await asyncio.sleep(0.01)
 
-            # Thực hiện tấn công
+            # Thực hiện tấn công (chiêu còn hồi: bị wake() sớm thì chờ tiếp, không bắn thêm loạt mới)
             skill = self.find_best_skill()
+            wait = self._cooldown_left(skill)
+            if wait > 0:
+                return wait
             if skill:
                 await service.select_skill(skill.template.id) 
                 
                 # Vòng lặp tấn công
                 for i in range(20):
-                    if mob_focus.hp > -1: # Kiểm tra quái còn sống không trước khi đánh tiếp
+                    if combat.is_alive(mob_focus.mob_id): # Kiểm tra quái còn sống không trước khi đánh tiếp
                         await service.send_player_attack([mob_focus.mob_id])
+                        self._m_attacks.inc()
+                        skill.last_time_use_this_skill = int(time.time() * 1000)
                         # logger.info(f"Auto: Tấn công phát {i+1} vào Mob {mob_focus.mob_id}")
                         
                         # Nghỉ rất ngắn để tránh bị server drop packet (hủy gói tin)
                         await asyncio.sleep(0.02)
+                return self._cooldown_left(skill)
+        return 0
     
-    async def _attack_char_focus(self, char_focus: dict, service, my_char):
+    async def _attack_char_focus(self, char_focus: dict, service, my_char) -> Optional[float]:
         """
         Tấn công char_focus (Boss hoặc Player)
         char_focus là dict chứa thông tin char từ controller.chars
+        Trả về số giây chờ trước lượt tiếp theo (như tansat)
         """
         char_id = char_focus.get('id')
         char_name = char_focus.get('name', 'Unknown')
@@ -190,13 +228,19 @@ class AutoPlay:
         # Kiểm tra target còn sống
         if char_hp <= 0:
             my_char.char_focus = None
-            return
+            return 0
         
-        # Tính khoảng cách
-        dist = math.sqrt((char_x - my_char.cx)**2 + (char_y - my_char.cy)**2)
+        # Chiêu còn hồi: bị wake() sớm thì chờ tiếp, không bắn thêm loạt mới
+        skill = self.find_best_skill()
+        wait = self._cooldown_left(skill)
+        if wait > 0:
+            return wait
+
+        # Tính khoảng cách (bình phương)
+        dist2 = (char_x - my_char.cx)**2 + (char_y - my_char.cy)**2
         
         # Di chuyển nếu quá xa (> 60px)
-        if dist > 60:
+        if dist2 > 60 * 60:
             logger.info(f"Auto: Dịch chuyển tới Boss/Char {char_name}")
             # Tính hướng TRƯỚC KHI cập nhật cx
             my_char.cdir = 1 if char_x > my_char.cx else -1
@@ -206,7 +250,6 @@ class AutoPlay:
             await asyncio.sleep(0.01)
         
         # Thực hiện tấn công
-        skill = self.find_best_skill()
         if skill:
             await service.select_skill(skill.template.id)
             
@@ -216,11 +259,15 @@ class AutoPlay:
                 current_char = self.controller.chars.get(char_id)
                 if current_char and current_char.get('hp', 0) > 0:
                     await service.attack_player(char_id)
+                    self._m_attacks.inc()
+                    skill.last_time_use_this_skill = int(time.time() * 1000)
                     await asyncio.sleep(0.02)
                 else:
                     # Target đã chết
                     my_char.char_focus = None
-                    break
+                    return 0
+            return self._cooldown_left(skill)
+        return 0
 
     def find_best_skill(self) -> Skill:
         my_char = self.controller.account.char
@@ -1,7 +1,10 @@
 import asyncio
 import json
 import time
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+from logic.game_data import GAME_DATA
+
+logger = get_logger("logic.auto_scanmap")
 
 class AutoScanMap:
     def __init__(self, account):
@@ -54,12 +57,7 @@ class AutoScanMap:
                 if not hasattr(mob, 'template_id'): continue
                 if mob.template_id not in seen_ids:
                     seen_ids.add(mob.template_id)
-                    from main import MOB_NAMES # Lấy global dictionary
-                    
-                    # Ưu tiên lấy tên thật từ game object mob.name nếu có
-                    mob_name = getattr(mob, 'name', '')
-                    if not mob_name:
-                        mob_name = MOB_NAMES.get(mob.template_id, f"Mob_{mob.template_id}")
+                    mob_name = GAME_DATA.mob_name(mob.template_id, f"Mob_{mob.template_id}")
                     
                     mob_list.append({
                         "mob_id": mob.template_id,
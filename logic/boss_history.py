@@ -0,0 +1,226 @@
+"""
+BossHistory - Lịch sử xuất hiện / bị tiêu diệt của boss và dự đoán lần xuất hiện kế tiếp.
+
+BossManager ghi mỗi sự kiện ĐẦU TIÊN (đã khử trùng lặp giữa các tài khoản) vào
+`boss_history.jsonl`: nhật ký append-only, mỗi dòng một sự kiện
+{"t": epoch, "e": "appear" | "death", "b": tên, "m": map_id, "mn": tên map, "z": zone}.
+Khi load, dòng ghi dở cuối file (crash) được bỏ qua; file quá `COMPACT_RECORDS` dòng thì được
+ghi lại chỉ với phần lịch sử còn giữ trong bộ nhớ (tmp + os.replace).
+
+Học chu kỳ hồi sinh theo từng boss (tên chuẩn hóa), từ các cặp sự kiện liên tiếp:
+  - chết -> xuất hiện: thời gian hồi sinh (chính xác nhất, đồng hồ hồi sinh tính từ lúc chết);
+  - xuất hiện -> xuất hiện: chu kỳ khi không thấy thông báo chết.
+Khoảng cách quá `MAX_GAP_SECONDS` (bot tắt giữa chừng) bị bỏ. Chu kỳ = trung vị, độ lệch =
+trung vị độ lệch tuyệt đối (MAD) nên vài mẫu lạc không kéo lệch dự đoán. Map dự đoán là map boss
+xuất hiện nhiều nhất gần đây; nếu map đó đủ mẫu riêng thì dùng chu kỳ riêng của (boss, map).
+
+    prediction = BossManager().predict_next("Broly")
+    if prediction and prediction.seconds_left() < 20: xmap tới prediction.map_id
+"""
+import json
+import os
+import statistics
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from logic.game_data import normalize_name
+from logs.logger_config import get_logger
+
+logger = get_logger("logic.boss_history")
+
+HISTORY_FILE = "boss_history.jsonl"
+APPEAR = "appear"
+DEATH = "death"
+MAX_EVENTS_PER_BOSS = 200      # Số sự kiện giữ trong bộ nhớ cho mỗi boss
+COMPACT_RECORDS = 20000        # Số dòng nhật ký trước khi tự ghi gọn
+MIN_SAMPLES = 2                # Số mẫu tối thiểu để dự đoán
+MIN_GAP_SECONDS = 5            # Mẫu ngắn hơn: báo trùng / nhiễu
+MAX_GAP_SECONDS = 6 * 3600     # Mẫu dài hơn: bot không chạy giữa hai sự kiện
+MAP_WINDOW = 10                # Số lần xuất hiện gần nhất dùng để chọn map
+
+
+@dataclass(slots=True)
+class BossPrediction:
+    """Dự đoán lần xuất hiện kế tiếp của một boss."""
+    name: str
+    map_id: int
+    map_name: str
+    eta: datetime            # Thời điểm dự kiến xuất hiện
+    interval: float          # Chu kỳ (giây) dùng để dự đoán
+    spread: float            # Độ lệch điển hình (giây, MAD)
+    samples: int             # Số mẫu chu kỳ đã học
+    basis: str               # DEATH (tính từ lúc chết) hoặc APPEAR (tính từ lần xuất hiện trước)
+
+    def seconds_left(self, now: Optional[datetime] = None) -> float:
+        """Số giây tới `eta` (âm nếu đã quá giờ mà chưa thấy thông báo)."""
+        return (self.eta - (now or datetime.now())).total_seconds()
+
+
+def _map_key(event: dict):
+    return event['m'] if event.get('m', -1) != -1 else normalize_name(event.get('mn', ''))
+
+
+class BossHistory:
+    """Nhật ký sự kiện boss (bộ nhớ + file) và bộ học chu kỳ hồi sinh."""
+
+    def __init__(self, history_file: str = HISTORY_FILE):
+        self.history_file = history_file
+        self._events: Dict[str, Deque[dict]] = {}
+        self._loaded = False
+        self._records = 0  # Số dòng đang nằm trong file
+        # Tên / từ khóa truy vấn -> dự đoán (kể cả None); chỉ đổi khi có sự kiện mới nên xóa trong record()
+        self._predictions: Dict[str, Optional[BossPrediction]] = {}
+
+    # ── Load / ghi ──
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.history_file):
+            return
+        try:
+            with open(self.history_file, "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.endswith("\n"):
+                        logger.warning(f"{self.history_file}: bỏ qua dòng {line_no} ghi dở.")
+                        break
+                    try:
+                        event = json.loads(line)
+                        self._remember(event)
+                    except (json.JSONDecodeError, TypeError, KeyError) as e:
+                        logger.warning(f"{self.history_file}: bỏ qua dòng {line_no} hỏng ({e}).")
+                        continue
+                    self._records += 1
+        except IOError as e:
+            logger.error(f"Không đọc được {self.history_file}: {e}")
+
+    def _remember(self, event: dict):
+        key = normalize_name(event['b'])
+        events = self._events.get(key)
+        if events is None:
+            events = self._events[key] = deque(maxlen=MAX_EVENTS_PER_BOSS)
+        events.append(event)
+
+    def record(self, kind: str, name: str, map_id: int = -1, map_name: str = "", zone_id: int = -1,
+               timestamp: Optional[float] = None):
+        """Ghi một sự kiện APPEAR / DEATH (bộ nhớ + một dòng nhật ký)."""
+        self._ensure_loaded()
+        event = {"t": round(time.time() if timestamp is None else timestamp, 3), "e": kind,
+                 "b": name, "m": map_id, "mn": map_name, "z": zone_id}
+        self._remember(event)
+        self._predictions.clear()
+        try:
+            with open(self.history_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.error(f"Không ghi được {self.history_file}: {e}")
+            return
+        self._records += 1
+        if self._records >= COMPACT_RECORDS:
+            self.compact()
+
+    def compact(self) -> bool:
+        """Ghi lại file chỉ với các sự kiện còn giữ trong bộ nhớ (tmp + os.replace)."""
+        events = sorted((e for q in self._events.values() for e in q), key=lambda e: e['t'])
+        tmp = self.history_file + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.history_file)
+        except OSError as e:
+            logger.error(f"Không ghi gọn được {self.history_file}: {e}")
+            return False
+        self._records = len(events)
+        return True
+
+    # ── Học / dự đoán ──
+
+    def events(self, boss: str) -> List[dict]:
+        """Các sự kiện (cũ trước mới sau) của boss có tên chuẩn hóa trùng `boss`."""
+        self._ensure_loaded()
+        return list(self._events.get(normalize_name(boss), ()))
+
+    def names(self) -> List[str]:
+        """Tên (gần nhất) của mọi boss đã có lịch sử."""
+        self._ensure_loaded()
+        return [q[-1]['b'] for q in self._events.values() if q]
+
+    @staticmethod
+    def _samples(events: List[dict]) -> Dict[str, List[tuple]]:
+        """Mẫu chu kỳ theo loại mốc: {DEATH | APPEAR: [(giây, map_key), ...]}."""
+        samples: Dict[str, List[tuple]] = {DEATH: [], APPEAR: []}
+        for prev, cur in zip(events, events[1:]):
+            if cur['e'] != APPEAR:
+                continue
+            gap = cur['t'] - prev['t']
+            if MIN_GAP_SECONDS <= gap <= MAX_GAP_SECONDS:
+                samples[prev['e']].append((gap, _map_key(cur)))
+        return samples
+
+    def predict_matching(self, keyword: str) -> Optional[BossPrediction]:
+        """
+        Dự đoán cho `keyword` (có cache tới sự kiện kế tiếp): tên trùng khớp, không có thì dự đoán
+        sớm nhất trong các boss có tên chứa `keyword`.
+        """
+        try:
+            return self._predictions[keyword]
+        except KeyError:
+            pass
+        self._ensure_loaded()
+        keyword_norm = normalize_name(keyword)
+        prediction = self._predict(keyword_norm)
+        if prediction is None:
+            candidates = [self._predict(name) for name in self._events if keyword_norm in name]
+            candidates = [p for p in candidates if p is not None]
+            prediction = min(candidates, key=lambda p: p.eta) if candidates else None
+        self._predictions[keyword] = prediction
+        return prediction
+
+    def predict_next(self, boss: str) -> Optional[BossPrediction]:
+        """Dự đoán lần xuất hiện kế tiếp của `boss` (tên đầy đủ). None nếu chưa đủ mẫu."""
+        self._ensure_loaded()
+        return self._predict(normalize_name(boss))
+
+    def _predict(self, key: str) -> Optional[BossPrediction]:
+        events = list(self._events.get(key, ()))
+        if len(events) < 2:
+            return None
+
+        last = events[-1]
+        basis = last['e']
+        samples = self._samples(events)[basis]
+        if len(samples) < MIN_SAMPLES:
+            return None
+
+        appears = [e for e in events if e['e'] == APPEAR][-MAP_WINDOW:]
+        if not appears:
+            return None
+        map_key, _ = Counter(_map_key(e) for e in appears).most_common(1)[0]
+        where = next(e for e in reversed(appears) if _map_key(e) == map_key)
+
+        # Đủ mẫu riêng cho map này thì dùng chu kỳ riêng (boss hồi sinh khác nhau theo map)
+        on_map = [gap for gap, key in samples if key == map_key]
+        gaps = on_map if len(on_map) >= MIN_SAMPLES else [gap for gap, _ in samples]
+        interval = statistics.median(gaps)
+        spread = statistics.median(abs(g - interval) for g in gaps)
+
+        return BossPrediction(
+            name=last['b'],
+            map_id=where.get('m', -1),
+            map_name=where.get('mn', ''),
+            eta=datetime.fromtimestamp(last['t'] + interval),
+            interval=interval,
+            spread=spread,
+            samples=len(gaps),
+            basis=basis,
+        )
+
+
+BOSS_HISTORY = BossHistory()
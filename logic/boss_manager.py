@@ -1,5 +1,35 @@
+"""
+BossManager - Danh sách boss xuất hiện, dùng chung cho mọi tài khoản (singleton).
+
+Mọi tài khoản đều nhận cùng một thông báo boss trên kênh thế giới, nên cùng một sự kiện được báo
+N lần. Registry khử trùng lặp theo khóa (tên chuẩn hóa, map): báo cáo đầu tiên được ghi, N-1 báo
+cáo còn lại trong `Config.BOSS_DEDUP_SECONDS` chỉ là một lần tra dict rồi bỏ qua.
+
+  - `_entries`: OrderedDict khóa -> boss, cũ trước mới sau (ring buffer `Config.BOSS_HISTORY_SIZE`,
+    bỏ phần tử cũ nhất bằng popitem O(1)). Làm mới một boss sẽ đưa nó về cuối nên thứ tự luôn
+    theo thời gian: không cần sort, hết hạn (`Config.BOSS_TTL_MINUTES`) thì cắt từ đầu.
+  - `_by_name`: tên chuẩn hóa -> các khóa (mark_boss_dead / tìm theo tên không phải quét).
+
+Mỗi boss vẫn là dict {'name', 'map', 'map_id', 'zone', 'time', 'status'} như trước.
+
+Báo cáo đầu tiên của mỗi lần xuất hiện / bị tiêu diệt được ghi vào lịch sử (`logic.boss_history`)
+để học chu kỳ hồi sinh: `predict_next(boss)` cho biết boss sắp xuất hiện ở map nào, lúc nào.
+"""
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import threading
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from logic.boss_history import APPEAR, BOSS_HISTORY, DEATH, BossPrediction
+from logic.game_data import GAME_DATA, normalize_name
+
+ALIVE = 'Sống'
+DEAD = 'Chết'
+
+BossKey = Tuple[str, object]  # (tên chuẩn hóa, map_id hoặc tên map chuẩn hóa nếu không rõ ID)
+_KEY_CACHE_SIZE = 4096
+
 
 class BossManager:
     _instance = None
@@ -10,79 +40,135 @@ class BossManager:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super(BossManager, cls).__new__(cls)
-                    cls._instance.bosses = []
+                    cls._instance._entries = OrderedDict()
+                    cls._instance._by_name = {}
+                    cls._instance._key_cache = {}
         return cls._instance
 
-    def add_boss(self, name: str, map_name: str, zone_id: int = -1):
-        """Thêm boss mới vào danh sách."""
-        # Kiểm tra trùng lặp (nếu boss cùng tên ở cùng map xuất hiện trong thời gian ngắn < 1 phút thì update time)
+    _entries: "OrderedDict[BossKey, dict]"
+    _by_name: Dict[str, List[BossKey]]
+    _key_cache: Dict[Tuple[str, str], Tuple[BossKey, int]]  # (tên, tên map) thô -> (khóa, map_id)
+
+    @property
+    def bosses(self) -> List[dict]:
+        """Danh sách boss, cũ trước mới sau (tương thích code cũ đọc `BossManager().bosses`)."""
+        return list(self._entries.values())
+
+    def _key_of(self, name: str, map_name: str) -> Tuple[BossKey, int]:
+        # Các tài khoản nhận cùng một chuỗi thông báo: chuẩn hóa + tra map_id một lần cho mỗi chuỗi
+        raw = (name, map_name)
+        cached = self._key_cache.get(raw)
+        if cached is None:
+            if len(self._key_cache) >= _KEY_CACHE_SIZE:
+                self._key_cache.clear()
+            map_id = GAME_DATA.maps.id_of(map_name, -1)
+            key = (normalize_name(name), map_id if map_id != -1 else normalize_name(map_name))
+            cached = self._key_cache[raw] = (key, map_id)
+        return cached
+
+    # ── Ghi ──
+
+    def add_boss(self, name: str, map_name: str, zone_id: int = -1) -> bool:
+        """Ghi nhận boss xuất hiện. Trả về False nếu là báo cáo trùng (đã có báo cáo đầu tiên)."""
         now = datetime.now()
-        
-        # Check logic trùng (đơn giản hoá: cùng tên, cùng map)
-        for b in self.bosses:
-            if b['name'] == name and b['map'] == map_name:
-                # Update time
-                b['time'] = now 
-                if zone_id != -1:
-                    b['zone'] = zone_id
-                return
-
-        # Lookup map_id
-        from logic.map_data import MAP_NAME_TO_ID
-        # Try exact match first, then partial match?
-        # Map names from server might have variations.
-        map_id_val = MAP_NAME_TO_ID.get(map_name, -1)
-        
-        # If not found, try to find case-insensitive or partial
-        if map_id_val == -1:
-             for name_key, id_val in MAP_NAME_TO_ID.items():
-                 if name_key.lower() == map_name.lower():
-                     map_id_val = id_val
-                     break
-        
-        new_boss = {
+        key, map_id = self._key_of(name, map_name)
+
+        boss = self._entries.get(key)
+        if boss is not None:
+            if boss['status'] == ALIVE and (now - boss['time']).total_seconds() < Config.BOSS_DEDUP_SECONDS:
+                # Cùng một thông báo do tài khoản khác báo lại: giữ báo cáo đầu tiên
+                if boss['zone'] == -1 and zone_id != -1:
+                    boss['zone'] = zone_id
+                return False
+            # Boss hồi sinh / báo lại sau cửa sổ khử trùng: làm mới và đưa về cuối
+            boss.update(name=name, map=map_name, zone=zone_id, time=now, status=ALIVE)
+            self._entries.move_to_end(key)
+            BOSS_HISTORY.record(APPEAR, name, map_id, map_name, zone_id, now.timestamp())
+            return True
+
+        self._entries[key] = {
             'name': name,
             'map': map_name,
-            'map_id': map_id_val,
+            'map_id': map_id,
             'zone': zone_id,
             'time': now,
-            'status': 'Sống'  # Status: Sống / Chết
+            'status': ALIVE,
         }
-        self.bosses.append(new_boss)
-        # Giới hạn danh sách 15 boss mới nhất
-        if len(self.bosses) > 15:
-            self.bosses.pop(0)
-
-    def mark_boss_dead(self, boss_name: str):
-        """Đánh dấu boss đã bị tiêu diệt."""
-        # Tìm boss sống gần nhất có tên trùng khớp
-        # Ưu tiên boss mới xuất hiện nhất
-        for b in self.bosses:
-            if b['name'] == boss_name and b['status'] == 'Sống':
-                b['status'] = 'Chết'
-                # b['time'] = datetime.now() # Optional: Update time to death time?
-                return True
-        return False
-
-    def get_bosses(self):
-        """Trả về danh sách boss, sắp xếp mới nhất trước."""
-        return sorted(self.bosses, key=lambda x: x['time'], reverse=True)
-    
-    def find_bosses_by_keyword(self, keyword: str):
+        self._by_name.setdefault(key[0], []).append(key)
+        while len(self._entries) > Config.BOSS_HISTORY_SIZE:
+            self._evict_oldest()
+        BOSS_HISTORY.record(APPEAR, name, map_id, map_name, zone_id, now.timestamp())
+        return True
+
+    def mark_boss_dead(self, boss_name: str) -> bool:
+        """Đánh dấu boss (mới xuất hiện nhất còn sống, cùng tên) đã bị tiêu diệt.
+
+        Trả về False nếu không có boss sống trùng tên — kể cả khi tài khoản khác đã báo trước.
+        """
+        keys = self._by_name.get(normalize_name(boss_name))
+        if not keys:
+            return False
+        alive = [self._entries[k] for k in keys if self._entries[k]['status'] == ALIVE]
+        if not alive:
+            return False
+        boss = max(alive, key=lambda b: b['time'])
+        boss['status'] = DEAD
+        BOSS_HISTORY.record(DEATH, boss['name'], boss['map_id'], boss['map'], boss['zone'])
+        return True
+
+    def _evict_oldest(self):
+        key, _ = self._entries.popitem(last=False)
+        keys = self._by_name.get(key[0])
+        if keys is not None:
+            keys.remove(key)
+            if not keys:
+                del self._by_name[key[0]]
+
+    def _purge_expired(self, ttl_minutes: Optional[float] = None):
+        ttl = Config.BOSS_TTL_MINUTES if ttl_minutes is None else ttl_minutes
+        if ttl <= 0:
+            return
+        cutoff = datetime.now() - timedelta(minutes=ttl)
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest['time'] >= cutoff:
+                break
+            self._evict_oldest()
+
+    # ── Đọc ──
+
+    def get_bosses(self) -> List[dict]:
+        """Trả về danh sách boss, mới nhất trước."""
+        self._purge_expired()
+        return list(reversed(self._entries.values()))
+
+    def find_bosses_by_keyword(self, keyword: str) -> List[dict]:
         """
-        Tìm tất cả boss có tên chứa keyword (case-insensitive).
-        Trả về list của boss đang sống, sắp xếp theo thời gian mới nhất.
-        
+        Tìm tất cả boss có tên chứa keyword (không phân biệt hoa thường / dấu).
+        Trả về list của boss đang sống, mới nhất trước.
+
         Ví dụ: keyword="Super Broly" sẽ match "Super Broly 1", "Super Broly 25"
         """
-        keyword_lower = keyword.lower()
-        matching_bosses = [
-            b for b in self.bosses 
-            if keyword_lower in b['name'].lower() and b['status'] == 'Sống'
-        ]
-        return sorted(matching_bosses, key=lambda x: x['time'], reverse=True)
+        self._purge_expired()
+        keyword_norm = normalize_name(keyword)
+        # So chuỗi một lần cho mỗi tên khác nhau, không phải cho mỗi báo cáo
+        names = {name for name in self._by_name if keyword_norm in name}
+        if not names:
+            return []
+        return [b for key, b in reversed(self._entries.items()) if key[0] in names and b['status'] == ALIVE]
+
+    def find_boss(self, name: str, map_name: str) -> Optional[dict]:
+        """Boss theo đúng tên + map (tra dict)."""
+        return self._entries.get(self._key_of(name, map_name)[0])
 
     def clear_expired(self, minutes: int = 60):
         """Xóa boss đã xuất hiện quá lâu."""
-        now = datetime.now()
-        self.bosses = [b for b in self.bosses if (now - b['time']).total_seconds() < minutes * 60]
+        self._purge_expired(minutes)
+
+    def predict_next(self, boss: str) -> Optional[BossPrediction]:
+        """
+        Dự đoán lần xuất hiện kế tiếp của `boss` từ lịch sử (None nếu chưa đủ dữ liệu).
+        Không có tên trùng khớp thì xét mọi boss có tên chứa `boss` và lấy dự đoán sớm nhất.
+        Kết quả được cache tới sự kiện boss kế tiếp nên gọi mỗi tick vẫn rẻ.
+        """
+        return BOSS_HISTORY.predict_matching(boss)
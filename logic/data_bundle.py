@@ -0,0 +1,194 @@
+"""
+Data Bundle - Gói dữ liệu game đã biên dịch sẵn (pickle có header version + hash nguồn).
+
+Gom các dữ liệu trước đây phải parse/dựng lại mỗi lần chạy (hoặc mỗi tài khoản):
+  - data/*.txt (tên mob/item dạng `id,tên`)
+  - maps_config.json (mỗi AutoMainQuest đọc lại khi khởi tạo)
+  - đồ thị liên kết map của XMap (tuple thường; XMap dựng NextMap một lần khi dùng lần đầu)
+  - tên map (logic/map_data.py), tên NPC (logic/npc_names.py), vị trí quái (logic/game_data.py)
+
+Bundle được lưu ở `data/game_data.bundle`. Header chứa SHA-1 của toàn bộ file nguồn,
+nên khi một file nguồn đổi, bundle tự biên dịch lại ở lần `get_bundle()` kế tiếp.
+
+Biên dịch thủ công: python -m logic.data_bundle
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+from logs.logger_config import get_logger
+
+logger = get_logger("logic.data_bundle")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+BUNDLE_PATH = os.path.join(DATA_DIR, "game_data.bundle")
+MAPS_CONFIG_PATH = os.path.join(PROJECT_ROOT, "maps_config.json")
+
+BUNDLE_MAGIC = b"NROD"
+BUNDLE_VERSION = 2  # 2: liên kết XMap lưu dạng tuple, không pickle NextMap
+_HEADER = struct.Struct("<4sI20s")  # magic, version, sha1 nguồn
+
+
+def source_files(data_dir: str = DATA_DIR) -> List[str]:
+    """Danh sách file nguồn của bundle (thứ tự cố định để hash ổn định)."""
+    files = sorted(glob.glob(os.path.join(data_dir, "*.txt")))
+    files.append(MAPS_CONFIG_PATH)
+    for module in ("map_data.py", "npc_names.py", "game_data.py", "xmap.py", "data_bundle.py"):
+        files.append(os.path.join(PROJECT_ROOT, "logic", module))
+    return files
+
+
+def _stat_signature(files: List[str]) -> Tuple:
+    sig = []
+    for path in files:
+        try:
+            st = os.stat(path)
+            sig.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((path, None, None))
+    return tuple(sig)
+
+
+def source_digest(files: List[str]) -> bytes:
+    """SHA-1 trên (tên file, nội dung) của mọi file nguồn; file thiếu vẫn được tính (rỗng)."""
+    h = hashlib.sha1()
+    h.update(struct.pack("<I", BUNDLE_VERSION))
+    for path in files:
+        h.update(os.path.relpath(path, PROJECT_ROOT).encode("utf-8"))
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"\0missing")
+    return h.digest()
+
+
+def read_id_name_file(path: str) -> Dict[int, str]:
+    """Đọc file dạng `id,tên` mỗi dòng (data/mob_data.txt, data/item_data.txt)."""
+    result: Dict[int, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.strip().split(",")
+                if len(parts) < 2:
+                    continue
+                try:
+                    result[int(parts[0])] = parts[1].strip()
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        logger.warning(f"Không tìm thấy file {path}.")
+    except Exception as e:
+        logger.error(f"Lỗi khi nạp {path}: {e}")
+    return result
+
+
+def _read_maps_config() -> dict:
+    try:
+        with open(MAPS_CONFIG_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {"maps": []}
+
+
+def compile_payload(data_dir: str = DATA_DIR) -> dict:
+    """Dựng nội dung bundle từ các file nguồn."""
+    from logic.map_data import MAP_ID_TO_NAME
+    from logic.npc_names import NPC_NAMES
+    from logic.game_data import MOB_LOCATION_DATA
+    from logic.xmap import XMap
+
+    link_maps, direction_overrides, map_groups = XMap.build_map_graph()
+    return {
+        "mobs": read_id_name_file(os.path.join(data_dir, "mob_data.txt")),
+        "items": read_id_name_file(os.path.join(data_dir, "item_data.txt")),
+        "maps": dict(MAP_ID_TO_NAME),
+        "npcs": dict(NPC_NAMES),
+        "mob_locations": dict(MOB_LOCATION_DATA),
+        "maps_config": _read_maps_config(),
+        "xmap": {
+            "link_maps": link_maps,
+            "direction_overrides": direction_overrides,
+            "map_groups": map_groups,
+        },
+    }
+
+
+def build_bundle(path: str = BUNDLE_PATH, data_dir: str = DATA_DIR) -> dict:
+    """Biên dịch và ghi bundle (ghi file tạm rồi os.replace để không để lại file hỏng)."""
+    digest = source_digest(source_files(data_dir))
+    payload = compile_payload(data_dir)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, digest))
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Không ghi được data bundle {path}: {e}")
+    return payload
+
+
+def load_bundle(path: str = BUNDLE_PATH, data_dir: str = DATA_DIR) -> Optional[dict]:
+    """Đọc bundle nếu header khớp version và hash nguồn hiện tại, ngược lại trả về None."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, version, digest = _HEADER.unpack(header)
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+                return None
+            if digest != source_digest(source_files(data_dir)):
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Data bundle {path} hỏng, sẽ biên dịch lại: {e}")
+        return None
+
+
+_cache: Dict[str, object] = {"signature": None, "payload": None}
+
+
+def get_bundle(data_dir: str = DATA_DIR) -> dict:
+    """Bundle hiện tại (dùng chung toàn process).
+
+    Mỗi lần gọi chỉ stat các file nguồn; khi có file đổi mới kiểm tra hash và
+    biên dịch lại nếu cần.
+    """
+    signature = _stat_signature(source_files(data_dir))
+    if _cache["payload"] is not None and _cache["signature"] == signature:
+        return _cache["payload"]
+
+    start = time.perf_counter()
+    payload = load_bundle(data_dir=data_dir)
+    action = "Đã nạp"
+    if payload is None:
+        payload = build_bundle(data_dir=data_dir)
+        action = "Đã biên dịch"
+    logger.debug(f"{action} data bundle trong {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    _cache["signature"] = _stat_signature(source_files(data_dir))
+    _cache["payload"] = payload
+    return payload
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    bundle = build_bundle()
+    t1 = time.perf_counter()
+    _cache["payload"] = None
+    get_bundle()
+    t2 = time.perf_counter()
+    print(f"Đã biên dịch {BUNDLE_PATH} ({os.path.getsize(BUNDLE_PATH)} bytes) trong {(t1 - t0) * 1000:.1f}ms")
+    print(f"  mobs={len(bundle['mobs'])} items={len(bundle['items'])} maps={len(bundle['maps'])} "
+          f"npcs={len(bundle['npcs'])} links={sum(len(v) for v in bundle['xmap']['link_maps'].values())}")
+    print(f"Nạp lại từ bundle: {(t2 - t1) * 1000:.1f}ms")
@@ -0,0 +1,181 @@
+"""
+Game Data Registry - Bảng dữ liệu game dùng chung cho mọi tài khoản.
+
+Gom các bảng tên/ID trước đây bị nạp/lặp lại ở nhiều nơi:
+  - mob:  data/mob_data.txt (+ template từ gói UPDATE_MAP) -> đồng bộ MOB_TEMPLATES
+  - item: data/item_data.txt -> đồng bộ ITEM_TEMPLATES
+  - map:  logic/map_data.py (MAP_ID_TO_NAME / MAP_NAME_TO_ID)
+  - npc:  logic/npc_names.py (NPC_NAMES)
+  - vị trí quái: MOB_LOCATION_DATA (tên quái -> (map_id, mob_template_id))
+
+Chuỗi được intern, mỗi bảng tra cứu O(1) theo ID -> tên, tên -> ID và tên đã chuẩn hóa
+(chữ thường, bỏ dấu, gộp khoảng trắng) -> ID. Nạp một lần bằng `GAME_DATA.load()`,
+dữ liệu lấy từ data bundle đã biên dịch (logic/data_bundle.py).
+"""
+import sys
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from logs.logger_config import get_logger
+from model.game_objects import ITEM_TEMPLATES, MOB_TEMPLATES, MobTemplate
+
+logger = get_logger("logic.game_data")
+
+# Tên quái (chữ thường) -> (map_id nơi quái xuất hiện, mob template ID)
+MOB_LOCATION_DATA = {
+    "mộc nhân": (14, 0), "khủng long": (1, 1), "lợn lòi": (8, 2), "quỷ đất": (15, 3),
+    "khủng long mẹ": (2, 4), "lợn lòi mẹ": (9, 5), "quỷ đất mẹ": (16, 6),
+    "thằn lằn bay": (3, 7), "phi long": (11, 8), "quỷ bay": (17, 9), "thằn lằn mẹ": (4, 10),
+    "phi long mẹ": (12, 11), "quỷ bay mẹ": (18, 12),
+    "ốc mượn hồn": (29, 13), "ốc sên": (33, 14), "heo xayda mẹ": (37, 15),
+    "heo rừng": (28, 16), "heo da xanh": (32, 17), "heo xayda": (36, 18),
+    "heo rừng mẹ": (6, 19), "heo xanh mẹ": (10, 20), "alien": (19, 21),
+    "bulon": (30, 22), "ukulele": (34, 23), "quỷ mập": (38, 24),
+    "tambourine": (6, 25), "drum": (10, 26), "akkuman": (19, 27),
+    "không tặc": (29, 31), "quỷ đầu to": (33, 32), "quỷ địa ngục": (37, 33),
+    "nappa": (68, 39), "soldier": (70, 40), "appule": (71, 41), "raspberry": (71, 42),
+    "thằn lằn xanh": (72, 43), "quỷ đầu nhọn": (64, 44), "quỷ đầu vàng": (63, 45),
+    "quỷ da tím": (66, 46), "quỷ già": (67, 47), "cá sấu": (73, 48),
+    "dơi da xanh": (67, 49), "quỷ chim": (81, 50), "lính đầu trọc": (74, 51),
+    "lính tai dài": (76, 52), "lính vũ trụ": (77, 53), "khỉ lông đen": (82, 54),
+    "khỉ giáp sắt": (83, 55), "khỉ lông đỏ": (79, 56), "khỉ lông vàng": (80, 57),
+    "xên con cấp 1": (92, 58), "xên con cấp 2": (93, 59), "xên con cấp 3": (94, 60),
+    "xên con cấp 4": (96, 61), "xên con cấp 5": (97, 62), "xên con cấp 6": (98, 63),
+    "xên con cấp 7": (99, 64), "xên con cấp 8": (100, 65), "tai tím": (106, 66),
+    "abo": (107, 67), "kado": (109, 68), "da xanh": (110, 69),
+    "khỉ lông xanh": (155, 78), "taburine đỏ": (155, 79),
+    "ếch mặt đỏ": (166, 86), "jinai": (166, 87),
+}
+
+
+def normalize_name(name: str) -> str:
+    """Chuẩn hóa tên để so khớp: chữ thường, bỏ dấu tiếng Việt (kể cả đ), gộp khoảng trắng."""
+    text = unicodedata.normalize('NFD', name.lower().replace('đ', 'd'))
+    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    return ' '.join(text.split())
+
+
+class NameTable:
+    """Bảng ID <-> tên với tra cứu O(1). Trùng tên thì ID thêm sau được ưu tiên (như MAP_NAME_TO_ID).
+
+    Hỗ trợ `get(id, default)`, `table[id]`, `id in table`, `items()` để thay thế các dict cũ.
+    """
+    __slots__ = ('_by_id', '_by_name', '_by_norm')
+
+    def __init__(self):
+        self._by_id: Dict[int, str] = {}
+        self._by_name: Dict[str, int] = {}
+        self._by_norm: Dict[str, int] = {}
+
+    def add(self, id_: int, name: str):
+        name = sys.intern(name.strip())
+        self._by_id[id_] = name
+        self._by_name[name] = id_
+        self._by_norm[sys.intern(normalize_name(name))] = id_
+
+    def update(self, mapping: Dict[int, str]):
+        for id_, name in mapping.items():
+            self.add(id_, name)
+
+    def name(self, id_: int, default: Optional[str] = None) -> Optional[str]:
+        return self._by_id.get(id_, default)
+
+    def id_of(self, name: str, default: Optional[int] = None) -> Optional[int]:
+        """ID theo tên chính xác, nếu không có thì theo tên chuẩn hóa."""
+        id_ = self._by_name.get(name)
+        if id_ is None:
+            id_ = self._by_norm.get(normalize_name(name))
+        return default if id_ is None else id_
+
+    def search(self, fragment: str) -> List[Tuple[int, str]]:
+        """Các (ID, tên) có tên chuẩn hóa chứa `fragment` (đã chuẩn hóa)."""
+        key = normalize_name(fragment)
+        return [(id_, self._by_id[id_]) for norm, id_ in self._by_norm.items() if key in norm]
+
+    def get(self, id_: int, default: Optional[str] = None) -> Optional[str]:
+        return self._by_id.get(id_, default)
+
+    def __getitem__(self, id_: int) -> str:
+        return self._by_id[id_]
+
+    def __contains__(self, id_) -> bool:
+        return id_ in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._by_id)
+
+    def keys(self):
+        return self._by_id.keys()
+
+    def items(self):
+        return self._by_id.items()
+
+    def name_to_id(self) -> Dict[str, int]:
+        """View tên -> ID (chỉ đọc)."""
+        return self._by_name
+
+
+class GameData:
+    """Registry dữ liệu game: mobs, items, maps, npcs và vị trí quái."""
+
+    def __init__(self):
+        self.mobs = NameTable()
+        self.items = NameTable()
+        self.maps = NameTable()
+        self.npcs = NameTable()
+        self._mob_locations: Dict[str, Tuple[int, int]] = {}
+        self.loaded = False
+
+    def load(self):
+        """Nạp toàn bộ bảng một lần; các lần gọi sau không làm gì."""
+        if self.loaded:
+            return
+        from logic.data_bundle import get_bundle
+        bundle = get_bundle()
+
+        for mob_id, name in bundle["mobs"].items():
+            self._add_mob(mob_id, name)
+        for item_id, name in bundle["items"].items():
+            self._add_item(item_id, name)
+        self.maps.update(bundle["maps"])
+        self.npcs.update(bundle["npcs"])
+        for name, location in bundle["mob_locations"].items():
+            self._mob_locations[sys.intern(normalize_name(name))] = location
+
+        self.loaded = True
+        logger.info(f"Đã nạp dữ liệu game: {len(self.mobs)} mob, {len(self.items)} item, "
+                    f"{len(self.maps)} map, {len(self.npcs)} npc.")
+
+    def _add_mob(self, mob_id: int, name: str):
+        self.mobs.add(mob_id, name)
+        if mob_id not in MOB_TEMPLATES:
+            MOB_TEMPLATES[mob_id] = MobTemplate(mob_template_id=mob_id, name=self.mobs.name(mob_id))
+
+    def _add_item(self, item_id: int, name: str):
+        self.items.add(item_id, name)
+        ITEM_TEMPLATES[item_id] = self.items.name(item_id)
+
+    def update_mob_template(self, template: MobTemplate):
+        """Cập nhật template từ server (UPDATE_MAP). Giữ object cũ nếu dữ liệu không đổi để
+        mọi tài khoản dùng chung một bản."""
+        template.name = sys.intern(template.name)
+        current = MOB_TEMPLATES.get(template.mob_template_id)
+        if current != template:
+            MOB_TEMPLATES[template.mob_template_id] = template
+
+    def mob_name(self, template_id: int, default: Optional[str] = None) -> Optional[str]:
+        """Tên quái: ưu tiên template server gửi, sau đó tới data/mob_data.txt."""
+        template = MOB_TEMPLATES.get(template_id)
+        if template is not None and template.name:
+            return template.name
+        return self.mobs.name(template_id, default)
+
+    def mob_location(self, name: str) -> Optional[Tuple[int, int]]:
+        """(map_id, mob_template_id) theo tên quái (so khớp tên chuẩn hóa)."""
+        return self._mob_locations.get(normalize_name(name))
+
+
+GAME_DATA = GameData()
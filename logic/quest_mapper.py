@@ -1,5 +1,6 @@
 from typing import Optional
 from model.game_objects import Task
+from logic.text_classifier import TEXT_CLASSIFIER
 
 class QuestMapper:
     """Helper class giúp map nhiệm vụ sang Boss tương ứng"""
@@ -29,24 +30,22 @@ class QuestMapper:
         """
         if not task:
             return None
-            
-        # 1. Check sub_names (name of current step)
+
+        # Thứ tự kiểm tra: bước hiện tại -> chi tiết -> tên nhiệm vụ (ít cụ thể nhất)
+        texts = []
         if task.index < len(task.sub_names):
-            current_step = task.sub_names[task.index].lower()
-            for keyword, boss_name in QuestMapper.KEYWORD_TO_BOSS.items():
-                if keyword in current_step:
-                    return boss_name.strip()
+            texts.append(task.sub_names[task.index])
+        texts.extend((task.detail, task.name))
 
-        # 2. Check task detail
-        detail_lower = task.detail.lower()
-        for keyword, boss_name in QuestMapper.KEYWORD_TO_BOSS.items():
-            if keyword in detail_lower:
-                return boss_name.strip()
+        for text in texts:
+            found = TEXT_CLASSIFIER.classify(text).keywords("quest_boss")
+            if found:
+                # Nhiều từ khóa cùng trúng: ưu tiên theo thứ tự trong KEYWORD_TO_BOSS (VD: "fide 1" trước "fide")
+                for keyword, boss_name in QuestMapper.KEYWORD_TO_BOSS.items():
+                    if keyword in found:
+                        return boss_name.strip()
 
-        # 3. Check task name (least specific)
-        name_lower = task.name.lower()
-        for keyword, boss_name in QuestMapper.KEYWORD_TO_BOSS.items():
-            if keyword in name_lower:
-                return boss_name.strip()
-        
         return None
+
+
+TEXT_CLASSIFIER.register("quest_boss", QuestMapper.KEYWORD_TO_BOSS)
@@ -0,0 +1,171 @@
+"""
+Spatial Index - Chỉ mục không gian (lưới đều) cho mobs/chars trong map hiện tại.
+
+Mỗi Controller giữ 2 chỉ mục: `mob_index` (chỉ chứa mob còn sống, đánh được) và
+`char_index` (người chơi/boss trong map). Các handler cập nhật tăng dần theo gói tin
+(MAP_INFO, MOB_HP, NPC_DIE, NPC_LIVE, PLAYER_ADD/MOVE...), logic chọn mục tiêu chỉ
+cần hỏi k-gần-nhất hoặc trong-bán-kính thay vì quét toàn bộ mỗi tick.
+
+Mọi so sánh khoảng cách dùng bình phương (không gọi sqrt).
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class SpatialIndex:
+    """Lưới đều ô `cell_size` px; mỗi entry gồm key, tọa độ, tag (vd. template_id) và object."""
+
+    def __init__(self, cell_size: int = 96):
+        self.cell_size = cell_size
+        self._entries: Dict[Any, Tuple[int, int, Any, Any]] = {}  # key -> (x, y, tag, obj)
+        self._cells: Dict[Tuple[int, int], Set[Any]] = {}
+        self._bounds: Optional[List[int]] = None  # [min_cx, min_cy, max_cx, max_cy]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def _cell(self, x: int, y: int) -> Tuple[int, int]:
+        return x // self.cell_size, y // self.cell_size
+
+    def clear(self):
+        self._entries.clear()
+        self._cells.clear()
+        self._bounds = None
+
+    def insert(self, key, x: int, y: int, obj: Any, tag: Any = None):
+        """Thêm hoặc cập nhật entry `key` tại (x, y)."""
+        if key in self._entries:
+            self.remove(key)
+        self._entries[key] = (x, y, tag, obj)
+        cell = self._cell(x, y)
+        self._cells.setdefault(cell, set()).add(key)
+        b = self._bounds
+        if b is None:
+            self._bounds = [cell[0], cell[1], cell[0], cell[1]]
+        else:
+            if cell[0] < b[0]: b[0] = cell[0]
+            if cell[1] < b[1]: b[1] = cell[1]
+            if cell[0] > b[2]: b[2] = cell[0]
+            if cell[1] > b[3]: b[3] = cell[1]
+
+    def move(self, key, x: int, y: int):
+        """Cập nhật tọa độ cho entry đã có (bỏ qua nếu key không tồn tại)."""
+        entry = self._entries.get(key)
+        if entry is not None and (entry[0] != x or entry[1] != y):
+            self.insert(key, x, y, entry[3], entry[2])
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        cell = self._cell(entry[0], entry[1])
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def _matches(self, entry, tags: Optional[Set], predicate: Optional[Callable]) -> bool:
+        if tags and entry[2] not in tags:
+            return False
+        return predicate is None or predicate(entry[3])
+
+    def nearest(self, x: int, y: int, k: int = 1, max_dist: float = None,
+                tags: Optional[Set] = None, predicate: Optional[Callable] = None) -> List[Tuple[int, Any]]:
+        """k entry gần (x, y) nhất, trả về [(khoảng cách bình phương, obj)] tăng dần.
+
+        Args:
+            max_dist: Bán kính tối đa (px), None = không giới hạn
+            tags: Chỉ lấy entry có tag thuộc tập này (vd. template_id của mob)
+            predicate: Bộ lọc bổ sung trên obj
+        """
+        if not self._entries or k <= 0:
+            return []
+        max_d2 = None if max_dist is None else max_dist * max_dist
+        qx, qy = self._cell(x, y)
+        b = self._bounds
+        max_ring = max(qx - b[0], b[2] - qx, qy - b[1], b[3] - qy, 0)
+        cs = self.cell_size
+        found: List[Tuple[int, Any]] = []
+
+        for r in range(max_ring + 1):
+            # Khoảng cách nhỏ nhất từ điểm truy vấn tới một ô thuộc vòng r
+            lower = (r - 1) * cs if r > 0 else 0
+            lower2 = lower * lower
+            if max_d2 is not None and lower2 > max_d2:
+                break
+            if len(found) >= k and lower2 > found[k - 1][0]:
+                break
+
+            for cell in self._ring(qx, qy, r):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for key in bucket:
+                    entry = self._entries[key]
+                    d2 = (entry[0] - x) ** 2 + (entry[1] - y) ** 2
+                    if max_d2 is not None and d2 > max_d2:
+                        continue
+                    if not self._matches(entry, tags, predicate):
+                        continue
+                    found.append((d2, entry[3]))
+            if found:
+                found.sort(key=lambda item: item[0])
+                del found[k:]
+        return found
+
+    def nearest_one(self, x: int, y: int, max_dist: float = None,
+                    tags: Optional[Set] = None, predicate: Optional[Callable] = None) -> Tuple[Optional[int], Any]:
+        """Tiện ích: (khoảng cách bình phương, obj) gần nhất, hoặc (None, None)."""
+        result = self.nearest(x, y, 1, max_dist, tags, predicate)
+        return result[0] if result else (None, None)
+
+    def within(self, x: int, y: int, radius: float,
+               tags: Optional[Set] = None, predicate: Optional[Callable] = None) -> List[Tuple[int, Any]]:
+        """Tất cả entry trong bán kính `radius` quanh (x, y), sắp theo khoảng cách bình phương."""
+        if not self._entries:
+            return []
+        r2 = radius * radius
+        x0, y0 = self._cell(int(x - radius), int(y - radius))
+        x1, y1 = self._cell(int(x + radius), int(y + radius))
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self._cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for key in bucket:
+                    entry = self._entries[key]
+                    d2 = (entry[0] - x) ** 2 + (entry[1] - y) ** 2
+                    if d2 <= r2 and self._matches(entry, tags, predicate):
+                        found.append((d2, entry[3]))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    @staticmethod
+    def _ring(qx: int, qy: int, r: int) -> Iterable[Tuple[int, int]]:
+        """Các ô có khoảng cách Chebyshev đúng bằng r tính từ (qx, qy)."""
+        if r == 0:
+            yield (qx, qy)
+            return
+        for cx in range(qx - r, qx + r + 1):
+            yield (cx, qy - r)
+            yield (cx, qy + r)
+        for cy in range(qy - r + 1, qy + r):
+            yield (qx - r, cy)
+            yield (qx + r, cy)
+
+
+def is_mob_attackable(mob) -> bool:
+    """Mob còn sống và đánh được (cùng điều kiện lọc của AutoPlay)."""
+    return mob.status > 1 and mob.hp > 0 and not mob.is_mob_me
+
+
+def index_mob(index: SpatialIndex, mob):
+    """Đồng bộ một mob vào `mob_index`: thêm/cập nhật nếu đánh được, xóa nếu không."""
+    if is_mob_attackable(mob):
+        index.insert(mob.mob_id, mob.x, mob.y, mob, mob.template_id)
+    else:
+        index.remove(mob.mob_id)
@@ -1,9 +1,17 @@
 """
 Target Utilities - Reusable focus functions for targeting system
 Có thể dùng bởi AutoAttack, AI Core, AutoBoss, và các tools khác
+
+Tìm kiếm mob dùng tập quái còn sống của `controller.combat_handler` (kèm `mob_index`),
+char dùng `controller.char_index` (logic/spatial_index.py); so sánh khoảng cách bằng bình phương.
 """
-import math
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+
+logger = get_logger("logic.target_utils")
+
+
+def _char_alive(char_data: dict) -> bool:
+    return char_data.get('hp', 0) > -1  # HP > -1 cho char
 
 
 def focus_nearest_mob(controller, max_distance: float = 100) -> bool:
@@ -18,21 +26,14 @@ def focus_nearest_mob(controller, max_distance: float = 100) -> bool:
         True nếu tìm thấy và focus thành công, False nếu không
     """
     my_char = controller.account.char
-    nearest_mob = None
-    min_distance = float('inf')
     
-    # Tìm mob gần nhất
-    for mob_id, mob in controller.mobs.items():
-        if mob.hp > -1:  # Mob chết có HP = -1, không phải 0 (theo auto_play.py)
-            dist = math.sqrt((mob.x - my_char.cx)**2 + (mob.y - my_char.cy)**2)
-            if dist <= max_distance and dist < min_distance:
-                min_distance = dist
-                nearest_mob = mob
+    # Tìm mob gần nhất trong tập quái còn sống
+    min_d2, nearest_mob = controller.combat_handler.nearest_alive(my_char.cx, my_char.cy, max_dist=max_distance)
     
     # Focus vào mob gần nhất
     if nearest_mob:
         my_char.mob_focus = nearest_mob
-        logger.debug(f"Target Utils: Focused Mob {nearest_mob.mob_id} ({min_distance:.1f}px)")
+        logger.debug(f"Target Utils: Focused Mob {nearest_mob.mob_id} ({min_d2 ** 0.5:.1f}px)")
         return True
     
     return False
@@ -50,23 +51,15 @@ def focus_nearest_char(controller, max_distance: float = 100) -> bool:
         True nếu tìm thấy và focus thành công, False nếu không
     """
     my_char = controller.account.char
-    nearest_char = None
-    min_distance = float('inf')
     
     # Tìm char gần nhất
-    for char_id, char_data in controller.chars.items():
-        if char_data.get('hp', 0) > -1:  # HP > -1 cho char
-            char_x = char_data.get('x', 0)
-            char_y = char_data.get('y', 0)
-            dist = math.sqrt((char_x - my_char.cx)**2 + (char_y - my_char.cy)**2)
-            if dist <= max_distance and dist < min_distance:
-                min_distance = dist
-                nearest_char = char_data
+    min_d2, nearest_char = controller.char_index.nearest_one(
+        my_char.cx, my_char.cy, max_distance, predicate=_char_alive)
     
     # Focus vào char gần nhất
     if nearest_char:
         my_char.char_focus = nearest_char
-        logger.debug(f"Target Utils: Focused Char {nearest_char.get('id')} ({min_distance:.1f}px)")
+        logger.debug(f"Target Utils: Focused Char {nearest_char.get('id')} ({min_d2 ** 0.5:.1f}px)")
         return True
     
     return False
@@ -85,54 +78,39 @@ def focus_nearest_target(controller, prefer_boss: bool = False, max_distance: fl
         True nếu tìm thấy và focus thành công, False nếu không
     """
     my_char = controller.account.char
-    nearest_mob = None
-    nearest_char = None
-    min_mob_dist = float('inf')
-    min_char_dist = float('inf')
     
     # Tìm mob gần nhất
-    for mob_id, mob in controller.mobs.items():
-        if mob.hp > -1:  # HP > -1 theo auto_play.py
-            dist = math.sqrt((mob.x - my_char.cx)**2 + (mob.y - my_char.cy)**2)
-            if dist <= max_distance and dist < min_mob_dist:
-                min_mob_dist = dist
-                nearest_mob = mob
+    min_mob_d2, nearest_mob = controller.combat_handler.nearest_alive(my_char.cx, my_char.cy, max_dist=max_distance)
     
     # Tìm char gần nhất
-    for char_id, char_data in controller.chars.items():
-        if char_data.get('hp', 0) > -1:  # HP > -1 cho char
-            char_x = char_data.get('x', 0)
-            char_y = char_data.get('y', 0)
-            dist = math.sqrt((char_x - my_char.cx)**2 + (char_y - my_char.cy)**2)
-            if dist <= max_distance and dist < min_char_dist:
-                min_char_dist = dist
-                nearest_char = char_data
+    min_char_d2, nearest_char = controller.char_index.nearest_one(
+        my_char.cx, my_char.cy, max_distance, predicate=_char_alive)
     
     # Quyết định focus vào target nào
     if prefer_boss and nearest_char:
         # Ưu tiên boss: focus char nếu có
         my_char.char_focus = nearest_char
-        logger.debug(f"Target Utils: Focused Char {nearest_char.get('id')} ({min_char_dist:.1f}px) [prefer_boss]")
+        logger.debug(f"Target Utils: Focused Char {nearest_char.get('id')} ({min_char_d2 ** 0.5:.1f}px) [prefer_boss]")
         return True
     elif nearest_mob and nearest_char:
         # Có cả 2: chọn target gần hơn
-        if min_mob_dist <= min_char_dist:
+        if min_mob_d2 <= min_char_d2:
             my_char.mob_focus = nearest_mob
-            logger.debug(f"Target Utils: Focused Mob {nearest_mob.mob_id} ({min_mob_dist:.1f}px)")
+            logger.debug(f"Target Utils: Focused Mob {nearest_mob.mob_id} ({min_mob_d2 ** 0.5:.1f}px)")
             return True
         else:
             my_char.char_focus = nearest_char
-            logger.debug(f"Target Utils: Focused Char {nearest_char.get('id')} ({min_char_dist:.1f}px)")
+            logger.debug(f"Target Utils: Focused Char {nearest_char.get('id')} ({min_char_d2 ** 0.5:.1f}px)")
             return True
     elif nearest_mob:
         # Chỉ có mob
         my_char.mob_focus = nearest_mob
-        logger.debug(f"Target Utils: Focused Mob {nearest_mob.mob_id} ({min_mob_dist:.1f}px)")
+        logger.debug(f"Target Utils: Focused Mob {nearest_mob.mob_id} ({min_mob_d2 ** 0.5:.1f}px)")
         return True
     elif nearest_char:
         # Chỉ có char
         my_char.char_focus = nearest_char
-        logger.debug(f"Target Utils: Focused Char {nearest_char.get('id')} ({min_char_dist:.1f}px)")
+        logger.debug(f"Target Utils: Focused Char {nearest_char.get('id')} ({min_char_d2 ** 0.5:.1f}px)")
         return True
     
     return False
@@ -157,39 +135,29 @@ def focus_by_name(controller, name: str, target_type: str = "both", max_distance
     
     # Tìm mob theo tên
     if target_type in ["mob", "both"]:
-        for mob_id, mob in controller.mobs.items():
-            if mob.hp > -1:  # HP > -1 theo auto_play.py
-                mob_name = mob.name.lower()
-                if name_lower in mob_name:
-                    dist = math.sqrt((mob.x - my_char.cx)**2 + (mob.y - my_char.cy)**2)
-                    if dist <= max_distance:
-                        found_targets.append(("mob", mob, dist, mob.name))
+        for d2, mob in controller.mob_index.within(my_char.cx, my_char.cy, max_distance):
+            if name_lower in mob.name.lower():
+                found_targets.append(("mob", mob, d2, mob.name))
     
     # Tìm char theo tên
     if target_type in ["char", "both"]:
-        for char_id, char_data in controller.chars.items():
-            if char_data.get('hp', 0) > -1:  # HP > -1 cho char
-                char_name = char_data.get('name', '').lower()
-                if name_lower in char_name:
-                    char_x = char_data.get('x', 0)
-                    char_y = char_data.get('y', 0)
-                    dist = math.sqrt((char_x - my_char.cx)**2 + (char_y - my_char.cy)**2)
-                    if dist <= max_distance:
-                        found_targets.append(("char", char_data, dist, char_data.get('name', 'Unknown')))
+        for d2, char_data in controller.char_index.within(my_char.cx, my_char.cy, max_distance, predicate=_char_alive):
+            if name_lower in char_data.get('name', '').lower():
+                found_targets.append(("char", char_data, d2, char_data.get('name', 'Unknown')))
     
     if not found_targets:
         return False
     
     # Chọn target gần nhất trong danh sách match
     found_targets.sort(key=lambda x: x[2])  # Sort by distance
-    target_kind, target_obj, target_dist, target_name = found_targets[0]
+    target_kind, target_obj, target_d2, target_name = found_targets[0]
     
     if target_kind == "mob":
         my_char.mob_focus = target_obj
-        logger.debug(f"Target Utils: Focused Mob '{target_name}' ID={target_obj.mob_id} ({target_dist:.1f}px)")
+        logger.debug(f"Target Utils: Focused Mob '{target_name}' ID={target_obj.mob_id} ({target_d2 ** 0.5:.1f}px)")
     else:  # char
         my_char.char_focus = target_obj
-        logger.debug(f"Target Utils: Focused Char '{target_name}' ID={target_obj.get('id')} ({target_dist:.1f}px)")
+        logger.debug(f"Target Utils: Focused Char '{target_name}' ID={target_obj.get('id')} ({target_d2 ** 0.5:.1f}px)")
     
     return True
 
@@ -211,7 +179,7 @@ def focus_by_id(controller, mob_id: int = None, char_id: int = None) -> bool:
     # Focus mob by ID
     if mob_id is not None:
         mob = controller.mobs.get(mob_id)
-        if mob and mob.hp > -1:  # HP > -1 theo auto_play.py
+        if mob and controller.combat_handler.is_alive(mob_id):
             my_char.mob_focus = mob
             logger.debug(f"Target Utils: Focused Mob ID={mob_id}")
             return True
@@ -0,0 +1,182 @@
+"""
+TextClassifier - Phân loại thông báo / chat từ server bằng một lượt quét.
+
+Các module đăng ký bộ từ khóa theo nhóm (`TEXT_CLASSIFIER.register("giftcode_used", [...])`); tất cả
+được dựng thành MỘT automaton Aho-Corasick (dựng lại lười khi có nhóm mới). `classify(text)` hạ
+chữ thường một lần, quét một lượt và trả về `TextMatch` gồm mọi nhóm + từ khóa trúng, kèm kết quả
+phân tích thông báo boss (regex biên dịch sẵn, chỉ chạy khi automaton thấy từ khóa boss).
+
+Cùng một thông báo thế giới tới cả nghìn tài khoản, nên kết quả được cache theo chuỗi gốc:
+tài khoản thứ 2..N chỉ tốn một lần tra dict.
+
+    match = TEXT_CLASSIFIER.classify(text)
+    if match.boss_appear: name, map_name, zone = match.boss_appear
+    if match.has("msm", "không đủ") and match.has("msm", "vàng"): ...
+"""
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+CACHE_SIZE = 2048
+
+# ── Ngữ pháp thông báo boss ──
+BOSS_APPEAR = "boss_appear"
+BOSS_DEATH = "boss_death"
+_BOSS_PREFIX = re.compile(r"(?:Boss|boss|BOSS) ")
+_APPEAR_RE = re.compile(r"^(?P<name>.*?) (?:vừa |đã )?xuất hiện tại (?P<loc>.*)$", re.S)
+_DEATH_RE = re.compile(r" vừa tiêu diệt được (?P<name>.*?)(?: mọi người|$)", re.S)
+
+
+def parse_boss_appear(text: str) -> Optional[Tuple[str, str, int]]:
+    """'<Boss> vừa xuất hiện tại <map> [khu vực <zone>]' -> (tên, map, zone | -1)."""
+    m = _APPEAR_RE.match(_BOSS_PREFIX.sub("", text))
+    if not m:
+        return None
+    loc = m.group("loc")
+    map_name, zone_id = loc.strip(), -1
+    if "khu vực" in loc:
+        map_part, _, zone_part = loc.partition(" khu vực ")
+        map_name = map_part.strip()
+        try:
+            zone_id = int(zone_part.strip())
+        except ValueError:
+            pass
+    return m.group("name").strip(), map_name, zone_id
+
+
+def parse_boss_death(text: str) -> Optional[str]:
+    """'<người chơi> vừa tiêu diệt được <Boss> mọi người ...' -> tên boss."""
+    m = _DEATH_RE.search(text)
+    return m.group("name").strip() if m else None
+
+
+@dataclass(frozen=True, slots=True)
+class TextMatch:
+    """Kết quả phân loại một chuỗi: nhóm -> các từ khóa trúng, và thông báo boss (nếu có)."""
+    hits: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    boss_appear: Optional[Tuple[str, str, int]] = None
+    boss_death: Optional[str] = None
+
+    def has(self, category: str, keyword: Optional[str] = None) -> bool:
+        """Có trúng nhóm `category` (và đúng từ khóa `keyword` nếu truyền) hay không."""
+        found = self.hits.get(category)
+        if found is None:
+            return False
+        return keyword is None or keyword in found
+
+    def keywords(self, category: str) -> FrozenSet[str]:
+        return self.hits.get(category, frozenset())
+
+
+_EMPTY = TextMatch()
+
+
+class AhoCorasick:
+    """Automaton Aho-Corasick: tìm mọi từ khóa trong một lượt quét (O(độ dài chuỗi + số lần trúng))."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Tuple[str, ...]] = [()]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._output.append(())
+            state = nxt
+        if pattern not in self._output[state]:
+            self._output[state] += (pattern,)
+
+    def _build(self):
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                fail[nxt] = self._goto[f].get(ch, 0)
+                # Gộp sẵn output theo chuỗi fail để lúc quét không phải đi ngược
+                self._output[nxt] += self._output[fail[nxt]]
+        self._fail = fail
+
+    def find(self, text: str) -> set:
+        """Tập các từ khóa xuất hiện trong `text`."""
+        goto, fail, output = self._goto, self._fail, self._output
+        root = goto[0]
+        found = set()
+        state = 0
+        for ch in text:
+            if state == 0 and ch not in root:
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class TextClassifier:
+    """Bộ phân loại dùng chung; các module đăng ký từ khóa khi import."""
+
+    def __init__(self):
+        self._categories: Dict[str, Tuple[str, ...]] = {}
+        self._keyword_categories: Dict[str, List[str]] = {}
+        self._automaton: Optional[AhoCorasick] = None
+        self._cache: Dict[str, TextMatch] = {}
+
+    def register(self, category: str, keywords: Iterable[str]):
+        """Đăng ký (hoặc thay) bộ từ khóa của nhóm `category`. So khớp không phân biệt hoa thường."""
+        self._categories[category] = tuple(dict.fromkeys(k.lower() for k in keywords))
+        self._keyword_categories = {}
+        for name, words in self._categories.items():
+            for word in words:
+                self._keyword_categories.setdefault(word, []).append(name)
+        self._automaton = None
+        self._cache.clear()
+
+    def categories(self) -> Dict[str, Tuple[str, ...]]:
+        return dict(self._categories)
+
+    def classify(self, text: str) -> TextMatch:
+        """Phân loại `text` (kết quả được cache theo chuỗi gốc)."""
+        if not text:
+            return _EMPTY
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        if self._automaton is None:
+            self._automaton = AhoCorasick(self._keyword_categories)
+        found = self._automaton.find(text.lower())
+
+        hits: Dict[str, set] = {}
+        for word in found:
+            for category in self._keyword_categories[word]:
+                hits.setdefault(category, set()).add(word)
+        result = TextMatch(
+            hits={c: frozenset(words) for c, words in hits.items()},
+            boss_appear=parse_boss_appear(text) if BOSS_APPEAR in hits else None,
+            boss_death=parse_boss_death(text) if BOSS_DEATH in hits else None,
+        )
+
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[text] = result
+        return result
+
+
+TEXT_CLASSIFIER = TextClassifier()
+TEXT_CLASSIFIER.register(BOSS_APPEAR, ["xuất hiện tại"])
+TEXT_CLASSIFIER.register(BOSS_DEATH, ["vừa tiêu diệt được"])
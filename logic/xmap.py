@@ -3,8 +3,19 @@ import asyncio
 import random
 import heapq
 from typing import List, Dict, Optional, Tuple
-from logs.logger_config import logger, TerminalColors as C
+from logs.logger_config import get_logger, logger_enabled, TerminalColors as C
+from controller.event_bus import MenuOpened, XMapStopped
 from network.service import Service
+from logic.game_data import GAME_DATA
+from logs.metrics import METRICS
+
+logger = get_logger("logic.xmap")
+
+XMAP_ROUTES = METRICS.counter("nro_xmap_routes_total", "Số lượt XMap theo kết quả (arrived/failed/stopped)", ("account", "result"))
+XMAP_ROUTE_SECONDS = METRICS.histogram("nro_xmap_route_seconds", "Thời gian một lượt XMap", ("account",),
+                                       buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120))
+XMAP_HOPS = METRICS.histogram("nro_xmap_hops", "Số lần chuyển map trong một lượt XMap", ("account",),
+                              buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24))
 
 class NextMap:
     """Cấu trúc dữ liệu lưu thông tin để di chuyển sang bản đồ kế tiếp"""
@@ -26,6 +37,25 @@ class NextMap:
         self.index_npc3 = index_npc3
         self.capsule_index = capsule_index
 
+    # Thứ tự tham số __init__: bundle lưu NextMap dạng tuple thường (unpickle không phải import module này)
+    FIELDS = ("map_id", "npc_id", "select_name", "select_name2", "select_name3", "walk", "x", "y",
+              "item_id", "index_npc", "index_npc2", "index_npc3", "capsule_index")
+
+    def to_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+
+# Đồ thị NextMap dựng từ bundle một lần cho mọi tài khoản: (link_maps thô của bundle, link_maps)
+_shared_link_maps: Tuple[Optional[dict], Dict[int, List[NextMap]]] = (None, {})
+
+
+def _link_maps_from_bundle(graph: dict) -> Dict[int, List[NextMap]]:
+    global _shared_link_maps
+    raw = graph["link_maps"]
+    if _shared_link_maps[0] is not raw:
+        _shared_link_maps = (raw, {u: [NextMap(*link) for link in links] for u, links in raw.items()})
+    return _shared_link_maps[1]
+
 class XMap:
     def __init__(self, controller):
         self.controller = controller
@@ -39,6 +69,7 @@ class XMap:
         self.update_interval =  0 # Tối ưu tốc độ
         self.processing_map_change = False
         self.expected_next_map_id = -1
+        self.started_at = 0.0
         self.last_action_time = 0
         
         self.dangerous_maps = set() # Lưu danh sách bản đồ có Boss/Nguy hiểm
@@ -59,7 +90,24 @@ class XMap:
             153, 156, 157, 158, 159
         }
         
-        self.init_map_data()
+        # Đồ thị liên kết map dựng sẵn trong data bundle, dùng chung (chỉ đọc) cho mọi tài khoản
+        from logic.data_bundle import get_bundle
+        graph = get_bundle()["xmap"]
+        self.link_maps = _link_maps_from_bundle(graph)
+        self.direction_overrides = graph["direction_overrides"]
+        self.map_groups = graph["map_groups"]
+
+    @classmethod
+    def build_map_graph(cls) -> Tuple[Dict[int, List[tuple]], Dict[Tuple[int, int], str], List[List[int]]]:
+        """Dựng đồ thị liên kết map từ `init_map_data` (dùng khi biên dịch data bundle).
+
+        Liên kết trả về dạng tuple (`NextMap.FIELDS`) để bundle chỉ chứa kiểu dữ liệu có sẵn.
+        """
+        graph = cls.__new__(cls)
+        graph.link_maps = {}
+        graph.init_map_data()
+        link_maps = {u: [link.to_tuple() for link in links] for u, links in graph.link_maps.items()}
+        return link_maps, graph.direction_overrides, graph.map_groups
 
     def init_map_data(self):
         """Khởi tạo dữ liệu kết nối giữa các bản đồ"""
@@ -368,7 +416,7 @@ class XMap:
             username = getattr(self.controller.account, 'username', 'Unknown')
             msg = f"Không thể vào nhà của hành tinh khác. Điểm đến ({target_planet_name}) không phù hợp."
             
-            if logger.disabled:
+            if not logger_enabled():
                 print(f"\n[{C.YELLOW}{username}{C.RESET}] {C.RED}{msg}{C.RESET} {' ' * 20}")
             else:
                 logger.error(f"[{username}] {msg}")
@@ -379,6 +427,7 @@ class XMap:
         current_map = self.controller.tile_map.map_id
         self.history = [current_map]
         self.capsule_history = []
+        self.started_at = time.perf_counter()
         
         if not keep_dangerous:
             self.dangerous_maps.clear()
@@ -417,8 +466,12 @@ class XMap:
 
     def stop(self):
         """Dừng tiến trình XMap một cách chủ động (dùng cho NavigationService)"""
+        was_xmapping = self.is_xmapping
         self.is_xmapping = False
         self.processing_map_change = False
+        if was_xmapping:
+            self._record_route("stopped")
+            self.controller.events.publish(XMapStopped(self.controller.tile_map.map_id, self.target_map_id))
 
     def finish(self):
         """Kết thúc XMap và hiển thị lộ trình đã đi"""
@@ -446,21 +499,25 @@ class XMap:
             msg = f"XMap kết thúc. {C.RED}(Chưa đến đích: {current_map} -> {self.target_map_id}){C.RESET} {C.GREY}[{history_str}]{C.RESET}"
             log_func = logger.warning
 
-        if logger.disabled:
+        if not logger_enabled():
             print(f"[{C.YELLOW}{username}{C.RESET}] {msg} {' ' * 20}")
         else:
             log_func(f"\n[{C.YELLOW}{username}{C.RESET}] {msg} {' ' * 20}")
+
+        self._record_route("arrived" if current_map == self.target_map_id else "failed")
+        self.controller.events.publish(XMapStopped(current_map, self.target_map_id))
+
+    def _record_route(self, result: str):
+        """Ghi metric cho lượt XMap vừa kết thúc."""
+        username = getattr(self.controller.account, 'username', 'Unknown')
+        XMAP_ROUTES.labels(username, result).inc()
+        XMAP_ROUTE_SECONDS.labels(username).observe(time.perf_counter() - self.started_at)
+        XMAP_HOPS.labels(username).observe(max(0, len(self.history) - 1))
       
 
     def _has_item(self, item_id: int) -> bool:
         """Kiểm tra nhân vật có vật phẩm cụ thể không."""
-        char = self.controller.account.char
-        if not char.arr_item_bag:
-            return False
-        for item in char.arr_item_bag:
-            if item and item.item_id == item_id:
-                return True
-        return False
+        return self.controller.account.char.bag_index.has(item_id)
 
     def _is_map_accessible(self, map_id: int, char) -> bool:
         """Kiểm tra xem một bản đồ có thể truy cập được không dựa trên các yêu cầu."""
@@ -747,7 +804,7 @@ class XMap:
         username = getattr(self.controller.account, 'username', 'Unknown')
         
         # Verbose Log
-        if not logger.disabled:
+        if logger_enabled():
              logger.info(f"[{C.YELLOW}{username}{C.RESET}] [XMAP] Moving: {C.CYAN}{current_map_id}{C.RESET} -> {C.GREEN}{next_map.map_id}{C.RESET} (Type: {'NPC' if next_map.npc_id != -1 else 'Walk' if next_map.walk else 'Item' if next_map.item_id != -1 else 'Waypoint'})")
 
         if next_map.npc_id != -1:
@@ -766,7 +823,7 @@ class XMap:
             self.processing_map_change = True
             self.expected_next_map_id = next_map.map_id
             self.last_action_time = time.time()
-            if not logger.disabled:
+            if logger_enabled():
                 logger.info(f"[{C.YELLOW}{username}{C.RESET}] [XMAP] Action performed. Waiting for map {next_map.map_id}...")
 
     async def handle_capsule_move(self, next_map: NextMap):
@@ -802,8 +859,7 @@ class XMap:
         current_map_id = self.controller.tile_map.map_id
         next_map_id = next_map.map_id
         
-        from logic.map_data import MAP_ID_TO_NAME
-        expected_name = MAP_ID_TO_NAME.get(next_map_id, "")
+        expected_name = GAME_DATA.maps.get(next_map_id, "")
         target_wp = None
         
         # 1. Tìm chính xác gateway dựa trên tên bản đồ đích từ popup text
@@ -878,22 +934,21 @@ class XMap:
             return fallback_idx
 
         # 3. Mở menu NPC lần 1
-        self.controller.ui_menu_event.clear()
-        await self.controller.account.service.open_menu_npc(next_map.npc_id)
-        
         try:
             # Đợi phản hồi menu
-            await asyncio.wait_for(self.controller.ui_menu_event.wait(), timeout=2.0)
+            with self.controller.events.expect(MenuOpened) as menu:
+                await self.controller.account.service.open_menu_npc(next_map.npc_id)
+                await menu.result(2.0)
             options = self.controller.last_ui_options
             idx1 = find_idx(next_map.select_name, next_map.index_npc, options)
             
             if idx1 != -1:
                 # Nếu có menu tiếp theo cần bấm (select_name2), phải đợi menu mới
                 if next_map.select_name2 or next_map.index_npc2 != -1:
-                    self.controller.ui_menu_event.clear()
-                    await self.controller.account.service.confirm_menu_npc(next_map.npc_id, idx1)
                     try:
-                        await asyncio.wait_for(self.controller.ui_menu_event.wait(), timeout=2.0)
+                        with self.controller.events.expect(MenuOpened) as menu:
+                            await self.controller.account.service.confirm_menu_npc(next_map.npc_id, idx1)
+                            await menu.result(2.0)
                         options2 = self.controller.last_ui_options
                         idx2 = find_idx(next_map.select_name2, next_map.index_npc2, options2)
                         if idx2 != -1:
@@ -1,5 +1,12 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import re
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
 
 class TerminalColors:
     """Mã màu ANSI cho Terminal"""
@@ -101,29 +108,239 @@ class ColoredFormatter(logging.Formatter):
         logging.CRITICAL: f"{TerminalColors.GREY}%(asctime)s{TerminalColors.RESET} | {TerminalColors.BOLD_RED}%(levelname)-8s{TerminalColors.RESET} | %(message)s",
     }
 
+    def __init__(self):
+        super().__init__(self.fmt_str, datefmt="%H:%M:%S")
+        # Formatter cho từng level được tạo một lần, không tạo lại mỗi record
+        self._formatters = {level: logging.Formatter(fmt, datefmt="%H:%M:%S")
+                            for level, fmt in self.FORMATS.items()}
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt, datefmt="%H:%M:%S")
+        formatter = self._formatters.get(record.levelno)
+        if formatter is None:
+            return super().format(record)
         return formatter.format(record)
 
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+# "[username] ..." ở đầu message (username có thể được tô màu)
+_ACCOUNT_RE = re.compile(r"^\s*\[(?:\x1b\[[0-9;]*m)*([^\]\x1b]+)(?:\x1b\[[0-9;]*m)*\]")
+
+
+def record_account(record) -> Optional[str]:
+    """Username của record: `extra={'account': ...}` hoặc tiền tố "[username]" trong message."""
+    account = getattr(record, "account", None)
+    if account is not None:
+        return account
+    msg = record.msg
+    if isinstance(msg, str) and msg[:12].lstrip().startswith(("[", "\x1b")):
+        match = _ACCOUNT_RE.match(msg)
+        if match:
+            return match.group(1)
+    return None
+
+
+class JsonFormatter(logging.Formatter):
+    """Một dòng JSON cho mỗi record (không có mã màu): ts, level, logger, account, msg, exc."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "account": record_account(record),
+            "msg": _ANSI_RE.sub("", record.getMessage()),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class AccountSampler(logging.Filter):
+    """
+    Lấy mẫu log theo tài khoản: với rate N chỉ giữ 1/N record dưới WARNING của account đó.
+    WARNING trở lên luôn được giữ. Chạy trước khi record vào hàng đợi nên record bị bỏ không tốn gì thêm.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.default_rate = 1
+        self.rates: Dict[str, int] = {}
+        self._counters: Dict[Optional[str], int] = {}
+
+    def set_rate(self, rate: int, account: Optional[str] = None):
+        rate = max(1, int(rate))
+        if account is None:
+            self.default_rate = rate
+        elif rate == 1:
+            self.rates.pop(account, None)
+        else:
+            self.rates[account] = rate
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING or (self.default_rate == 1 and not self.rates):
+            return True
+        account = record_account(record)
+        rate = self.rates.get(account, self.default_rate)
+        if rate == 1:
+            return True
+        count = self._counters.get(account, 0)
+        self._counters[account] = count + 1
+        return count % rate == 0
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler không format record trên thread gọi log (event loop): record vào hàng đợi nguyên
+    msg/args, các handler của QueueListener format trên thread ghi log. Chỉ exc_info được đổi sang
+    exc_text ngay (traceback giữ frame sống và có thể đổi trước khi thread ghi log tới lượt).
+    Args của record vì vậy được đọc muộn: đừng truyền object sẽ bị sửa ngay sau lời gọi log.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        if record.exc_info:
+            record = copy.copy(record)  # Không sửa record mà handler khác (nếu có) còn dùng
+            if not record.exc_text:
+                record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# ── Pipeline: logger → AccountSampler → DeferredQueueHandler → (thread) QueueListener → handlers ──
+
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(ColoredFormatter())
+_json_handler: Optional[logging.Handler] = None
+_listener: Optional[QueueListener] = None
+sampler = AccountSampler()
+
+
+def _restart_listener():
+    """(Khởi động lại) thread ghi log với danh sách handler hiện tại."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    handlers = [_console_handler] + ([_json_handler] if _json_handler else [])
+    _listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # Ghi nốt các record còn trong hàng đợi
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def set_json_output(enabled: bool, path: Optional[str] = None):
+    """Bật/tắt xuất log dạng JSON (mỗi dòng một record) ra file `path` hoặc stdout."""
+    global _json_handler
+    if _json_handler is not None:
+        _json_handler.close()
+        _json_handler = None
+    if enabled:
+        _json_handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stdout)
+        _json_handler.setFormatter(JsonFormatter())
+    if _listener is not None:
+        _restart_listener()
+
+
+def set_account_sampling(rate: int, account: Optional[str] = None):
+    """Chỉ giữ 1/`rate` log dưới WARNING của `account` (None = mặc định cho mọi account)."""
+    sampler.set_rate(rate, account)
+
+
+# Logger gốc của từng subsystem (network.session, controller.map, logic.xmap, ... là con của chúng).
+# Logger của thư viện bên ngoài đi theo mức của root (WARNING).
+SUBSYSTEMS = ("Main", "network", "controller", "logic", "services", "commands",
+              "targeted_commands", "core", "ui", "utils", "plugins", "logs")
+DEFAULT_LEVELS = {
+    "network.session": logging.WARNING,  # Log theo từng gói tin, chỉ bật khi cần
+}
+
+
+def _install_pipeline():
+    """Gắn QueueHandler (+ sampler) vào root logger một lần; mọi logger con đều propagate lên đây."""
+    root = logging.getLogger()
+    if any(isinstance(h, QueueHandler) for h in root.handlers):
+        return
+    handler = DeferredQueueHandler(_log_queue)
+    handler.addFilter(sampler)
+    root.addHandler(handler)
+    root.setLevel(logging.WARNING)
+    for name in SUBSYSTEMS:
+        logging.getLogger(name).setLevel(logging.DEBUG)
+    for name, level in DEFAULT_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+    if _listener is None:
+        _restart_listener()
+
+
 def setup_logger(name="Bot", level=logging.INFO):
-    """Hàm khởi tạo logger để sử dụng ở các file khác"""
+    """Hàm khởi tạo logger để sử dụng ở các file khác.
+    Logger chỉ đưa record vào hàng đợi; format và ghi ra stdout chạy trên thread nền."""
+    _install_pipeline()
     logger = logging.getLogger(name)
     logger.setLevel(level)
-
-    # Tránh việc add handler nhiều lần nếu hàm này bị gọi lại
-    if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(ColoredFormatter())
-        logger.addHandler(handler)
-    
     return logger
 
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger của một subsystem, ví dụ get_logger("controller.map"). Mức log chỉnh được lúc chạy (set_level)."""
+    _install_pipeline()
+    return logging.getLogger(name)
+
+
+def parse_level(level) -> Optional[int]:
+    """"debug" / "INFO" / 20 -> mức logging, None nếu không hợp lệ."""
+    if isinstance(level, int) or str(level).isdigit():
+        return int(level)
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else None
+
+
+def set_level(name: str, level) -> bool:
+    """Đổi mức log của một logger (và mọi logger con chưa đặt mức riêng). name "root" = root logger."""
+    value = parse_level(level)
+    if value is None:
+        return False
+    logging.getLogger(None if name == "root" else name).setLevel(value)
+    return True
+
+
+def get_levels() -> Dict[str, str]:
+    """{tên logger: mức hiệu lực} của các logger thuộc dự án đã được tạo."""
+    names = set(SUBSYSTEMS) | {
+        n for n in logging.Logger.manager.loggerDict
+        if n.split(".", 1)[0] in SUBSYSTEMS and isinstance(logging.Logger.manager.loggerDict[n], logging.Logger)
+    }
+    return {n: logging.getLevelName(logging.getLogger(n).getEffectiveLevel()) for n in sorted(names)}
+
+
 # Tạo sẵn một instance mặc định
 logger = setup_logger("Main", level=logging.DEBUG)
 
+_enabled = True
+
+
 def set_logger_status(is_enabled: bool):
-    """Bật hoặc tắt logger."""
+    """Bật hoặc tắt toàn bộ logger. Khi tắt, logger.isEnabledFor(...) trả False nên log được guard không tốn gì."""
+    global _enabled
+    _enabled = is_enabled
     logger.disabled = not is_enabled
+    logging.disable(logging.NOTSET if is_enabled else logging.CRITICAL)
+
+
+def logger_enabled() -> bool:
+    """Logger đang bật hay không (thay cho kiểm tra logger.disabled)."""
+    return _enabled
+
 
-set_logger_status(False)  # Mặc định tắt logger, bật khi cần thiết trong main.py hoặc các module khác
\ No newline at end of file
+set_logger_status(False)  # Mặc định tắt logger, bật khi cần thiết trong main.py hoặc các module khác
@@ -0,0 +1,237 @@
+"""
+Loop Monitor - Đo độ trễ event loop, thống kê task và phát hiện task chặn loop.
+
+  - Sampler (một task): ngủ `interval` giây rồi đo độ trễ thực tế so với dự kiến (lag).
+  - Watchdog (một thread daemon): liên tục gửi "ping" vào loop (`call_soon_threadsafe`); ping nào
+    chưa được xử lý sau `block_threshold` giây nghĩa là loop đang bị chặn, khi đó ghi lại task
+    đang chạy (`asyncio.current_task(loop)`) và vị trí code của thread chạy loop (`sys._current_frames`).
+  - Census: `asyncio.all_tasks()` gom theo tên coroutine (VD: "AutoPlay.loop") và theo tài khoản
+    (suy ra từ `self` / `acc` / `account` trong frame của coroutine).
+
+Kết quả: `MONITOR.status()` / `census()` / `blocks`, và metric `nro_loop_*`, `nro_tasks*`.
+
+    MONITOR.start(interval=0.5, block_threshold=0.1)   # gọi trong event loop
+    MONITOR.stop()
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from logs.logger_config import get_logger
+from logs.metrics import METRICS
+
+logger = get_logger("logs.loop_monitor")
+
+LOOP_LAG = METRICS.histogram("nro_loop_lag_seconds", "Độ trễ event loop (thời gian ngủ thực tế - dự kiến)",
+                             buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_LAG_LAST = METRICS.gauge("nro_loop_lag_last_seconds", "Độ trễ event loop ở lần đo gần nhất")
+LOOP_BLOCKS = METRICS.counter("nro_loop_blocks_total", "Số lần loop bị chặn quá ngưỡng", ("coro",))
+TASKS_BY_CORO = METRICS.gauge("nro_tasks", "Số task đang sống theo tên coroutine", ("coro",))
+TASKS_BY_ACCOUNT = METRICS.gauge("nro_account_tasks", "Số task đang sống theo tài khoản", ("account",))
+TASKS_TOTAL = METRICS.gauge("nro_tasks_total", "Tổng số task đang sống")
+
+NO_ACCOUNT = "-"
+
+
+@dataclass(slots=True)
+class BlockEvent:
+    """Một lần loop bị chặn: task đang chạy, vị trí code và thời gian chặn (giây)."""
+    at: float
+    coro: str
+    account: str
+    location: str
+    duration: float = 0.0
+
+
+def coro_name(task: asyncio.Task) -> str:
+    """Tên coroutine của task (qualname, VD: 'AutoPlay.loop')."""
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+def _username(obj) -> Optional[str]:
+    for path in ((), ("account",), ("acc",), ("controller", "account")):
+        target = obj
+        for attr in path:
+            target = getattr(target, attr, None)
+            if target is None:
+                break
+        name = getattr(target, "username", None) if target is not None else None
+        if isinstance(name, str):
+            return name
+    return None
+
+
+def task_account(task: asyncio.Task) -> str:
+    """Tài khoản sở hữu task, suy ra từ biến cục bộ của coroutine ngoài cùng ('-' nếu không rõ)."""
+    frame = getattr(task.get_coro(), "cr_frame", None)
+    if frame is None:
+        return NO_ACCOUNT
+    local_vars = frame.f_locals
+    for key in ("self", "acc", "account"):
+        obj = local_vars.get(key)
+        if obj is not None:
+            name = _username(obj)
+            if name:
+                return name
+    return NO_ACCOUNT
+
+
+def _frame_location(frame, depth: int = 3) -> str:
+    """'file:line func' của `depth` frame trong cùng (trong cùng đứng trước)."""
+    parts = []
+    while frame is not None and len(parts) < depth:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}")
+        frame = frame.f_back
+    return " <- ".join(parts)
+
+
+class LoopMonitor:
+    """Giám sát event loop đang chạy. Chỉ một instance dùng chung (`MONITOR`)."""
+
+    def __init__(self, history: int = 240, max_blocks: int = 50):
+        self.interval = 0.5
+        self.block_threshold = 0.1
+        self.census_every = 10  # census mỗi N lần đo lag
+        self.lags: Deque[float] = deque(maxlen=history)
+        self.blocks: Deque[BlockEvent] = deque(maxlen=max_blocks)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._running = False
+        self._acked = threading.Event()
+        self._last_census: Tuple[Dict[str, int], Dict[str, int]] = ({}, {})
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self, interval: float = 0.5, block_threshold: float = 0.1):
+        """Bật giám sát (phải gọi từ trong event loop)."""
+        self.interval = max(0.05, interval)
+        self.block_threshold = max(0.01, block_threshold)
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._running = True
+        self._acked = threading.Event()
+        self._task = self._loop.create_task(self._sample_loop(), name="loop_monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._watchdog = None
+
+    # ── Sampler (trong loop) ──
+
+    async def _sample_loop(self):
+        samples = 0
+        try:
+            while self._running:
+                expected = time.perf_counter() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.perf_counter() - expected)
+                self.lags.append(lag)
+                LOOP_LAG.observe(lag)
+                LOOP_LAG_LAST.set(lag)
+
+                samples += 1
+                if samples % self.census_every == 0:
+                    self.census()
+        except asyncio.CancelledError:
+            pass
+
+    # ── Watchdog (thread riêng) ──
+
+    def _watch(self):
+        loop, acked = self._loop, self._acked
+        me = threading.current_thread()
+        while self._watchdog is me:  # stop() / start() lại sẽ thay thread
+            acked.clear()
+            sent = time.perf_counter()
+            try:
+                loop.call_soon_threadsafe(acked.set)
+            except RuntimeError:  # loop đã đóng
+                break
+            block = None
+            while not acked.wait(self.block_threshold / 4):
+                if self._watchdog is not me:
+                    return
+                if block is None and time.perf_counter() - sent >= self.block_threshold:
+                    block = self._capture()
+            if block is not None:
+                block.duration = time.perf_counter() - sent
+                self.blocks.append(block)
+                LOOP_BLOCKS.labels(block.coro).inc()
+                logger.warning(f"Event loop bị chặn {block.duration * 1000:.0f}ms bởi {block.coro} "
+                               f"[{block.account}] tại {block.location}")
+            time.sleep(self.block_threshold / 2)
+
+    def _capture(self) -> BlockEvent:
+        """Chụp task đang chạy và vị trí code của thread event loop (gọi từ watchdog)."""
+        task = asyncio.current_task(self._loop)
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if task is None:
+            name, account = "<callback>", NO_ACCOUNT
+        else:
+            name, account = coro_name(task), task_account(task)
+        return BlockEvent(time.time(), name, account, _frame_location(frame) if frame else "?")
+
+    # ── Census ──
+
+    def census(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Đếm task đang sống theo coroutine và theo tài khoản; cập nhật gauge tương ứng."""
+        by_coro: _Tally = _Tally()
+        by_account: _Tally = _Tally()
+        for task in asyncio.all_tasks():
+            if task.done():
+                continue
+            by_coro[coro_name(task)] += 1
+            by_account[task_account(task)] += 1
+
+        # Series của coroutine / tài khoản không còn task thì về 0
+        old_coro, old_account = self._last_census
+        for name in old_coro.keys() - by_coro.keys():
+            TASKS_BY_CORO.labels(name).set(0)
+        for name in old_account.keys() - by_account.keys():
+            TASKS_BY_ACCOUNT.labels(name).set(0)
+        for name, n in by_coro.items():
+            TASKS_BY_CORO.labels(name).set(n)
+        for name, n in by_account.items():
+            TASKS_BY_ACCOUNT.labels(name).set(n)
+        TASKS_TOTAL.set(sum(by_coro.values()))
+
+        self._last_census = (dict(by_coro), dict(by_account))
+        return self._last_census
+
+    def status(self) -> dict:
+        """Tóm tắt độ trễ: số mẫu, trung bình, p99, max (giây) và số lần bị chặn."""
+        lags = sorted(self.lags)
+        if not lags:
+            return {"samples": 0, "avg": 0.0, "p99": 0.0, "max": 0.0, "blocks": len(self.blocks)}
+        return {
+            "samples": len(lags),
+            "avg": sum(lags) / len(lags),
+            "p99": lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+            "max": lags[-1],
+            "blocks": len(self.blocks),
+        }
+
+    @staticmethod
+    def top(counts: Dict[str, int], n: int = 10) -> List[Tuple[str, int]]:
+        return sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+
+
+MONITOR = LoopMonitor()
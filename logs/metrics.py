@@ -0,0 +1,291 @@
+"""
+Metrics - Registry counter / gauge / histogram nhẹ, xuất theo định dạng text của Prometheus.
+
+Chỉ dùng thư viện chuẩn. Mỗi metric có danh sách label cố định; `metric.labels(...)` trả về
+series con (được cache) nên ở hot path nên giữ lại series con thay vì gọi labels() mỗi lần:
+
+    PACKETS_IN = METRICS.counter("nro_packets_received_total", "Gói tin nhận", ("account",))
+    self._m_packets_in = PACKETS_IN.labels(username)   # một lần, khi tạo Session
+    self._m_packets_in.inc()                          # mỗi gói tin
+
+Xuất ra: `METRICS.expose()` (text), `METRICS.dump(path)` (ghi file atomic) hoặc
+`await start_http_server(port)` (GET /metrics trên 127.0.0.1).
+"""
+import asyncio
+import bisect
+import math
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        """Context manager đo thời gian một khối lệnh (giây)."""
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Series con ứng với giá trị label (theo thứ tự labelnames)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: cần {len(self.labelnames)} label, nhận {len(key)}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def remove(self, *values):
+        """Bỏ series con (ví dụ khi account bị xoá)."""
+        self._children.pop(tuple(str(v) for v in values), None)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        """Tăng series không label."""
+        self.labels().inc(amount)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(c.value)}"
+                for k, c in list(self._children.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(c.value)}"
+                for k, c in list(self._children.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self) -> List[str]:
+        out = []
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            for bound, n in zip(self.bounds + (math.inf,), child.counts):
+                cumulative += n
+                le = f'le="{_format_value(float(bound))}"'
+                out.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            out.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            out.append(f"{self.name}_count{labels} {child.count}")
+        return out
+
+
+class MetricsRegistry:
+    """Tập hợp metric; tạo lại cùng tên sẽ trả về metric đã có."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} đã được đăng ký với kiểu {metric.kind}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def names(self) -> List[str]:
+        return sorted(self._metrics)
+
+    def expose(self, prefix: str = "") -> str:
+        """Toàn bộ metric (tên bắt đầu bằng `prefix`) theo định dạng text của Prometheus."""
+        blocks = [m.expose() for name, m in sorted(self._metrics.items()) if name.startswith(prefix)]
+        return "\n".join(blocks) + "\n"
+
+    def dump(self, path: str):
+        """Ghi expose() ra file (ghi file tạm rồi os.replace để bên đọc không thấy file dở)."""
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.expose())
+        os.replace(tmp, path)
+
+
+METRICS = MetricsRegistry()
+
+
+# ── HTTP endpoint ──
+
+_server: Optional[asyncio.AbstractServer] = None
+
+
+async def _handle_http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+        # Bỏ qua header
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            if not line or line in (b"\r\n", b"\n"):
+                break
+        parts = request_line.decode("latin-1").split()
+        path = parts[1] if len(parts) > 1 else "/"
+        if path.split("?")[0] in ("/", "/metrics"):
+            body = METRICS.expose().encode("utf-8")
+            status = "200 OK"
+        else:
+            body = b"not found\n"
+            status = "404 Not Found"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+    except Exception:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_http_server(port: int = 9108, host: str = "127.0.0.1") -> asyncio.AbstractServer:
+    """Phục vụ GET /metrics trên `host:port` ngay trong event loop (không cần thread)."""
+    global _server
+    await stop_http_server()
+    _server = await asyncio.start_server(_handle_http, host, port)
+    return _server
+
+
+async def stop_http_server():
+    global _server
+    if _server is not None:
+        _server.close()
+        await _server.wait_closed()
+        _server = None
+
+
+def http_server_address() -> Optional[Tuple[str, int]]:
+    if _server is None or not _server.sockets:
+        return None
+    return _server.sockets[0].getsockname()[:2]
@@ -0,0 +1,163 @@
+"""
+Profiler - Sampling profiler cho event loop đang chạy (không cần khởi động lại dưới cProfile).
+
+Một thread daemon chụp stack của thread chạy event loop `hz` lần mỗi giây (`sys._current_frames`)
+và gắn mỗi mẫu với task đang chạy (`asyncio.current_task(loop)`) → coroutine + tài khoản.
+Kết quả là các stack đã gộp (collapsed / folded) dạng
+
+    <tài khoản>;<coroutine>;main.py:main;...;auto_play.py:tansat 42
+
+đọc được bằng flamegraph.pl, speedscope hoặc inferno. Lúc loop rảnh (đang chờ I/O trong
+selector) mẫu được ghi là `-;<idle>` để tỉ lệ CPU thực sự bận vẫn đọc được trên flamegraph.
+
+    PROFILER.start(duration=30, hz=100)   # gọi trong event loop
+    PROFILER.stop(); PROFILER.dump("profile.folded")
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from typing import Dict, List, Optional, Tuple
+
+from logs.logger_config import get_logger
+from logs.loop_monitor import NO_ACCOUNT, coro_name, task_account
+
+logger = get_logger("logs.profiler")
+
+IDLE = "<idle>"
+CALLBACK = "<callback>"
+MAX_DEPTH = 64
+# Frame chờ I/O của event loop: mẫu có frame trong cùng là một trong các frame này thì loop đang rảnh.
+# file -> qualname (None = mọi hàm trong file): selector (SelectorEventLoop, Unix) và IOCP
+# (ProactorEventLoop, mặc định trên Windows: chờ trong GetQueuedCompletionStatus gọi từ _poll)
+_IDLE_FRAMES: Dict[str, Optional[Tuple[str, ...]]] = {
+    "selectors.py": None,
+    "windows_events.py": ("IocpProactor._poll",),
+}
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    if filename not in _IDLE_FRAMES:
+        return False
+    names = _IDLE_FRAMES[filename]
+    return names is None or code.co_qualname in names
+
+
+def _frame_key(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+class SamplingProfiler:
+    """Profiler lấy mẫu cho thread chạy event loop. Chỉ một instance dùng chung (`PROFILER`)."""
+
+    def __init__(self):
+        self.hz = 100
+        self.samples: _Tally = _Tally()  # stack đã gộp -> số mẫu
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+        self.total = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._deadline: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, duration: Optional[float] = None, hz: int = 100):
+        """Bắt đầu lấy mẫu (gọi trong event loop); tự dừng sau `duration` giây nếu có. Xoá mẫu cũ."""
+        self.stop()
+        self.hz = max(1, min(1000, hz))
+        with self._lock:
+            self.samples = _Tally()
+            self.total = 0
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self.stopped_at = 0.0
+        self._deadline = time.perf_counter() + duration if duration else None
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._thread = None
+            self.stopped_at = time.time()
+
+    # ── Thread lấy mẫu ──
+
+    def _run(self):
+        me = threading.current_thread()
+        period = 1.0 / self.hz
+        next_at = time.perf_counter()
+        while self._thread is me:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                self._thread = None
+                self.stopped_at = time.time()
+                logger.info(f"Profiler tự dừng sau khung thời gian ({self.total} mẫu).")
+                break
+            self._sample()
+            next_at += period
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_at = time.perf_counter()  # bị trễ (GIL bận): bỏ qua các nhịp đã lỡ
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        if _is_idle(frame):
+            key = f"{NO_ACCOUNT};{IDLE}"
+        else:
+            stack: List[str] = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(_frame_key(frame))
+                frame = frame.f_back
+            stack.reverse()
+            task = asyncio.current_task(self._loop)
+            if task is None:
+                root = f"{NO_ACCOUNT};{CALLBACK}"
+            else:
+                root = f"{task_account(task)};{coro_name(task)}"
+            key = root + ";" + ";".join(stack)
+        with self._lock:
+            self.samples[key] += 1
+            self.total += 1
+
+    # ── Kết quả ──
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.samples)
+
+    def dump(self, path: str) -> int:
+        """Ghi các stack đã gộp ra `path` (một dòng `stack count`); trả về số dòng."""
+        samples = self.snapshot()
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for stack, count in sorted(samples.items()):
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp, path)
+        return len(samples)
+
+    def summary(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Số mẫu theo tài khoản và theo coroutine (hai phần tử đầu của mỗi stack)."""
+        by_account: _Tally = _Tally()
+        by_coro: _Tally = _Tally()
+        for stack, count in self.snapshot().items():
+            account, coro = stack.split(";", 2)[:2]
+            by_account[account] += count
+            by_coro[coro] += count
+        return dict(by_account), dict(by_coro)
+
+
+PROFILER = SamplingProfiler()
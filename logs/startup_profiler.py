@@ -0,0 +1,109 @@
+"""
+Startup Profiler - Đo thời gian import từng module khi khởi động (`python main.py --profile-startup`).
+
+Module này chỉ dùng thư viện chuẩn và không import gì của dự án, để có thể cài đặt
+trước mọi import khác trong main.py. Kết quả là cây import (self/cumulative ms) và
+thời gian từ lúc khởi động tới khi hiện prompt.
+"""
+import importlib.abc
+import sys
+import time
+
+_start_time = time.perf_counter()
+
+
+class _ImportNode:
+    __slots__ = ("name", "cumulative", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cumulative = 0.0
+        self.children = []
+
+    @property
+    def self_time(self) -> float:
+        return self.cumulative - sum(child.cumulative for child in self.children)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Finder đứng đầu sys.meta_path: tìm spec bằng các finder còn lại rồi bọc exec_module để đo giờ."""
+
+    def __init__(self):
+        self.root = _ImportNode("<startup>")
+        self._stack = [self.root]
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    self._wrap(spec, fullname)
+                return spec
+        return None
+
+    def _wrap(self, spec, fullname: str):
+        loader = spec.loader
+        exec_module = loader.exec_module
+        timer = self
+
+        class _TimedLoader:
+            # Proxy loader: chỉ thay exec_module, mọi thuộc tính khác chuyển tiếp về loader gốc
+            def __getattr__(self, name):
+                return getattr(loader, name)
+
+            def create_module(self, spec):
+                return loader.create_module(spec)
+
+            def exec_module(self, module):
+                node = _ImportNode(fullname)
+                timer._stack[-1].children.append(node)
+                timer._stack.append(node)
+                start = time.perf_counter()
+                try:
+                    exec_module(module)
+                finally:
+                    node.cumulative = time.perf_counter() - start
+                    timer._stack.pop()
+
+        spec.loader = _TimedLoader()
+
+    def report(self, threshold_ms: float = 1.0, out=None):
+        """In cây import; bỏ qua nhánh có cumulative < threshold_ms."""
+        out = out or sys.stdout
+        self.root.cumulative = sum(child.cumulative for child in self.root.children)
+        print(f"{'cumul(ms)':>10} {'self(ms)':>10}  module", file=out)
+        self._print_node(self.root, 0, threshold_ms / 1000, out)
+        elapsed = (time.perf_counter() - _start_time) * 1000
+        print(f"Import: {self.root.cumulative * 1000:.1f}ms | Tới prompt: {elapsed:.1f}ms", file=out)
+
+    def _print_node(self, node: _ImportNode, depth: int, threshold: float, out):
+        for child in sorted(node.children, key=lambda n: n.cumulative, reverse=True):
+            if child.cumulative < threshold:
+                continue
+            print(f"{child.cumulative * 1000:>10.1f} {child.self_time * 1000:>10.1f}  {'  ' * depth}{child.name}", file=out)
+            self._print_node(child, depth + 1, threshold, out)
+
+
+_timer = None
+
+
+def install() -> ImportTimer:
+    """Cài ImportTimer vào đầu sys.meta_path (gọi một lần, càng sớm càng tốt)."""
+    global _timer
+    if _timer is None:
+        _timer = ImportTimer()
+        sys.meta_path.insert(0, _timer)
+    return _timer
+
+
+def report(threshold_ms: float = 1.0):
+    """In báo cáo và gỡ ImportTimer (import sau đó không còn bị đo)."""
+    global _timer
+    if _timer is None:
+        return
+    if _timer in sys.meta_path:
+        sys.meta_path.remove(_timer)
+    _timer.report(threshold_ms)
+    _timer = None
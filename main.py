@@ -1,5 +1,12 @@
-import asyncio
 import sys
+
+# --profile-startup: cài bộ đo import trước mọi import khác để thấy toàn bộ cây import
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    from logs import startup_profiler
+    startup_profiler.install()
+
+import asyncio
 import os
 import shutil
 from config import Config
@@ -16,6 +23,7 @@ from utils.autocomplete import get_input_with_autocomplete, COMMAND_TREE
 from utils.macro_interpreter import MacroInterpreter
 from commands.command_loader import load_commands
 from targeted_commands.targeted_command_loader import load_targeted_commands
+from logic.game_data import GAME_DATA
 import time
 
 # Plugin System imports
@@ -27,52 +35,6 @@ except ImportError:
     PLUGINS_AVAILABLE = False
     logger.warning("Plugin system not available")
 
-MOB_NAMES = {}
-
-def load_mob_names():
-    global MOB_NAMES
-    try:
-        from model.game_objects import MOB_TEMPLATES, MobTemplate
-        with open("data/mob_data.txt", "r", encoding="utf-8") as f:
-            for line in f:
-                parts = line.strip().split(",")
-                if len(parts) >= 2:
-                    mob_id_str = parts[0].strip()
-                    name = parts[1].strip()
-                    try:
-                        mob_id = int(mob_id_str)
-                        MOB_NAMES[mob_id] = name
-                        # Init template với tên tiếng Việt luôn cũng được
-                        if mob_id not in MOB_TEMPLATES:
-                            t = MobTemplate()
-                            t.mob_template_id = mob_id
-                            t.name = name
-                            MOB_TEMPLATES[mob_id] = t
-                    except ValueError:
-                        continue
-    except FileNotFoundError:
-        logger.warning("File data/mob_data.txt not found.")
-    except Exception as e:
-        logger.error(f"Error loading data/mob_data.txt: {e}")
-
-def load_item_names():
-    try:
-        from model.game_objects import ITEM_TEMPLATES
-        with open("data/item_data.txt", "r", encoding="utf-8") as f:
-            for line in f:
-                parts = line.strip().split(",")
-                if len(parts) >= 2:
-                    try:
-                        item_id = int(parts[0])
-                        item_name = parts[1].strip()
-                        ITEM_TEMPLATES[item_id] = item_name
-                    except ValueError:
-                        continue
-    except FileNotFoundError:
-        logger.warning("File item_data.txt not found.")
-    except Exception as e:
-        logger.error(f"Error loading item_data.txt: {e}")
-
 def clean_pycache():
     """Tìm và xóa tất cả thư mục __pycache__ trong thư mục hiện tại và thư mục con."""
     root_dir = os.getcwd()
@@ -133,6 +95,9 @@ async def command_loop(manager: AccountManager):
     # === Command Registry ===
     commands = load_commands(manager, proxy_list, None)
     targeted_commands = load_targeted_commands()
+
+    if PROFILE_STARTUP:
+        startup_profiler.report()
     
     current_macro: MacroInterpreter | None = None
     
@@ -355,8 +320,7 @@ async def main():
 if __name__ == "__main__":
     # Clean pycache first
     clean_pycache()
-    load_mob_names()
-    load_item_names()
+    GAME_DATA.load()
     
     # Setup logger
     # logger is already imported and configured in logger_config
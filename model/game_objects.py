@@ -1,5 +1,8 @@
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from model.inventory_index import InventoryIndex
 
 class SkillTemplate:
     def __init__(self):
@@ -33,7 +36,7 @@ class Skill:
 MOB_TEMPLATES = {} # Dict[int, MobTemplate]
 ITEM_TEMPLATES = {} # Dict[int, str]
 
-@dataclass
+@dataclass(slots=True)
 class MobTemplate:
     mob_template_id: int = 0
     type: int = 0
@@ -43,7 +46,7 @@ class MobTemplate:
     speed: int = 0
     dart_type: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class Mob:
     mob_id: int = 0
     template_id: int = 0
@@ -73,13 +76,95 @@ class Mob:
             return MOB_TEMPLATES[self.template_id].name
         return f"Quái {self.template_id}"
 
+
+class DictAccessMixin:
+    """Compatibility shim: lets slotted entities be read/written like the dicts they replaced.
+
+    Supports `obj['x']`, `obj['x'] = v`, `obj.get('x', default)`, `'x' in obj`, `keys()`/`items()`.
+    Keys that are not valid attribute names are mapped through `_KEY_ALIASES`.
+    """
+    __slots__ = ()
+    _KEY_ALIASES: Dict[str, str] = {}
+
+    def _attr(self, key: str) -> str:
+        return self._KEY_ALIASES.get(key, key)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, self._attr(key))
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value):
+        try:
+            setattr(self, self._attr(key), value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._attr(key) in self.__slots__
+
+    def get(self, key: str, default=None):
+        return getattr(self, self._attr(key), default)
+
+    def keys(self) -> List[str]:
+        reverse = {v: k for k, v in self._KEY_ALIASES.items()}
+        return [reverse.get(name, name) for name in self.__slots__]
+
+    def items(self) -> List[tuple]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+
+@dataclass(slots=True)
+class CharEffect(DictAccessMixin):
+    """Effect on another character (PLAYER_ADD effect list)."""
+    id: int = 0
+    p1: int = 0
+    p2: int = 0
+    p3: int = 0
+
+
+@dataclass(slots=True)
+class CharInfo(DictAccessMixin):
+    """Another player or boss in the current map (entries of `controller.chars`).
+
+    Used to be a plain dict; dict-style access still works through `DictAccessMixin`
+    (`'class'` maps to `char_class`).
+    """
+    _KEY_ALIASES = {'class': 'char_class'}
+
+    id: int = 0
+    clan_id: int = 0
+    level: int = 0
+    is_invisible: bool = False
+    type_pk: int = 0
+    char_class: int = 0
+    gender: int = 0
+    head: int = 0
+    name: str = ""
+    hp: int = 0
+    max_hp: int = 0
+    body: int = 0
+    leg: int = 0
+    bag: int = 0
+    x: int = 0
+    y: int = 0
+    eff_buff_hp: int = 0
+    eff_buff_mp: int = 0
+    effects: List[CharEffect] = field(default_factory=list)
+
         
-@dataclass
+@dataclass(slots=True)
 class ItemOption:
     option_template_id: int = 0
     param: int = 0
 
 class Item:
+    __slots__ = ('template', 'item_id', 'quantity', 'info', 'content', 'item_option', 'index_ui')
+
     def __init__(self):
         self.template = None
         self.item_id = 0
@@ -137,6 +222,8 @@ class Char:
         self.arr_item_body = [] # List[Item]
         self.arr_item_bag = [] # List[Item]
         self.arr_item_box = [] # List[Item]
+        self._bag_index = InventoryIndex()
+        self._box_index = InventoryIndex()
         self.curr_str_level = ""
         self.c_power = 0
         self.c_tiem_nang = 0
@@ -148,6 +235,20 @@ class Char:
         
         self.task = Task() # Current task info
         
+    @property
+    def bag_index(self) -> InventoryIndex:
+        """Index of arr_item_bag (re-indexed if the list was replaced without going through the handlers)."""
+        if self._bag_index.source is not self.arr_item_bag:
+            self._bag_index.rebuild(self.arr_item_bag)
+        return self._bag_index
+
+    @property
+    def box_index(self) -> InventoryIndex:
+        """Index of arr_item_box."""
+        if self._box_index.source is not self.arr_item_box:
+            self._box_index.rebuild(self.arr_item_box)
+        return self._box_index
+
     def set_default_part(self):
         # Placeholder for setDefaultPart logic in C#
         pass
@@ -0,0 +1,196 @@
+
+from bisect import insort
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass(slots=True)
+class SlotSummary:
+    """Parsed view of one inventory slot (options flattened to {option_id: param}, first one wins)."""
+    item_id: int = 0
+    quantity: int = 0
+    options: Dict[int, int] = field(default_factory=dict)
+
+
+# InventoryChange.kind
+ADDED = "added"
+REMOVED = "removed"
+QUANTITY = "quantity"
+OPTIONS = "options"
+
+
+@dataclass(slots=True)
+class InventoryChange:
+    """One slot-level difference produced when the bag/box is updated."""
+    container: str  # "bag" / "box"
+    kind: str
+    index: int
+    item_id: int
+    old_quantity: int = 0
+    new_quantity: int = 0
+
+
+def same_item(a, b) -> bool:
+    """True if two Items carry identical data (the old object can be kept)."""
+    return (a.item_id == b.item_id and a.quantity == b.quantity and a.info == b.info
+            and a.content == b.content and a.item_option == b.item_option)
+
+
+def summarize_item(item) -> SlotSummary:
+    options: Dict[int, int] = {}
+    for opt in item.item_option or ():
+        options.setdefault(opt.option_template_id, opt.param)
+    return SlotSummary(item.item_id, item.quantity, options)
+
+
+class InventoryIndex:
+    """
+    Per-character index over a bag/box item list.
+
+    Maps item_id -> sorted slot indices and total quantity, and keeps a parsed
+    SlotSummary per occupied slot, so lookups do not scan the item list.
+    The inventory handlers keep it in sync: `merge` when a full list arrives,
+    `set_quantity` on quantity updates; `rebuild` re-indexes from scratch.
+    """
+
+    __slots__ = ('source', '_slots', '_quantity', '_summaries')
+
+    def __init__(self):
+        self.source: Optional[list] = None  # The list this index was built from
+        self._slots: Dict[int, List[int]] = {}
+        self._quantity: Dict[int, int] = {}
+        self._summaries: Dict[int, SlotSummary] = {}
+
+    # --- Maintenance ---
+
+    def rebuild(self, items: Optional[list]):
+        """Re-index a whole item list."""
+        self.source = items
+        self._slots.clear()
+        self._quantity.clear()
+        self._summaries.clear()
+        for index, item in enumerate(items or ()):
+            if item is not None:
+                self._add(index, summarize_item(item))
+
+    def set_slot(self, index: int, item):
+        """Slot `index` now holds `item` (None = empty)."""
+        self._remove(index)
+        if item is not None:
+            self._add(index, summarize_item(item))
+
+    def set_quantity(self, index: int, quantity: int):
+        """Quantity update for slot `index`; quantity 0 empties the slot."""
+        summary = self._summaries.get(index)
+        if summary is None:
+            return
+        if quantity <= 0:
+            self._remove(index)
+            return
+        self._quantity[summary.item_id] += quantity - summary.quantity
+        summary.quantity = quantity
+
+    def merge(self, items: list, new_items: list, container: str = "bag") -> List[InventoryChange]:
+        """
+        Bring `items` (the indexed list) in line with a freshly parsed `new_items`, in place.
+
+        Unchanged Item objects are kept, only differing slots are replaced and re-indexed.
+        Returns the slot changes, in slot order.
+        """
+        if self.source is not items:
+            self.rebuild(items)
+        changes: List[InventoryChange] = []
+        size = len(new_items)
+        if len(items) < size:
+            items.extend([None] * (size - len(items)))
+        for index in range(len(items)):
+            old = items[index]
+            new = new_items[index] if index < size else None
+            if old is None and new is None:
+                continue
+            if old is not None and new is not None:
+                if same_item(old, new):
+                    continue
+                if old.item_id == new.item_id:
+                    kind = QUANTITY if (old.item_option == new.item_option and old.info == new.info) else OPTIONS
+                    changes.append(InventoryChange(container, kind, index, new.item_id, old.quantity, new.quantity))
+                else:
+                    changes.append(InventoryChange(container, REMOVED, index, old.item_id, old.quantity, 0))
+                    changes.append(InventoryChange(container, ADDED, index, new.item_id, 0, new.quantity))
+            elif old is None:
+                changes.append(InventoryChange(container, ADDED, index, new.item_id, 0, new.quantity))
+            else:
+                changes.append(InventoryChange(container, REMOVED, index, old.item_id, old.quantity, 0))
+            items[index] = new
+            self.set_slot(index, new)
+        del items[size:]
+        return changes
+
+    def _add(self, index: int, summary: SlotSummary):
+        self._summaries[index] = summary
+        insort(self._slots.setdefault(summary.item_id, []), index)
+        self._quantity[summary.item_id] = self._quantity.get(summary.item_id, 0) + summary.quantity
+
+    def _remove(self, index: int):
+        summary = self._summaries.pop(index, None)
+        if summary is None:
+            return
+        slots = self._slots[summary.item_id]
+        slots.remove(index)
+        if slots:
+            self._quantity[summary.item_id] -= summary.quantity
+        else:
+            del self._slots[summary.item_id]
+            del self._quantity[summary.item_id]
+
+    # --- Lookups ---
+
+    def has(self, item_id: int) -> bool:
+        return item_id in self._slots
+
+    def count(self, item_id: int) -> int:
+        """Total quantity of `item_id` across all slots."""
+        return self._quantity.get(item_id, 0)
+
+    def count_many(self, item_ids: Iterable[int]) -> Dict[int, int]:
+        return {item_id: self._quantity.get(item_id, 0) for item_id in item_ids}
+
+    def slots(self, item_id: int) -> Tuple[int, ...]:
+        """Slot indices holding `item_id`, ascending."""
+        return tuple(self._slots.get(item_id, ()))
+
+    def first_slot(self, item_id: int) -> int:
+        """Lowest slot index holding `item_id`, or -1."""
+        slots = self._slots.get(item_id)
+        return slots[0] if slots else -1
+
+    def first_slot_of(self, item_ids: Iterable[int]) -> int:
+        """Lowest slot index holding any of `item_ids`, or -1."""
+        found = [self._slots[item_id][0] for item_id in item_ids if item_id in self._slots]
+        return min(found) if found else -1
+
+    def item_ids(self) -> List[int]:
+        return list(self._slots)
+
+    def summary(self, index: int) -> Optional[SlotSummary]:
+        return self._summaries.get(index)
+
+    def option(self, item_id: int, option_id: int, default: int = 0) -> int:
+        """Param of `option_id` on the first slot of `item_id` that has it."""
+        for index in self._slots.get(item_id, ()):
+            param = self._summaries[index].options.get(option_id)
+            if param is not None:
+                return param
+        return default
+
+    def max_option(self, item_id: int, option_id: int, default: int = 0) -> int:
+        """Highest param of `option_id` over all slots of `item_id`."""
+        best = default
+        for index in self._slots.get(item_id, ()):
+            param = self._summaries[index].options.get(option_id)
+            if param is not None and param > best:
+                best = param
+        return best
+
+    def __len__(self) -> int:
+        return len(self._summaries)
@@ -1,5 +1,21 @@
+from array import array
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# NumPy là tùy chọn: có thì truy vấn hàng loạt được vector hóa, không có thì dùng array thuần
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    _NUMPY_AVAILABLE = False
+
+# Bảng tile set dùng chung cho mọi tài khoản (từ gói TILE_SET -82).
+# TILE_SETS[tile_id - 1] = [(tile_type, [tile_index, ...]), ...]
+TILE_SETS: List[List[tuple]] = []
+
+# Cache map template theo map_id: {map_id: (tmw, tmh, maps)}
+MAP_TEMPLATES: Dict[int, tuple] = {}
 
 @dataclass
 class Waypoint:
@@ -19,6 +35,144 @@ class Waypoint:
     def center_y(self) -> int:
         return self.max_y
 
+class CollisionGrid:
+    """Lưới va chạm gọn của một map, dùng chung (read-only) cho mọi tài khoản đứng trên map đó.
+
+    `maps` là array('B') tile IDs, `types` là array('i') cờ va chạm, hàng-chính (row-major)
+    kích thước tmw x tmh. Khi có NumPy, `np_types` là view 2-D (tmh, tmw) trên cùng bộ nhớ.
+    """
+    __slots__ = ('map_id', 'tile_id', 'tmw', 'tmh', 'size', 'maps', 'types', 'np_types', '_top_cells')
+
+    # Registry dùng chung: {map_id: CollisionGrid}
+    _shared: Dict[int, 'CollisionGrid'] = {}
+
+    def __init__(self, map_id: int, tile_id: int, tmw: int, tmh: int, maps: Iterable[int], size: int = 24):
+        self.map_id = map_id
+        self.tile_id = tile_id
+        self.tmw = tmw
+        self.tmh = tmh
+        self.size = size
+        self.maps = array('B', maps)
+        lut = self._type_lut(tile_id)
+        self.types = array('i', [lut[tile] for tile in self.maps])
+        self.np_types = None
+        if _NUMPY_AVAILABLE and self.types:
+            self.np_types = np.frombuffer(self.types, dtype=np.int32).reshape(tmh, tmw)
+        self._top_cells = None
+
+    @staticmethod
+    def _type_lut(tile_id: int) -> List[int]:
+        """Bảng tra tile ID (0-255) -> cờ va chạm cho tile set `tile_id` (C# TileMap.loadMap/setTile)."""
+        lut = [0] * 256
+        if 0 < tile_id <= len(TILE_SETS):
+            for tile_type, indexes in TILE_SETS[tile_id - 1]:
+                for index in indexes:
+                    # C#: maps[i] - 1 == tileIndex[j]
+                    if 0 <= index + 1 < 256:
+                        lut[index + 1] |= tile_type
+        return lut
+
+    @classmethod
+    def shared(cls, map_id: int, tile_id: int, tmw: int, tmh: int, maps: Iterable[int]) -> 'CollisionGrid':
+        """Lấy lưới dùng chung của `map_id`, dựng mới nếu chưa có hoặc dữ liệu khác (kể cả tile IDs)."""
+        grid = cls._shared.get(map_id)
+        if (grid is None or grid.tile_id != tile_id or grid.tmw != tmw or grid.tmh != tmh
+                or (maps is not grid.maps and grid.maps != array('B', maps))):
+            grid = cls(map_id, tile_id, tmw, tmh, maps)
+            cls._shared[map_id] = grid
+        return grid
+
+    @classmethod
+    def clear_shared(cls):
+        """Xóa registry (ví dụ khi TILE_SET thay đổi)."""
+        cls._shared.clear()
+
+    # ── Truy vấn đơn ──
+
+    def type_at(self, px: int, py: int) -> int:
+        """Cờ va chạm của tile tại pixel (px, py); 0 nếu ngoài map."""
+        col = px // self.size
+        row = py // self.size
+        if 0 <= col < self.tmw and 0 <= row < self.tmh:
+            return self.types[row * self.tmw + col]
+        return 0
+
+    def is_type_at(self, px: int, py: int, t: int) -> bool:
+        return (self.type_at(px, py) & t) == t
+
+    # ── Truy vấn hàng loạt ──
+
+    def are_types_at(self, points: Iterable[Tuple[int, int]], t: int) -> List[bool]:
+        """Phiên bản hàng loạt của `is_type_at` cho nhiều điểm pixel."""
+        if self.np_types is not None:
+            pts = np.asarray(list(points), dtype=np.int64).reshape(-1, 2)
+            cols = pts[:, 0] // self.size
+            rows = pts[:, 1] // self.size
+            valid = (cols >= 0) & (cols < self.tmw) & (rows >= 0) & (rows < self.tmh)
+            result = np.zeros(len(pts), dtype=bool)
+            flags = self.np_types[rows[valid], cols[valid]]
+            result[valid] = (flags & t) == t
+            return result.tolist()
+
+        types = self.types
+        tmw, tmh, size = self.tmw, self.tmh, self.size
+        out = []
+        for px, py in points:
+            col = px // size
+            row = py // size
+            out.append(0 <= col < tmw and 0 <= row < tmh and (types[row * tmw + col] & t) == t)
+        return out
+
+    def ground_y(self, px: int, py: int) -> Optional[int]:
+        """Y pixel của mặt đất (ô T_TOP đầu tiên) tính từ (px, py) trở xuống; None nếu không có."""
+        col = px // self.size
+        if not 0 <= col < self.tmw:
+            return None
+        start = max(py // self.size, 0)
+        if start >= self.tmh:
+            return None
+
+        if self.np_types is not None:
+            hits = np.flatnonzero(self.np_types[start:, col] & TileMap.T_TOP)
+            return int(start + hits[0]) * self.size if hits.size else None
+
+        types, tmw = self.types, self.tmw
+        for row in range(start, self.tmh):
+            if types[row * tmw + col] & TileMap.T_TOP:
+                return row * self.size
+        return None
+
+    def top_cells(self) -> List[Tuple[int, int]]:
+        """Danh sách ô (cột, hàng) đứng được (có T_TOP), tính một lần rồi cache."""
+        if self._top_cells is None:
+            tmw = self.tmw
+            self._top_cells = [(i % tmw, i // tmw) for i, t in enumerate(self.types) if t & TileMap.T_TOP]
+        return self._top_cells
+
+    def nearest_walkable(self, px: int, py: int) -> Optional[Tuple[int, int]]:
+        """Điểm pixel đứng được (giữa mặt trên ô T_TOP) gần (px, py) nhất; None nếu map không có."""
+        size = self.size
+        half = size // 2
+        if self.np_types is not None:
+            rows, cols = np.nonzero(self.np_types & TileMap.T_TOP)
+            if not rows.size:
+                return None
+            d2 = (cols * size + half - px) ** 2 + (rows * size - py) ** 2
+            i = int(np.argmin(d2))
+            return int(cols[i]) * size + half, int(rows[i]) * size
+
+        best = None
+        best_d2 = None
+        for col, row in self.top_cells():
+            x = col * size + half
+            y = row * size
+            d2 = (x - px) ** 2 + (y - py) ** 2
+            if best_d2 is None or d2 < best_d2:
+                best_d2 = d2
+                best = (x, y)
+        return best
+
+
 class TileMap:
     # Tile Types (from C# TileMap.cs)
     T_EMPTY = 0
@@ -55,8 +209,17 @@ class TileMap:
         self.tmw: int = 0
         self.tmh: int = 0
         self.size: int = 24
-        self.maps: List[int] = [] # Tile IDs
-        self.types: List[int] = [] # Tile Types (Collision flags)
+        self.grid: Optional[CollisionGrid] = None # Lưới va chạm dùng chung theo map_id
+
+    @property
+    def maps(self) -> array:
+        """Tile IDs (row-major), dùng chung với các tài khoản khác trên cùng map."""
+        return self.grid.maps if self.grid else array('B')
+
+    @property
+    def types(self) -> array:
+        """Tile Types (Collision flags), row-major."""
+        return self.grid.types if self.grid else array('i')
 
     def set_map_info(self, map_id, planet_id, tile_id, bg_id, type_map, map_name, zone_id):
         self.map_id = map_id
@@ -70,21 +233,40 @@ class TileMap:
     def add_waypoint(self, wp: Waypoint):
         self.waypoints.append(wp)
 
+    def load_map_template(self, tmw: int, tmh: int, maps: List[int]):
+        """Load tile IDs from the map template (NOT_MAP sub 10) into the shared collision grid."""
+        self.tmw = tmw
+        self.tmh = tmh
+        if tmw * tmh == 0:
+            self.grid = None
+            return
+        self.grid = CollisionGrid.shared(self.map_id, self.tile_id, tmw, tmh, maps)
+
+    def load_types(self):
+        """Rebuild collision types after the shared tile set changed (C# TileMap.loadMap)."""
+        if self.grid is not None:
+            self.grid = CollisionGrid.shared(self.map_id, self.tile_id, self.tmw, self.tmh, self.grid.maps)
+
+    @property
+    def has_tile_data(self) -> bool:
+        return self.grid is not None and len(self.grid.types) == self.tmw * self.tmh
+
     def is_tile_type_at(self, px: int, py: int, t: int) -> bool:
-        """Check if tile at pixel (px, py) has type t."""
-        try:
-            # If we don't have map data, return False (assume clear)
-            # Or safe default?
-            if not self.types:
-                return False
-            
-            # Simple bounds check
-            if px < 0 or py < 0: return False
-            
-            idx = (py // self.size) * self.tmw + (px // self.size)
-            if idx < 0 or idx >= len(self.types):
-                return False
-                
-            return (self.types[idx] & t) == t
-        except Exception:
+        """Check if tile at pixel (px, py) has type t (False outside the map or without tile data)."""
+        if self.grid is None:
             return False
+        return self.grid.is_type_at(px, py, t)
+
+    def are_tile_types_at(self, points: Iterable[Tuple[int, int]], t: int) -> List[bool]:
+        """Batch `is_tile_type_at` over many pixel points."""
+        if self.grid is None:
+            return [False for _ in points]
+        return self.grid.are_types_at(points, t)
+
+    def ground_y(self, px: int, py: int) -> Optional[int]:
+        """Ground height (pixel Y of the first T_TOP tile) at or below (px, py)."""
+        return self.grid.ground_y(px, py) if self.grid else None
+
+    def nearest_walkable(self, px: int, py: int) -> Optional[Tuple[int, int]]:
+        """Nearest standable pixel position (top of a T_TOP tile) to (px, py)."""
+        return self.grid.nearest_walkable(px, py) if self.grid else None
@@ -25,5 +25,9 @@ class Message:
     def get_data(self) -> bytes:
         return self._writer.get_data()
 
+    def payload_size(self) -> int:
+        """Kích thước payload của tin nhắn nhận được (0 nếu không có dữ liệu đọc)."""
+        return len(self._reader.data) if self._reader else 0
+
     def cleanup(self):
         pass
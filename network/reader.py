@@ -1,5 +1,7 @@
 import struct
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+
+logger = get_logger("network.reader")
 
 class Reader:
     def __init__(self, data: bytes):
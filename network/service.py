@@ -1,16 +1,33 @@
-from logs.logger_config import logger 
+import time
+from collections import deque
+from logs.logger_config import get_logger
 from network.writer import Writer
 from network.message import Message
 from network.session import Session
 from model.game_objects import Char
 from constants.cmd import Cmd
 
+logger = get_logger("network.service")
+
+MAP_TEMPLATE_TIMEOUT = 5.0  # Giây; yêu cầu map template quá hạn coi như server đã bỏ qua
+
 # logger = logging.getLogger(__name__)
 
 class Service:
     def __init__(self, session: Session, char_data: Char):
         self.session = session
         self.char_data = char_data
+        # (map_id, thời điểm gửi) đã xin template, theo thứ tự gửi (gói trả lời không mang map_id,
+        # server trả theo thứ tự); yêu cầu không được trả lời bị bỏ sau MAP_TEMPLATE_TIMEOUT
+        self.pending_map_templates: deque = deque()
+
+    def expire_map_templates(self):
+        """Bỏ các yêu cầu map template đã quá MAP_TEMPLATE_TIMEOUT mà chưa có trả lời."""
+        pending = self.pending_map_templates
+        deadline = time.monotonic() - MAP_TEMPLATE_TIMEOUT
+        while pending and pending[0][1] < deadline:
+            map_id, _ = pending.popleft()
+            logger.warning(f"Yêu cầu map template map={map_id} không có trả lời, bỏ qua")
 
     async def pet_info(self):
         """Yêu cầu thông tin đệ tử (Cmd -107)"""
@@ -328,6 +345,25 @@ class Service:
         except Exception as e:
             logger.error(f"Lỗi khi gửi yêu cầu cộng tiềm năng: {e}")
 
+    async def request_map_template(self, map_id: int):
+        """Yêu cầu map template (tile IDs) của map (Cmd -28, sub 10)."""
+        self.expire_map_templates()
+        if any(pending_id == map_id for pending_id, _ in self.pending_map_templates):
+            return  # Đang chờ trả lời cho map này
+        entry = (map_id, time.monotonic())
+        try:
+            msg = Message(Cmd.NOT_MAP)
+            writer = msg.writer()
+            writer.write_byte(Cmd.REQUEST_MAPTEMPLATE)
+            writer.write_ubyte(map_id)
+            self.pending_map_templates.append(entry)
+            await self.session.send_message(msg)
+            logger.info(f"Đã gửi yêu cầu map template: map={map_id}")
+        except Exception as e:
+            if self.pending_map_templates and self.pending_map_templates[-1] is entry:
+                self.pending_map_templates.pop()
+            logger.error(f"Lỗi khi gửi yêu cầu map template: {e}")
+
     async def request_me_info(self):
         """Gửi yêu cầu cập nhật thông tin nhân vật (Cmd -30, sub 0)."""
         try:
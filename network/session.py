@@ -5,9 +5,13 @@ from typing import Optional
 from network.message import Message
 from config import Config
 from constants.cmd import Cmd
+from logs.metrics import METRICS
 
 logger = logging.getLogger(__name__)
 
+NET_PACKETS = METRICS.counter("nro_packets_total", "Số gói tin theo chiều (in/out)", ("account", "direction"))
+NET_BYTES = METRICS.counter("nro_bytes_total", "Số byte payload theo chiều (in/out)", ("account", "direction"))
+
 class Session:
     def __init__(self, controller=None, proxy=None):
         self.reader: Optional[asyncio.StreamReader] = None
@@ -20,6 +24,13 @@ class Session:
         self.controller = controller
         self.proxy = proxy
 
+        # Series metric của account này, lấy một lần để hot path chỉ còn phép cộng
+        username = getattr(getattr(controller, 'account', None), 'username', 'unknown')
+        self._m_packets_in = NET_PACKETS.labels(username, "in")
+        self._m_packets_out = NET_PACKETS.labels(username, "out")
+        self._m_bytes_in = NET_BYTES.labels(username, "in")
+        self._m_bytes_out = NET_BYTES.labels(username, "out")
+
     async def connect(self, host: str, port: int):
         try:
             if self.proxy:
@@ -100,7 +111,8 @@ class Session:
         command = msg.command
         payload = msg.get_data()
         
-        logger.debug(f"Đang chuẩn bị MSG: {command}, Độ dài Payload: {len(payload)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Đang chuẩn bị MSG: {command}, Độ dài Payload: {len(payload)}")
         
         buffer = bytearray()
 
@@ -121,12 +133,16 @@ class Session:
             buffer.extend(payload)
 
         # GHI NHẬT KÝ HEX
-        logger.debug(f"GỬI [Mã hóa={self.get_key_complete}][Chỉ mục_W={self.cur_w}]: {buffer.hex()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"GỬI [Mã hóa={self.get_key_complete}][Chỉ mục_W={self.cur_w}]: {buffer.hex()}")
 
         try:
             self.writer.write(buffer)
             await self.writer.drain()
-            logger.info(f"Đã gửi tin nhắn: {command}, Độ dài: {length} bytes")
+            self._m_packets_out.inc()
+            self._m_bytes_out.inc(len(buffer))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Đã gửi tin nhắn: {command}, Độ dài: {length} bytes")
         except Exception as e:
             logger.error(f"Lỗi khi gửi tin nhắn (socket error): {e}")
             self.disconnect()
@@ -201,6 +217,9 @@ class Session:
 
                 # logger.debug(f"NHẬN MSG (Thô): {cmd}, Dài: {length}, Payload: {payload_raw.hex()}")
                 
+                self._m_packets_in.inc()
+                self._m_bytes_in.inc(length)
+
                 msg = Message(cmd, payload)
                 await self.on_message(msg)
 
@@ -226,10 +245,12 @@ class Session:
     async def on_message(self, msg: Message):
         # Lọc các lệnh tài nguyên/nhiễu
         if msg.command in [Cmd.GET_IMG_BY_NAME, Cmd.GET_IMAGE_SOURCE]:
-            logger.debug(f"Đã bỏ qua tin nhắn tài nguyên: {msg.command}, Độ dài: {len(msg.get_data())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Đã bỏ qua tin nhắn tài nguyên: {msg.command}, Độ dài: {len(msg.get_data())}")
             return
 
-        logger.info(f"Đã nhận tin nhắn: {msg.command}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Đã nhận tin nhắn: {msg.command}")
         
         if msg.command == Cmd.GET_SESSION_ID: # -27
             self.process_key_message(msg)
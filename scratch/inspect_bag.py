@@ -10,6 +10,7 @@ if _project_root not in sys.path:
 from config import Config
 from core.account_manager import AccountManager
 from services.inventory import InventoryService
+from controller.event_bus import PetInfoUpdated
 
 async def main():
     Config.init()
@@ -35,10 +36,10 @@ async def main():
         print("\n--- EQUIPMENT PET ---")
         if acc.pet and acc.pet.have_pet:
             # Request pet info first to load it
-            acc.controller.pet_info_event.clear()
-            await acc.service.pet_info()
             try:
-                await asyncio.wait_for(acc.controller.pet_info_event.wait(), timeout=3.0)
+                with acc.controller.events.expect(PetInfoUpdated) as pet_info:
+                    await acc.service.pet_info()
+                    await pet_info.result(3.0)
             except Exception:
                 pass
             for idx, item in enumerate(acc.pet.arr_item_body or []):
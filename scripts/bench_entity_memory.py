@@ -0,0 +1,83 @@
+"""
+Đo bộ nhớ của các entity model (Mob, Item, CharInfo) so với dạng cũ (dataclass có __dict__ / dict).
+
+Chạy: python scripts/bench_entity_memory.py [số_lượng]
+"""
+import os
+import sys
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+from model.game_objects import CharEffect, CharInfo, Item, ItemOption, Mob
+
+# Dạng cũ: dataclass không slots, cùng danh sách field
+LegacyMob = make_dataclass('LegacyMob', [(f.name, f.type, f) for f in fields(Mob)])
+
+
+class LegacyItem:
+    def __init__(self):
+        self.template = None
+        self.item_id = 0
+        self.quantity = 0
+        self.info = ""
+        self.content = ""
+        self.item_option = []
+        self.index_ui = 0
+
+
+def legacy_char(i: int) -> dict:
+    return {
+        'level': 10, 'is_invisible': False, 'type_pk': 0, 'class': 0, 'gender': 1,
+        'head': 64, 'name': f"player{i}", 'hp': 1000, 'max_hp': 1000, 'body': 1, 'leg': 2,
+        'bag': 0, 'x': i, 'y': 300, 'eff_buff_hp': 0, 'eff_buff_mp': 0,
+        'effects': [{'id': 1, 'p1': 2, 'p2': 3, 'p3': 4}], 'id': i, 'clan_id': -1,
+    }
+
+
+def new_char(i: int) -> CharInfo:
+    return CharInfo(id=i, clan_id=-1, level=10, gender=1, head=64, name=f"player{i}",
+                    hp=1000, max_hp=1000, body=1, leg=2, x=i, y=300,
+                    effects=[CharEffect(1, 2, 3, 4)])
+
+
+def fill_item(item, i: int):
+    item.item_id = i
+    item.quantity = 1
+    item.info = "info"
+    item.content = "content"
+    item.item_option = [ItemOption(47, 10)]
+    item.index_ui = i
+    return item
+
+
+def measure(factory, n: int) -> int:
+    """Tổng số byte được cấp phát để giữ `n` object do `factory(i)` tạo ra."""
+    tracemalloc.start()
+    objs = [factory(i) for i in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return size
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cases = [
+        ("Mob", lambda i: LegacyMob(mob_id=i, x=i, y=i), lambda i: Mob(mob_id=i, x=i, y=i)),
+        ("Item", lambda i: fill_item(LegacyItem(), i), lambda i: fill_item(Item(), i)),
+        ("CharInfo", legacy_char, new_char),
+    ]
+    print(f"{'Model':<10} | {'Cũ (B/obj)':>12} | {'Mới (B/obj)':>12} | {'Giảm':>6}")
+    print("-" * 50)
+    for name, old_factory, new_factory in cases:
+        old = measure(old_factory, n) / n
+        new = measure(new_factory, n) / n
+        print(f"{name:<10} | {old:>12.1f} | {new:>12.1f} | {(1 - new / old) * 100:>5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
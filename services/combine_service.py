@@ -17,7 +17,8 @@ from typing import Callable, Optional
 
 from logs.logger_config import TerminalColors
 from services.navigation import NavigationService, move_to_map, teleport_to_npc, find_menu_option
-from services.inventory import InventoryService, refresh_inventory, count_item
+from services.inventory import InventoryService, refresh_inventory, count_item, expect_change
+from controller.event_bus import MenuOpened, CombineUpdate
 
 
 # ── Option IDs trong NRO ──
@@ -33,15 +34,14 @@ def detect_star_option(acc, item_id: int) -> Optional[int]:
       - Option 102: ép sao (param = star count)
       - Option 107: pha lê hóa hoặc max slots
     """
-    for item in acc.char.arr_item_bag or []:
-        if item is not None and item.item_id == item_id:
-            for opt in (item.item_option or []):
-                if opt.option_template_id == 102:
-                    return 102
-            for opt in (item.item_option or []):
-                if opt.option_template_id == 107:
-                    return 107
-            break
+    index = acc.char.bag_index
+    slot = index.first_slot(item_id)
+    if slot == -1:
+        return None
+    options = index.summary(slot).options
+    for option_id in (102, 107):
+        if option_id in options:
+            return option_id
     return None
 
 
@@ -131,23 +131,11 @@ class CombineService:
 
     def _get_star_count(self, item_id: int) -> int:
         """Lấy số sao ép sao hiện tại của item (chỉ option 102)."""
-        for item in self.acc.char.arr_item_bag or []:
-            if item is not None and item.item_id == item_id:
-                for opt in (item.item_option or []):
-                    if opt.option_template_id == OPTION_STAR_EP:
-                        return opt.param
-        return 0
+        return self.acc.char.bag_index.option(item_id, OPTION_STAR_EP)
 
     def _get_star_count_max(self, item_id: int) -> int:
         """Lấy số sao ép sao cao nhất (chỉ option 102)."""
-        max_s = 0
-        for item in self.acc.char.arr_item_bag or []:
-            if item is not None and item.item_id == item_id:
-                for opt in (item.item_option or []):
-                    if opt.option_template_id == OPTION_STAR_EP:
-                        if opt.param > max_s:
-                            max_s = opt.param
-        return max_s
+        return self.acc.char.bag_index.max_option(item_id, OPTION_STAR_EP)
 
     def get_item_stars(self, item_id: int) -> int:
         """Lấy số sao cao nhất của item trong balo."""
@@ -180,18 +168,19 @@ class CombineService:
                     "info": "tên", "options": [...]}]
         """
         results = []
-        for idx, item in enumerate(self.acc.char.arr_item_bag or []):
-            if item is not None and item.item_id == item_id:
-                results.append({
-                    "index": idx,
-                    "qty": item.quantity,
-                    "stars": self._get_item_stars(item),
-                    "info": item.info or f"Item {item_id}",
-                    "options": [
-                        {"id": o.option_template_id, "param": o.param}
-                        for o in (item.item_option or [])
-                    ],
-                })
+        bag = self.acc.char.arr_item_bag
+        for idx in self.acc.char.bag_index.slots(item_id):
+            item = bag[idx]
+            results.append({
+                "index": idx,
+                "qty": item.quantity,
+                "stars": self._get_item_stars(item),
+                "info": item.info or f"Item {item_id}",
+                "options": [
+                    {"id": o.option_template_id, "param": o.param}
+                    for o in (item.item_option or [])
+                ],
+            })
         return results
 
     def get_slot_max(self, item) -> int:
@@ -311,15 +300,11 @@ class CombineService:
         await asyncio.sleep(0.01)
 
         # Mở menu NPC
-        ctrl.ui_menu_event.clear()
-        await self.acc.service.open_menu_npc(npc_id)
-        try:
-            await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=2.0)
-        except asyncio.TimeoutError:
-            pass
-        await asyncio.sleep(0.01)
+        with ctrl.events.expect(MenuOpened) as menu:
+            await self.acc.service.open_menu_npc(npc_id)
+            event = await menu.wait(timeout=2.0)
 
-        opts = ctrl.last_ui_options or []
+        opts = event.options if event else []
         self.log(f"{C.DIM}→ Menu NPC {npc_id}: {opts}{C.RESET}")
         if not opts:
             return False
@@ -331,15 +316,11 @@ class CombineService:
         self.log(f"{C.DIM}→ Chọn '{opts[func_idx]}'.{C.RESET}")
 
         # Mở sub-menu
-        ctrl.ui_menu_event.clear()
-        await self.acc.service.confirm_menu_npc(npc_id, func_idx)
-        try:
-            await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=2.0)
-        except asyncio.TimeoutError:
-            pass
-        await asyncio.sleep(0.01)
+        with ctrl.events.expect(MenuOpened) as menu:
+            await self.acc.service.confirm_menu_npc(npc_id, func_idx)
+            event = await menu.wait(timeout=2.0)
 
-        opts2 = ctrl.last_ui_options or []
+        opts2 = event.options if event else []
         self.log(f"{C.DIM}→ Sub-menu: {opts2}{C.RESET}")
         if not opts2:
             return False
@@ -370,18 +351,14 @@ class CombineService:
         self.log(f"{C.DIM}→ Chọn '{opts2[combine_idx]}'.{C.RESET}")
 
         # Mở tab combine
-        ctrl.ui_menu_event.clear()
-        ctrl.combine_event.clear()
-        ctrl.combine_result = ""
-        await self.acc.service.confirm_menu_npc(npc_id, combine_idx)
+        with ctrl.events.expect(CombineUpdate) as combine:
+            await self.acc.service.confirm_menu_npc(npc_id, combine_idx)
+            opened = await combine.wait(timeout=2.0)
 
-        try:
-            await asyncio.wait_for(ctrl.combine_event.wait(), timeout=2.0)
+        if opened:
             self.log(f"{C.GREEN}→ Tab combine đã mở.{C.RESET}")
-        except asyncio.TimeoutError:
+        else:
             self.log(f"{C.YELLOW}→ Timeout chờ tab combine.{C.RESET}")
-
-        await asyncio.sleep(0.05)
         return True
 
     # ═══════════════════════════════════════════════
@@ -430,15 +407,11 @@ class CombineService:
             self.log(f"{C.DIM}→ Thử menu path {path_idx + 1}...{C.RESET}")
 
             # Mở menu NPC
-            ctrl.ui_menu_event.clear()
-            await self.acc.service.open_menu_npc(npc_id)
-            try:
-                await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
-            except asyncio.TimeoutError:
-                pass
-            await asyncio.sleep(0.1)
+            with ctrl.events.expect(MenuOpened) as menu:
+                await self.acc.service.open_menu_npc(npc_id)
+                event = await menu.wait(timeout=3.0)
 
-            opts = ctrl.last_ui_options or []
+            opts = event.options if event else []
             self.log(f"{C.DIM}  Menu NPC {npc_id}: {opts}{C.RESET}")
             if not opts:
                 continue
@@ -453,29 +426,21 @@ class CombineService:
 
             if not path["has_submenu"]:
                 # Direct option — confirm và mở tab combine
-                ctrl.ui_menu_event.clear()
-                ctrl.combine_event.clear()
-                ctrl.combine_result = ""
-                await self.acc.service.confirm_menu_npc(npc_id, main_idx)
-                try:
-                    await asyncio.wait_for(ctrl.combine_event.wait(), timeout=3.0)
+                with ctrl.events.expect(CombineUpdate) as combine:
+                    await self.acc.service.confirm_menu_npc(npc_id, main_idx)
+                    opened = await combine.wait(timeout=3.0)
+                if opened:
                     self.log(f"{C.GREEN}→ Tab item upgrade đã mở (path {path_idx + 1}).{C.RESET}")
-                    await asyncio.sleep(0.01)
                     return True
-                except asyncio.TimeoutError:
-                    self.log(f"{C.YELLOW}→ Timeout chờ tab combine.{C.RESET}")
-                    continue
+                self.log(f"{C.YELLOW}→ Timeout chờ tab combine.{C.RESET}")
+                continue
             else:
                 # Mở sub-menu
-                ctrl.ui_menu_event.clear()
-                await self.acc.service.confirm_menu_npc(npc_id, main_idx)
-                try:
-                    await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
-                except asyncio.TimeoutError:
-                    pass
-                await asyncio.sleep(0.01)
-
-                opts2 = ctrl.last_ui_options or []
+                with ctrl.events.expect(MenuOpened) as menu:
+                    await self.acc.service.confirm_menu_npc(npc_id, main_idx)
+                    event = await menu.wait(timeout=3.0)
+
+                opts2 = event.options if event else []
                 self.log(f"{C.DIM}  Sub-menu: {opts2}{C.RESET}")
                 if not opts2:
                     continue
@@ -500,18 +465,14 @@ class CombineService:
                 self.log(f"{C.DIM}  Chọn '{opts2[sub_idx]}'.{C.RESET}")
 
                 # Mở tab combine
-                ctrl.ui_menu_event.clear()
-                ctrl.combine_event.clear()
-                ctrl.combine_result = ""
-                await self.acc.service.confirm_menu_npc(npc_id, sub_idx)
-                try:
-                    await asyncio.wait_for(ctrl.combine_event.wait(), timeout=3.0)
+                with ctrl.events.expect(CombineUpdate) as combine:
+                    await self.acc.service.confirm_menu_npc(npc_id, sub_idx)
+                    opened = await combine.wait(timeout=3.0)
+                if opened:
                     self.log(f"{C.GREEN}→ Tab item upgrade đã mở (path {path_idx + 1}: {opts2[sub_idx]}).{C.RESET}")
-                    await asyncio.sleep(0.01)
                     return True
-                except asyncio.TimeoutError:
-                    self.log(f"{C.YELLOW}→ Timeout chờ tab combine.{C.RESET}")
-                    continue
+                self.log(f"{C.YELLOW}→ Timeout chờ tab combine.{C.RESET}")
+                continue
 
         self.log(f"{C.RED}→ Không mở được tab item upgrade sau {len(menu_paths)} paths.{C.RESET}")
         return False
@@ -528,8 +489,8 @@ class CombineService:
         """Thực hiện combine lặp lại: main + materials → xác nhận → verify.
 
         Flow:
-          send_combine_items → đợi menu (ui_menu_event) → chọn option
-          → đợi kết quả combine (combine_event) → verify
+          send_combine_items → đợi menu (MenuOpened) → chọn option
+          → đợi kết quả combine (CombineUpdate) → verify
 
         Args:
             main_item_id: ID item chính (trang bị cần ép)
@@ -554,6 +515,7 @@ class CombineService:
             # Track ALL materials before combine, not just Item 16
             mat_ids = [m[0] for m in materials]
             mat_before = {mid: count_item(self.acc, mid) for mid in mat_ids}
+            stars_before = self._get_star_count(main_item_id) or 0
 
             # ── Tìm main item (theo index cụ thể hoặc first item) ──
             main_idx = bag_index
@@ -594,77 +556,66 @@ class CombineService:
             self.log(f"{C.DIM}  Lần {round_idx + 1}/{max_times}: "
                      f"indices={all_indices}{C.RESET}")
 
-            # ── Clear state trước khi gửi ──
-            ctrl.combine_event.clear()
-            ctrl.combine_result = ""
-            ctrl.ui_menu_event.clear()
-            ctrl.last_ui_options = []
-            ctrl.last_npc_template_id = 0
-
-            # ── Gửi combine items ──
-            await self.acc.service.send_combine_items(all_indices)
-
-            # ── Server gửi menu confirm (OPEN_UI_CONFIRM cmd 32) ──
-            result = None
-            try:
-                await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=3.0)
-            except asyncio.TimeoutError:
-                pass
-
-            opts = ctrl.last_ui_options or []
-
-            if opts:
-                self.log(f"{C.DIM}  Menu confirm: {opts}{C.RESET}")
-
-                # Chọn option "nâng cấp", tránh "đóng"
-                confirm_idx = -1
-                close_idx = -1
-                for i, opt in enumerate(opts):
-                    ol = opt.lower().replace('\n', ' ')
-                    if any(kw in ol for kw in ["đóng", "dong", "từ chối", "tu choi"]):
-                        close_idx = i
-                    elif any(kw in ol for kw in ["nâng cấp", "nang cap", "cần", "can",
-                                                  "ngọc", "ngoc", "đồng ý", "dong y",
-                                                  "xác nhận", "xac nhan", "cường hóa",
-                                                  "cuong hoa"]):
-                        confirm_idx = i
-                        break
-
-                if confirm_idx == -1:
+            # ── Đăng ký chờ trước khi gửi ──
+            with (ctrl.events.expect(MenuOpened) as menu,
+                  ctrl.events.expect(CombineUpdate, lambda e: e.result in ("success", "fail")) as early_result,
+                  # Chờ balo thay đổi (material bị trừ / main item đổi option) thay vì luôn refresh
+                  expect_change(self.acc, item_ids=mat_ids + [main_item_id]) as bag_changed):
+                # ── Gửi combine items ──
+                await self.acc.service.send_combine_items(all_indices)
+
+                # ── Server gửi menu confirm (OPEN_UI_CONFIRM cmd 32) ──
+                result = None
+                event = await menu.wait(timeout=3.0)
+                opts = event.options if event else []
+
+                if opts:
+                    self.log(f"{C.DIM}  Menu confirm: {opts}{C.RESET}")
+
+                    # Chọn option "nâng cấp", tránh "đóng"
+                    confirm_idx = -1
+                    close_idx = -1
                     for i, opt in enumerate(opts):
-                        if i != close_idx:
+                        ol = opt.lower().replace('\n', ' ')
+                        if any(kw in ol for kw in ["đóng", "dong", "từ chối", "tu choi"]):
+                            close_idx = i
+                        elif any(kw in ol for kw in ["nâng cấp", "nang cap", "cần", "can",
+                                                      "ngọc", "ngoc", "đồng ý", "dong y",
+                                                      "xác nhận", "xac nhan", "cường hóa",
+                                                      "cuong hoa"]):
                             confirm_idx = i
                             break
-                if confirm_idx == -1:
-                    confirm_idx = 0
-
-                self.log(f"{C.DIM}  Chọn: '{opts[confirm_idx]}' (index {confirm_idx}){C.RESET}")
-
-                # Gửi xác nhận
-                ctrl.combine_event.clear()
-                ctrl.combine_result = ""
-                ctrl.ui_menu_event.clear()
-                ctrl.last_ui_options = []
-                await self.acc.service.confirm_menu_npc(npc_id, confirm_idx)
-
-                # Đợi kết quả combine (timeout 5s để server kịp xử lý)
-                try:
-                    await asyncio.wait_for(ctrl.combine_event.wait(), timeout=5.0)
-                    if ctrl.combine_result == "reopen":
-                        result = "success"
-                    else:
-                        result = ctrl.combine_result
-                except asyncio.TimeoutError:
-                    pass
-            else:
-                if ctrl.combine_result in ("success", "fail"):
-                    result = ctrl.combine_result
 
-            # ── Verify ──
-            await refresh_inventory(self.acc)
+                    if confirm_idx == -1:
+                        for i, opt in enumerate(opts):
+                            if i != close_idx:
+                                confirm_idx = i
+                                break
+                    if confirm_idx == -1:
+                        confirm_idx = 0
+
+                    self.log(f"{C.DIM}  Chọn: '{opts[confirm_idx]}' (index {confirm_idx}){C.RESET}")
+
+                    # Gửi xác nhận
+                    early_result.cancel()
+                    with ctrl.events.expect(CombineUpdate) as combine:
+                        await self.acc.service.confirm_menu_npc(npc_id, confirm_idx)
+
+                        # Đợi kết quả combine (timeout 5s để server kịp xử lý)
+                        update = await combine.wait(timeout=5.0)
+                    if update:
+                        result = "success" if update.result == "reopen" else update.result
+                else:
+                    if early_result.done():
+                        result = early_result.event.result
+                    early_result.cancel()
+
+                # ── Verify ── (chỉ tải lại cả balo nếu server chưa gửi cập nhật balo nào)
+                if not bag_changed.done():
+                    bag_changed.cancel()
+                    await refresh_inventory(self.acc)
             mat_after = {mid: count_item(self.acc, mid) for mid in mat_ids}
             mat_consumed = any(mat_after[mid] < mat_before.get(mid, 0) for mid in mat_ids)
-            stars_before = self._get_star_count(main_item_id) or 0
             stars_after = self._get_star_count_max(main_item_id) or 0
 
             if result == "success":
@@ -708,22 +659,16 @@ class CombineService:
         Returns: 'success' | 'fail' | 'timeout' | ''
         """
         ctrl = self.ctrl
-        ctrl.combine_event.clear()
-        ctrl.combine_result = ""
-        ctrl.ui_menu_event.clear()
-        ctrl.last_ui_options = []
-
-        await self.acc.service.send_combine_items(indices)
-
-        # Đợi menu confirm
-        try:
-            await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=4.0)
-        except asyncio.TimeoutError:
-            pass
-
-        opts = ctrl.last_ui_options or []
+        with (ctrl.events.expect(MenuOpened) as menu,
+              ctrl.events.expect(CombineUpdate, lambda e: e.result in ("success", "fail")) as early_result):
+            await self.acc.service.send_combine_items(indices)
+
+            # Đợi menu confirm
+            event = await menu.wait(timeout=4.0)
+        opts = event.options if event else []
+        early = early_result.event
         if not opts:
-            return ctrl.combine_result if ctrl.combine_result in ("success", "fail") else ""
+            return early.result if early else ""
 
         # Chọn option đầu tiên không phải "Đóng"
         confirm_idx = 0
@@ -733,14 +678,10 @@ class CombineService:
                 confirm_idx = i
                 break
 
-        ctrl.combine_event.clear()
-        ctrl.combine_result = ""
-        await self.acc.service.confirm_menu_npc(npc_id, confirm_idx)
+        with ctrl.events.expect(CombineUpdate) as combine:
+            await self.acc.service.confirm_menu_npc(npc_id, confirm_idx)
 
-        try:
-            await asyncio.wait_for(ctrl.combine_event.wait(), timeout=5.0)
-            if ctrl.combine_result == "reopen":
-                return "success"
-            return ctrl.combine_result
-        except asyncio.TimeoutError:
+            update = await combine.wait(timeout=5.0)
+        if update is None:
             return "timeout"
+        return "success" if update.result == "reopen" else update.result
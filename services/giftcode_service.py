@@ -9,20 +9,32 @@ Cách dùng:
   # status: 'success' | 'used' | 'expired' | 'invalid' | 'unknown'
 """
 
-import asyncio
 from typing import Callable, Optional
 
 from logs.logger_config import TerminalColors
+from controller.event_bus import EventWaiter, ServerMessage
 from services.navigation import NavigationService
 from services.inventory import InventoryService
+from logic.text_classifier import TEXT_CLASSIFIER
 
 
-# ── Từ khóa nhận diện phản hồi giftcode ──
+# ── Từ khóa nhận diện phản hồi giftcode (đăng ký vào bộ phân loại dùng chung) ──
 GIFTCODE_KEYWORDS = [
     "thành công", "chúc mừng", "nhận được", "tặng", "giftcode",
     "đã sử dụng", "da su dung", "hết hạn", "het han",
     "không tồn tại", "khong ton tai", "sai mã", "mã quà",
 ]
+GIFTCODE_RESPONSE_KEYWORDS = {
+    "giftcode": GIFTCODE_KEYWORDS,
+    "giftcode_success": ["thành công", "chúc mừng"],
+    "giftcode_reward": ["nhận được", "tặng"],
+    "giftcode_reward_item": ["item", "vật phẩm", "ngọc", "vàng"],
+    "giftcode_used": ["đã sử dụng", "da su dung", "đã dùng", "da dung"],
+    "giftcode_expired": ["hết hạn", "het han", "hết hiệu lực", "qua hạn"],
+    "giftcode_invalid": ["không tồn tại", "khong ton tai", "không đúng", "sai", "không hợp lệ", "khong hop le"],
+}
+for _category, _keywords in GIFTCODE_RESPONSE_KEYWORDS.items():
+    TEXT_CLASSIFIER.register(_category, _keywords)
 
 # ── Constants (import từ shared constants) ──
 from commands.setup.constants import SANTA_MAPS, NPC_SANTA, ITEM_1680
@@ -44,70 +56,44 @@ class GiftcodeService:
         self.nav = NavigationService(acc, log_func)
         self.inv = InventoryService(acc, log_func)
 
-    # ═══════════════════════════════════════════════
-    # EVENT GUARD
-    # ═══════════════════════════════════════════════
-
-    def _ensure_server_event(self):
-        """Đảm bảo server_message_event tồn tại và là asyncio.Event().
-        Controller có thể bị re-init (ví dụ khi reconnect), làm mất event cũ.
-        """
-        ctrl = self.ctrl
-        if ctrl.server_message_event is None or not isinstance(ctrl.server_message_event, asyncio.Event):
-            ctrl.server_message_event = asyncio.Event()
-        return ctrl.server_message_event
-
     # ═══════════════════════════════════════════════
     # WAIT FOR GIFTCODE RESPONSE
     # ═══════════════════════════════════════════════
 
-    async def wait_response(self, timeout: float = 5.0) -> tuple[str, str]:
+    @staticmethod
+    def classify_response(text: str) -> Optional[str]:
+        """Phân loại thông báo server: 'success'|'used'|'expired'|'invalid', None nếu không liên quan giftcode."""
+        match = TEXT_CLASSIFIER.classify(text)
+        if not match.has("giftcode"):
+            return None
+        if match.has("giftcode_success"):
+            return "success"
+        if match.has("giftcode_reward") and match.has("giftcode_reward_item"):
+            return "success"
+        if match.has("giftcode_used"):
+            return "used"
+        if match.has("giftcode_expired"):
+            return "expired"
+        if match.has("giftcode_invalid"):
+            return "invalid"
+        return None
+
+    def expect_response(self) -> EventWaiter:
+        """Đăng ký chờ phản hồi giftcode (gọi TRƯỚC khi gửi mã). Message không liên quan bị bỏ qua."""
+        return self.ctrl.events.expect(ServerMessage, lambda e: self.classify_response(e.text) is not None)
+
+    async def wait_response(self, timeout: float = 5.0,
+                            response: Optional[EventWaiter] = None) -> tuple[str, str]:
         """Đợi phản hồi server sau khi gửi giftcode.
-        Xử lý race condition: nếu message không liên quan → chờ message tiếp.
 
         Returns:
             (status, detail) với status: 'success'|'used'|'expired'|'invalid'|'unknown'
         """
-        C = self.C
-        ctrl = self.ctrl
-        deadline = asyncio.get_event_loop().time() + timeout
-
-        while True:
-            remaining = deadline - asyncio.get_event_loop().time()
-            if remaining <= 0:
-                self.log(f"{C.YELLOW}→ Timeout chờ phản hồi giftcode.{C.RESET}")
-                return ("unknown", "timeout")
-
-            try:
-                evt = self._ensure_server_event()
-                await asyncio.wait_for(evt.wait(), timeout=remaining)
-            except asyncio.TimeoutError:
-                self.log(f"{C.YELLOW}→ Timeout chờ phản hồi giftcode.{C.RESET}")
-                return ("unknown", "timeout")
-
-            text = ctrl.last_server_message.lower()
-            detail = ctrl.last_server_message
-
-            if not any(kw in text for kw in GIFTCODE_KEYWORDS):
-                self._ensure_server_event().clear()
-                continue
-
-            if "thành công" in text or "chúc mừng" in text:
-                return ("success", detail)
-            if ("nhận được" in text or "tặng" in text) and (
-                "item" in text or "vật phẩm" in text or "ngọc" in text or "vàng" in text
-            ):
-                return ("success", detail)
-            if any(kw in text for kw in ["đã sử dụng", "da su dung", "đã dùng", "da dung"]):
-                return ("used", detail)
-            if any(kw in text for kw in ["hết hạn", "het han", "hết hiệu lực", "qua hạn"]):
-                return ("expired", detail)
-            if any(kw in text for kw in ["không tồn tại", "khong ton tai", "không đúng",
-                                          "sai", "không hợp lệ", "khong hop le"]):
-                return ("invalid", detail)
-
-            self._ensure_server_event().clear()
-            continue
+        event = await (response or self.expect_response()).wait(timeout)
+        if event is None:
+            self.log(f"{self.C.YELLOW}→ Timeout chờ phản hồi giftcode.{self.C.RESET}")
+            return ("unknown", "timeout")
+        return (self.classify_response(event.text), event.text)
 
     # ═══════════════════════════════════════════════
     # CHECK ITEM 1680
@@ -153,7 +139,6 @@ class GiftcodeService:
     async def _submit_at_npc(self, code: str, npc_id: int) -> str:
         """Nhập giftcode tại NPC cụ thể."""
         C = self.C
-        ctrl = self.ctrl
 
         if not await self.nav.teleport_to_npc(npc_id):
             self.log(f"{C.YELLOW}→ Không tìm thấy NPC {npc_id}.{C.RESET}")
@@ -170,12 +155,10 @@ class GiftcodeService:
             self.log(f"{C.YELLOW}→ Timeout chờ form giftcode.{C.RESET}")
             return "unknown"
 
-        self._ensure_server_event().clear()
-        ctrl.last_server_message = ""
-        await self.acc.service.send_client_input([code])
-
-        status, detail = await self.wait_response()
-        await self._log_giftcode_result(code, status, detail)
+        with self.expect_response() as response:
+            await self.acc.service.send_client_input([code])
+            status, detail = await self.wait_response(response=response)
+        self._log_giftcode_result(code, status, detail)
         if status == "success" or status == "used":
             await self.check_reward_items()
         return status
@@ -209,12 +192,10 @@ class GiftcodeService:
             self.log(f"{C.YELLOW}→ Timeout chờ form giftcode tại Santa.{C.RESET}")
             return "unknown"
 
-        self._ensure_server_event().clear()
-        ctrl.last_server_message = ""
-        await self.acc.service.send_client_input([code])
-
-        status, detail = await self.wait_response()
-        await self._log_giftcode_result(f"{code} (Santa)", status, detail)
+        with self.expect_response() as response:
+            await self.acc.service.send_client_input([code])
+            status, detail = await self.wait_response(response=response)
+        self._log_giftcode_result(f"{code} (Santa)", status, detail)
         if status == "success" or status == "used":
             await self.check_reward_items()
         return status
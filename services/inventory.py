@@ -2,6 +2,7 @@
 InventoryService — Service tái sử dụng cho mọi thao tác kiểm tra hành trang (inventory).
 
 Không phụ thuộc vào setup accounts, có thể dùng từ bất kỳ module nào.
+Mọi truy vấn đều tra `char.bag_index` (InventoryIndex) nên không phải quét balo.
 
 Cách dùng:
   # Cách 1: Dùng class (khuyến nghị)
@@ -9,6 +10,12 @@ Cách dùng:
   count = svc.count_item(item_id=16)
   await svc.refresh()
 
+  # Chờ một thay đổi cụ thể thay vì refresh cả balo
+  change = svc.expect_change(item_ids=[16], kinds=["quantity", "removed"])
+  await acc.service.send_combine_items(...)
+  if await change.wait(timeout=3.0) is None:
+      await svc.refresh()
+
   # Cách 2: Dùng free functions (backward compatible)
   from services.inventory import count_item, refresh_inventory
   count = count_item(acc, item_id=16)
@@ -16,7 +23,9 @@ Cách dùng:
 """
 
 import asyncio
-from typing import Callable, Optional
+from typing import Callable, Iterable, Optional
+
+from controller.event_bus import MeLoaded
 
 
 # ═══════════════════════════════════════════════
@@ -26,58 +35,57 @@ from typing import Callable, Optional
 
 def count_item(acc, item_id: int) -> int:
     """Đếm số lượng item theo ID trong balo (free function)."""
-    count = 0
-    for item in acc.char.arr_item_bag or []:
-        if item is not None and item.item_id == item_id:
-            count += item.quantity
-    return count
+    return acc.char.bag_index.count(item_id)
 
 
 def find_item_index(acc, item_id: int) -> int:
     """Tìm index đầu tiên của item trong balo. Trả về -1 nếu không."""
-    for idx, item in enumerate(acc.char.arr_item_bag or []):
-        if item is not None and item.item_id == item_id:
-            return idx
-    return -1
+    return acc.char.bag_index.first_slot(item_id)
 
 
 def find_item_indices(acc, item_id: int, quantity: int = 1) -> list[int]:
     """Tìm nhiều index của item trong balo."""
-    indices = []
-    for idx, item in enumerate(acc.char.arr_item_bag or []):
-        if item is not None and item.item_id == item_id:
-            indices.append(idx)
-            if len(indices) >= quantity:
-                break
-    return indices
+    return list(acc.char.bag_index.slots(item_id)[:quantity])
 
 
 def has_item(acc, item_id: int) -> bool:
     """Kiểm tra có item trong balo không."""
-    for item in acc.char.arr_item_bag or []:
-        if item is not None and item.item_id == item_id:
-            return True
-    return False
+    return acc.char.bag_index.has(item_id)
 
 
 def count_items_by_ids(acc, item_ids: list[int]) -> dict[int, int]:
     """Đếm số lượng nhiều item IDs cùng lúc. Trả về {item_id: count}."""
-    counts = {iid: 0 for iid in item_ids}
-    for item in acc.char.arr_item_bag or []:
-        if item is not None and item.item_id in counts:
-            counts[item.item_id] += item.quantity
-    return counts
+    return acc.char.bag_index.count_many(item_ids)
+
+
+def change_filter(item_ids: Optional[Iterable[int]] = None, kinds: Optional[Iterable[str]] = None,
+                  container: str = "bag") -> Callable:
+    """Predicate cho InventoryChange theo item_ids / kinds ("added", "removed", "quantity", "options") / container."""
+    item_ids = set(item_ids) if item_ids is not None else None
+    kinds = set(kinds) if kinds is not None else None
+
+    def predicate(change) -> bool:
+        return (change.container == container
+                and (item_ids is None or change.item_id in item_ids)
+                and (kinds is None or change.kind in kinds))
+    return predicate
+
+
+def expect_change(acc, item_ids=None, kinds=None, container: str = "bag"):
+    """Đăng ký chờ thay đổi hành trang (gọi TRƯỚC khi gửi hành động)."""
+    return acc.controller.inventory_handler.expect_change(change_filter(item_ids, kinds, container))
 
 
 async def refresh_inventory(acc):
     """Refresh lại thông tin inventory từ server (free function)."""
-    try:
-        acc.controller.me_load_all_event.clear()
-        await acc.service.request_me_info()
-        await asyncio.wait_for(acc.controller.me_load_all_event.wait(), timeout=1.5)
-    except Exception:
-        # Fallback to a tiny sleep in case of failure/timeout
-        await asyncio.sleep(0.05)
+    with acc.controller.events.expect(MeLoaded) as loaded:
+        try:
+            await acc.service.request_me_info()
+        except Exception:
+            # Fallback to a tiny sleep in case of failure
+            await asyncio.sleep(0.05)
+            return
+        await loaded.wait(timeout=1.5)
 
 
 # ═══════════════════════════════════════════════
@@ -128,3 +136,15 @@ class InventoryService:
     async def refresh(self):
         """Refresh lại thông tin inventory từ server."""
         await refresh_inventory(self.acc)
+
+    # ═══════════════════════════════════════════════
+    # CHỜ THAY ĐỔI
+    # ═══════════════════════════════════════════════
+
+    def expect_change(self, item_ids=None, kinds=None, container: str = "bag"):
+        """Đăng ký chờ thay đổi hành trang (gọi TRƯỚC khi gửi hành động); trả về EventWaiter."""
+        return expect_change(self.acc, item_ids, kinds, container)
+
+    async def wait_for_change(self, item_ids=None, kinds=None, container: str = "bag", timeout: float = 2.0):
+        """Chờ InventoryChange kế tiếp khớp điều kiện. Hết giờ trả về None."""
+        return await expect_change(self.acc, item_ids, kinds, container).wait(timeout)
@@ -4,6 +4,7 @@ import logging
 from model.game_objects import Char
 from model.map_objects import Waypoint, TileMap
 from network.service import Service
+from services.pathfinder import find_route
 
 logger = logging.getLogger(__name__)
 
@@ -16,11 +17,17 @@ class MovementService:
     async def move_to(self, target_x: int, target_y: int):
         """
         Moves the character to target coordinates.
-        Uses simple linear interpolation for now.
+        Follows an A* route over the map's tile grid when collision data is loaded,
+        otherwise falls back to simple linear interpolation.
         """
         self.stop_moving()
         self.is_moving = True
-        self._move_task = asyncio.create_task(self._move_loop(target_x, target_y))
+        char = self.controller.account.char
+        route = find_route(self.controller.tile_map, char.cx, char.cy, target_x, target_y)
+        if route:
+            self._move_task = asyncio.create_task(self._route_loop(route))
+        else:
+            self._move_task = asyncio.create_task(self._move_loop(target_x, target_y))
         await self._move_task
 
     def stop_moving(self):
@@ -28,6 +35,29 @@ class MovementService:
             self._move_task.cancel()
         self.is_moving = False
 
+    async def _route_loop(self, route: list):
+        """Send one char_move per waypoint of a precomputed route."""
+        try:
+            await self._send_route(route, 0.1)
+        except asyncio.CancelledError:
+            logger.info("Movement cancelled.")
+        except Exception as e:
+            logger.error(f"Error in route movement: {e}")
+        finally:
+            self.is_moving = False
+
+    async def _send_route(self, route: list, step_delay: float):
+        """Send one char_move per route waypoint, sleeping `step_delay` between them."""
+        char = self.controller.account.char
+        for i, (wx, wy) in enumerate(route):
+            if wx != char.cx:
+                char.cdir = 1 if wx > char.cx else -1
+            char.cx = wx
+            char.cy = wy
+            await self.controller.account.service.char_move()
+            if step_delay and i < len(route) - 1:
+                await asyncio.sleep(step_delay)
+
     async def _move_loop(self, tx: int, ty: int):
         char = self.controller.account.char
         speed = 10 # Pixels per tick (approx)
@@ -68,14 +98,21 @@ class MovementService:
     async def teleport_to(self, target_x: int, target_y: int):
         """
         Teleports the character to target coordinates immediately with 'wiggle' to ensure server sync.
+        When the map's collision data is loaded, the jump follows the A* route (one char_move per
+        waypoint, no delay) so it never passes through walls or platforms; a target in line of sight
+        is still a single packet.
         """
         self.stop_moving()
         char = self.controller.account.char
         
         # 1. Main Teleport
-        char.cx = target_x
-        char.cy = target_y
-        await self.controller.account.service.char_move()
+        route = find_route(self.controller.tile_map, char.cx, char.cy, target_x, target_y)
+        if route:
+            await self._send_route(route, 0)
+        else:
+            char.cx = target_x
+            char.cy = target_y
+            await self.controller.account.service.char_move()
         
         # 2. Wiggle (Simulation of landing/adjusting)
         char.cy = target_y + 1
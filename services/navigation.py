@@ -12,7 +12,11 @@ Cách dùng:
   idx = svc.find_menu_option(opts, "ép sao")
   await svc.confirm_menu(npc_id=21, option_idx=1)
   await svc.go_home()
-  await svc.move_to_map(target_map_id=5)
+  await svc.move_to_map(target_map_id=5, timeout=10.0)
+  svc.last_wait  # NavWait(action, ok, waited, deadline) của thao tác vừa xong
+
+  Mọi thao tác chờ theo sự kiện từ controller (MenuOpened, InputFormOpened, MapEntered,
+  XMapStopped) với hạn `timeout` cấu hình được, không poll bằng sleep.
 
   # Cách 2: Dùng free functions (backward compatible)
   from services.navigation import find_npc, teleport_to_npc
@@ -21,13 +25,39 @@ Cách dùng:
 """
 
 import asyncio
+import time
+from dataclasses import dataclass
 from typing import Callable, Optional
 
-from logs.logger_config import TerminalColors
+from logs.logger_config import get_logger, TerminalColors
+from controller.event_bus import MenuOpened, InputFormOpened, MapEntered, XMapStopped, Disconnected
+
+logger = get_logger("services.navigation")
 
 
 # ── Constants ──
 HOME_MAPS = {0: 21, 1: 22, 2: 23}  # Map nhà theo giới tính
+TELEPORT_TIMEOUT = 3.0  # Hạn gửi xong gói di chuyển
+MENU_TIMEOUT = 3.0      # Hạn chờ menu / form từ server
+XMAP_TIMEOUT = 2.5      # Hạn chờ XMap tới map đích
+
+
+@dataclass(slots=True)
+class NavWait:
+    """Thời gian một thao tác điều hướng thực sự phải chờ."""
+    action: str
+    ok: bool
+    waited: float    # giây
+    deadline: float  # giây
+
+
+def _report(action: str, started: float, ok: bool, deadline: float,
+            on_wait: Optional[Callable[[NavWait], None]]) -> NavWait:
+    wait = NavWait(action, ok, time.perf_counter() - started, deadline)
+    logger.debug(f"[Nav] {action}: ok={ok} chờ {wait.waited * 1000:.0f}ms / hạn {deadline:.1f}s")
+    if on_wait:
+        on_wait(wait)
+    return wait
 
 
 # ═══════════════════════════════════════════════
@@ -56,74 +86,65 @@ def find_npc_by_name(acc, name: str) -> Optional[dict]:
     return None
 
 
-async def teleport_to_npc(acc, npc_id: int, y_offset: int = -3) -> bool:
-    """Teleport đến gần NPC (free function)."""
+async def teleport_to_npc(acc, npc_id: int, y_offset: int = -3, timeout: float = TELEPORT_TIMEOUT,
+                          on_wait: Optional[Callable[[NavWait], None]] = None) -> bool:
+    """Teleport đến gần NPC (free function). Xong khi các gói di chuyển đã gửi đi (server không phản hồi vị trí)."""
+    started = time.perf_counter()
+    movement = acc.controller.movement
     npc_data = find_npc(acc, npc_id)
-    if npc_data:
-        x, y = npc_data.get('x', 100), npc_data.get('y', 100)
-        await acc.controller.movement.teleport_to(x, y + y_offset)
-        await asyncio.sleep(0.01)
-        return True
+    ok = False
     try:
-        result = await acc.controller.movement.teleport_to_npc(npc_id, search_by_template=True)
-        if result:
-            await asyncio.sleep(0.01)
-            return True
+        if npc_data:
+            x, y = npc_data.get('x', 100), npc_data.get('y', 100)
+            await asyncio.wait_for(movement.teleport_to(x, y + y_offset), timeout)
+            ok = True
+        else:
+            ok = bool(await asyncio.wait_for(movement.teleport_to_npc(npc_id, search_by_template=True), timeout))
     except Exception:
         pass
-    return False
+    _report(f"teleport_to_npc({npc_id})", started, ok, timeout, on_wait)
+    return ok
 
 
-async def open_menu_npc(acc, npc_id: int, timeout: float = 3.0) -> list[str]:
+async def open_menu_npc(acc, npc_id: int, timeout: float = MENU_TIMEOUT,
+                        on_wait: Optional[Callable[[NavWait], None]] = None) -> list[str]:
     """Mở menu NPC, trả về danh sách tùy chọn (free function)."""
-    ctrl = acc.controller
-    ctrl.ui_menu_event.clear()
-    await acc.service.open_menu_npc(npc_id)
-    try:
-        await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=timeout)
-    except asyncio.TimeoutError:
-        pass
-    await asyncio.sleep(0.01)
-    return ctrl.last_ui_options or []
+    started = time.perf_counter()
+    with acc.controller.events.expect(MenuOpened) as menu:
+        await acc.service.open_menu_npc(npc_id)
+        event = await menu.wait(timeout)
+    _report(f"open_menu_npc({npc_id})", started, event is not None, timeout, on_wait)
+    return event.options if event else []
 
 
 async def confirm_menu_npc(acc, npc_id: int, option_idx: int,
-                            wait_next: bool = False, timeout: float = 3.0) -> list[str]:
-    """Xác nhận tùy chọn trong menu NPC (free function)."""
-    ctrl = acc.controller
-    if wait_next:
-        ctrl.ui_menu_event.clear()
-    await acc.service.confirm_menu_npc(npc_id, option_idx)
-    if wait_next:
-        try:
-            await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=timeout)
-        except asyncio.TimeoutError:
-            pass
-        await asyncio.sleep(0.01)
-        return ctrl.last_ui_options or []
-    await asyncio.sleep(0.01)
-    return []
-
-
-async def open_input_form(acc, npc_id: int, option_idx: int, timeout: float = 3.0) -> bool:
-    """Mở menu NPC → chọn option → đợi input form (free function)."""
-    ctrl = acc.controller
-    ctrl.ui_menu_event.clear()
-    ctrl.input_form_received.clear()
-    await acc.service.open_menu_npc(npc_id)
-    try:
-        await asyncio.wait_for(ctrl.ui_menu_event.wait(), timeout=timeout)
-    except asyncio.TimeoutError:
-        pass
-    await asyncio.sleep(0.01)
-    ctrl.ui_menu_event.clear()
-    await acc.service.confirm_menu_npc(npc_id, option_idx)
-    try:
-        await asyncio.wait_for(ctrl.input_form_received.wait(), timeout=timeout)
-        await asyncio.sleep(0.01)
-        return True
-    except asyncio.TimeoutError:
-        return False
+                            wait_next: bool = False, timeout: float = MENU_TIMEOUT,
+                            on_wait: Optional[Callable[[NavWait], None]] = None) -> list[str]:
+    """Xác nhận tùy chọn trong menu NPC (free function). `wait_next`: chờ menu kế tiếp."""
+    if not wait_next:
+        await acc.service.confirm_menu_npc(npc_id, option_idx)
+        return []
+    started = time.perf_counter()
+    with acc.controller.events.expect(MenuOpened) as menu:
+        await acc.service.confirm_menu_npc(npc_id, option_idx)
+        event = await menu.wait(timeout)
+    _report(f"confirm_menu_npc({npc_id}, {option_idx})", started, event is not None, timeout, on_wait)
+    return event.options if event else []
+
+
+async def open_input_form(acc, npc_id: int, option_idx: int, timeout: float = MENU_TIMEOUT,
+                          on_wait: Optional[Callable[[NavWait], None]] = None) -> bool:
+    """Mở menu NPC → chọn option → đợi input form (free function). `timeout` áp dụng cho từng bước chờ."""
+    started = time.perf_counter()
+    events = acc.controller.events
+    with events.expect(MenuOpened) as menu:
+        await acc.service.open_menu_npc(npc_id)
+        await menu.wait(timeout)
+    with events.expect(InputFormOpened) as form:
+        await acc.service.confirm_menu_npc(npc_id, option_idx)
+        ok = await form.wait(timeout) is not None
+    _report(f"open_input_form({npc_id}, {option_idx})", started, ok, timeout * 2, on_wait)
+    return ok
 
 
 def find_menu_option(options: list[str], *keywords: str) -> int:
@@ -136,64 +157,81 @@ def find_menu_option(options: list[str], *keywords: str) -> int:
     return -1
 
 
-async def go_home(acc, log_func) -> bool:
+async def _xmap_to(acc, target_map_id: int, timeout: float, log_func: Optional[Callable] = None) -> bool:
+    """
+    Chạy XMap tới `target_map_id` và chờ theo sự kiện (MapEntered / XMapStopped / Disconnected)
+    thay vì poll trạng thái. Dừng XMap khi đã tới nơi; trả về True nếu đang ở map đích.
+    """
+    C = TerminalColors
+    ctrl = acc.controller
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    wake_on = (MapEntered, XMapStopped, Disconnected)
+
+    waiter = ctrl.events.expect(wake_on)
+    try:
+        await ctrl.xmap.start(target_map_id)
+        while ctrl.tile_map.map_id != target_map_id:
+            if not acc.is_logged_in or not ctrl.xmap.is_xmapping:
+                break
+            event = await waiter.wait(max(0.0, deadline - loop.time()))
+            if event is None or not isinstance(event, MapEntered):
+                break
+            if log_func and event.map_id != target_map_id:
+                log_func(f"{C.DIM}  Đang di chuyển... (map {event.map_id}){C.RESET}")
+            waiter = ctrl.events.expect(wake_on)
+    finally:
+        waiter.cancel()
+
+    arrived = ctrl.tile_map.map_id == target_map_id
+    if arrived and ctrl.xmap.is_xmapping:
+        ctrl.xmap.stop()
+    return arrived
+
+
+async def go_home(acc, log_func, timeout: float = XMAP_TIMEOUT,
+                  on_wait: Optional[Callable[[NavWait], None]] = None) -> bool:
     """Di chuyển về nhà theo giới tính nhân vật (free function)."""
     C = TerminalColors
     home_map = HOME_MAPS.get(acc.char.gender, 22)
     if acc.controller.tile_map.map_id == home_map:
         log_func(f"{C.GREEN}→ Đã ở nhà (map {home_map}).{C.RESET}")
         return True
+    started = time.perf_counter()
     try:
-        await acc.controller.xmap.start(home_map)
-        for _ in range(45):
-            if not acc.is_logged_in:
-                return False
-            await asyncio.sleep(0.05)
-            if not acc.controller.xmap.is_xmapping:
-                break
-            if acc.controller.tile_map.map_id == home_map:
-                acc.controller.xmap.stop()
-                break
-        if acc.controller.tile_map.map_id == home_map:
-            log_func(f"{C.GREEN}→ Về nhà OK.{C.RESET}")
-            return True
-        log_func(f"{C.YELLOW}→ Đang ở map {acc.controller.tile_map.map_id}.{C.RESET}")
-        return False
+        arrived = await _xmap_to(acc, home_map, timeout)
     except Exception as e:
         log_func(f"{C.RED}→ Lỗi xmap: {e}{C.RESET}")
         return False
+    wait = _report(f"go_home({home_map})", started, arrived, timeout, on_wait)
+    if arrived:
+        log_func(f"{C.GREEN}→ Về nhà OK ({wait.waited:.1f}s).{C.RESET}")
+    elif acc.is_logged_in:
+        log_func(f"{C.YELLOW}→ Đang ở map {acc.controller.tile_map.map_id}.{C.RESET}")
+    return arrived
 
 
-async def move_to_map(acc, target_map_id: int, log_func) -> bool:
+async def move_to_map(acc, target_map_id: int, log_func, timeout: float = XMAP_TIMEOUT,
+                      on_wait: Optional[Callable[[NavWait], None]] = None) -> bool:
     """Di chuyển đến map theo ID bằng xmap (free function)."""
     C = TerminalColors
     ctrl = acc.controller
     if ctrl.tile_map.map_id == target_map_id:
         log_func(f"{C.GREEN}→ Đã ở map {target_map_id}.{C.RESET}")
         return True
+    started = time.perf_counter()
     try:
         log_func(f"{C.DIM}→ XMap tới map {target_map_id}...{C.RESET}")
-        await ctrl.xmap.start(target_map_id)
-        for i in range(45):
-            if not acc.is_logged_in:
-                return False
-            await asyncio.sleep(0.05)
-            if not ctrl.xmap.is_xmapping:
-                break
-            if ctrl.tile_map.map_id == target_map_id:
-                ctrl.xmap.stop()
-                break
-            if i % 5 == 0 and i > 0:
-                log_func(f"{C.DIM}  Đang di chuyển... (map {ctrl.tile_map.map_id}){C.RESET}")
-        arrived = ctrl.tile_map.map_id == target_map_id
-        if arrived:
-            log_func(f"{C.GREEN}→ Đã đến map {target_map_id}.{C.RESET}")
-        else:
-            log_func(f"{C.YELLOW}→ Không đến được map {target_map_id} (đang ở {ctrl.tile_map.map_id}).{C.RESET}")
-        return arrived
+        arrived = await _xmap_to(acc, target_map_id, timeout, log_func)
     except Exception as e:
         log_func(f"{C.RED}→ Lỗi xmap: {e}{C.RESET}")
         return False
+    wait = _report(f"move_to_map({target_map_id})", started, arrived, timeout, on_wait)
+    if arrived:
+        log_func(f"{C.GREEN}→ Đã đến map {target_map_id} ({wait.waited:.1f}s).{C.RESET}")
+    elif acc.is_logged_in:
+        log_func(f"{C.YELLOW}→ Không đến được map {target_map_id} (đang ở {ctrl.tile_map.map_id}).{C.RESET}")
+    return arrived
 
 
 # ═══════════════════════════════════════════════
@@ -214,6 +252,10 @@ class NavigationService:
         self.log = log_func or (lambda msg: None)
         self.C = TerminalColors
         self.ctrl = acc.controller
+        self.last_wait: Optional[NavWait] = None
+
+    def _record(self, wait: NavWait):
+        self.last_wait = wait
 
     # ═══════════════════════════════════════════════
     # TÌM NPC
@@ -231,27 +273,27 @@ class NavigationService:
     # TELEPORT
     # ═══════════════════════════════════════════════
 
-    async def teleport_to_npc(self, npc_id: int, y_offset: int = -3) -> bool:
+    async def teleport_to_npc(self, npc_id: int, y_offset: int = -3, timeout: float = TELEPORT_TIMEOUT) -> bool:
         """Teleport đến gần NPC."""
-        return await teleport_to_npc(self.acc, npc_id, y_offset)
+        return await teleport_to_npc(self.acc, npc_id, y_offset, timeout, self._record)
 
     # ═══════════════════════════════════════════════
     # MENU NPC
     # ═══════════════════════════════════════════════
 
-    async def open_menu(self, npc_id: int, timeout: float = 3.0) -> list[str]:
+    async def open_menu(self, npc_id: int, timeout: float = MENU_TIMEOUT) -> list[str]:
         """Mở menu NPC, trả về danh sách tùy chọn."""
-        return await open_menu_npc(self.acc, npc_id, timeout)
+        return await open_menu_npc(self.acc, npc_id, timeout, self._record)
 
     async def confirm_menu(self, npc_id: int, option_idx: int,
-                           wait_next: bool = False, timeout: float = 3.0) -> list[str]:
+                           wait_next: bool = False, timeout: float = MENU_TIMEOUT) -> list[str]:
         """Xác nhận tùy chọn trong menu NPC."""
-        return await confirm_menu_npc(self.acc, npc_id, option_idx, wait_next, timeout)
+        return await confirm_menu_npc(self.acc, npc_id, option_idx, wait_next, timeout, self._record)
 
     async def open_input_form(self, npc_id: int, option_idx: int,
-                              timeout: float = 3.0) -> bool:
+                              timeout: float = MENU_TIMEOUT) -> bool:
         """Mở menu NPC → chọn option → đợi input form xuất hiện."""
-        return await open_input_form(self.acc, npc_id, option_idx, timeout)
+        return await open_input_form(self.acc, npc_id, option_idx, timeout, self._record)
 
     @staticmethod
     def find_menu_option(options: list[str], *keywords: str) -> int:
@@ -262,10 +304,10 @@ class NavigationService:
     # DI CHUYỂN MAP
     # ═══════════════════════════════════════════════
 
-    async def go_home(self) -> bool:
+    async def go_home(self, timeout: float = XMAP_TIMEOUT) -> bool:
         """Di chuyển về nhà theo giới tính nhân vật."""
-        return await go_home(self.acc, self.log)
+        return await go_home(self.acc, self.log, timeout, self._record)
 
-    async def move_to_map(self, target_map_id: int) -> bool:
+    async def move_to_map(self, target_map_id: int, timeout: float = XMAP_TIMEOUT) -> bool:
         """Di chuyển đến map theo ID bằng xmap."""
-        return await move_to_map(self.acc, target_map_id, self.log)
+        return await move_to_map(self.acc, target_map_id, self.log, timeout, self._record)
@@ -0,0 +1,172 @@
+"""
+PathFinder - Tìm đường trong một map trên lưới tile (tmw x tmh) bằng A*.
+
+Luật va chạm theo client C# (Char.update):
+  - Đi sang phải vào ô có T_LEFT  -> bị chặn (tường bên trái của ô)
+  - Đi sang trái vào ô có T_RIGHT -> bị chặn (tường bên phải của ô)
+  - Đi xuống từ ô có T_TOP        -> bị chặn (đang đứng trên mặt đất/bục)
+  - Đi lên luôn được (bục một chiều, nhân vật bay)
+
+Route trả về là danh sách waypoint pixel tối giản (đã làm mượt theo line-of-sight),
+mỗi waypoint tương ứng một gói char_move.
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from model.map_objects import CollisionGrid, TileMap
+
+T_TOP = TileMap.T_TOP
+T_LEFT = TileMap.T_LEFT
+T_RIGHT = TileMap.T_RIGHT
+
+Cell = Tuple[int, int]
+
+
+class TileGrid:
+    """Bộ tìm đường trên lưới va chạm dùng chung (`CollisionGrid`) của một map."""
+
+    def __init__(self, collision: CollisionGrid):
+        self.collision = collision
+        self.map_id = collision.map_id
+        self.tmw = collision.tmw
+        self.tmh = collision.tmh
+        self.size = collision.size
+        self.flags = collision.types
+
+    def cell_of(self, px: int, py: int) -> Cell:
+        """Chuyển tọa độ pixel sang ô (cột, hàng), kẹp trong biên map."""
+        cx = min(max(px // self.size, 0), self.tmw - 1)
+        cy = min(max(py // self.size, 0), self.tmh - 1)
+        return cx, cy
+
+    def pixel_of(self, cell: Cell) -> Tuple[int, int]:
+        """Tọa độ pixel đại diện của ô: giữa ô theo X, mặt đất nếu là ô T_TOP."""
+        cx, cy = cell
+        y = cy * self.size
+        if not self.flags[cy * self.tmw + cx] & T_TOP:
+            y += self.size // 2
+        return cx * self.size + self.size // 2, y
+
+    def can_step(self, cx: int, cy: int, dx: int, dy: int) -> bool:
+        """Kiểm tra bước 4 hướng từ ô (cx, cy) sang ô kề (cx+dx, cy+dy)."""
+        nx, ny = cx + dx, cy + dy
+        if nx < 0 or ny < 0 or nx >= self.tmw or ny >= self.tmh:
+            return False
+        if dx > 0:
+            return not self.flags[ny * self.tmw + nx] & T_LEFT
+        if dx < 0:
+            return not self.flags[ny * self.tmw + nx] & T_RIGHT
+        if dy > 0:
+            return not self.flags[cy * self.tmw + cx] & T_TOP
+        return True
+
+    def find_path(self, start: Cell, goal: Cell, max_nodes: int = 20000) -> Optional[List[Cell]]:
+        """A* 4 hướng (heuristic Manhattan). Trả về danh sách ô từ start tới goal, hoặc None."""
+        if start == goal:
+            return [start]
+
+        gx, gy = goal
+        open_heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start)]
+        came_from: Dict[Cell, Cell] = {}
+        g_score: Dict[Cell, int] = {start: 0}
+        expanded = 0
+
+        while open_heap:
+            _, g, cell = heapq.heappop(open_heap)
+            if cell == goal:
+                path = [cell]
+                while cell in came_from:
+                    cell = came_from[cell]
+                    path.append(cell)
+                path.reverse()
+                return path
+            if g > g_score.get(cell, g):
+                continue
+
+            expanded += 1
+            if expanded > max_nodes:
+                return None
+
+            cx, cy = cell
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if not self.can_step(cx, cy, dx, dy):
+                    continue
+                nxt = (cx + dx, cy + dy)
+                ng = g + 1
+                if ng < g_score.get(nxt, ng + 1):
+                    g_score[nxt] = ng
+                    came_from[nxt] = cell
+                    h = abs(nxt[0] - gx) + abs(nxt[1] - gy)
+                    heapq.heappush(open_heap, (ng + h, ng, nxt))
+        return None
+
+    def line_clear(self, a: Cell, b: Cell) -> bool:
+        """Kiểm tra đoạn thẳng a -> b đi được: duyệt các ô mà đoạn thẳng cắt qua, từng bước 4 hướng."""
+        x, y = a
+        tx, ty = b
+        nx, ny = abs(tx - x), abs(ty - y)
+        sx = 1 if tx > x else -1
+        sy = 1 if ty > y else -1
+        ix = iy = 0
+        while ix < nx or iy < ny:
+            # So sánh (0.5 + ix) / nx với (0.5 + iy) / ny không dùng số thực
+            if (1 + 2 * ix) * ny < (1 + 2 * iy) * nx:
+                if not self.can_step(x, y, sx, 0):
+                    return False
+                x += sx
+                ix += 1
+            else:
+                if not self.can_step(x, y, 0, sy):
+                    return False
+                y += sy
+                iy += 1
+        return True
+
+    def smooth(self, path: List[Cell]) -> List[Cell]:
+        """Rút gọn path thành ít waypoint nhất có thể bằng line-of-sight tham lam."""
+        if len(path) <= 2:
+            return list(path)
+        result = [path[0]]
+        anchor = 0
+        while anchor < len(path) - 1:
+            nxt = len(path) - 1
+            while nxt > anchor + 1 and not self.line_clear(path[anchor], path[nxt]):
+                nxt -= 1
+            result.append(path[nxt])
+            anchor = nxt
+        return result
+
+    def route(self, sx: int, sy: int, tx: int, ty: int) -> Optional[List[Tuple[int, int]]]:
+        """Tìm route pixel từ (sx, sy) tới (tx, ty). Waypoint cuối luôn là đích chính xác."""
+        start = self.cell_of(sx, sy)
+        goal = self.cell_of(tx, ty)
+        path = self.find_path(start, goal)
+        if path is None:
+            return None
+        cells = self.smooth(path)
+        waypoints = [self.pixel_of(c) for c in cells[1:-1]]
+        waypoints.append((tx, ty))
+        return waypoints
+
+
+# Cache lưới theo map_id, dùng chung cho mọi tài khoản
+_GRID_CACHE: Dict[int, TileGrid] = {}
+
+
+def get_grid(tile_map: TileMap) -> Optional[TileGrid]:
+    """Lấy (hoặc dựng và cache) lưới tìm đường cho map hiện tại. None nếu chưa có dữ liệu tile."""
+    if not tile_map.has_tile_data:
+        return None
+    grid = _GRID_CACHE.get(tile_map.map_id)
+    if grid is None or grid.collision is not tile_map.grid:
+        grid = TileGrid(tile_map.grid)
+        _GRID_CACHE[tile_map.map_id] = grid
+    return grid
+
+
+def find_route(tile_map: TileMap, sx: int, sy: int, tx: int, ty: int) -> Optional[List[Tuple[int, int]]]:
+    """Route waypoint pixel trong map hiện tại, hoặc None nếu không có dữ liệu tile / không có đường."""
+    grid = get_grid(tile_map)
+    if grid is None:
+        return None
+    return grid.route(sx, sy, tx, ty)
@@ -56,7 +56,7 @@ def handle_pet_info_response(msg: Message):
                     continue
                 
                 item = Item()
-                item.template_id = template_id
+                item.item_id = template_id
                 # Giả sử đã có hàm để lấy ItemTemplate từ id
                 # item.template = ItemTemplates.get(template_id) 
                 
@@ -66,12 +66,12 @@ def handle_pet_info_response(msg: Message):
                 
                 num_options = msg.reader.read_unsigned_byte()
                 if num_options > 0:
-                    item.options = []
+                    item.item_option = []
                     for _ in range(num_options):
                         option_id = msg.reader.read_unsigned_byte()
                         param = msg.reader.read_unsigned_short()
                         if option_id != -1:
-                            item.options.append(ItemOption(option_id, param))
+                            item.item_option.append(ItemOption(option_id, param))
                 pet.items_body[i] = item
 
             # Đọc các chỉ số của đệ tử
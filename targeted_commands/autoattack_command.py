@@ -18,11 +18,6 @@ class AutoattackCommand(TargetedCommand):
                 print(f"[{self.C.YELLOW}{account.username}{self.C.RESET}] Đã {'BẬT' if status else 'TẮT'} autoattack.")
             
             elif sub == "target":
-                # Lazy init auto_attack
-                if account.controller.auto_attack is None:
-                    from logic.auto_attack import AutoAttack
-                    account.controller.auto_attack = AutoAttack(account.controller)
-                
                 if len(parts) > 2:
                     target_arg = parts[2]
                     
@@ -75,11 +70,6 @@ class AutoattackCommand(TargetedCommand):
 
             
             elif sub == "clear":
-                # Lazy init auto_attack
-                if account.controller.auto_attack is None:
-                    from logic.auto_attack import AutoAttack
-                    account.controller.auto_attack = AutoAttack(account.controller)
-                
                 account.controller.auto_attack.clear_target()
                 print(f"[{self.C.YELLOW}{account.username}{self.C.RESET}] Đã xóa target")
             
@@ -2,7 +2,7 @@ from targeted_commands.base_targeted_command import TargetedCommand
 from typing import Any
 from core.account import Account
 from logs.logger_config import TerminalColors
-from main import MOB_NAMES
+from logic.game_data import GAME_DATA
 
 class FindmobCommand(TargetedCommand):
     def __init__(self):
@@ -50,7 +50,7 @@ class FindmobCommand(TargetedCommand):
             hp_text = f"{data['hp']}/{data['max_hp']}"
             
             # Lấy tên từ Mob object (đại diện bằng mob_id đầu tiên tìm được)
-            mob_name = MOB_NAMES.get(data['template_id'])
+            mob_name = GAME_DATA.mob_name(data['template_id'])
             if not mob_name:
                 mob_obj = account.controller.mobs.get(data['mob_id'])
                 mob_name = mob_obj.name if mob_obj and mob_obj.name else f"{data['template_id']}"
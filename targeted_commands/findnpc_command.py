@@ -2,6 +2,7 @@ from targeted_commands.base_targeted_command import TargetedCommand
 from typing import Any
 from core.account import Account
 from logs.logger_config import TerminalColors
+from logic.game_data import GAME_DATA
 
 class FindnpcCommand(TargetedCommand):
     def __init__(self):
@@ -12,21 +13,16 @@ class FindnpcCommand(TargetedCommand):
         if not npcs:
             print(f"[{self.C.YELLOW}{account.username}{self.C.RESET}] Không tìm thấy NPC nào trên bản đồ hiện tại.")
         else:
-            try:
-                from logic.npc_names import NPC_NAMES
-            except ImportError:
-                NPC_NAMES = {}
-
             print(f"[{self.C.YELLOW}{account.username}{self.C.RESET}] Các NPC trên bản đồ:")
             for npc_id, npc_data in npcs.items():
                 template_id = npc_data.get('template_id', 'N/A')
                 raw_name = npc_data.get('name')
                 
-                # Ưu tiên name có sẵn từ npc_data, nếu không thì lấy từ NPC_NAMES
+                # Ưu tiên name có sẵn từ npc_data, nếu không thì lấy từ bảng NPC dùng chung
                 if raw_name:
                     name = f"{raw_name} ({template_id})"
                 else:
-                    real_name = NPC_NAMES.get(template_id)
+                    real_name = GAME_DATA.npcs.get(template_id)
                     if real_name:
                         name = f"{real_name} ({template_id})"
                     else:
@@ -1,7 +1,9 @@
 from targeted_commands.base_targeted_command import TargetedCommand
 from typing import Any
 from core.account import Account
-from logs.logger_config import set_logger_status
+from logs.logger_config import (
+    set_logger_status, set_json_output, set_account_sampling, set_level, get_levels,
+)
 
 class LoggerCommand(TargetedCommand):
     async def execute(self, account: Account, *args, **kwargs) -> Any:
@@ -10,6 +12,28 @@ class LoggerCommand(TargetedCommand):
             status = parts[1] == "on"
             set_logger_status(status)
             print(f"Đã {'BẬT' if status else 'TẮT'} logger.")
+        elif len(parts) > 2 and parts[1] == "json" and parts[2] in ["on", "off"]:
+            enabled = parts[2] == "on"
+            path = parts[3] if len(parts) > 3 else None
+            set_json_output(enabled, path)
+            print(f"Đã {'BẬT' if enabled else 'TẮT'} log JSON{f' ({path})' if enabled and path else ''}.")
+        elif len(parts) > 2 and parts[1] == "sample" and parts[2].isdigit():
+            rate = int(parts[2])
+            # Mặc định áp dụng cho account đang target; 'all' = mọi account
+            target = parts[3] if len(parts) > 3 else account.username
+            set_account_sampling(rate, None if target == "all" else target)
+            print(f"Lấy mẫu log 1/{max(1, rate)} cho {'mọi tài khoản' if target == 'all' else target}.")
+        elif len(parts) > 3 and parts[1] == "level":
+            # logger level network.session debug  |  logger level logic warning
+            name, level = parts[2], parts[3]
+            if set_level(name, level):
+                print(f"Mức log của '{name}' → {level.upper()}.")
+            else:
+                print(f"Mức log không hợp lệ: {level} (debug|info|warning|error|critical).")
+        elif len(parts) > 1 and parts[1] == "levels":
+            for name, level in get_levels().items():
+                print(f"  {name:<40} {level}")
         else:
-            print("Sử dụng: logger <on|off>")
+            print("Sử dụng: logger <on|off> | logger level <tên> <mức> | logger levels | "
+                  "logger json <on|off> [file] | logger sample <N> [username|all]")
         return True, "OK"
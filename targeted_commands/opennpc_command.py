@@ -1,6 +1,9 @@
 import asyncio
 from targeted_commands.base_targeted_command import TargetedCommand
-from logs.logger_config import TerminalColors as C, logger
+from logs.logger_config import TerminalColors as C, get_logger
+from controller.event_bus import MenuOpened
+
+logger = get_logger("targeted_commands.opennpc")
 
 class OpenNpcCommand(TargetedCommand):
     async def execute(self, account, *args, **kwargs):
@@ -38,11 +41,10 @@ class OpenNpcCommand(TargetedCommand):
             # Teleport slightly above the NPC
             await controller.movement.teleport_to(target_npc['x'], target_npc['y'] - 3)
             
-            controller.ui_menu_event.clear()
-            await controller.account.service.open_menu_npc(npc_template_id)
-            
             try:
-                await asyncio.wait_for(controller.ui_menu_event.wait(), timeout=2.0)
+                with controller.events.expect(MenuOpened) as menu:
+                    await controller.account.service.open_menu_npc(npc_template_id)
+                    await menu.result(2.0)
                 options = controller.last_ui_options
                 
                 # Nếu chỉ mở để xem
@@ -57,16 +59,16 @@ class OpenNpcCommand(TargetedCommand):
                 else:
                     for arg in parts[2:]:
                         idx = int(arg)
-                        controller.ui_menu_event.clear()
-                        await controller.account.service.confirm_menu_npc(npc_template_id, idx)
-                        print(f"[{controller.account.username}] Đã chọn menu index: {idx}")
-                        
-                        # Đợi menu tiếp theo nếu có nhiều tham số
-                        if arg != parts[-1]:
-                            try:
-                                await asyncio.wait_for(controller.ui_menu_event.wait(), timeout=2.0)
-                            except asyncio.TimeoutError:
-                                break
+                        with controller.events.expect(MenuOpened) as menu:
+                            await controller.account.service.confirm_menu_npc(npc_template_id, idx)
+                            print(f"[{controller.account.username}] Đã chọn menu index: {idx}")
+
+                            # Đợi menu tiếp theo nếu có nhiều tham số
+                            if arg != parts[-1]:
+                                try:
+                                    await menu.result(2.0)
+                                except asyncio.TimeoutError:
+                                    break
                             
             except asyncio.TimeoutError:
                 print(f"[{controller.account.username}] Timeout: Không nhận được menu từ {npc_name}.")
@@ -1,9 +1,11 @@
 from targeted_commands.base_targeted_command import TargetedCommand
-from logs.logger_config import logger, TerminalColors
+from logs.logger_config import get_logger, TerminalColors
 from core.account import Account
 import asyncio
 from typing import Any
 
+logger = get_logger("targeted_commands.scanmap")
+
 class ScanMapCommand(TargetedCommand):
     """
     Quét danh sách quái vật trong một khoảng Map ID và tự động lưu vào maps_config.json.
@@ -5,6 +5,7 @@ from logs.logger_config import TerminalColors
 from ui import display_character_status, display_character_base_stats, display_task_info, Box, display_boss_list
 import asyncio
 from logic.boss_manager import BossManager
+from controller.event_bus import PetInfoUpdated
 
 class ShowCommand(TargetedCommand):
     def __init__(self):
@@ -250,6 +251,13 @@ class ShowCommand(TargetedCommand):
                 await self._show_pet_equip(account)
                 print()
 
+            elif sub == "handlers":
+                # show handlers on|off|reset  |  show handlers [N] [total|avg|max|count|bytes|errors]
+                self._show_handlers(account, parts[2:])
+
+            elif sub == "bosstime":
+                self._show_boss_predictions(account, " ".join(parts[2:]))
+
             else:
                 print(f"[{self.C.YELLOW}{account.username}{self.C.RESET}] Lệnh show con không xác định: {sub}")
         else:
@@ -257,6 +265,64 @@ class ShowCommand(TargetedCommand):
             display_character_status(account, compact=compact_mode, idx=idx)
         return True, "OK"
 
+    # ─── Helper: đo process_* của handler (show handlers) ───
+    def _show_handlers(self, account, args):
+        from controller.handlers import instrumentation
+        ctrl = account.controller
+        tag = f"[{self.C.YELLOW}{account.username}{self.C.RESET}]"
+        action = args[0].lower() if args else ""
+
+        if action == "on":
+            instrumentation.enable(ctrl)
+            print(f"{tag} Đã BẬT đo process_* (show handlers [N] để xem).")
+            return
+        if action == "off":
+            instrumentation.disable(ctrl)
+            print(f"{tag} Đã TẮT đo process_* (số liệu vẫn giữ).")
+            return
+        if action == "reset":
+            instrumentation.reset(ctrl)
+            print(f"{tag} Đã xoá số liệu đo process_*.")
+            return
+
+        n = int(action) if action.isdigit() else 10
+        sort = args[1].lower() if len(args) > 1 else "total"
+        rows = instrumentation.top(ctrl, n, sort)
+        state = f"{self.C.GREEN}BẬT{self.C.RESET}" if instrumentation.is_enabled(ctrl) else f"{self.C.DIM}TẮT{self.C.RESET}"
+        print(f"{tag} {self.C.CYAN}--- Top {n} loại gói tốn nhất (theo {sort if sort in instrumentation.SORT_KEYS else 'total'}) ---{self.C.RESET} đo: {state}")
+        if not rows:
+            print(f"  {self.C.DIM}(chưa có số liệu — bật bằng 'show handlers on'){self.C.RESET}")
+            return
+        print(f"{self.C.PURPLE}{'Cmd':>5} | {'Handler':<36} | {'Số lần':>7} | {'Tổng ms':>9} | {'TB µs':>8} | {'Max ms':>7} | {'TB byte':>7} | {'Lỗi':>4}{self.C.RESET}")
+        print("-" * 100)
+        for s in rows:
+            avg_bytes = s.bytes // s.count if s.count else 0
+            err = f"{self.C.RED}{s.errors:>4}{self.C.RESET}" if s.errors else f"{s.errors:>4}"
+            print(f"{s.cmd:>5} | {s.handler:<36} | {s.count:>7} | {s.total * 1000:>9.2f} | "
+                  f"{s.avg * 1e6:>8.1f} | {s.max * 1000:>7.2f} | {avg_bytes:>7} | {err}")
+
+    # ─── Helper: dự đoán boss hồi sinh (show bosstime) ───
+    def _show_boss_predictions(self, account, keyword: str):
+        from logic.boss_history import BOSS_HISTORY, DEATH
+        manager = BossManager()
+        names = [keyword] if keyword else BOSS_HISTORY.names()
+        predictions = [p for p in (manager.predict_next(name) for name in names) if p is not None]
+        predictions.sort(key=lambda p: p.eta)
+
+        print(f"[{self.C.YELLOW}{account.username}{self.C.RESET}] {self.C.CYAN}--- Dự đoán boss hồi sinh ---{self.C.RESET}")
+        if not predictions:
+            print(f"  {self.C.DIM}(chưa đủ lịch sử — cần ít nhất 2 chu kỳ mỗi boss){self.C.RESET}")
+            return
+        print(f"{self.C.PURPLE}{'Boss':<26} | {'Bản đồ':<24} | {'Dự kiến':<8} | {'Còn':>7} | {'Chu kỳ':>12} | {'Mẫu':>4} | Mốc{self.C.RESET}")
+        print("-" * 100)
+        for p in predictions:
+            left = p.seconds_left()
+            left_text = f"{left:>6.0f}s" if left >= 0 else f"{self.C.RED}{left:>6.0f}s{self.C.RESET}"
+            cycle = f"{p.interval:.0f}s±{p.spread:.0f}"
+            basis = "chết" if p.basis == DEATH else "xuất hiện"
+            print(f"{p.name[:26]:<26} | {f'{p.map_name} [{p.map_id}]'[:24]:<24} | {p.eta:%H:%M:%S} | "
+                  f"{left_text:>7} | {cycle:>12} | {p.samples:>4} | {basis}")
+
     # ─── Helper: hiển thị trang bị trên body sư phụ + đệ tử (dùng trong show equip) ───
     def _show_body_equip(self, account):
         """Hiển thị trang bị sư phụ + đệ tử đang mặc (tổng hợp nhanh)."""
@@ -329,9 +395,9 @@ class ShowCommand(TargetedCommand):
         """Hiển thị chi tiết trang bị đệ tử đang mặc."""
         if not (account.pet and account.pet.have_pet):
             try:
-                account.controller.pet_info_event.clear()
-                await account.service.pet_info()
-                await asyncio.wait_for(account.controller.pet_info_event.wait(), timeout=3.0)
+                with account.controller.events.expect(PetInfoUpdated) as pet_info:
+                    await account.service.pet_info()
+                    await pet_info.result(3.0)
             except Exception:
                 pass
 
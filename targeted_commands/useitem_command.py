@@ -26,11 +26,7 @@ class UseitemCommand(TargetedCommand):
                 return False, "Hành trang trống"
 
             # Tìm item trong hành trang
-            found_index = -1
-            for i, item in enumerate(char.arr_item_bag):
-                if item and item.item_id == item_id:
-                    found_index = i
-                    break
+            found_index = char.bag_index.first_slot(item_id)
                     
             if found_index == -1:
                 print(f"[{self.C.YELLOW}{account.username}{self.C.RESET}] Không tìm thấy item ID {item_id} trong hành trang.")
@@ -74,10 +74,11 @@ def display_character_status(account, compact=False, idx: int = None):
         zone_id = str(map_info.get('zone', '?'))
         coords = f"{char.cx},{char.cy}"
         
-        # Function status indicators
+        # Function status indicators (module lazy chưa khởi tạo = đang tắt, không tạo chỉ để hiển thị)
+        from controller.controller import LazyComponent
         ap_on = account.controller.auto_play.interval
-        apet_on = account.controller.auto_pet.is_running
-        aquest_on = getattr(account.controller.auto_quest, 'is_running', False)
+        apet_on = getattr(LazyComponent.loaded(account.controller, 'auto_pet'), 'is_running', False)
+        aquest_on = getattr(LazyComponent.loaded(account.controller, 'auto_quest'), 'is_running', False)
         
         funcs = ""
         if ap_on:
@@ -122,10 +123,15 @@ def display_character_status(account, compact=False, idx: int = None):
         print(f"  {C.GREEN}Ngọc khóa:{C.RESET} {C.PURPLE}{short_number(getattr(char, 'luong_khoa', 0))}{C.RESET}")
         
         print_section_header("Chức năng", width=55, color=C.CYAN)
+        # Module lazy chưa khởi tạo thì chắc chắn đang tắt: không tạo chỉ để hiển thị [OFF]
+        from controller.controller import LazyComponent
+        auto_pet = LazyComponent.loaded(account.controller, 'auto_pet')
+        auto_quest = LazyComponent.loaded(account.controller, 'auto_quest')
+        auto_main_quest = LazyComponent.loaded(account, 'auto_main_quest')
         ap_status = f"{C.BRIGHT_GREEN}[ON]{C.RESET}" if account.controller.auto_play.interval else f"{C.RED}[OFF]{C.RESET}"
-        apet_status = f"{C.BRIGHT_GREEN}[ON]{C.RESET}" if account.controller.auto_pet.is_running else f"{C.RED}[OFF]{C.RESET}"
-        abm_status = f"{C.BRIGHT_GREEN}[ON]{C.RESET}" if getattr(account.controller.auto_quest, 'is_running', False) else f"{C.RED}[OFF]{C.RESET}"
-        aquest_status = f"{C.BRIGHT_GREEN}[ON]{C.RESET}" if getattr(account, 'auto_main_quest', None) and account.auto_main_quest.is_running else f"{C.RED}[OFF]{C.RESET}"
+        apet_status = f"{C.BRIGHT_GREEN}[ON]{C.RESET}" if auto_pet and auto_pet.is_running else f"{C.RED}[OFF]{C.RESET}"
+        abm_status = f"{C.BRIGHT_GREEN}[ON]{C.RESET}" if getattr(auto_quest, 'is_running', False) else f"{C.RED}[OFF]{C.RESET}"
+        aquest_status = f"{C.BRIGHT_GREEN}[ON]{C.RESET}" if auto_main_quest and auto_main_quest.is_running else f"{C.RED}[OFF]{C.RESET}"
         
         print(f"  {C.DIM}AutoPlay :{C.RESET} {ap_status}    {C.DIM}AutoPet:{C.RESET} {apet_status}    {C.DIM}AutoBM:{C.RESET} {abm_status}    {C.DIM}AutoQuest:{C.RESET} {aquest_status}")
 
@@ -30,12 +30,15 @@ def display_help():
         ("show", "Hiển thị thông tin nhân vật"),
         ("show balo", "Hiển thị item trong hành trang và rương"),
         ("show boss", "Hiển thị danh sách Boss xuất hiện"),
+        ("show bosstime [tên]", "Dự đoán boss hồi sinh (map, thời điểm) từ lịch sử"),
         ("show mobs", "Hiển thị danh sách quái trong map"),
         ("show csgoc", "Hiển thị chỉ số GỐC (chưa cộng đồ)"),
         ("show nhiemvu", "Hiển thị thông tin nhiệm vụ"),
         ("show equip", "Hiển thị trạng thái ép sao + body sư phụ/đệ tử"),
         ("show equip_master", "Chi tiết trang bị sư phụ đang mặc"),
         ("show equip_pet", "Chi tiết trang bị đệ tử đang mặc"),
+        ("show handlers <on|off|reset>", "Bật/tắt đo thời gian giải mã từng loại gói tin"),
+        ("show handlers [N] [sắp xếp]", "Top N loại gói tốn nhất (total|avg|max|count|bytes|errors)"),
         ("pet", "Xem các lệnh đệ tử"),
         ("andau", "Sử dụng đậu thần hồi HP/MP"),
         ("hit", "Tấn công quái vật gần nhất"),
@@ -92,6 +95,21 @@ def display_help():
         print(f"  {C.GREEN}{cmd:<26}{C.RESET} {C.DIM}-{C.RESET} {desc}")
     print()
 
+    # Section: Monitoring
+    print_section_header("Giám Sát", width=70, color=C.PURPLE)
+    cmds = [
+        ("metrics show [tiền tố]", "Xem counter/gauge/histogram hiện tại"),
+        ("metrics serve [port] | stop", "Mở/tắt HTTP /metrics (127.0.0.1, mặc định 9108)"),
+        ("metrics dump [file]", "Ghi metrics ra file (mặc định metrics.prom)"),
+        ("monitor on [ms] [ngưỡng_ms] | off", "Bật/tắt đo độ trễ event loop và phát hiện task chặn loop"),
+        ("monitor [status|tasks [N]|blocks]", "Xem độ trễ loop, số task theo coroutine/tài khoản, lần chặn"),
+        ("profile start [giây] [hz] | stop", "Lấy mẫu CPU của event loop theo coroutine/tài khoản"),
+        ("profile dump [file] | status", "Ghi stack gộp (flamegraph) ra file, xem tóm tắt"),
+    ]
+    for cmd, desc in cmds:
+        print(f"  {C.GREEN}{cmd:<26}{C.RESET} {C.DIM}-{C.RESET} {desc}")
+    print()
+
     # Section: Other
     print_section_header("Khác", width=70, color=C.PURPLE)
     cmds = [
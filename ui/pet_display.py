@@ -1,10 +1,12 @@
 """Module chứa các hàm hiển thị thông tin pet."""
 
-from logs.logger_config import logger, TerminalColors as C, print_header, print_separator
+from logs.logger_config import get_logger, TerminalColors as C, print_header, print_separator
 from ui.formatters import short_number
 from ui.pet_status import get_pet_status_vietnamese, get_pet_status_short, get_pet_status_short_raw
 from ui.table_utils import pad_colored
 
+logger = get_logger("ui.pet_display")
+
 
 def display_pet_info(pet, username="Unknown", compact=False, idx: int = None):
     """Hiển thị thông tin chi tiết của đệ tử."""
@@ -1,6 +1,6 @@
 import sys
 import os
-from logic.npc_names import NPC_NAMES
+from logic.game_data import GAME_DATA
 
 # Cấu trúc lệnh gợi ý: { "lệnh_chính": ["sub1", "sub2", ...] }
 COMMAND_TREE = {
@@ -176,7 +176,7 @@ def get_candidates(buffer_str):
                 
         if should_suggest_npc:
             # Tạo list ID từ dict (chỉ lấy các ID phổ biến có trong map)
-            npc_ids = [str(k) for k in NPC_NAMES.keys()]
+            npc_ids = [str(k) for k in GAME_DATA.npcs.keys()]
             candidates = [i for i in npc_ids if i.startswith(current_npc_prefix)]
             return sorted(candidates), current_npc_prefix
     # --- End NPC Autocomplete ---
@@ -1,7 +1,9 @@
 import re
 import math
 import random
-from logs.logger_config import logger
+from logs.logger_config import get_logger
+
+logger = get_logger("utils.macro_interpreter")
 
 class MacroInterpreter:
     def __init__(self, name: str, lines: list[str], manager=None):